@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+# Copyright 2012, 2013 The GalSim developers:
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+#
+# GalSim is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GalSim is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""A script to time drawing a GaussianMixture compared to the equivalent Add of Gaussians.
+
+For each number of components, this times drawing (in real space, with no pixel convolution)
+  - a single Gaussian with the same total flux, for reference,
+  - a GaussianMixture of that many sheared and shifted components,
+  - the equivalent galsim.Add of sheared and shifted Gaussians.
+It also checks that the two images agree.
+
+Usage: time_gaussian_mixture.py [ncomponents ...]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+# This machinery lets us run Python examples even though they aren't positioned
+# properly to find galsim as a package in the current directory.
+try:
+    import galsim
+except ImportError:
+    path, filename = os.path.split(__file__)
+    sys.path.append(os.path.abspath(os.path.join(path, "..", "..", "..")))
+    import galsim
+
+NPIX = 128              # size of the image
+PIXEL_SCALE = 0.2       # arcsec
+NREPEAT = 5             # number of times to draw each one
+RANDOM_SEED = 1234
+
+def make_components(n, ud):
+    """Make random fluxes, sigmas, shears and centers for n components, typical of a galaxy
+    model made from many small Gaussians.
+    """
+    flux = np.array([ 0.1 + ud() for i in range(n) ])
+    sigma = np.array([ 0.1 + 0.4 * ud() for i in range(n) ])
+    g1 = np.array([ 0.6 * ud() - 0.3 for i in range(n) ])
+    g2 = np.array([ 0.6 * ud() - 0.3 for i in range(n) ])
+    x0 = np.array([ 4. * ud() - 2. for i in range(n) ])
+    y0 = np.array([ 4. * ud() - 2. for i in range(n) ])
+    return flux, sigma, g1, g2, x0, y0
+
+def time_draw(obj):
+    im = galsim.ImageD(NPIX, NPIX)
+    t1 = time.time()
+    for i in range(NREPEAT):
+        obj.draw(im, dx=PIXEL_SCALE)
+    t2 = time.time()
+    return im, (t2-t1) / NREPEAT
+
+def time_ncomponents(n, ud):
+    flux, sigma, g1, g2, x0, y0 = make_components(n, ud)
+
+    # The covariance of a Gaussian with the given sigma after applyShear(g1,g2).
+    gsq = g1**2 + g2**2
+    cxx = sigma**2 * ((1.+g1)**2 + g2**2) / (1.-gsq)
+    cxy = sigma**2 * 2.*g2 / (1.-gsq)
+    cyy = sigma**2 * ((1.-g1)**2 + g2**2) / (1.-gsq)
+    mix = galsim.GaussianMixture(flux, cov=np.array([cxx,cxy,cyy]).T, x0=x0, y0=y0)
+
+    gauss = []
+    for i in range(n):
+        g = galsim.Gaussian(sigma=sigma[i], flux=flux[i])
+        g.applyShear(g1=g1[i], g2=g2[i])
+        g.applyShift(x0[i], y0[i])
+        gauss.append(g)
+    add = galsim.Add(gauss)
+
+    single = galsim.Gaussian(sigma=1., flux=flux.sum())
+
+    im_single, t_single = time_draw(single)
+    im_mix, t_mix = time_draw(mix)
+    im_add, t_add = time_draw(add)
+    maxdiff = np.max(np.abs(im_mix.array - im_add.array)) / np.max(np.abs(im_add.array))
+
+    print "%5d   %9.5f   %9.5f   %9.5f    %8.2f    %.1e"%(
+        n, t_single, t_mix, t_add, t_add/t_mix, maxdiff)
+
+def main(argv):
+    if len(argv) > 1:
+        ncomponents = [ int(arg) for arg in argv[1:] ]
+    else:
+        ncomponents = [ 1, 3, 10, 30, 100, 300 ]
+    ud = galsim.UniformDeviate(RANDOM_SEED)
+    print "Times in seconds to draw a %dx%d image"%(NPIX,NPIX)
+    print "    n      single     mixture         Add    Add/mixture    max rel diff"
+    for n in ncomponents:
+        time_ncomponents(n, ud)
+
+if __name__ == "__main__":
+    main(sys.argv)
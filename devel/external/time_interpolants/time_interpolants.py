@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+# Copyright 2012, 2013 The GalSim developers:
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+#
+# GalSim is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GalSim is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""A script to time the interpolation of an InterpolatedImage with each type of Interpolant.
+
+For each interpolant, this times
+  - drawing a sheared InterpolatedImage in real space (XTable interpolation),
+  - xValue at scattered positions, as PowerSpectrum.getShear does (XTable interpolation),
+  - drawK of a sheared InterpolatedImage using it as the k interpolant (KTable interpolation).
+Run it before and after a change to the interpolation code to see the effect.  The results for
+the change that added Interpolant::xvalTaps are in interpolant_timing_results.txt.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+# This machinery lets us run Python examples even though they aren't positioned
+# properly to find galsim as a package in the current directory.
+try:
+    import galsim
+except ImportError:
+    path, filename = os.path.split(__file__)
+    sys.path.append(os.path.abspath(os.path.join(path, "..", "..", "..")))
+    import galsim
+
+NPIX = 64               # size of the original image
+PIXEL_SCALE = 0.2       # arcsec
+NPOS = 20000            # number of scattered positions for xValue
+RANDOM_SEED = 1234
+
+def time_interpolant(name, interp):
+    gal = galsim.Sersic(n=2.5, half_light_radius=1.2)
+    gal.applyShear(g1=0.2, g2=-0.1)
+    im = galsim.ImageD(NPIX, NPIX)
+    gal.draw(im, dx=PIXEL_SCALE)
+
+    interp2d = galsim.InterpolantXY(interp)
+    int_im = galsim.InterpolatedImage(im, x_interpolant=interp2d)
+    sheared = int_im.createSheared(g1=0.13, g2=0.21)
+
+    draw_im = galsim.ImageD(NPIX, NPIX)
+    t1 = time.time()
+    sheared.draw(draw_im, dx=PIXEL_SCALE)
+    t2 = time.time()
+
+    ud = galsim.UniformDeviate(RANDOM_SEED)
+    half = 0.4 * NPIX * PIXEL_SCALE
+    for i in range(NPOS):
+        pos = galsim.PositionD((2.*ud()-1.)*half, (2.*ud()-1.)*half)
+        int_im.xValue(pos)
+    t3 = time.time()
+
+    k_int_im = galsim.InterpolatedImage(im, k_interpolant=interp2d)
+    k_sheared = k_int_im.createSheared(g1=0.13, g2=0.21)
+    re = galsim.ImageD(2*NPIX, 2*NPIX)
+    imag = galsim.ImageD(2*NPIX, 2*NPIX)
+    t4 = time.time()
+    k_sheared.drawK(re, imag, dk=0.5*k_sheared.stepK())
+    t5 = time.time()
+
+    print "%-10s  sheared draw %7.4f s   %d xValues %7.4f s   sheared drawK %7.4f s"%(
+        name, t2-t1, NPOS, t3-t2, t5-t4)
+
+def main(argv):
+    interps = [ ("Linear", galsim.Linear()),
+                ("Cubic", galsim.Cubic()),
+                ("Quintic", galsim.Quintic()),
+                ("Lanczos3", galsim.Lanczos(3, True, 1.e-4)),
+                ("Lanczos5", galsim.Lanczos(5, True, 1.e-4)) ]
+    for name, interp in interps:
+        time_interpolant(name, interp)
+
+if __name__ == "__main__":
+    main(sys.argv)
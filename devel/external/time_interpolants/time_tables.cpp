@@ -0,0 +1,110 @@
+/* -*- c++ -*-
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+// Time the XTable and KTable interpolation routines directly for each type of Interpolant.
+//
+// This is the benchmark used for interpolant_timing_results.txt.  From the top GalSim directory,
+// after running scons, build it with something like
+//
+//     g++ -O2 -DNDEBUG -Iinclude -Iinclude/galsim \
+//         devel/external/time_interpolants/time_tables.cpp -Llib -lgalsim -ltmv -lfftw3 \
+//         -o time_tables
+//
+// (adding -I and -L flags for TMV, FFTW and Boost as needed), and run ./time_tables.
+// To get the "before" numbers for a change, build it the same way against the older version.
+
+#include <cstdio>
+#include <ctime>
+#include <vector>
+#include <complex>
+#include "FFT.h"
+#include "Interpolant.h"
+
+using namespace galsim;
+
+// A simple linear congruential generator, so the positions are the same for every build.
+static double next_uniform(unsigned& r)
+{
+    r = r*1103515245 + 12345;
+    return (r>>8) / double(1<<24);
+}
+
+int main()
+{
+    const int N = 128;
+    const int nscatter = 200000;
+    const int ngrid = 3;
+    unsigned r = 1;
+
+    XTable xt(N, 0.3);
+    KTable kt(N, 0.1);
+    for (int iy=-N/2; iy<N/2; ++iy) for (int ix=-N/2; ix<N/2; ++ix)
+        xt.xSet(ix, iy, next_uniform(r));
+    for (int iy=-N/2; iy<N/2; ++iy) for (int ix=0; ix<=N/2; ++ix)
+        kt.kSet(ix, iy, std::complex<double>(next_uniform(r), 0.1));
+
+    const int ninterp = 5;
+    boost::shared_ptr<Interpolant> interps[ninterp] = {
+        boost::shared_ptr<Interpolant>(new Linear()),
+        boost::shared_ptr<Interpolant>(new Cubic()),
+        boost::shared_ptr<Interpolant>(new Quintic()),
+        boost::shared_ptr<Interpolant>(new Lanczos(3,true)),
+        boost::shared_ptr<Interpolant>(new Lanczos(5,true))
+    };
+    const char* names[ninterp] = { "Linear", "Cubic", "Quintic", "Lanczos3", "Lanczos5" };
+
+    std::printf("Times in seconds for %d scattered interpolations and %d sheared grids\n",
+                nscatter, ngrid);
+    std::printf("            XTable  KTable  KTable grid\n");
+    for (int k=0; k<ninterp; ++k) {
+        InterpolantXY interp(interps[k]);
+        // The sums are printed at the end so the compiler cannot skip the work.
+        double xsum = 0.;
+        std::complex<double> ksum = 0.;
+
+        // Scattered positions, so there is no reuse of cached rows (as for
+        // PowerSpectrum.getShear or a sheared InterpolatedImage).
+        std::clock_t t0 = std::clock();
+        for (int i=0; i<nscatter; ++i) {
+            double x = (next_uniform(r)-0.5) * 20.;
+            double y = (next_uniform(r)-0.5) * 20.;
+            xsum += xt.interpolate(x, y, interp);
+        }
+        std::clock_t t1 = std::clock();
+        for (int i=0; i<nscatter; ++i) {
+            double kx = (next_uniform(r)-0.5) * 8.;
+            double ky = (next_uniform(r)-0.5) * 8.;
+            ksum += kt.interpolate(kx, ky, interp);
+        }
+        std::clock_t t2 = std::clock();
+        // A sheared 65x128 grid of k values, as drawK uses.
+        std::vector<std::complex<double> > kgrid(65*128);
+        for (int i=0; i<ngrid; ++i)
+            kt.interpolateGrid(&kgrid[0], 65, 128, 0., 0.05, 0.011, -3.2, 0.05, -0.009, 1.e10,
+                               interp);
+        std::clock_t t3 = std::clock();
+        ksum += kgrid[100];
+
+        std::printf("%-10s  %.3f   %.3f   %.3f        (%g %g)\n", names[k],
+                    double(t1-t0)/CLOCKS_PER_SEC, double(t2-t1)/CLOCKS_PER_SEC,
+                    double(t3-t2)/CLOCKS_PER_SEC, xsum, ksum.real());
+    }
+    return 0;
+}
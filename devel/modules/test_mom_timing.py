@@ -203,3 +203,23 @@ print "\nFor Airy, Pixel, Sersic, ",imsize," per side, no noise, time to get mom
 print "time to estimate shear was ",time_shear," per call"
 print "Results for e1, e2 (corrected): ",res2.corrected_e1, res2.corrected_e2
 print "Results for sigma observed: ",res1.moments_sigma
+
+# Now check how the time to get moments scales with the stamp size for a small object.  Since the
+# moments are only computed using pixels within sqrt(max_moment_nsig2) sigma of the centroid, the
+# time should hardly depend on the stamp size.  To compare with the code from before this cutoff
+# was applied to the loop itself, run this script with that version of GalSim.  The C++ program
+# time_ellipmom.cpp in this directory compares the two versions of the inner loop directly.
+gal = galsim.Gaussian(fwhm = psf_fwhm, flux=gal_flux)
+gal.applyShear(e1 = gal_e1, e2 = gal_e2)
+obj = galsim.Convolve(gal, epsf)
+print "\nTime to get moments for the same object in stamps of increasing size:"
+print "  size   time (s)    sigma"
+for this_imsize in [ imsize, 2*imsize, 4*imsize, 8*imsize, 16*imsize ]:
+    im_obj = galsim.ImageF(this_imsize, this_imsize)
+    im_obj = obj.draw(image = im_obj, dx=pixel_scale)
+    n = max(ntest * imsize**2 / this_imsize**2, 5)
+    t1 = time.time()
+    for i in range(n):
+        res1 = im_obj.FindAdaptiveMom(strict=False)
+    t2 = time.time()
+    print "  %4d   %9.3e   %.6f"%(this_imsize, (t2-t1)/n, res1.moments_sigma)
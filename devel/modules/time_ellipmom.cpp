@@ -0,0 +1,203 @@
+/* -*- c++ -*-
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+// Time the weighted moment sums of the adaptive moments code before and after restricting them
+// to the pixels inside the weight cutoff.
+//
+// The inner loop of the adaptive moments is find_ellipmom_1 in src/hsm/PSFCorr.cpp, which is
+// called once per iteration.  That function is internal to the library, so this file has
+// standalone copies of its two versions, working on a plain array with no mask:
+//   - before: loop over every pixel of the stamp and call exp for each pixel inside the
+//     cutoff rho^2 < max_moment_nsig2,
+//   - after: loop only over the rows and columns that can be inside the cutoff, and fill each
+//     row's weights by multiplying outwards from the row's peak, so exp is called a few times
+//     per row.
+// If you change find_ellipmom_1, update the "after" copy here to match.
+//
+// Build and run with
+//
+//     g++ -O2 devel/modules/time_ellipmom.cpp -o time_ellipmom
+//     ./time_ellipmom
+//
+// The script test_mom_timing.py in this directory times the full python calls.
+
+#include <cmath>
+#include <cstdio>
+#include <ctime>
+#include <vector>
+#include <algorithm>
+
+struct Sums
+{
+    double A, Bx, By, Cxx, Cxy, Cyy, rho4w;
+};
+
+static void add_pixel(Sums& s, double intensity, double x_x0, double y_y0, double rho2)
+{
+    double intensity__x_x0 = intensity * x_x0;
+    double intensity__y_y0 = intensity * y_y0;
+    s.A    += intensity;
+    s.Bx   += intensity__x_x0;
+    s.By   += intensity__y_y0;
+    s.Cxx  += intensity__x_x0 * x_x0;
+    s.Cxy  += intensity__x_x0 * y_y0;
+    s.Cyy  += intensity__y_y0 * y_y0;
+    s.rho4w+= intensity * rho2 * rho2;
+}
+
+// The sums over the whole stamp, with one exp per pixel inside the cutoff.
+static Sums sums_before(const std::vector<float>& data, int nx, int ny, double x0, double y0,
+                        double Mxx, double Mxy, double Myy, double max_rho2)
+{
+    double detM = Mxx * Myy - Mxy * Mxy;
+    double Minv_xx    =  Myy/detM;
+    double TwoMinv_xy = -Mxy/detM * 2.0;
+    double Minv_yy    =  Mxx/detM;
+
+    std::vector<double> Minv_xx__x_x0__x_x0(nx);
+    for (int x=0; x<nx; x++) Minv_xx__x_x0__x_x0[x] = Minv_xx*(x-x0)*(x-x0);
+
+    Sums s = { 0., 0., 0., 0., 0., 0., 0. };
+    const float* imageptr = &data[0];
+    for (int y=0; y<ny; y++) {
+        double y_y0 = y-y0;
+        double x_x0 = -1 - x0;
+        double TwoMinv_xy__y_y0 = TwoMinv_xy * y_y0;
+        double Minv_yy__y_y0__y_y0 = Minv_yy * y_y0 * y_y0;
+        const double* mxxptr = &Minv_xx__x_x0__x_x0[0];
+        for (int x=0; x<nx; x++, imageptr++, mxxptr++) {
+            x_x0 += 1.;
+            double rho2 = Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0 + *mxxptr;
+            if (rho2 < max_rho2) {
+                double intensity = std::exp(-0.5 * rho2) * *imageptr;
+                add_pixel(s, intensity, x_x0, y_y0, rho2);
+            }
+        }
+    }
+    return s;
+}
+
+// The sums over the pixels that can be inside the cutoff, with the weights of each row
+// filled outwards from its peak.
+static Sums sums_after(const std::vector<float>& data, int nx, int ny, double x0, double y0,
+                       double Mxx, double Mxy, double Myy, double max_rho2)
+{
+    double detM = Mxx * Myy - Mxy * Mxy;
+    double Minv_xx    =  Myy/detM;
+    double TwoMinv_xy = -Mxy/detM * 2.0;
+    double Minv_yy    =  Mxx/detM;
+
+    const double y_extent = std::sqrt(max_rho2 * Myy);
+    const long ylo = long(std::max(0., std::floor(y0 - y_extent) - 1.));
+    const long yhi = long(std::min(double(ny-1), std::ceil(y0 + y_extent) + 1.));
+    const double exp_mMinv_xx = std::exp(-Minv_xx);
+    std::vector<double> wrow(nx);
+
+    Sums s = { 0., 0., 0., 0., 0., 0., 0. };
+    for (long y=ylo; y<=yhi; y++) {
+        double y_y0 = y-y0;
+        double TwoMinv_xy__y_y0 = TwoMinv_xy * y_y0;
+        double Minv_yy__y_y0__y_y0 = Minv_yy * y_y0 * y_y0;
+
+        double disc = TwoMinv_xy__y_y0 * TwoMinv_xy__y_y0
+            - 4. * Minv_xx * (Minv_yy__y_y0__y_y0 - max_rho2);
+        if (disc <= 0.) continue;
+        double xpeak = x0 - 0.5 * TwoMinv_xy__y_y0 / Minv_xx;
+        double x_extent = 0.5 * std::sqrt(disc) / Minv_xx;
+        long xlo = long(std::max(0., std::floor(xpeak - x_extent) - 1.));
+        long xhi = long(std::min(double(nx-1), std::ceil(xpeak + x_extent) + 1.));
+        if (xlo > xhi) continue;
+
+        long xmid = long(std::min(double(xhi), std::max(double(xlo), std::floor(xpeak + 0.5))));
+        double u = xmid - xpeak;
+        double x_x0 = xmid - x0;
+        double w = std::exp(-0.5 * (Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0
+                                    + Minv_xx*x_x0*x_x0));
+        double* wptr = &wrow[xmid];
+        *wptr = w;
+        double ratio = std::exp(-0.5 * Minv_xx * (2.*u + 1.));
+        for (long x=xmid+1; x<=xhi; x++) {
+            w *= ratio;
+            ratio *= exp_mMinv_xx;
+            *(++wptr) = w;
+        }
+        w = wrow[xmid];
+        wptr = &wrow[xmid];
+        ratio = std::exp(-0.5 * Minv_xx * (1. - 2.*u));
+        for (long x=xmid-1; x>=xlo; x--) {
+            w *= ratio;
+            ratio *= exp_mMinv_xx;
+            *(--wptr) = w;
+        }
+
+        const float* imageptr = &data[y*nx + xlo];
+        wptr = &wrow[xlo];
+        x_x0 = xlo - x0;
+        for (long x=xlo; x<=xhi; x++, x_x0+=1., ++imageptr, ++wptr) {
+            double rho2 = Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0 + Minv_xx*x_x0*x_x0;
+            if (rho2 < max_rho2) add_pixel(s, *wptr * *imageptr, x_x0, y_y0, rho2);
+        }
+    }
+    return s;
+}
+
+int main()
+{
+    // An elliptical Gaussian with about the size of the object in test_mom_timing.py, measured
+    // with weight moments equal to its own moments, as at convergence.
+    const double Mxx = 5.3;
+    const double Mxy = 0.9;
+    const double Myy = 3.6;
+    const double max_rho2 = 25.;   // The default HSMParams max_moment_nsig2.
+    const double detM = Mxx * Myy - Mxy * Mxy;
+
+    std::printf("Time per call of the moment sums, before and after restricting them to the\n");
+    std::printf("pixels inside the weight cutoff.\n");
+    std::printf("  size     before (s)      after (s)   before/after   max rel diff\n");
+    for (int n=48; n<=768; n*=2) {
+        const double x0 = 0.5*n + 0.3;
+        const double y0 = 0.5*n - 0.2;
+        std::vector<float> data(n*n);
+        for (int y=0; y<n; ++y) for (int x=0; x<n; ++x) {
+            double dx = x-x0, dy = y-y0;
+            double rho2 = (Myy*dx*dx - 2.*Mxy*dx*dy + Mxx*dy*dy) / detM;
+            data[y*n+x] = 1.e4 * std::exp(-0.5*rho2);
+        }
+
+        // Use about the same total number of pixels for each size.
+        const int nrep = std::max(20, 20000 * 48 * 48 / (n*n));
+        Sums s1, s2;
+        std::clock_t t0 = std::clock();
+        for (int i=0; i<nrep; ++i) s1 = sums_before(data, n, n, x0, y0, Mxx, Mxy, Myy, max_rho2);
+        std::clock_t t1 = std::clock();
+        for (int i=0; i<nrep; ++i) s2 = sums_after(data, n, n, x0, y0, Mxx, Mxy, Myy, max_rho2);
+        std::clock_t t2 = std::clock();
+
+        double diff = std::abs(s2.A/s1.A - 1.);
+        diff = std::max(diff, std::abs(s2.Cxx/s1.Cxx - 1.));
+        diff = std::max(diff, std::abs(s2.Cxy/s1.Cxy - 1.));
+        diff = std::max(diff, std::abs(s2.Cyy/s1.Cyy - 1.));
+        diff = std::max(diff, std::abs(s2.rho4w/s1.rho4w - 1.));
+        double tb = double(t1-t0) / CLOCKS_PER_SEC / nrep;
+        double ta = double(t2-t1) / CLOCKS_PER_SEC / nrep;
+        std::printf("  %4d   %12.3e   %12.3e   %12.1f   %12.1e\n", n, tb, ta, tb/ta, diff);
+    }
+    return 0;
+}
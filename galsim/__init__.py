@@ -29,7 +29,7 @@ from compound import Add, Convolve, Deconvolve, AutoConvolve, AutoCorrelate
 
 from shear import Shear
 from lensing_ps import PowerSpectrum
-from nfw_halo import NFWHalo, Cosmology
+from nfw_halo import NFWHalo, NFWHaloField, Cosmology
 from catalog import InputCatalog
 from table import LookupTable
 from random import DistDeviate
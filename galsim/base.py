@@ -38,6 +38,7 @@ Image is acceptable.
 
 import os
 import collections
+import numpy as np
 import galsim
 import utilities
 
@@ -700,9 +701,51 @@ class GSObject(object):
 
         return image
 
+    def shoot(self, n_photons, rng=None):
+        """Shoot photons drawn from the surface brightness profile of the object, and return 
+        them in a PhotonArray.
+
+        This is the first half of what drawShoot() does.  It is useful when the same photons
+        should be used more than once, e.g. to apply different sensor effects or dithers before
+        binning them into an image.  The photon positions and fluxes are available as numpy 
+        arrays `photons.x`, `photons.y` and `photons.flux`, which view the photon data without 
+        copying it, so they may be modified in place.  (While these arrays exist, the
+        PhotonArray cannot be extended with `append`.)  Then the photons can be binned into an
+        image with `photons.addTo(image)`.  Also, a new PhotonArray can be made from numpy arrays
+        with `galsim.PhotonArray(x, y, flux)`.
+
+        The positions are in the same units as the profile (normally arcsec), and the total flux
+        of the photons is approximately the flux of the object.  Note that `addTo` treats the 
+        image as surface brightness, so it divides each photon's flux by the pixel area.  Use 
+        `photons.scaleFlux(image.scale**2)` first to get the flux normalization that drawShoot() 
+        uses by default.  Also, the photons are not shifted to the center of the image the way 
+        drawShoot() does; the profile's origin corresponds to the (0,0) pixel of the image.
+
+        @param n_photons  The number of photons to shoot.
+        @param rng        If provided, a random number generator to use for photon shooting.
+                            (may be any kind of `galsim.BaseDeviate` object)
+                          If `rng=None`, one will be automatically created, using the time
+                            as a seed.
+                          (Default `rng = None`)
+
+        @returns      A galsim.PhotonArray with the photons.
+        """
+        n_photons = int(n_photons)
+        if n_photons < 0:
+            raise ValueError("Invalid n_photons < 0. in shoot command")
+
+        if rng is None:
+            uniform_deviate = galsim.UniformDeviate()
+        elif isinstance(rng,galsim.BaseDeviate):
+            uniform_deviate = galsim.UniformDeviate(rng)
+        else:
+            raise TypeError("The rng provided to shoot is not a BaseDeviate")
+
+        return self.SBProfile.shoot(n_photons, uniform_deviate)
+
     def drawShoot(self, image=None, dx=None, gain=1., wmult=1., normalization="flux",
                   add_to_image=False, use_true_center=True,
-                  n_photons=0., rng=None, max_extra_noise=0., poisson_flux=None):
+                  n_photons=0., rng=None, max_extra_noise=0., poisson_flux=None, nthreads=1):
         """Draw an image of the object by shooting individual photons drawn from the surface 
         brightness profile of the object.
 
@@ -817,6 +860,15 @@ class GSObject(object):
                                 `poisson_flux = True` unless n_photons is given, in which case
                                 the default is `poisson_flux = False`).
 
+        @param nthreads         The number of threads to use for shooting the photons.  Each
+                                  thread uses its own random number generator, seeded from `rng`,
+                                  so the output is reproducible for a given seed and `nthreads`, 
+                                  but different values of `nthreads` give different (equally 
+                                  valid) realizations of the photons.  The threads only run in 
+                                  parallel if GalSim was compiled with OpenMP.  `nthreads <= 0` 
+                                  means to use the OpenMP default number of threads.
+                                (Default `nthreads = 1`)
+
         @returns      The drawn image.
         """
 
@@ -880,7 +932,7 @@ class GSObject(object):
         try:
             image.added_flux = prof.SBProfile.drawShoot(
                 image.view(), n_photons, uniform_deviate, gain, max_extra_noise,
-                poisson_flux, add_to_image)
+                poisson_flux, add_to_image, int(nthreads))
         except RuntimeError:
             # Give some extra explanation as a warning, then raise the original exception
             # so the traceback shows as much detail as possible.
@@ -1043,6 +1095,98 @@ class Gaussian(GSObject):
         return self.SBProfile.getSigma() * 1.1774100225154747 # factor = sqrt[2ln(2)]
 
 
+class GaussianMixture(GSObject):
+    """A class describing a sum of many elliptical Gaussians.  Has an SBGaussianMixture in the
+    SBProfile attribute.
+
+    This is equivalent to galsim.Add of a list of Gaussians, each of which may have been sheared
+    and shifted, but all of the component fluxes, centers and covariance matrices are stored in
+    flat arrays and evaluated together.  Each component is only evaluated over the pixels where
+    it is above the accuracy threshold, whereas the corresponding Add evaluates every component
+    over the full image separately.  So mixtures with many compact components draw faster.
+    The script devel/external/time_gaussian_mixture/time_gaussian_mixture.py compares the two.
+    For more details, please see the SBGaussianMixture documentation produced by doxygen.
+
+    Initialization
+    --------------
+    A GaussianMixture is initialized with an array of component fluxes and one (and only one)
+    of two possible size parameters:
+
+        sigma       The sigma of each (circular) component, either a scalar or an array with
+                    the same length as flux.
+        cov         The covariance matrix of each component, either a single 2x2 matrix for all
+                    of them, an array of shape (n,2,2) or an array of shape (n,3) giving
+                    [ Ixx, Ixy, Iyy ] for each component.  Each must be positive definite.
+
+    The component centers are given by the optional parameters `x0` and `y0` [default 0], which
+    may also be scalars or arrays with the same length as flux.  Component fluxes may be
+    negative.
+
+    Example:
+
+        >>> flux = [ 0.6, 0.3, 0.1 ]
+        >>> cov = [ [ 1.0, 0.2, 1.5 ], [ 4.0, -0.3, 3.0 ], [ 0.2, 0., 0.2 ] ]
+        >>> mix = galsim.GaussianMixture(flux, cov=cov, x0=[ 0., 0., 1.5 ], y0=[ 0., 0., -0.5 ])
+
+    is the same profile as an Add of three Gaussians with the appropriate shears, dilations and
+    shifts.
+
+    The centroid is the flux-weighted mean of the component centers.  If the component fluxes
+    sum to zero, the absolute values of the fluxes are used as the weights instead.
+
+    You may also specify a gsparams argument.  See the docstring for galsim.GSParams using
+    help(galsim.GSParams) for more information about this option.
+
+    Methods
+    -------
+    The GaussianMixture is a GSObject, and inherits all of the GSObject methods (draw(),
+    drawShoot(), applyShear() etc.) and operator bindings.
+    """
+
+    # --- Public Class methods ---
+    def __init__(self, flux, sigma=None, cov=None, x0=0., y0=0., gsparams=None):
+        flux = np.array(flux, dtype=float).ravel()
+        n = len(flux)
+        if (sigma is None) == (cov is None):
+            raise TypeError("Exactly one of sigma or cov must be given for GaussianMixture")
+        if sigma is not None:
+            sigma = self._broadcast(sigma, n, 'sigma')
+            cxx = sigma**2
+            cxy = np.zeros(n)
+            cyy = cxx
+        else:
+            cov = np.array(cov, dtype=float)
+            if cov.shape == (2,2):
+                cov = np.tile(cov, (n,1,1))
+            if cov.shape == (n,2,2):
+                cxx = cov[:,0,0]
+                cxy = cov[:,0,1]
+                cyy = cov[:,1,1]
+            elif cov.shape == (n,3):
+                cxx = cov[:,0]
+                cxy = cov[:,1]
+                cyy = cov[:,2]
+            else:
+                raise ValueError("cov must have shape (2,2), (%d,2,2) or (%d,3)"%(n,n))
+        x0 = self._broadcast(x0, n, 'x0')
+        y0 = self._broadcast(y0, n, 'y0')
+        GSObject.__init__(
+            self, galsim.SBGaussianMixture(flux, x0, y0, cxx, cxy, cyy, gsparams=gsparams))
+
+    def _broadcast(self, value, n, name):
+        value = np.array(value, dtype=float).ravel()
+        if len(value) == 1:
+            value = np.repeat(value, n)
+        elif len(value) != n:
+            raise ValueError("%s must be a scalar or have the same length as flux"%name)
+        return value
+
+    def getNComponents(self):
+        """Return the number of Gaussian components in this GaussianMixture.
+        """
+        return self.SBProfile.getNComponents()
+
+
 class Moffat(GSObject):
     """A class describing Moffat PSF profiles.  Has an SBMoffat in the SBProfile attribute.
 
@@ -118,6 +118,15 @@ class Convolve(GSObject):
     Also, note that parameters related to the Fourier-space calculations must be set when
     initializing the individual GSObjects that go into the Convolve, NOT when creating the Convolve
     (at which point the accuracy and threshold parameters will simply be ignored).
+
+    When the same objects (e.g. a PSF and a pixel) are convolved with many different galaxies,
+    you can put them at the start of the list and give their number as the `ncache` keyword
+    argument.  Then the product of their Fourier transforms is tabulated the first time it is
+    needed for a given k grid and reused by later Convolve objects with the same leading objects
+    and `ncache`.  Only the few most recently used tables are kept.  The objects must be the very
+    same instances each time (or copies of them), not just equivalent profiles.  The number of
+    tables kept can be changed with `galsim.SBConvolve.setCacheSize(n)`, and 
+    `galsim.SBConvolve.clearCache()` removes them all, which also releases the objects they hold.
     """
                     
     # --- Public Class methods ---
@@ -162,6 +171,8 @@ class Convolve(GSObject):
 
         gsparams = kwargs.pop("gsparams", None)
 
+        ncache = kwargs.pop("ncache", 0)
+
         # Make sure there is nothing left in the dict.
         if kwargs:
             raise TypeError(
@@ -224,7 +235,7 @@ class Convolve(GSObject):
 
         # Then finally initialize the SBProfile using the objects' SBProfiles in SBList
         GSObject.__init__(self, galsim.SBConvolve(SBList, real_space=real_space,
-                                                  gsparams=gsparams))
+                                                  gsparams=gsparams, ncache=ncache))
 
 
 class Deconvolve(GSObject):
@@ -197,6 +197,20 @@ def UpdateGSParams(gsparams, config, key, base):
     return ret
 
 
+# The GSParams objects built so far, keyed by the sorted items of the gsparams dict.
+# Usually every object in a config uses the same gsparams, so there is no need to build a new
+# GSParams object for each one.
+_gsparams_cache = {}
+
+def _GetGSParams(gsparams):
+    """@brief Return a GSParams object for the gsparams dict, reusing an existing one if possible.
+    """
+    key = tuple(sorted(gsparams.items()))
+    if key not in _gsparams_cache:
+        _gsparams_cache[key] = galsim.GSParams(**gsparams)
+    return _gsparams_cache[key]
+
+
 def _BuildNone(config, key, base, ignore, gsparams):
     """@brief Special type=None returns None
     """
@@ -237,7 +251,7 @@ def _BuildAdd(config, key, base, ignore, gsparams):
                 "Automatically scaling the last item in Sum to make the total flux\n" +
                 "equal 1 requires the last item to have negative flux = %f"%f)
         gsobjects[-1].setFlux(f)
-    if gsparams: gsparams = galsim.GSParams(**gsparams)
+    if gsparams: gsparams = _GetGSParams(gsparams)
     else: gsparams = None
     gsobject = galsim.Add(gsobjects,gsparams=gsparams)
 
@@ -268,7 +282,7 @@ def _BuildConvolve(config, key, base, ignore, gsparams):
         gsobjects.append(gsobject)
     #print 'After built component items for ',type,' safe = ',safe
 
-    if gsparams: gsparams = galsim.GSParams(**gsparams)
+    if gsparams: gsparams = _GetGSParams(gsparams)
     else: gsparams = None
     gsobject = galsim.Convolve(gsobjects,gsparams=gsparams)
 
@@ -355,7 +369,7 @@ def _BuildPixel(config, key, base, ignore, gsparams):
         opt = galsim.__dict__['Pixel']._opt_params,
         single = galsim.__dict__['Pixel']._single_params,
         ignore = ignore)
-    if gsparams: kwargs['gsparams'] = galsim.GSParams(**gsparams)
+    if gsparams: kwargs['gsparams'] = _GetGSParams(gsparams)
 
     if 'yw' in kwargs.keys() and (kwargs['xw'] != kwargs['yw']):
         import warnings
@@ -383,7 +397,7 @@ def _BuildRealGalaxy(config, key, base, ignore, gsparams):
         opt = galsim.__dict__['RealGalaxy']._opt_params,
         single = galsim.__dict__['RealGalaxy']._single_params,
         ignore = ignore)
-    if gsparams: kwargs['gsparams'] = galsim.GSParams(**gsparams)
+    if gsparams: kwargs['gsparams'] = _GetGSParams(gsparams)
 
     if 'rng' not in base:
         raise ValueError("No base['rng'] available for %s.type = RealGalaxy"%(key))
@@ -414,7 +428,7 @@ def _BuildSimple(config, key, base, ignore, gsparams={}):
                                               opt = init_func._opt_params,
                                               single = init_func._single_params,
                                               ignore = ignore)
-    if gsparams: kwargs['gsparams'] = galsim.GSParams(**gsparams)
+    if gsparams: kwargs['gsparams'] = _GetGSParams(gsparams)
 
     if init_func._takes_rng:
         if 'rng' not in base:
@@ -18,9 +18,11 @@
 #
 
 import galsim
+import numpy
 
 def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
-                make_psf_image=False, make_weight_image=False, make_badpix_image=False):
+                make_psf_image=False, make_weight_image=False, make_badpix_image=False,
+                callback=None):
     """
     Build a number of postage stamp images as specified by the config dict.
 
@@ -33,6 +35,11 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
     @param make_psf_image      Whether to make psf_image.
     @param make_weight_image   Whether to make weight_image.
     @param make_badpix_image   Whether to make badpix_image.
+    @param callback            If given, a function that is called as
+                                   callback(k, image, psf_image, weight_image, badpix_image)
+                               as soon as image k (0 <= k < nimages) is built.  When nproc > 1,
+                               the images may arrive in any order.  In this case the images are
+                               not kept, and the returned lists are all empty.
 
     @return (images, psf_images, weight_images, badpix_images)  (All in tuple are lists)
     """
@@ -152,10 +159,13 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
         for i in range(0,nimages,nim_per_task):
             results, k, proc = done_queue.get()
             for result in results:
-                images[k] = result[0]
-                psf_images[k] = result[1]
-                weight_images[k] = result[2]
-                badpix_images[k] = result[3]
+                if callback:
+                    callback(k, result[0], result[1], result[2], result[3])
+                else:
+                    images[k] = result[0]
+                    psf_images[k] = result[1]
+                    weight_images[k] = result[2]
+                    badpix_images[k] = result[3]
                 if logger:
                     # Note: numpy shape is y,x
                     ys, xs = result[0].array.shape
@@ -178,6 +188,12 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
             p_list[j].join()
         task_queue.close()
 
+        if callback:
+            images = []
+            psf_images = []
+            weight_images = []
+            badpix_images = []
+
     else : # nproc == 1
 
         images = []
@@ -192,10 +208,13 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
             kwargs['obj_num'] = obj_num
             kwargs['logger'] = logger
             result = BuildImage(**kwargs)
-            images += [ result[0] ]
-            psf_images += [ result[1] ]
-            weight_images += [ result[2] ]
-            badpix_images += [ result[3] ]
+            if callback:
+                callback(k, result[0], result[1], result[2], result[3])
+            else:
+                images += [ result[0] ]
+                psf_images += [ result[1] ]
+                weight_images += [ result[2] ]
+                badpix_images += [ result[3] ]
             t2 = time.time()
             if logger:
                 # Note: numpy shape is y,x
@@ -288,6 +307,44 @@ def _set_image_origin(config, convention):
     config['image_origin'] = galsim.PositionI(origin,origin)
 
 
+def _make_full_image(pixel_type, xsize, ysize, config, pixel_scale, shared=False):
+    """Make a blank image with the given numpy pixel type, size, origin and scale.
+
+    If shared is True, the pixels are allocated in shared memory, so that processes started
+    after this call can all add their stamps to it directly.  This only works for processes
+    that are forked from this one (see _can_share_images).
+    """
+    if shared:
+        import mmap
+        nbytes = xsize * ysize * numpy.dtype(pixel_type).itemsize
+        # An anonymous mmap is shared with any child processes that are forked from this one.
+        buf = mmap.mmap(-1, max(nbytes,1))
+        array = numpy.frombuffer(buf, dtype=pixel_type, count=xsize*ysize).reshape(ysize,xsize)
+        image = galsim.ImageView[pixel_type](array)
+    else:
+        image = galsim.Image[pixel_type](xsize,ysize)
+    image.setOrigin(config['image_origin'])
+    image.setZero()
+    image.setScale(pixel_scale)
+    return image
+
+
+def _can_share_images():
+    """Whether images made by _make_full_image with shared=True are shared with new processes.
+
+    The anonymous mmap is only inherited by processes that are forked from this one, so this
+    is False on systems without fork (e.g. Windows), or if multiprocessing has been set to
+    start its processes some other way.
+    """
+    try:
+        from multiprocessing import get_start_method
+    except ImportError:
+        # Python 2 multiprocessing always forks where it can.
+        import os
+        return hasattr(os, 'fork')
+    return get_start_method() == 'fork'
+
+
 def BuildSingleImage(config, logger=None, image_num=0, obj_num=0,
                      make_psf_image=False, make_weight_image=False, make_badpix_image=False):
     """
@@ -309,7 +366,7 @@ def BuildSingleImage(config, logger=None, image_num=0, obj_num=0,
     config['seq_index'] = image_num
 
     ignore = [ 'random_seed', 'draw_method', 'noise', 'wcs', 'nproc' ,
-               'n_photons', 'wmult', 'gsparams' ]
+               'n_photons', 'photon_threads', 'wmult', 'gsparams' ]
     opt = { 'size' : int , 'xsize' : int , 'ysize' : int , 'index_convention' : str,
             'pixel_scale' : float , 'sky_level' : float , 'sky_level_pixel' : float }
     params = galsim.config.GetAllParams(
@@ -372,7 +429,7 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
     config['seq_index'] = image_num
 
     ignore = [ 'random_seed', 'draw_method', 'noise', 'wcs', 'nproc' ,
-               'image_pos', 'n_photons', 'wmult', 'gsparams' ]
+               'image_pos', 'n_photons', 'photon_threads', 'wmult', 'gsparams' ]
     req = { 'nx_tiles' : int , 'ny_tiles' : int }
     opt = { 'stamp_size' : int , 'stamp_xsize' : int , 'stamp_ysize' : int ,
             'border' : int , 'xborder' : int , 'yborder' : int ,
@@ -497,10 +554,13 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
 
     nproc = params.get('nproc',1)
 
-    full_image = galsim.ImageF(full_xsize,full_ysize)
-    full_image.setOrigin(config['image_origin'])
-    full_image.setZero()
-    full_image.setScale(pixel_scale)
+    # When using multiple processes, each process adds its stamps directly to the full images,
+    # so they need to be in shared memory.  If that's not possible, the stamps are sent back
+    # to this process to be added.
+    shared = nproc != 1 and _can_share_images()
+
+    full_image = _make_full_image(
+        numpy.float32, full_xsize, full_ysize, config, pixel_scale, shared)
 
     # Also define the overall image center, since we need that to calculate the position 
     # of each stamp relative to the center.
@@ -508,42 +568,28 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
     #print 'image_cen = ',full_image.bounds.trueCenter()
 
     if make_psf_image:
-        full_psf_image = galsim.ImageF(full_xsize,full_ysize)
-        full_psf_image.setOrigin(config['image_origin'])
-        full_psf_image.setZero()
-        full_psf_image.setScale(pixel_scale)
+        full_psf_image = _make_full_image(
+            numpy.float32, full_xsize, full_ysize, config, pixel_scale, shared)
     else:
         full_psf_image = None
 
     if make_weight_image:
-        full_weight_image = galsim.ImageF(full_xsize,full_ysize)
-        full_weight_image.setOrigin(config['image_origin'])
-        full_weight_image.setZero()
-        full_weight_image.setScale(pixel_scale)
+        full_weight_image = _make_full_image(
+            numpy.float32, full_xsize, full_ysize, config, pixel_scale, shared)
     else:
         full_weight_image = None
 
     if make_badpix_image:
-        full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
-        full_badpix_image.setOrigin(config['image_origin'])
-        full_badpix_image.setZero()
-        full_badpix_image.setScale(pixel_scale)
+        full_badpix_image = _make_full_image(
+            numpy.int16, full_xsize, full_ysize, config, pixel_scale, shared)
     else:
         full_badpix_image = None
 
-    stamp_images = galsim.config.BuildStamps(
-            nobjects=nobjects, config=config,
-            xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num, 
-            nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=do_noise, logger=logger,
-            make_psf_image=make_psf_image,
-            make_weight_image=make_weight_image,
-            make_badpix_image=make_badpix_image)
-
-    images = stamp_images[0]
-    psf_images = stamp_images[1]
-    weight_images = stamp_images[2]
-    badpix_images = stamp_images[3]
+    full_images = (full_image, full_psf_image, full_weight_image, full_badpix_image)
 
+    # The region of the full images where each stamp goes.  Since the tiles don't overlap,
+    # each process can add its stamps without waiting for any of the others.
+    stamp_bounds = []
     for k in range(nobjects):
         ix = ix_list[k]
         iy = iy_list[k]
@@ -551,17 +597,37 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
         xmax = xmin + stamp_xsize-1
         ymin = iy * (stamp_ysize + yborder) + 1
         ymax = ymin + stamp_ysize-1
-        b = galsim.BoundsI(xmin,xmax,ymin,ymax)
-        #print 'full bounds = ',full_image.bounds
-        #print 'stamp bounds = ',b
-        #print 'original stamp bounds = ',images[k].bounds
-        full_image[b] += images[k]
-        if make_psf_image:
-            full_psf_image[b] += psf_images[k]
-        if make_weight_image:
-            full_weight_image[b] += weight_images[k]
-        if make_badpix_image:
-            full_badpix_image[b] |= badpix_images[k]
+        stamp_bounds.append(galsim.BoundsI(xmin,xmax,ymin,ymax))
+
+    if shared or nproc == 1:
+        galsim.config.BuildStamps(
+                nobjects=nobjects, config=config,
+                xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num, 
+                nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=do_noise, logger=logger,
+                make_psf_image=make_psf_image,
+                make_weight_image=make_weight_image,
+                make_badpix_image=make_badpix_image,
+                full_images=full_images, stamp_bounds=stamp_bounds)
+    else:
+        # The tiles don't overlap, so the stamps can be added in whatever order they arrive.
+        def add_stamp(k, image, psf_image, weight_image, badpix_image):
+            b = stamp_bounds[k]
+            full_image[b] += image
+            if make_psf_image:
+                full_psf_image[b] += psf_image
+            if make_weight_image:
+                full_weight_image[b] += weight_image
+            if make_badpix_image:
+                full_badpix_image[b] |= badpix_image
+
+        galsim.config.BuildStamps(
+                nobjects=nobjects, config=config,
+                xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num, 
+                nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=do_noise, logger=logger,
+                make_psf_image=make_psf_image,
+                make_weight_image=make_weight_image,
+                make_badpix_image=make_badpix_image,
+                callback=add_stamp)
 
     if not do_noise:
         if 'noise' in config['image']:
@@ -605,7 +671,7 @@ def BuildScatteredImage(config, logger=None, image_num=0, obj_num=0,
     config['seq_index'] = image_num
 
     ignore = [ 'random_seed', 'draw_method', 'noise', 'wcs', 'nproc' ,
-               'image_pos', 'sky_pos', 'n_photons', 'wmult',
+               'image_pos', 'sky_pos', 'n_photons', 'photon_threads', 'wmult',
                'stamp_size', 'stamp_xsize', 'stamp_ysize', 'gsparams' ]
     req = { 'nobjects' : int }
     opt = { 'size' : int , 'xsize' : int , 'ysize' : int , 
@@ -707,10 +773,8 @@ def BuildScatteredImage(config, logger=None, image_num=0, obj_num=0,
 
     nproc = params.get('nproc',1)
 
-    full_image = galsim.ImageF(full_xsize,full_ysize)
-    full_image.setOrigin(config['image_origin'])
-    full_image.setZero()
-    full_image.setScale(pixel_scale)
+    full_image = _make_full_image(
+        numpy.float32, full_xsize, full_ysize, config, pixel_scale)
 
     # Also define the overall image center, since we need that to calculate the position 
     # of each stamp relative to the center.
@@ -718,62 +782,64 @@ def BuildScatteredImage(config, logger=None, image_num=0, obj_num=0,
     #print 'image_cen = ',full_image.bounds.trueCenter()
 
     if make_psf_image:
-        full_psf_image = galsim.ImageF(full_xsize,full_ysize)
-        full_psf_badpix_image.setOrigin(config['image_origin'])
-        full_psf_image.setZero()
-        full_psf_image.setScale(pixel_scale)
+        full_psf_image = _make_full_image(
+            numpy.float32, full_xsize, full_ysize, config, pixel_scale)
     else:
         full_psf_image = None
 
     if make_weight_image:
-        full_weight_image = galsim.ImageF(full_xsize,full_ysize)
-        full_weight_image.setOrigin(config['image_origin'])
-        full_weight_image.setZero()
-        full_weight_image.setScale(pixel_scale)
+        full_weight_image = _make_full_image(
+            numpy.float32, full_xsize, full_ysize, config, pixel_scale)
     else:
         full_weight_image = None
 
     if make_badpix_image:
-        full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
-        full_badpix_image.setOrigin(config['image_origin'])
-        full_badpix_image.setZero()
-        full_badpix_image.setScale(pixel_scale)
+        full_badpix_image = _make_full_image(
+            numpy.int16, full_xsize, full_ysize, config, pixel_scale)
     else:
         full_badpix_image = None
 
-    stamp_images = galsim.config.BuildStamps(
+    # Add each stamp to the full images as soon as it is built.  With nproc > 1, they can arrive
+    # in any order, so we hold on to any that arrive early and add them in order of k.
+    # Otherwise, the sums where stamps overlap would be done in a different order each time, so
+    # the output wouldn't be deterministic.  With ordered_callback=True, BuildStamps makes sure
+    # no more than 2*nproc stamps (or Rings) are ever ahead of the next one we need, so pending
+    # stays small.
+    pending = {}
+    next_k = [ 0 ]
+    def add_stamp(k, image, psf_image, weight_image, badpix_image):
+        pending[k] = (image, psf_image, weight_image, badpix_image)
+        while next_k[0] in pending:
+            image, psf_image, weight_image, badpix_image = pending.pop(next_k[0])
+            next_k[0] += 1
+            bounds = image.bounds & full_image.bounds
+            #print 'stamp bounds = ',image.bounds
+            #print 'full bounds = ',full_image.bounds
+            #print 'Overlap = ',bounds
+            if bounds.isDefined():
+                full_image[bounds] += image[bounds]
+                if make_psf_image:
+                    full_psf_image[bounds] += psf_image[bounds]
+                if make_weight_image:
+                    full_weight_image[bounds] += weight_image[bounds]
+                if make_badpix_image:
+                    full_badpix_image[bounds] |= badpix_image[bounds]
+            else:
+                if logger:
+                    logger.warn(
+                        "Object centered at (%d,%d) is entirely off the main image,\n"%(
+                            image.bounds.center().x, image.bounds.center().y) +
+                        "whose bounds are (%d,%d,%d,%d)."%(
+                            full_image.bounds.xmin, full_image.bounds.xmax,
+                            full_image.bounds.ymin, full_image.bounds.ymax))
+
+    galsim.config.BuildStamps(
             nobjects=nobjects, config=config, obj_num=obj_num,
             nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=False, logger=logger,
             make_psf_image=make_psf_image,
             make_weight_image=make_weight_image,
-            make_badpix_image=make_badpix_image)
-
-    images = stamp_images[0]
-    psf_images = stamp_images[1]
-    weight_images = stamp_images[2]
-    badpix_images = stamp_images[3]
-
-    for k in range(nobjects):
-        bounds = images[k].bounds & full_image.bounds
-        #print 'stamp bounds = ',images[k].bounds
-        #print 'full bounds = ',full_image.bounds
-        #print 'Overlap = ',bounds
-        if bounds.isDefined():
-            full_image[bounds] += images[k][bounds]
-            if make_psf_image:
-                full_psf_image[bounds] += psf_images[k][bounds]
-            if make_weight_image:
-                full_weight_image[bounds] += weight_images[k][bounds]
-            if make_badpix_image:
-                full_badpix_image[bounds] |= badpix_images[k][bounds]
-        else:
-            if logger:
-                logger.warn(
-                    "Object centered at (%d,%d) is entirely off the main image,\n"%(
-                        images[k].bounds.center().x, images[k].bounds.center().y) +
-                    "whose bounds are (%d,%d,%d,%d)."%(
-                        full_image.bounds.xmin, full_image.bounds.xmax,
-                        full_image.bounds.ymin, full_image.bounds.ymax))
+            make_badpix_image=make_badpix_image,
+            callback=add_stamp, ordered_callback=True)
 
     if 'noise' in config['image']:
         # Apply the noise to the full image
@@ -31,6 +31,7 @@ valid_input_types = {
     'catalog' : ('InputCatalog', [], True), 
     'real_catalog' : ('RealGalaxyCatalog', [], True),
     'nfw_halo' : ('NFWHalo', [], False),
+    'nfw_halo_field' : ('NFWHaloField', [], False),
     'power_spectrum' : ('PowerSpectrum',
                         # power_spectrum uses these extra parameters for buildGrid later.
                         ['grid_spacing', 'interpolant'], 
@@ -119,6 +120,22 @@ def Process(config, logger=None):
     build and write the specified files.  The input field is processed before
     building each file.
     """
+    # The output compression settings are stored in galsim.fits.write_file, so put back
+    # whatever they were before, so they don't carry over to later configs or to direct calls
+    # to galsim.fits.write, etc.
+    level = galsim.fits.write_file.compression_level
+    threads = galsim.fits.write_file.compression_threads
+    try:
+        _ProcessFiles(config, logger)
+    finally:
+        galsim.fits.write_file.compression_level = level
+        galsim.fits.write_file.compression_threads = threads
+
+
+def _ProcessFiles(config, logger):
+    """
+    The implementation of Process, apart from restoring the output compression settings.
+    """
 
     # If we don't have a root specified yet, we generate it from the current script.
     if 'root' not in config:
@@ -205,6 +222,9 @@ def Process(config, logger=None):
             if logger:
                 logger.info("Unable to determine ncpu.  Using %d processes",nproc)
     
+    # Set the compression level and threads used for gzip and bzip2 output files.
+    SetFileCompression(config)
+
     # Set up the multi-process worker function if we're going to need it.
     if nproc > 1:
         # NB: See the function BuildStamps for more verbose comments about how
@@ -216,6 +236,7 @@ def Process(config, logger=None):
             for (kwargs, file_num, file_name) in iter(input.get, 'STOP'):
                 #print current_process().name,': worker got: ',file_num,file_name,kwargs
                 ProcessInput(kwargs['config'], file_num=file_num)
+                SetFileCompression(kwargs['config'])
                 #print current_process().name,': After ProcessInput for file ',file_num
                 result = build_func(**kwargs)
                 #print current_process().name,': result for ',file_num,' = ',result
@@ -375,6 +396,25 @@ def Process(config, logger=None):
         logger.debug('Done building files')
 
 
+def SetFileCompression(config):
+    """
+    Set the level and number of threads to use for gzip and bzip2 compressed output files
+    from the optional output fields compression_level and compression_threads.
+
+    These are set in galsim.fits.write_file, so they also apply to any later writes in the
+    same process.  Process puts back the previous settings when it is done.
+    """
+    output = config['output']
+    if 'compression_level' in output:
+        level = galsim.config.ParseValue(output, 'compression_level', config, int)[0]
+        if level < 1 or level > 9:
+            raise AttributeError("output.compression_level must be between 1 and 9")
+        galsim.fits.write_file.compression_level = level
+    if 'compression_threads' in output:
+        galsim.fits.write_file.compression_threads = galsim.config.ParseValue(
+            output, 'compression_threads', config, int)[0]
+
+
 def BuildFits(file_name, config, logger=None, 
               image_num=0, obj_num=0,
               psf_file_name=None, psf_hdu=None,
@@ -511,38 +551,36 @@ def BuildMultiFits(file_name, nimages, config, nproc=1, logger=None,
     else:
         make_badpix_image = False
 
-    all_images = galsim.config.BuildImages(
+    # Write each image out as soon as it is done, rather than keeping them all in memory until
+    # the end.
+    writers = [ galsim.fits.MultiWriter(file_name, nimages) ]
+    for extra_file_name in [ psf_file_name, weight_file_name, badpix_file_name ]:
+        if extra_file_name:
+            writers.append(galsim.fits.MultiWriter(extra_file_name, nimages))
+        else:
+            writers.append(None)
+
+    galsim.config.BuildImages(
         nimages, config=config, logger=logger,
         image_num=image_num, obj_num=obj_num, nproc=nproc,
         make_psf_image=make_psf_image, 
         make_weight_image=make_weight_image,
-        make_badpix_image=make_badpix_image)
+        make_badpix_image=make_badpix_image,
+        callback=_WriteImagesCallback(writers))
 
-    main_images = all_images[0]
-    psf_images = all_images[1]
-    weight_images = all_images[2]
-    badpix_images = all_images[3]
+    for writer in writers:
+        if writer:
+            writer.close()
 
-    galsim.fits.writeMulti(main_images, file_name)
     if logger:
         logger.debug('Wrote images to multi-extension fits file %r',file_name)
-
-    if psf_file_name:
-        galsim.fits.writeMulti(psf_images, psf_file_name)
-        if logger:
+        if psf_file_name:
             logger.debug('Wrote psf images to multi-extension fits file %r',psf_file_name)
-
-    if weight_file_name:
-        galsim.fits.writeMulti(weight_images, weight_file_name)
-        if logger:
+        if weight_file_name:
             logger.debug('Wrote weight images to multi-extension fits file %r',weight_file_name)
-
-    if badpix_file_name:
-        galsim.fits.writeMulti(badpix_images, badpix_file_name)
-        if logger:
+        if badpix_file_name:
             logger.debug('Wrote badpix images to multi-extension fits file %r',badpix_file_name)
 
-
     t2 = time.time()
     return t2-t1
 
@@ -606,53 +644,73 @@ def BuildDataCube(file_name, nimages, config, nproc=1, logger=None,
     config['image_xsize'] = image_xsize
     config['image_ysize'] = image_ysize
 
-    main_images = [ all_images[0] ]
-    psf_images = [ all_images[1] ]
-    weight_images = [ all_images[2] ]
-    badpix_images = [ all_images[3] ]
+    # Write each image into its plane of the data cube as soon as it is done, rather than
+    # keeping them all in memory until the end.
+    writers = [ galsim.fits.CubeWriter(file_name, nimages) ]
+    for extra_file_name in [ psf_file_name, weight_file_name, badpix_file_name ]:
+        if extra_file_name:
+            writers.append(galsim.fits.CubeWriter(extra_file_name, nimages))
+        else:
+            writers.append(None)
+    callback = _WriteImagesCallback(writers)
+    callback(0, *all_images)
+    all_images = None
 
-    all_images = galsim.config.BuildImages(
+    galsim.config.BuildImages(
         nimages-1, config=config, logger=logger,
         image_num=image_num+1, obj_num=obj_num, nproc=nproc, 
         make_psf_image=make_psf_image, 
         make_weight_image=make_weight_image,
-        make_badpix_image=make_badpix_image)
+        make_badpix_image=make_badpix_image,
+        callback=callback.offset(1))
 
-    main_images += all_images[0]
-    psf_images += all_images[1]
-    weight_images += all_images[2]
-    badpix_images += all_images[3]
+    for writer in writers:
+        if writer:
+            writer.close()
 
-    galsim.fits.writeCube(main_images, file_name)
     if logger:
         logger.debug('Wrote image to fits data cube %r',file_name)
-
-    if psf_file_name:
-        galsim.fits.writeCube(psf_images, psf_file_name)
-        if logger:
+        if psf_file_name:
             logger.debug('Wrote psf images to fits data cube %r',psf_file_name)
-
-    if weight_file_name:
-        galsim.fits.writeCube(weight_images, weight_file_name)
-        if logger:
+        if weight_file_name:
             logger.debug('Wrote weight images to fits data cube %r',weight_file_name)
-
-    if badpix_file_name:
-        galsim.fits.writeCube(badpix_images, badpix_file_name)
-        if logger:
+        if badpix_file_name:
             logger.debug('Wrote badpix images to fits data cube %r',badpix_file_name)
 
     t4 = time.time()
     return t4-t1
 
+class _WriteImagesCallback(object):
+    """A callback for BuildImages that writes each set of images (main, psf, weight, badpix) with
+    the corresponding fits writer (MultiWriter or CubeWriter), skipping any writers that are None.
+
+    The image numbers passed by BuildImages are shifted by the given offset before being passed
+    to the writers.
+    """
+    def __init__(self, writers, offset=0):
+        self.writers = writers
+        self._offset = offset
+
+    def __call__(self, k, *images):
+        for writer, image in zip(self.writers, images):
+            if writer:
+                writer.write(k + self._offset, image)
+
+    def offset(self, offset):
+        """Return a callback that writes to the same writers with a different offset.
+        """
+        return _WriteImagesCallback(self.writers, offset)
+
 def GetNObjForFits(config, file_num, image_num):
-    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc' ]
+    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc',
+               'compression_level', 'compression_threads' ]
     galsim.config.CheckAllParams(config['output'], 'output', ignore=ignore)
     nobj = [ GetNObjForImage(config, image_num) ]
     return nobj
     
 def GetNObjForMultiFits(config, file_num, image_num):
-    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc' ]
+    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc',
+               'compression_level', 'compression_threads' ]
     req = { 'nimages' : int }
     # Allow nimages to be automatic based on input catalog if image type is Single
     if ( 'nimages' not in config['output'] and 
@@ -670,7 +728,8 @@ def GetNObjForMultiFits(config, file_num, image_num):
     return nobj
 
 def GetNObjForDataCube(config, file_num, image_num):
-    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc' ]
+    ignore = [ 'file_name', 'dir', 'nfiles', 'psf', 'weight', 'badpix', 'nproc',
+               'compression_level', 'compression_threads' ]
     req = { 'nimages' : int }
     # Allow nimages to be automatic based on input catalog if image type is Single
     if ( 'nimages' not in config['output'] and 
@@ -23,7 +23,9 @@ import galsim
 
 def BuildStamps(nobjects, config, xsize=0, ysize=0, 
                 obj_num=0, nproc=1, sky_level_pixel=None, do_noise=True, logger=None,
-                make_psf_image=False, make_weight_image=False, make_badpix_image=False):
+                make_psf_image=False, make_weight_image=False, make_badpix_image=False,
+                full_images=None, stamp_bounds=None, callback=None,
+                ordered_callback=False):
     """
     Build a number of postage stamp images as specified by the config dict.
 
@@ -43,12 +45,34 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
     @param make_psf_image      Whether to make psf_image.
     @param make_weight_image   Whether to make weight_image.
     @param make_badpix_image   Whether to make badpix_image.
+    @param full_images         If given, a tuple (image, psf_image, weight_image, badpix_image)
+                               of full images (the latter 3 may be None) into which each stamp
+                               is added as soon as it is built, rather than being returned.
+                               When nproc != 1, these must be backed by shared memory, since
+                               each process then adds its own stamps directly.
+    @param stamp_bounds        Required if full_images is given: a list of the bounds in the
+                               full images where each stamp goes.  These must not overlap, so
+                               the processes can add their stamps without any locking.
+    @param callback            If given, a function that is called as
+                                   callback(k, image, psf_image, weight_image, badpix_image)
+                               as soon as stamp k (0 <= k < nobjects) is built.  When nproc > 1,
+                               the stamps may arrive in any order, but no stamp is started until
+                               all stamps more than 2*nproc tasks before it are done.  In this 
+                               case the stamps are not kept, and the returned lists are all empty.
+    @param ordered_callback    Set this to True if the callback holds on to stamps that arrive
+                               early, to use them in order of k.  Then each task is as small as
+                               possible (one object, or one Ring), so the callback never needs
+                               to keep more than 2*nproc objects' (or Rings') worth of stamps.
+                               Otherwise, each task does several objects, which has less 
+                               overhead.  (default = False)
 
     @return (images, psf_images, weight_images, badpix_images)  (All in tuple are lists)
+
+    Note: If full_images is given, the stamps are not kept either, so the returned lists are
+          empty.
     """
     def worker(input, output):
         for (kwargs, config, obj_num, nobj, info) in iter(input.get, 'STOP'):
-            results = []
             # Make new copies of config and kwargs so we can update them without
             # clobbering the versions for other tasks on the queue.
             # (The config modifications come in BuildSingleStamp.)
@@ -58,8 +82,15 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
             for i in range(nobj):
                 kwargs1['config'] = config1
                 kwargs1['obj_num'] = obj_num + i
-                results.append(BuildSingleStamp(**kwargs1))
-            output.put( (results, info, current_process().name) )
+                result = BuildSingleStamp(**kwargs1)
+                if full_images:
+                    # Add the stamp to the shared full images here, and only send back
+                    # what the main process needs for logging.
+                    _AddStamp(result, full_images, stamp_bounds[info+i])
+                    result = (None, None, None, None, result[4], result[0].bounds)
+                # Send each stamp back as soon as it is done, rather than all of them at the
+                # end of the task, so the main process can use it (and let it go) right away.
+                output.put( (result, info+i, current_process().name) )
     
     # The kwargs to pass to build_func.
     # We'll be adding to this below...
@@ -73,6 +104,9 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
     }
     # Apparently the logger isn't picklable, so can't send that as an arg.
 
+    if full_images and not stamp_bounds:
+        raise AttributeError("stamp_bounds is required when full_images is given")
+
     if nproc > nobjects:
         if logger:
             logger.warn(
@@ -105,10 +139,15 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
         # This is important here, since we'll be getting back images in a random order,
         # and we need them to go in the right places (in order to have deterministic
         # output files).  So we initialize the list to be the right size.
-        images = [ None for i in range(nobjects) ]
-        psf_images = [ None for i in range(nobjects) ]
-        weight_images = [ None for i in range(nobjects) ]
-        badpix_images = [ None for i in range(nobjects) ]
+        # (If the stamps are going somewhere else, we don't need the lists at all.)
+        if full_images or callback:
+            nlist = 0
+        else:
+            nlist = nobjects
+        images = [ None for i in range(nlist) ]
+        psf_images = [ None for i in range(nlist) ]
+        weight_images = [ None for i in range(nlist) ]
+        badpix_images = [ None for i in range(nlist) ]
 
         # Number of objects to do in each task:
         # At most nobjects / nproc.
@@ -119,7 +158,9 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
         if ( 'gal' in config and isinstance(config['gal'],dict) and 'type' in config['gal'] and
              config['gal']['type'] == 'Ring' and 'num' in config['gal'] ):
             min_nobj = galsim.config.ParseValue(config['gal'], 'num', config, int)[0]
-        if max_nobj < min_nobj: 
+        if max_nobj < min_nobj or (callback and ordered_callback):
+            # If the callback uses the stamps in order, use the smallest tasks we can, since it
+            # may need to hold on to all the stamps from the tasks ahead of the slowest one.
             nobj_per_task = min_nobj
         else:
             import math
@@ -127,13 +168,23 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
             nobj_per_task = min_nobj * int(math.sqrt(float(max_nobj) / float(min_nobj)))
 
         # Set up the task list
-        task_queue = Queue()
+        tasks = []
         for k in range(0,nobjects,nobj_per_task):
             # Send kwargs, config, obj_num, nobj, k
             if k + nobj_per_task > nobjects:
-                task_queue.put( ( kwargs, config, obj_num+k, nobjects-k, k ) )
+                tasks.append( ( kwargs, config, obj_num+k, nobjects-k, k ) )
             else:
-                task_queue.put( ( kwargs, config, obj_num+k, nobj_per_task, k ) )
+                tasks.append( ( kwargs, config, obj_num+k, nobj_per_task, k ) )
+        nleft = [ task[3] for task in tasks ]
+
+        # Only let the tasks get 2*nproc ahead of the earliest one that isn't done yet.
+        # That's still enough to keep all the processes busy, but it means that if one task is
+        # slow, the later stamps can't pile up while the others keep going.
+        task_queue = Queue()
+        ntasks = min(len(tasks), 2*nproc)
+        for task in tasks[:ntasks]:
+            task_queue.put(task)
+        first_task = 0
 
         # Run the tasks
         # Each Process command starts up a parallel process that will keep checking the queue 
@@ -151,25 +202,41 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
             p.start()
             p_list.append(p)
 
-        # In the meanwhile, the main process keeps going.  We pull each set of images off of the 
-        # done_queue and put them in the appropriate place in the lists.
+        # In the meanwhile, the main process keeps going.  We pull each image off of the 
+        # done_queue and put it in the appropriate place in the lists.
         # This loop is happening while the other processes are still working on their tasks.
         # You'll see that these logging statements get print out as the stamp images are still 
         # being drawn.  
-        for i in range(0,nobjects,nobj_per_task):
-            results, k, proc = done_queue.get()
-            for result in results:
-                images[k] = result[0]
-                psf_images[k] = result[1]
-                weight_images[k] = result[2]
-                badpix_images[k] = result[3]
-                if logger:
-                    # Note: numpy shape is y,x
-                    ys, xs = result[0].array.shape
-                    t = result[4]
-                    logger.info('%s: Stamp %d: size = %d x %d, time = %f sec', 
-                                proc, obj_num+k, xs, ys, t)
-                k += 1
+        for i in range(nobjects):
+            result, k, proc = done_queue.get()
+            if full_images:
+                bounds = result[5]
+                xs = bounds.xmax - bounds.xmin + 1
+                ys = bounds.ymax - bounds.ymin + 1
+            else:
+                if callback:
+                    callback(k, result[0], result[1], result[2], result[3])
+                else:
+                    images[k] = result[0]
+                    psf_images[k] = result[1]
+                    weight_images[k] = result[2]
+                    badpix_images[k] = result[3]
+                # Note: numpy shape is y,x
+                ys, xs = result[0].array.shape
+            if logger:
+                t = result[4]
+                logger.info('%s: Stamp %d: size = %d x %d, time = %f sec', 
+                            proc, obj_num+k, xs, ys, t)
+            # Let go of this stamp before waiting for the next one.
+            result = None
+
+            # If that finished the earliest task in progress, move the window along.
+            nleft[k / nobj_per_task] -= 1
+            while first_task < len(tasks) and nleft[first_task] == 0:
+                first_task += 1
+            while ntasks < min(len(tasks), first_task + 2*nproc):
+                task_queue.put(tasks[ntasks])
+                ntasks += 1
 
         # Stop the processes
         # The 'STOP's could have been put on the task list before starting the processes, or you
@@ -198,10 +265,15 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
             kwargs['obj_num'] = obj_num+k
             kwargs['logger'] = logger
             result = BuildSingleStamp(**kwargs)
-            images += [ result[0] ]
-            psf_images += [ result[1] ]
-            weight_images += [ result[2] ]
-            badpix_images += [ result[3] ]
+            if full_images:
+                _AddStamp(result, full_images, stamp_bounds[k])
+            elif callback:
+                callback(k, result[0], result[1], result[2], result[3])
+            else:
+                images += [ result[0] ]
+                psf_images += [ result[1] ]
+                weight_images += [ result[2] ]
+                badpix_images += [ result[3] ]
             if logger:
                 # Note: numpy shape is y,x
                 ys, xs = result[0].array.shape
@@ -213,7 +285,18 @@ def BuildStamps(nobjects, config, xsize=0, ysize=0,
         logger.debug('Done making stamps')
 
     return images, psf_images, weight_images, badpix_images
- 
+
+
+def _AddStamp(result, full_images, bounds):
+    """
+    Add the images in result (as returned by BuildSingleStamp) to the given bounds of full_images.
+    """
+    for full, stamp in zip(full_images[:3], result[:3]):
+        if full is not None:
+            full[bounds] += stamp
+    if full_images[3] is not None:
+        full_images[3][bounds] |= result[3]
+
 
 def BuildSingleStamp(config, xsize=0, ysize=0,
                      obj_num=0, sky_level_pixel=None, do_noise=True, logger=None,
@@ -485,8 +568,17 @@ def DrawStampFFT(psf, pix, gal, config, xsize, ysize, sky_level_pixel, final_shi
             final = nopix
         config['wcs_shear'] = wcs_shear
     else:
-        fft_list = [ prof for prof in (psf,pix,gal) if prof is not None ]
-        final = galsim.Convolve(fft_list)
+        # Let Convolve cache the product of the Fourier transforms of the leading profiles that
+        # are the same object for every stamp (typically the psf and pix).  The order is not
+        # changed, since the first profile determines the gsparams of the convolution.
+        fft_list = []
+        ncache = 0
+        for prof, key in ((psf,'psf'), (pix,'pix'), (gal,'gal')):
+            if prof is None: continue
+            if ncache == len(fft_list) and config[key].get('safe',False):
+                ncache += 1
+            fft_list.append(prof)
+        final = galsim.Convolve(fft_list, ncache=ncache)
 
     if 'image' in config and 'pixel_scale' in config['image']:
         pixel_scale = galsim.config.ParseValue(config['image'], 'pixel_scale', config, float)[0]
@@ -724,6 +816,12 @@ def DrawStampPhot(psf, gal, config, xsize, ysize, rng, sky_level_pixel, final_sh
     else:
         im = None
 
+    # Optionally split the photons for each stamp across several threads.
+    if 'image' in config and 'photon_threads' in config['image']:
+        nthreads = galsim.config.ParseValue(config['image'], 'photon_threads', config, int)[0]
+    else:
+        nthreads = 1
+
     if 'image' in config and 'n_photons' in config['image']:
 
         if 'max_extra_noise' in config['image']:
@@ -734,7 +832,8 @@ def DrawStampPhot(psf, gal, config, xsize, ysize, rng, sky_level_pixel, final_sh
 
         n_photons = galsim.config.ParseValue(
             config['image'], 'n_photons', config, int)[0]
-        im = final.drawShoot(image=im, dx=pixel_scale, n_photons=n_photons, rng=rng)
+        im = final.drawShoot(image=im, dx=pixel_scale, n_photons=n_photons, rng=rng,
+                             nthreads=nthreads)
         im.setOrigin(config['image_origin'])
 
     else:
@@ -759,7 +858,8 @@ def DrawStampPhot(psf, gal, config, xsize, ysize, rng, sky_level_pixel, final_sh
                 raise ValueError("noise_var calculated to be < 0.")
             max_extra_noise *= noise_var
 
-        im = final.drawShoot(image=im, dx=pixel_scale, max_extra_noise=max_extra_noise, rng=rng)
+        im = final.drawShoot(image=im, dx=pixel_scale, max_extra_noise=max_extra_noise, rng=rng,
+                             nthreads=nthreads)
         im.setOrigin(config['image_origin'])
 
     return im
@@ -903,6 +1003,10 @@ def DrawPSFStamp(psf, pix, config, bounds, final_shift):
     """
     Draw an image using the given psf and pix profiles.
 
+    If the psf and pix are the same objects as for the previous stamp (which happens when they
+    are marked as safe to reuse) and the stamp size, shifts and wcs shear are also the same,
+    then the previously drawn image is copied rather than drawn again.
+
     @return the resulting image.
     """
 
@@ -914,11 +1018,6 @@ def DrawPSFStamp(psf, pix, config, bounds, final_shift):
     else:
         wcs_shear = None
 
-    if wcs_shear:
-        psf = psf.createSheared(wcs_shear)
-
-    psf_list = [ prof for prof in (psf,pix) if prof is not None ]
-
     if ('output' in config and 
         'psf' in config['output'] and 
         'real_space' in config['output']['psf'] ):
@@ -926,16 +1025,40 @@ def DrawPSFStamp(psf, pix, config, bounds, final_shift):
     else:
         real_space = None
         
-    final_psf = galsim.Convolve(psf_list, real_space=real_space)
-
     if 'image' in config and 'pixel_scale' in config['image']:
         pixel_scale = galsim.config.ParseValue(config['image'], 'pixel_scale', config, float)[0]
     else:
         pixel_scale = 1.0
 
-    # Special: if the galaxy was shifted, then also shift the psf 
     if 'shift' in config['gal']:
         gal_shift = galsim.config.GetCurrentValue(config['gal'],'shift')
+    else:
+        gal_shift = None
+
+    # Check whether we can reuse the image from the last call.
+    # The cache holds on to psf and pix, so their ids cannot be reused by new objects.
+    cache_ok = config['psf'].get('safe',False) and (pix is None or config['pix'].get('safe',False))
+    if cache_ok:
+        key = ( id(psf), id(pix), bounds.xmax-bounds.xmin, bounds.ymax-bounds.ymin,
+                real_space, pixel_scale,
+                gal_shift and (gal_shift.x, gal_shift.y),
+                final_shift and (final_shift.x, final_shift.y),
+                wcs_shear and (wcs_shear.g1, wcs_shear.g2) )
+        if 'psf_stamp_cache' in config and config['psf_stamp_cache'][0] == key:
+            psf_im = galsim.ImageF(bounds)
+            psf_im.setScale(pixel_scale)
+            psf_im.array[:,:] = config['psf_stamp_cache'][3]
+            return psf_im
+
+    if wcs_shear:
+        final_psf = psf.createSheared(wcs_shear)
+    else:
+        final_psf = psf
+    psf_list = [ prof for prof in (final_psf,pix) if prof is not None ]
+    final_psf = galsim.Convolve(psf_list, real_space=real_space)
+
+    # Special: if the galaxy was shifted, then also shift the psf 
+    if gal_shift:
         final_psf.applyShift(gal_shift.x, gal_shift.y)
 
     # Also apply any "final" shift to the psf.
@@ -946,6 +1069,9 @@ def DrawPSFStamp(psf, pix, config, bounds, final_shift):
     psf_im.setScale(pixel_scale)
     final_psf.draw(psf_im, dx=pixel_scale)
 
+    if cache_ok:
+        config['psf_stamp_cache'] = (key, psf, pix, psf_im.array.copy())
+
     return psf_im
            
 def CalculateWCSShear(wcs, base):
@@ -49,6 +49,8 @@ valid_value_types = {
     'RTheta' : [ galsim.PositionD ],
     'NFWHaloShear' : [ galsim.Shear ],
     'NFWHaloMagnification' : [ float ],
+    'NFWHaloFieldShear' : [ galsim.Shear ],
+    'NFWHaloFieldMagnification' : [ float ],
     'PowerSpectrumShear' : [ galsim.Shear ],
     'PowerSpectrumMagnification' : [ float ],
 }
@@ -717,25 +719,37 @@ def _GenerateFromFormattedStr(param, param_name, base, value_type):
 def _GenerateFromNFWHaloShear(param, param_name, base, value_type):
     """@brief Return a shear calculated from an NFWHalo object.
     """
+    return _GetNFWShear(param, param_name, base, 'NFWHaloShear', 'nfw_halo')
+
+
+def _GenerateFromNFWHaloFieldShear(param, param_name, base, value_type):
+    """@brief Return a shear calculated from an NFWHaloField object.
+    """
+    return _GetNFWShear(param, param_name, base, 'NFWHaloFieldShear', 'nfw_halo_field')
+
+
+def _GetNFWShear(param, param_name, base, type_name, input_name):
+    """@brief Return the shear from base[input_name] (an NFWHalo or NFWHaloField object).
+    """
     if 'sky_pos' not in base:
-        raise ValueError("NFWHaloShear requested, but no position defined.")
+        raise ValueError("%s requested, but no position defined."%type_name)
     pos = base['sky_pos']
     #print 'nfw pos = ',pos
 
     if 'gal' not in base or 'redshift' not in base['gal']:
-        raise ValueError("NFWHaloShear requested, but no gal.redshift defined.")
+        raise ValueError("%s requested, but no gal.redshift defined."%type_name)
     redshift = GetCurrentValue(base['gal'],'redshift')
 
-    if 'nfw_halo' not in base:
-        raise ValueError("NFWHaloShear requested, but no input.nfw_halo defined.")
+    if input_name not in base:
+        raise ValueError("%s requested, but no input.%s defined."%(type_name,input_name))
     
     req = {}
     # Only Check, not Get.  (There's nothing to get -- just make sure there aren't extra params.)
     CheckAllParams(param, param_name, req=req)
 
-    #print 'NFWHaloShear: pos = ',pos,' z = ',redshift
+    #print '%s: pos = '%type_name,pos,' z = ',redshift
     try:
-        g1,g2 = base['nfw_halo'].getShear(pos,redshift)
+        g1,g2 = base[input_name].getShear(pos,redshift)
         #print 'g1,g2 = ',g1,g2
         shear = galsim.Shear(g1=g1,g2=g2)
     except Exception as e:
@@ -751,29 +765,41 @@ def _GenerateFromNFWHaloShear(param, param_name, base, value_type):
 def _GenerateFromNFWHaloMagnification(param, param_name, base, value_type):
     """@brief Return a magnification calculated from an NFWHalo object.
     """
+    return _GetNFWMagnification(param, param_name, base, 'NFWHaloMagnification', 'nfw_halo')
+
+
+def _GenerateFromNFWHaloFieldMagnification(param, param_name, base, value_type):
+    """@brief Return a magnification calculated from an NFWHaloField object.
+    """
+    return _GetNFWMagnification(param, param_name, base, 'NFWHaloFieldMagnification',
+                                'nfw_halo_field')
+
+
+def _GetNFWMagnification(param, param_name, base, type_name, input_name):
+    """@brief Return the magnification from base[input_name] (an NFWHalo or NFWHaloField object).
+    """
     if 'sky_pos' not in base:
-        raise ValueError("NFWHaloMagnification requested, but no position defined.")
+        raise ValueError("%s requested, but no position defined."%type_name)
     pos = base['sky_pos']
     #print 'nfw pos = ',pos
 
     if 'gal' not in base or 'redshift' not in base['gal']:
-        raise ValueError("NFWHaloMagnification requested, but no gal.redshift defined.")
+        raise ValueError("%s requested, but no gal.redshift defined."%type_name)
     redshift = GetCurrentValue(base['gal'],'redshift')
 
-    if 'nfw_halo' not in base:
-        raise ValueError("NFWHaloMagnification requested, but no input.nfw_halo defined.")
+    if input_name not in base:
+        raise ValueError("%s requested, but no input.%s defined."%(type_name,input_name))
     
     opt = { 'max_mu' : float }
     kwargs = GetAllParams(param, param_name, base, opt=opt)[0]
 
-    #print 'NFWHaloMagnification: pos = ',pos,' z = ',redshift
-    mu = base['nfw_halo'].getMagnification(pos,redshift)
+    #print '%s: pos = '%type_name,pos,' z = ',redshift
+    mu = base[input_name].getMagnification(pos,redshift)
 
     max_mu = kwargs.get('max_mu', 25.)
     if not max_mu > 0.: 
         raise ValueError(
-            "Invalid max_mu=%f (must be > 0) for %s.type = NFWHaloMagnification"%(
-                max_mu,param_name))
+            "Invalid max_mu=%f (must be > 0) for %s.type = %s"%(max_mu,param_name,type_name))
 
     if mu < 0 or mu > max_mu:
         #print 'mu = ',mu
@@ -951,6 +977,8 @@ def _GenerateFromEval(param, param_name, base, value_type):
         real_catalog = base['real_catalog']
     if 'nfw_halo' in base:
         nfw_halo = base['nfw_halo']
+    if 'nfw_halo_field' in base:
+        nfw_halo_field = base['nfw_halo_field']
     if 'power_spectrum' in base:
         power_spectrum = base['power_spectrum']
 
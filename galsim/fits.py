@@ -25,6 +25,8 @@ routines for handling multiple Images.
 
 
 import os
+import functools
+import collections
 from sys import byteorder
 from . import _galsim
 
@@ -148,6 +150,16 @@ class _WriteFile:
     def __init__(self):
         # Store whether it is ok to use the in-memory version.
         self.in_mem = True
+        # The settings for gzip and bzip2 compression of the whole file.  These may be changed
+        # by the user (or by the config output fields compression_level and compression_threads).
+        # compression_level is passed as the compresslevel to gzip and bz2 (1 = fastest,
+        # 9 = smallest).  If compression_threads != 1, gzip files larger than gzip_block_size
+        # are compressed in independent blocks using that many threads (<= 0 means use the
+        # number of cpus).  The result is a multi-member gzip file, which any gzip reader 
+        # (including python's gzip module and the gunzip program) decompresses normally.
+        self.compression_level = 9
+        self.compression_threads = 1
+        self.gzip_block_size = 1 << 22
 
     def __call__(self, file, hdus, clobber, file_compress, pyfits_compress):
         import os
@@ -170,7 +182,7 @@ class _WriteFile:
                     data = buf.getvalue()
                 except:
                     self.in_mem = False
-                    return self(file,hdus,clobber,file_compress)
+                    return self(file,hdus,clobber,file_compress,pyfits_compress)
             else:
                 # However, pyfits versions before 2.3 do not support writing to a buffer, so the
                 # abover code with fail.  We need to use a temporary in that case.
@@ -184,19 +196,29 @@ class _WriteFile:
                 buf.close()
                 os.remove(tmp)
 
-            if file_compress == 'gzip':
-                import gzip
-                # There is a compresslevel option (for both gzip and bz2), but we just use the 
-                # default.
-                fout = gzip.GzipFile(file, 'wb')  
-            elif file_compress == 'bzip2':
-                import bz2
-                fout = bz2.BZ2File(file, 'wb')
+            nthreads = self.compression_threads
+            if nthreads <= 0:
+                try:
+                    from multiprocessing import cpu_count
+                    nthreads = cpu_count()
+                except:
+                    nthreads = 1
+            if file_compress == 'gzip' and nthreads > 1 and len(data) > self.gzip_block_size:
+                _write_gzip_parallel(file, data, self.compression_level, nthreads,
+                                     self.gzip_block_size)
             else:
-                raise ValueError("Unknown file_compression")
-    
-            fout.write(data)
-            fout.close()
+                if file_compress == 'gzip':
+                    import gzip
+                    fout = gzip.GzipFile(file, 'wb', self.compression_level)
+                elif file_compress == 'bzip2':
+                    import bz2
+                    # Python 2's bz2 module cannot read multi-stream files, so bzip2 is always
+                    # compressed serially.
+                    fout = bz2.BZ2File(file, 'wb', compresslevel=self.compression_level)
+                else:
+                    raise ValueError("Unknown file_compression")
+                fout.write(data)
+                fout.close()
 
         # There is a bug in pyfits where they don't add the size of the variable length array
         # to the TFORMx header keywords.  They should have size at the end of them.
@@ -228,6 +250,39 @@ class _WriteFile:
                 
 write_file = _WriteFile()
 
+def _gzip_block(args):
+    # Compress a single block as a complete gzip member.  zlib releases the GIL while it
+    # compresses, so several of these can run at once in different threads.
+    import zlib
+    data, level = args
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def _write_gzip_parallel(file, data, level, nthreads, block_size):
+    # Write data to file as a multi-member gzip file, compressing blocks of block_size bytes
+    # using nthreads threads.  The blocks are written in order as they finish.
+    # The blocks are buffers that refer to data rather than copies of it, and only 2*nthreads
+    # of them are compressed at a time, so the extra memory needed is only a few blocks.
+    from multiprocessing.pool import ThreadPool
+    from collections import deque
+    pool = ThreadPool(nthreads)
+    try:
+        fout = open(file, 'wb')
+        try:
+            pending = deque()
+            for i in range(0, len(data), block_size):
+                block = buffer(data, i, block_size)
+                pending.append(pool.apply_async(_gzip_block, ((block, level),)))
+                if len(pending) >= 2*nthreads:
+                    fout.write(pending.popleft().get())
+            while pending:
+                fout.write(pending.popleft().get())
+        finally:
+            fout.close()
+    finally:
+        pool.close()
+        pool.join()
+
 def write_header(hdu, add_wcs, scale, xmin, ymin):
     # In PyFITS 3.1, the update method was deprecated in favor of subscript assignment.
     # When we no longer care about supporting versions before 3.1, we can switch these
@@ -298,6 +353,133 @@ def check_hdu(hdu, pyfits_compress):
 
 
 
+def _memmap_data(hdu_list, hdu):
+    """Return the data in hdu_list[hdu] as a NumPy array backed by a memory map of the file, or
+    None if this is not possible for this HDU.
+
+    The map is opened copy-on-write, so the returned array may be modified without changing the
+    file.  The array has the file's byte order (always big-endian for FITS), so no memory is
+    allocated for the data until (and unless) they are used by _memmap_image.
+    """
+    import numpy
+    import pyfits
+    if not isinstance(hdu_list, pyfits.HDUList):
+        return None
+    fits = hdu_list[hdu]
+    if isinstance(fits, pyfits.CompImageHDU):
+        return None
+    try:
+        info = hdu_list.fileinfo(hdu)
+        file_name = info['file'].name
+        offset = info['datLoc']
+    except Exception:
+        # Either this HDUList wasn't read from a file, or this pyfits is too old to tell us where
+        # the data are.
+        return None
+    if not isinstance(file_name, basestring) or not os.path.isfile(file_name):
+        return None
+    if file_name.lower().endswith(('.gz', '.bz2', '.zip')):
+        return None
+
+    header = fits.header
+    # Scaled data (e.g. unsigned ints stored with BZERO) have to be converted, so there is no
+    # point in mapping them.
+    if header.get('BZERO', 0) != 0 or header.get('BSCALE', 1) != 1:
+        return None
+    bitpix_types = { 16 : '>i2', 32 : '>i4', -32 : '>f4', -64 : '>f8' }
+    if header.get('BITPIX') not in bitpix_types:
+        return None
+    naxis = header.get('NAXIS', 0)
+    if naxis == 0:
+        return None
+    # Note: numpy shape is the reverse of the FITS axis order.
+    shape = tuple([ header['NAXIS%d'%i] for i in range(naxis, 0, -1) ])
+
+    dtype = numpy.dtype(bitpix_types[header['BITPIX']])
+    return numpy.memmap(file_name, dtype=dtype, mode='c', offset=offset, shape=shape)
+
+def _memmap_image(data, xmin, ymin, scale):
+    """Make an ImageView of some memory mapped data returned by _memmap_data.
+
+    The C++ layer needs the data in native byte order, so if they are not, they are byte swapped
+    in place first.  This makes a private copy of every page of the map that the data use, so
+    readMulti and readCube put this off for each image until it is used (see _LazyImageList).
+    """
+    if not data.dtype.isnative:
+        data.byteswap(True)
+        data = data.view(data.dtype.newbyteorder(native_byteorder))
+    image = _galsim.ImageView[data.dtype.type](array=data, xmin=xmin, ymin=ymin)
+    image.scale = scale
+    return image
+
+class _LazyImageList(collections.MutableSequence):
+    """A list of images, some of which are only made the first time they are used.
+
+    This is what readMulti and readCube return for memory mapped data that need to be byte
+    swapped, so reading a large file only uses memory for the images that are actually used.
+    It acts like a normal list, and any way of reading an item makes it first.
+
+    @param images   A list of images, with None for the ones that haven't been made yet.
+    @param makers   A dict of functions, taking no arguments, that make the missing images,
+                    keyed by their index in the list.
+    """
+    def __init__(self, images, makers):
+        self._images = list(images)
+        # The function to make each image, or None if it has been made already.
+        self._makers = [ makers.get(k) for k in range(len(self._images)) ]
+
+    def _get(self, k):
+        if self._makers[k] is not None:
+            self._images[k] = self._makers[k]()
+            self._makers[k] = None
+        return self._images[k]
+
+    def __len__(self):
+        return len(self._images)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [ self._get(i) for i in range(*k.indices(len(self))) ]
+        if k < -len(self) or k >= len(self):
+            raise IndexError("list index out of range")
+        return self._get(k % len(self))
+
+    def __setitem__(self, k, image):
+        if isinstance(k, slice):
+            image = list(image)
+            self._images[k] = image
+            self._makers[k] = [ None ] * len(image)
+        else:
+            self._images[k] = image
+            self._makers[k] = None
+
+    def __delitem__(self, k):
+        del self._images[k]
+        del self._makers[k]
+
+    def insert(self, k, image):
+        self._images.insert(k, image)
+        self._makers.insert(k, None)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self._get(k)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        if not isinstance(other, collections.Sequence):
+            return NotImplemented
+        return list(self) != list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
 def write(image, file_name=None, dir=None, hdu_list=None, add_wcs=True, clobber=True,
           compression='auto'):
     """Write a single image to a FITS file.
@@ -338,6 +520,9 @@ def write(image, file_name=None, dir=None, hdu_list=None, add_wcs=True, clobber=
                                    '*.gz' => 'gzip'
                                    '*.bz2' => 'bzip2'
                                    otherwise None
+                        The level and number of threads used for 'gzip' and 'bzip2' are set by
+                        galsim.fits.write_file.compression_level (default 9) and
+                        galsim.fits.write_file.compression_threads (default 1).
     """
     import pyfits    # put this at function scope to keep pyfits optional
   
@@ -488,7 +673,261 @@ def writeCube(image_list, file_name=None, dir=None, hdu_list=None, add_wcs=True,
 
 
 
-def read(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto'):
+class MultiWriter(object):
+    """A class for writing a multi-extension FITS file one image at a time.
+
+    Unlike writeMulti, which needs all of the images at once, a MultiWriter writes each image to
+    the file as soon as possible, so the images do not all need to be kept in memory.  The images
+    may be given in any order (e.g. as they are completed by several processes), but HDUs have
+    to be written sequentially, so an image is held in memory until all of the images before it
+    have been written.
+
+    Initialization
+    --------------
+
+        >>> writer = galsim.fits.MultiWriter(file_name, nimages, dir=None, add_wcs=True,
+                                             clobber=True, compression='auto')
+
+    Then call writer.write(k, image) for each k in range(nimages), followed by writer.close().
+    A MultiWriter may also be used as a context manager, in which case close() is called
+    automatically at the end of the with block.
+
+    If the file is to be compressed (gzip, bzip2 or any of the tile compressions), the images
+    cannot be streamed to the file, so they are kept until close() is called, and then written
+    with writeMulti.
+
+    @param file_name    The name of the file to write to.
+    @param nimages      The number of images that will be written.
+    @param dir          Optionally a directory name can be provided if the file_name does not 
+                        already include it.
+    @param add_wcs      See documentation for this parameter on the galsim.fits.write method.
+    @param clobber      See documentation for this parameter on the galsim.fits.write method.
+    @param compression  See documentation for this parameter on the galsim.fits.write method.
+    """
+    def __init__(self, file_name, nimages, dir=None, add_wcs=True, clobber=True,
+                 compression='auto'):
+        if dir:
+            file_name = os.path.join(dir,file_name)
+        self.file_name = file_name
+        self.nimages = nimages
+        self.add_wcs = add_wcs
+        self.clobber = clobber
+        self.compression = compression
+        self.file_compress, self.pyfits_compress = parse_compression(compression,file_name)
+        self.stream = not (self.file_compress or self.pyfits_compress)
+        if self.stream and os.path.isfile(file_name):
+            if clobber:
+                os.remove(file_name)
+            else:
+                raise IOError('File %r already exists'%file_name)
+        # Images that have been given to write(), but not yet written to the file.
+        self.pending = {}
+        # The index of the next image to be written to the file.
+        self.next = 0
+
+    def write(self, k, image):
+        """Write image number k to the file (or hold it until images 0..k-1 have been written).
+        """
+        if k < 0 or k >= self.nimages:
+            raise IndexError("Image number %d is not in the range [0,%d)"%(k,self.nimages))
+        if k < self.next or k in self.pending:
+            raise IndexError("Image number %d has already been written"%k)
+        self.pending[k] = image
+        if self.stream:
+            while self.next in self.pending:
+                self._append(self.pending.pop(self.next))
+                self.next += 1
+
+    def _append(self, image):
+        import pyfits
+        if self.next == 0:
+            hdu = pyfits.PrimaryHDU(image.array)
+        else:
+            hdu = pyfits.ImageHDU(image.array)
+        write_header(hdu, self.add_wcs, image.scale, image.xmin, image.ymin)
+        if self.next == 0:
+            pyfits.HDUList([hdu]).writeto(self.file_name)
+        else:
+            try:
+                # Without verify=False, pyfits reads the whole file before appending to it.
+                pyfits.append(self.file_name, hdu.data, hdu.header, verify=False)
+            except TypeError:
+                # Older pyfits versions don't have the verify option.
+                pyfits.append(self.file_name, hdu.data, hdu.header)
+
+    def close(self):
+        """Finish writing the file.  All nimages images must have been written by now.
+        """
+        if self.stream:
+            if self.next != self.nimages:
+                raise RuntimeError(
+                    "Only %d of %d images were written to %s"%(
+                        self.next + len(self.pending), self.nimages, self.file_name))
+        else:
+            if len(self.pending) != self.nimages:
+                raise RuntimeError(
+                    "Only %d of %d images were written to %s"%(
+                        len(self.pending), self.nimages, self.file_name))
+            image_list = [ self.pending[k] for k in range(self.nimages) ]
+            self.pending = {}
+            writeMulti(image_list, self.file_name, add_wcs=self.add_wcs, clobber=self.clobber,
+                       compression=self.compression)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        # Don't mask an exception raised inside the with block.
+        if type is None:
+            self.close()
+
+
+class CubeWriter(object):
+    """A class for writing a FITS data cube one image at a time.
+
+    Unlike writeCube, which needs all of the images at once, a CubeWriter writes each image
+    directly into its plane of the data cube as soon as it is given.  The header and the full size
+    of the file are written when the first image is given, so the remaining images may be given in
+    any order, and none of them need to be kept in memory.
+
+    As for writeCube, each image must have the same size `(nx, ny)` and type.  The header (scale
+    and origin) is taken from the first image given.
+
+    Initialization
+    --------------
+
+        >>> writer = galsim.fits.CubeWriter(file_name, nimages, dir=None, add_wcs=True,
+                                            clobber=True, compression='auto')
+
+    Then call writer.write(k, image) for each k in range(nimages), followed by writer.close().
+    A CubeWriter may also be used as a context manager, in which case close() is called
+    automatically at the end of the with block.
+
+    If the file is to be compressed (gzip, bzip2 or any of the tile compressions), or if your
+    version of pyfits is too old to write a header on its own, the images are kept until close()
+    is called, and then written with writeCube.
+
+    @param file_name    The name of the file to write to.
+    @param nimages      The number of images in the data cube.
+    @param dir          Optionally a directory name can be provided if the file_name does not 
+                        already include it.
+    @param add_wcs      See documentation for this parameter on the galsim.fits.write method.
+    @param clobber      See documentation for this parameter on the galsim.fits.write method.
+    @param compression  See documentation for this parameter on the galsim.fits.write method.
+    """
+    def __init__(self, file_name, nimages, dir=None, add_wcs=True, clobber=True,
+                 compression='auto'):
+        import pyfits
+        if dir:
+            file_name = os.path.join(dir,file_name)
+        self.file_name = file_name
+        self.nimages = nimages
+        self.add_wcs = add_wcs
+        self.clobber = clobber
+        self.compression = compression
+        self.file_compress, self.pyfits_compress = parse_compression(compression,file_name)
+        # pyfits versions before 3.1 cannot give us the header as a string.
+        self.stream = ( not (self.file_compress or self.pyfits_compress) and
+                        'tostring' in pyfits.Header.__dict__ )
+        if self.stream and os.path.isfile(file_name):
+            if clobber:
+                os.remove(file_name)
+            else:
+                raise IOError('File %r already exists'%file_name)
+        self.fout = None
+        self.done = [ False ] * nimages
+        # For the non-streaming case, the images to write at the end.
+        self.pending = {}
+        self.closed = False
+
+    def _start(self, image):
+        """Write the header and allocate the file, based on the first image.
+        """
+        import numpy
+        import pyfits
+        array = image.array
+        self.ny, self.nx = array.shape
+        # FITS data are always big-endian.
+        self.dtype = array.dtype.newbyteorder('>')
+        # Make a header for a cube with one plane, and then fix NAXIS3.
+        hdu = pyfits.PrimaryHDU(numpy.zeros((1, self.ny, self.nx), dtype=array.dtype))
+        write_header(hdu, self.add_wcs, image.scale, image.xmin, image.ymin)
+        hdu.header['NAXIS3'] = self.nimages
+        header = hdu.header.tostring()
+        self.data_start = len(header)
+        self.plane_size = self.nx * self.ny * self.dtype.itemsize
+        data_size = self.plane_size * self.nimages
+        # The data are padded (with zeros) to a multiple of the 2880 byte FITS block size.
+        self.file_size = self.data_start + ((data_size + 2879) // 2880) * 2880
+        self.fout = open(self.file_name, 'wb')
+        self.fout.write(header)
+        # Allocate the full file now, so the planes can be written in any order.
+        self.fout.seek(self.file_size - 1)
+        self.fout.write(b'\0')
+
+    def write(self, k, image):
+        """Write image number k into the k-th plane of the data cube.
+        """
+        if self.closed:
+            raise RuntimeError("CubeWriter for %s has already been closed"%self.file_name)
+        if k < 0 or k >= self.nimages:
+            raise IndexError("Image number %d is not in the range [0,%d)"%(k,self.nimages))
+        if self.done[k]:
+            raise IndexError("Image number %d has already been written"%k)
+        if not self.stream:
+            self.pending[k] = image
+            self.done[k] = True
+            return
+        if self.fout is None:
+            self._start(image)
+        array = image.array
+        if array.shape != (self.ny, self.nx):
+            raise IndexError("In CubeWriter: image %d has the wrong shape"%k +
+                "Shape is (%d,%d).  Should be (%d,%d)"%(
+                    array.shape[1],array.shape[0],self.nx,self.ny))
+        self.fout.seek(self.data_start + k * self.plane_size)
+        self.fout.write(array.astype(self.dtype).tostring())
+        self.done[k] = True
+
+    def close(self):
+        """Finish writing the file.  All nimages images must have been written by now.
+
+        The file is closed even if this raises an exception.
+        """
+        if self.closed: return
+        try:
+            nwritten = sum(self.done)
+            if nwritten != self.nimages:
+                raise RuntimeError(
+                    "Only %d of %d images were written to %s"%(
+                        nwritten, self.nimages, self.file_name))
+            if not self.stream:
+                image_list = [ self.pending[k] for k in range(self.nimages) ]
+                writeCube(image_list, self.file_name, add_wcs=self.add_wcs,
+                          clobber=self.clobber, compression=self.compression)
+        finally:
+            if self.fout is not None:
+                self.fout.close()
+                self.fout = None
+            self.pending = {}
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+        else:
+            # Don't write anything more, but don't leave the file open.
+            if self.fout is not None:
+                self.fout.close()
+                self.fout = None
+            self.pending = {}
+            self.closed = True
+
+
+def read(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto', memmap=False):
     """Construct an Image from a FITS file or pyfits HDUList.
 
     The normal usage for this function is to read a fits file and return the image contained
@@ -527,11 +966,19 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto'):
                                    '*.gz' => 'gzip'
                                    '*.bz2' => 'bzip2'
                                    otherwise None
+    @param memmap       If `memmap=True`, the returned image is backed by a memory map of the
+                        file rather than being read into memory.  This requires an uncompressed
+                        FITS file and is only done for unscaled data of a type with a C++ Image
+                        instantiation; otherwise the data are read in the usual way.  The map is
+                        copy-on-write, so modifying the image does not modify the file.
+                        (Default `memmap = False`.)
     @returns An ImageView instance
     """
     import pyfits     # put this at function scope to keep pyfits optional
     
     file_compress, pyfits_compress = parse_compression(compression,file_name)
+    if memmap and (file_compress or pyfits_compress):
+        raise ValueError("memmap=True is only possible for uncompressed FITS files")
 
     if file_name and hdu_list:
         raise TypeError("Cannot provide both file_name and hdu_list to read()")
@@ -563,33 +1010,40 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto'):
     xmin = fits.header.get("GS_XMIN", 1)
     ymin = fits.header.get("GS_YMIN", 1)
     scale = fits.header.get("GS_SCALE", 1.0)
-    pixel = fits.data.dtype.type
-    if pixel in _galsim.ImageView.keys():
-        Class = _galsim.ImageView[pixel]
-        data = fits.data
-    else:
-        import warnings
-        warnings.warn("No C++ Image template instantiation for pixel type %s" % pixel)
-        warnings.warn("   Using float64 instead.")
-        Class = _galsim.ImageViewD
-        import numpy
-        data = fits.data.astype(numpy.float64)
 
-    # Check through byteorder possibilities, compare to native (used for numpy and our default) and
-    # swap if necessary so that C++ gets the correct view.
-    if fits.data.dtype.byteorder == '!':
-        if native_byteorder == '>':
+    data = None
+    if memmap:
+        data = _memmap_data(hdu_list, hdu)
+    if data is not None:
+        image = _memmap_image(data, xmin, ymin, scale)
+    else:
+        pixel = fits.data.dtype.type
+        if pixel in _galsim.ImageView.keys():
+            Class = _galsim.ImageView[pixel]
+            data = fits.data
+        else:
+            import warnings
+            warnings.warn("No C++ Image template instantiation for pixel type %s" % pixel)
+            warnings.warn("   Using float64 instead.")
+            Class = _galsim.ImageViewD
+            import numpy
+            data = fits.data.astype(numpy.float64)
+
+        # Check through byteorder possibilities, compare to native (used for numpy and our
+        # default) and swap if necessary so that C++ gets the correct view.
+        if fits.data.dtype.byteorder == '!':
+            if native_byteorder == '>':
+                pass
+            else:
+                fits.data.byteswap(True)
+        elif fits.data.dtype.byteorder in (native_byteorder, '=', '@'):
             pass
         else:
-            fits.data.byteswap(True)
-    elif fits.data.dtype.byteorder in (native_byteorder, '=', '@'):
-        pass
-    else:
-        fits.data.byteswap(True)   # Note inplace is just an arg, not a kwarg, inplace=True throws
-                                   # a TypeError exception in EPD Python 2.7.2
+            fits.data.byteswap(True)   # Note inplace is just an arg, not a kwarg, inplace=True
+                                       # throws a TypeError exception in EPD Python 2.7.2
 
-    image = Class(array=data, xmin=xmin, ymin=ymin)
-    image.scale = scale
+        image = Class(array=data, xmin=xmin, ymin=ymin)
+        image.scale = scale
 
     # If we opened a file, don't forget to close it.
     if fin: 
@@ -603,7 +1057,7 @@ def read(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto'):
 
     return image
 
-def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
+def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto', memmap=False):
     """Construct a list of Images from a FITS file or pyfits HDUList.
 
     The normal usage for this function is to read a fits file and return a list of all the images 
@@ -638,12 +1092,25 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
                                    '*.gz' => 'gzip'
                                    '*.bz2' => 'bzip2'
                                    otherwise None
+    @param memmap       If `memmap=True`, the returned images are backed by a memory map of the
+                        file rather than being read into memory.  This requires an uncompressed
+                        FITS file and is only done for unscaled data of a type with a C++ Image
+                        instantiation; otherwise the data are read in the usual way.  The map is
+                        copy-on-write, so modifying the images does not modify the file.
+                        If the data need to be byte swapped (e.g. any FITS file read on an
+                        x86 machine), each image is only swapped when it is first taken from
+                        the list, so only the images that are used take up any memory.  (In
+                        this case the returned object acts like a list, but is not an instance
+                        of list.)
+                        (Default `memmap = False`.)
     @returns A Python list of ImageView instances.
     """
 
     import pyfits     # put this at function scope to keep pyfits optional
      
     file_compress, pyfits_compress = parse_compression(compression,file_name)
+    if memmap and (file_compress or pyfits_compress):
+        raise ValueError("memmap=True is only possible for uncompressed FITS files")
 
     if file_name and hdu_list:
         raise TypeError("Cannot provide both file_name and hdu_list to readMulti()")
@@ -668,8 +1135,23 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
         first = 0
         if len(hdu_list) < 1:
             raise IOError('Expecting at least one HDU in galsim.readMulti')
+    makers = {}
     for hdu in range(first,len(hdu_list)):
-        image_list.append(read(hdu_list=hdu_list, hdu=hdu, compression=pyfits_compress))
+        data = None
+        if memmap:
+            data = _memmap_data(hdu_list, hdu)
+        if data is not None and not data.dtype.isnative:
+            # Wait to byte swap these data until the image is used.
+            header = hdu_list[hdu].header
+            makers[len(image_list)] = functools.partial(
+                _memmap_image, data, header.get("GS_XMIN", 1), header.get("GS_YMIN", 1),
+                header.get("GS_SCALE", 1.0))
+            image_list.append(None)
+        else:
+            image_list.append(read(hdu_list=hdu_list, hdu=hdu, compression=pyfits_compress,
+                                   memmap=memmap))
+    if makers:
+        image_list = _LazyImageList(image_list, makers)
 
     # If we opened a file, don't forget to close it.
     if fin:
@@ -683,7 +1165,7 @@ def readMulti(file_name=None, dir=None, hdu_list=None, compression='auto'):
 
     return image_list
 
-def readCube(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto'):
+def readCube(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto', memmap=False):
     """Construct a Python list of ImageViews from a FITS data cube.
 
     Not all FITS pixel types are supported (only those with C++ Image template instantiations are:
@@ -717,11 +1199,24 @@ def readCube(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto')
                                    '*.gz' => 'gzip'
                                    '*.bz2' => 'bzip2'
                                    otherwise None
+    @param memmap       If `memmap=True`, the returned images are backed by a memory map of the
+                        file rather than being read into memory.  This requires an uncompressed
+                        FITS file and is only done for unscaled data of a type with a C++ Image
+                        instantiation; otherwise the data are read in the usual way.  The map is
+                        copy-on-write, so modifying the images does not modify the file.
+                        If the data need to be byte swapped (e.g. any FITS file read on an
+                        x86 machine), each image is only swapped when it is first taken from
+                        the list, so only the images that are used take up any memory.  (In
+                        this case the returned object acts like a list, but is not an instance
+                        of list.)
+                        (Default `memmap = False`.)
     @returns A Python list of ImageView instances.
     """
     import pyfits     # put this at function scope to keep pyfits optional
   
     file_compress, pyfits_compress = parse_compression(compression,file_name)
+    if memmap and (file_compress or pyfits_compress):
+        raise ValueError("memmap=True is only possible for uncompressed FITS files")
 
     if file_name and hdu_list:
         raise TypeError("Cannot provide both file_name and hdu_list to read()")
@@ -753,37 +1248,52 @@ def readCube(file_name=None, dir=None, hdu_list=None, hdu=0, compression='auto')
     xmin = fits.header.get("GS_XMIN", 1)
     ymin = fits.header.get("GS_YMIN", 1)
     scale = fits.header.get("GS_SCALE", 1.0)
-    pixel = fits.data.dtype.type
-    if pixel in _galsim.ImageView.keys():
-        Class = _galsim.ImageView[pixel]
-        data = fits.data
-    else:
-        import warnings
-        warnings.warn("No C++ Image template instantiation for pixel type %s" % pixel)
-        warnings.warn("Using float")
-        Class = _galsim.ImageViewD
-        import numpy
-        data = fits.data.astype(numpy.float64)
 
-    # Check through byteorder possibilities, compare to native (used for numpy and our default) and
-    # swap if necessary so that C++ gets the correct view.
-    if fits.data.dtype.byteorder == '!':
-        if native_byteorder == '>':
+    data = None
+    if memmap:
+        data = _memmap_data(hdu_list, hdu)
+    mapped = data is not None
+    if mapped:
+        Class = _galsim.ImageView[data.dtype.type]
+    else:
+        pixel = fits.data.dtype.type
+        if pixel in _galsim.ImageView.keys():
+            Class = _galsim.ImageView[pixel]
+            data = fits.data
+        else:
+            import warnings
+            warnings.warn("No C++ Image template instantiation for pixel type %s" % pixel)
+            warnings.warn("Using float")
+            Class = _galsim.ImageViewD
+            import numpy
+            data = fits.data.astype(numpy.float64)
+
+        # Check through byteorder possibilities, compare to native (used for numpy and our
+        # default) and swap if necessary so that C++ gets the correct view.
+        if fits.data.dtype.byteorder == '!':
+            if native_byteorder == '>':
+                pass
+            else:
+                fits.data.byteswap(True)
+        elif fits.data.dtype.byteorder in (native_byteorder, '=', '@'):
             pass
         else:
-            fits.data.byteswap(True)
-    elif fits.data.dtype.byteorder in (native_byteorder, '=', '@'):
-        pass
+            fits.data.byteswap(True)   # Note inplace is just an arg, not a kwarg, inplace=True
+                                       # throws a TypeError exception in EPD Python 2.7.2
+
+    nimages = data.shape[0]
+    if mapped and not data.dtype.isnative:
+        # This is memory mapped data that need to be byte swapped, which we only do for each
+        # image when it is first used.
+        makers = dict([ (k, functools.partial(_memmap_image, data[k,:,:], xmin, ymin, scale))
+                        for k in range(nimages) ])
+        image_list = _LazyImageList([ None ] * nimages, makers)
     else:
-        fits.data.byteswap(True)   # Note inplace is just an arg, not a kwarg, inplace=True throws
-                                   # a TypeError exception in EPD Python 2.7.2
-
-    nimages = fits.data.shape[0]
-    image_list = []
-    for k in range(nimages):
-        image = Class(array=fits.data[k,:,:], xmin=xmin, ymin=ymin)
-        image.scale = scale
-        image_list.append(image)
+        image_list = []
+        for k in range(nimages):
+            image = Class(array=data[k,:,:], xmin=xmin, ymin=ymin)
+            image.scale = scale
+            image_list.append(image)
 
     # If we opened a file, don't forget to close it.
     if fin: 
@@ -338,7 +338,7 @@ def EstimateShear(gal_image, PSF_image, weight = None, badpix = None, sky_var =
 
 def FindAdaptiveMom(object_image, weight = None, badpix = None, guess_sig = 5.0, precision = 1.0e-6,
                     guess_x_centroid = -1000.0, guess_y_centroid = -1000.0, strict = True,
-                    hsmparams = None):
+                    hsmparams = None, warm_start = None):
     """Measure adaptive moments of an object.
 
     This method estimates the best-fit elliptical Gaussian to the object (see Hirata & Seljak 2003
@@ -394,6 +394,14 @@ def FindAdaptiveMom(object_image, weight = None, badpix = None, guess_sig = 5.0,
         >>> new_params = galsim.hsm.HSMParams(max_amoment=5.0e5)
         >>> my_moments = my_gaussian_image.FindAdaptiveMom(hsmparams = new_params)
 
+    When measuring many similar images, such as repeated noise realizations of the same galaxy,
+    the result for one image is a much better starting point for the iteration than the default
+    circular Gaussian at the image center.  Passing it as `warm_start` typically reduces the
+    number of iterations, reported as `moments_n_iter`, to just a few:
+
+        >>> first = images[0].FindAdaptiveMom()
+        >>> results = [ im.FindAdaptiveMom(warm_start = first) for im in images[1:] ]
+
     @param object_image      The Image or ImageView for the object being measured.
     @param weight            The optional weight image for the object being measured.  Can be an int
                              or a float array.  Currently, GalSim does not account for the variation
@@ -420,17 +428,34 @@ def FindAdaptiveMom(object_image, weight = None, badpix = None, guess_sig = 5.0,
     @param hsmparams         The hsmparams keyword can be used to change the settings used by
                              FindAdaptiveMom when estimating moments; see HSMParams documentation
                              using help(galsim.hsm.HSMParams) for more information.
+    @param warm_start        A ShapeData from a previous call to FindAdaptiveMom for a similar
+                             object.  If given, and that measurement succeeded, its
+                             moments_sigma, moments_centroid and observed_shape are used to start
+                             the iteration in place of `guess_sig`, `guess_x_centroid` and
+                             `guess_y_centroid`.  (Default `warm_start = None`.)
     @return                  A ShapeData object containing the results of moment measurement.
     """
     # prepare inputs to C++ routines: ImageView for the object being measured and the weight map.
     object_image_view = object_image.view()
     weight_view = _convertMask(object_image, weight=weight, badpix=badpix)
 
+    guess_e1 = guess_e2 = 0.
+    if warm_start is not None:
+        if not isinstance(warm_start, ShapeData):
+            raise TypeError("warm_start must be a ShapeData")
+        if warm_start.moments_status == 0:
+            guess_sig = warm_start.moments_sigma
+            guess_x_centroid = warm_start.moments_centroid.x
+            guess_y_centroid = warm_start.moments_centroid.y
+            guess_e1 = warm_start.observed_shape.e1
+            guess_e2 = warm_start.observed_shape.e2
+
     try:
         result = _galsim._FindAdaptiveMomView(object_image_view, weight_view,
                                               guess_sig = guess_sig, precision =  precision,
                                               guess_x_centroid = guess_x_centroid,
                                               guess_y_centroid = guess_y_centroid,
+                                              guess_e1 = guess_e1, guess_e2 = guess_e2,
                                               hsmparams = hsmparams)
     except RuntimeError as err:
         if (strict == True):
@@ -440,6 +465,253 @@ def FindAdaptiveMom(object_image, weight = None, badpix = None, guess_sig = 5.0,
             result.error_message = err.message
     return ShapeData(result)
 
+# The fields of the structured arrays returned by FindAdaptiveMomBatch and EstimateShearBatch.
+# These are in the same order as the columns of the array returned by the C++ batch functions.
+_batch_dtype = [ ('moments_status', int),
+                 ('observed_e1', float),
+                 ('observed_e2', float),
+                 ('moments_sigma', float),
+                 ('moments_amp', float),
+                 ('moments_centroid_x', float),
+                 ('moments_centroid_y', float),
+                 ('moments_rho4', float),
+                 ('moments_n_iter', int),
+                 ('correction_status', int),
+                 ('corrected_e1', float),
+                 ('corrected_e2', float),
+                 ('corrected_g1', float),
+                 ('corrected_g2', float),
+                 ('corrected_shape_err', float),
+                 ('resolution_factor', float),
+                 ('error', bool) ]
+
+def _batchStamps(images, bounds, name):
+    """Convert the images given to the batch functions into an ImageView and an array of stamps.
+
+    The images may be either an Image containing all the stamps, along with a list of BoundsI (or
+    an (n,4) array of xmin, xmax, ymin, ymax) for the stamps, or a 3-d numpy array of shape
+    (n, ny, nx).  In the latter case, the stamps are stacked into a single image of shape
+    (n*ny, nx), with stamp i covering rows i*ny+1 .. (i+1)*ny.
+
+    Returns the ImageView, an (n,4) int32 array of stamp bounds, and a bool that is True if the
+    images were given as a 3-d array.
+    """
+    import numpy as np
+    if isinstance(images, np.ndarray):
+        if images.ndim != 3:
+            raise ValueError("%s must be an Image or a 3-d numpy array"%name)
+        if bounds is not None:
+            raise ValueError("Stamp bounds cannot be given with a 3-d array of %s"%name)
+        if (images.dtype.type not in (np.float32, np.float64, np.int32) or
+            not images.dtype.isnative):
+            images = images.astype(np.float64)
+        n, ny, nx = images.shape
+        array = np.ascontiguousarray(images).reshape(n*ny, nx)
+        image_view = _galsim.ImageView[array.dtype.type](array)
+        stamps = np.empty((n,4), dtype=np.int32)
+        stamps[:,0] = 1
+        stamps[:,1] = nx
+        stamps[:,2] = np.arange(n) * ny + 1
+        stamps[:,3] = stamps[:,2] + ny - 1
+        return image_view, stamps, True
+    else:
+        image_view = images.view()
+        if image_view.array.dtype not in (np.float32, np.float64, np.int32):
+            # The C++ batch functions are only compiled for float, double and int images.
+            image_view = _floatView(image_view)
+        if bounds is None:
+            bounds = [ image_view.bounds ]
+        elif isinstance(bounds, galsim.BoundsI):
+            bounds = [ bounds ]
+        if not isinstance(bounds, np.ndarray):
+            bounds = [ (b.xmin, b.xmax, b.ymin, b.ymax) for b in bounds ]
+        stamps = np.ascontiguousarray(np.array(bounds, dtype=np.int32).reshape(-1,4))
+        return image_view, stamps, False
+
+def _floatView(image_view):
+    """Return a copy of the given ImageView with double pixels.
+    """
+    import numpy as np
+    return _galsim.ImageView[np.float64](array=image_view.array.astype(np.float64),
+                                         xmin=image_view.xmin, ymin=image_view.ymin)
+
+def _batchMask(image_view, weight, badpix):
+    """Make the mask for the batch functions from weight and badpix given in the same form as
+    the images (an Image or a 3-d numpy array).
+    """
+    import numpy as np
+    if isinstance(weight, np.ndarray):
+        weight = _batchStamps(weight, None, 'weight')[0]
+    if isinstance(badpix, np.ndarray):
+        badpix = _batchStamps(badpix, None, 'badpix')[0]
+    return _convertMask(image_view, weight=weight, badpix=badpix)
+
+def _batchResults(array, stamps, is_cube):
+    """Convert the array returned by the C++ batch functions to a structured array.
+    """
+    import numpy as np
+    results = np.empty(len(array), dtype=_batch_dtype)
+    for i, (field, type) in enumerate(_batch_dtype):
+        results[field] = array[:,i]
+    if is_cube:
+        # Make the centroids relative to each stamp, which starts at (1,1).
+        ok = ~results['error']
+        results['moments_centroid_y'][ok] -= stamps[ok,2] - 1
+    return results
+
+def FindAdaptiveMomBatch(object_images, bounds = None, weight = None, badpix = None,
+                         guess_sig = 5.0, precision = 1.0e-6, hsmparams = None, nthreads = 1):
+    """Measure adaptive moments of many objects at once.
+
+    This does the same measurement as FindAdaptiveMom for each of a set of objects, but the loop
+    over the objects is done in C++, optionally using multiple threads, and the results are
+    returned in a numpy structured array rather than as ShapeData objects.  This is much faster
+    than calling FindAdaptiveMom in a python loop when there are many small stamps.
+
+    The objects may be given either as a single Image containing all of them (e.g. a tiled image)
+    along with the `bounds` of each object's stamp, or as a 3-d numpy array of shape 
+    `(n, ny, nx)` with one stamp per object.  In the latter case, the stamps are taken to have
+    their lower left pixel at (1,1), like an Image made from a 2-d array, and the centroids are
+    given in those coordinates.
+
+    Failures do not raise an exception.  Rather, the `error` field is True for those objects,
+    and the other fields have the default values of an empty ShapeData object.  To get the error
+    message, measure that object again with FindAdaptiveMom.
+
+    The returned array has the following fields, which are the same as the attributes of 
+    ShapeData except that observed_shape is given as its distortion `observed_e1, observed_e2`
+    and moments_centroid as `moments_centroid_x, moments_centroid_y`:
+
+        moments_status, observed_e1, observed_e2, moments_sigma, moments_amp,
+        moments_centroid_x, moments_centroid_y, moments_rho4, moments_n_iter,
+        correction_status, corrected_e1, corrected_e2, corrected_g1, corrected_g2,
+        corrected_shape_err, resolution_factor, error
+
+    The PSF correction fields are only set by EstimateShearBatch.
+
+    The stamps are measured with the pixel type of the input if it is float32, float64 or int32.
+    Other types (e.g. an ImageS) are converted to float64 first.
+
+    Example usage
+    -------------
+
+        >>> results = galsim.hsm.FindAdaptiveMomBatch(tiled_image, bounds=stamp_bounds, 
+                                                      nthreads=4)
+        >>> good = ~results['error']
+        >>> sigma = results['moments_sigma'][good]
+
+    @param object_images     An Image containing all the objects, or a 3-d numpy array of stamps.
+    @param bounds            A list of BoundsI (or an (n,4) array of xmin, xmax, ymin, ymax) for
+                             the stamps in object_images.  This should be None if object_images is
+                             a 3-d array.  If it is None for an Image, the whole Image is a single 
+                             stamp.  (Default `bounds = None`.)
+    @param weight            The optional weight image, in the same form as object_images (an
+                             Image with the same bounds or a 3-d array with the same shape).  See
+                             FindAdaptiveMom for details.
+    @param badpix            The optional bad pixel mask, in the same form as object_images.
+    @param guess_sig         Optional argument with an initial guess for the Gaussian sigma of the
+                             objects, default `guess_sig = 5.0` (pixels).
+    @param precision         The convergence criterion for the moments; default `precision = 1e-6`.
+    @param hsmparams         The hsmparams keyword can be used to change the settings used by
+                             FindAdaptiveMomBatch when estimating moments; see HSMParams
+                             documentation using help(galsim.hsm.HSMParams) for more information.
+    @param nthreads          The number of threads to use.  This requires GalSim to be compiled 
+                             with OpenMP; otherwise the stamps are measured in a single thread.
+                             `nthreads <= 0` means to use all available cores.
+                             (Default `nthreads = 1`.)
+    @return                  A numpy structured array with the results for each stamp.
+    """
+    object_view, stamps, is_cube = _batchStamps(object_images, bounds, 'object_images')
+    weight_view = _batchMask(object_view, weight, badpix)
+
+    array = _galsim._FindAdaptiveMomBatch(object_view, weight_view, stamps,
+                                          guess_sig = guess_sig, precision = precision,
+                                          hsmparams = hsmparams, nthreads = int(nthreads))
+    return _batchResults(array, stamps, is_cube)
+
+def EstimateShearBatch(gal_images, PSF_images, gal_bounds = None, PSF_bounds = None,
+                       weight = None, badpix = None, sky_var = 0.0, shear_est = "REGAUSS",
+                       recompute_flux = "FIT", guess_sig_gal = 5.0, guess_sig_PSF = 3.0,
+                       precision = 1.0e-6, hsmparams = None, nthreads = 1):
+    """Carry out moments-based PSF correction for many galaxies at once.
+
+    This does the same measurement as EstimateShear for each of a set of galaxies, but the loop
+    over the galaxies is done in C++, optionally using multiple threads, and the results are
+    returned in a numpy structured array rather than as ShapeData objects.  See
+    FindAdaptiveMomBatch for the fields of the returned array and for how the stamps may be given.
+
+    The PSF may be given as a single Image to use for all the galaxies, or as stamps in the same 
+    way as the galaxies: either an Image with `PSF_bounds` or a 3-d numpy array.  In either case,
+    there must be one PSF stamp for each galaxy stamp.  When many galaxies share the same PSF
+    image, the transform of the PSF residual used by the REGAUSS method is computed once and
+    reused.
+
+    Failures do not raise an exception.  Rather, the `error` field is True for those galaxies,
+    and the other fields have the default values of an empty ShapeData object.  This corresponds
+    to `strict = False` in EstimateShear.
+
+    Example usage
+    -------------
+
+        >>> results = galsim.hsm.EstimateShearBatch(gal_cube, psf_image, nthreads=0)
+        >>> good = ~results['error']
+        >>> e1 = results['corrected_e1'][good]
+
+    @param gal_images        An Image containing all the galaxies, or a 3-d numpy array of stamps.
+    @param PSF_images        An Image of the PSF, or an Image containing all the PSF stamps, or a
+                             3-d numpy array of PSF stamps.
+    @param gal_bounds        A list of BoundsI (or an (n,4) array of xmin, xmax, ymin, ymax) for
+                             the stamps in gal_images.  This should be None if gal_images is a 3-d
+                             array.  (Default `gal_bounds = None`.)
+    @param PSF_bounds        A list of BoundsI (or an (n,4) array) for the stamps in PSF_images.  
+                             If None and PSF_images is an Image, the whole Image is used as the 
+                             PSF for every galaxy.  (Default `PSF_bounds = None`.)
+    @param weight            The optional weight image, in the same form as gal_images.
+    @param badpix            The optional bad pixel mask, in the same form as gal_images.
+    @param sky_var           The variance of the sky level; default `sky_var = 0.`.
+    @param shear_est         The method of PSF correction: REGAUSS, LINEAR, BJ, or KSB; default
+                             `shear_est = "REGAUSS"`.
+    @param recompute_flux    How to recompute the object flux: NONE, SUM, or FIT; default
+                             `recompute_flux = FIT`.
+    @param guess_sig_gal     Initial guess for the Gaussian sigma of the galaxies, default
+                             `guess_sig_gal = 5.` (pixels).
+    @param guess_sig_PSF     Initial guess for the Gaussian sigma of the PSF, default 
+                             `guess_sig_PSF = 3.` (pixels).
+    @param precision         The convergence criterion for the moments; default `precision = 1e-6`.
+    @param hsmparams         The hsmparams keyword can be used to change the settings used by
+                             EstimateShearBatch; see HSMParams documentation using
+                             help(galsim.hsm.HSMParams) for more information.
+    @param nthreads          The number of threads to use.  This requires GalSim to be compiled 
+                             with OpenMP; otherwise the stamps are measured in a single thread.
+                             `nthreads <= 0` means to use all available cores.
+                             (Default `nthreads = 1`.)
+    @return                  A numpy structured array with the results for each galaxy.
+    """
+    import numpy as np
+    gal_view, gal_stamps, is_cube = _batchStamps(gal_images, gal_bounds, 'gal_images')
+    PSF_view, PSF_stamps, _ = _batchStamps(PSF_images, PSF_bounds, 'PSF_images')
+    # Int images can only be used if both are ints.  Otherwise, use double for the int one.
+    if (gal_view.array.dtype == np.int32) != (PSF_view.array.dtype == np.int32):
+        if gal_view.array.dtype == np.int32: gal_view = _floatView(gal_view)
+        else: PSF_view = _floatView(PSF_view)
+    if len(PSF_stamps) == 1:
+        PSF_stamps = np.ascontiguousarray(np.repeat(PSF_stamps, len(gal_stamps), axis=0))
+    elif len(PSF_stamps) != len(gal_stamps):
+        raise ValueError("The number of PSF stamps (%d) does not match the number of galaxy "
+                         "stamps (%d)"%(len(PSF_stamps), len(gal_stamps)))
+    weight_view = _batchMask(gal_view, weight, badpix)
+
+    array = _galsim._EstimateShearBatch(gal_view, PSF_view, weight_view, gal_stamps, PSF_stamps,
+                                        sky_var = sky_var,
+                                        shear_est = shear_est.upper(),
+                                        recompute_flux = recompute_flux.upper(),
+                                        guess_sig_gal = guess_sig_gal,
+                                        guess_sig_PSF = guess_sig_PSF,
+                                        precision = precision,
+                                        hsmparams = hsmparams,
+                                        nthreads = int(nthreads))
+    return _batchResults(array, gal_stamps, is_cube)
+
 # make FindAdaptiveMom a method of Image and ImageView classes
 for Class in _galsim.ImageView.itervalues():
     Class.FindAdaptiveMom = FindAdaptiveMom
@@ -32,15 +32,24 @@ class Cosmology(object):
 
     Based on Matthias Bartelmann's libastro.
 
+    Distances are evaluated from a table of comoving distance vs. redshift that is built the first
+    time Da() is called (and extended as needed to cover higher redshifts), so Da() is cheap for
+    large arrays of redshifts.
+
     @param omega_m    Present day energy density of matter relative to critical density.
     @param omega_lam  Present day density of Dark Energy relative to critical density.
     """
+    # Redshift spacing and initial extent of the comoving distance table.
+    _table_dz = 1.e-3
+    _table_zmax = 4.
+
     def __init__(self, omega_m=0.3, omega_lam=0.7):
         # no quintessence, no radiation in this universe!
         self.omega_m = omega_m
         self.omega_lam = omega_lam
         self.omega_c = (1. - omega_m - omega_lam)
         self.omega_r = 0
+        self._z_table = None
     
     def a(self, z):
         """Compute scale factor.
@@ -62,34 +71,157 @@ class Cosmology(object):
         """
         return self.E(x**-1)**-1
 
+    def __buildTable(self, zmax):
+        """Tabulate the comoving distance chi(z) (in units of c/H0) from z=0 to at least zmax.
+
+        Each interval of the table is integrated with Simpson's rule.  Along with chi we store the
+        exact derivative dchi/dz = 1/E, which lets __chi() use cubic Hermite interpolation.
+        """
+        dz = self._table_dz
+        z = np.arange(int(np.ceil(zmax/dz)) + 1) * dz
+        f = self.__angKernel(1.+z)
+        fmid = self.__angKernel(1.+z[:-1]+0.5*dz)
+        chi = np.zeros_like(z)
+        chi[1:] = np.cumsum(dz/6. * (f[:-1] + 4.*fmid + f[1:]))
+        self._z_table = z
+        self._chi_table = chi
+        self._dchi_table = f
+
+    def __chi(self, z):
+        """Comoving distance to redshift(s) z in units of c/H0, interpolated from the table.
+        """
+        zmax = np.max(z) if z.size > 0 else 0.
+        if self._z_table is None:
+            self.__buildTable(max(zmax, self._table_zmax))
+        elif zmax > self._z_table[-1]:
+            self.__buildTable(max(zmax, 2.*self._z_table[-1]))
+        dz = self._table_dz
+        u = z/dz
+        i = np.minimum(u.astype(int), len(self._z_table)-2)
+        t = u - i
+        chi = self._chi_table
+        dchi = self._dchi_table
+        return ((1.+2.*t)*(1.-t)**2 * chi[i] + t*(1.-t)**2 * dz*dchi[i] +
+                t**2*(3.-2.*t) * chi[i+1] + t**2*(t-1.) * dz*dchi[i+1])
+
     def Da(self, z, z_ref=0):
         """Compute angular diameter distance between two redshifts in units of c/H0.
 
         In order to get the distance in Mpc/h, multiply by ~3000.
 
-        @param z     Redshift.
-        @param z_ref Reference redshift, with z_ref <= z.
+        @param z     Redshift, or NumPy array of redshifts.
+        @param z_ref Reference redshift, with z_ref <= z.  This may also be an array of the same
+                     shape as z.
+        @return The distance, as a NumPy array if z was an array and a float otherwise.
         """
+        zz = np.asarray(z, dtype=float)
+        if np.any(zz < 0):
+            raise ValueError("Redshift z must not be negative")
+        if np.any(zz < z_ref):
+            raise ValueError("Redshift z must not be smaller than the reference redshift")
+
+        d = self.__chi(zz) - self.__chi(np.asarray(z_ref, dtype=float))
+        # check for curvature
+        rk = (abs(self.omega_c))**0.5
+        if rk > 0:
+            mask = (rk*d > 0.01)
+            if self.omega_c > 0:
+                d = np.where(mask, np.sinh(rk*d)/rk, d)
+            else:
+                d = np.where(mask, np.sin(rk*d)/rk, d)
+        da = d/(1+zz)
         if isinstance(z, np.ndarray):
-            da = np.zeros_like(z)
-            for i in range(len(da)):
-                da[i] = self.Da(z[i], z_ref)
             return da
         else:
-            if z < 0:
-                raise ValueError("Redshift z must not be negative")
-            if z < z_ref:
-                raise ValueError("Redshift z must not be smaller than the reference redshift")
-
-            d = galsim.integ.int1d(self.__angKernel, z_ref+1, z+1)
-            # check for curvature
-            rk = (abs(self.omega_c))**0.5
-            if (rk*d > 0.01):
-                if self.omega_c > 0:
-                    d = sinh(rk*d)/rk
-                if self.omega_c < 0:
-                    d = sin(rk*d)/rk
-            return d/(1+z)
+            return float(da)
+
+def _farcth(x, out=None):
+    """Numerical implementation of integral functions of a spherical NFW profile.
+
+    All expressions are a function of x, which is the radius r in units of the NFW scale radius,
+    r_s.  For the derivation of these functions, see for example Wright & Brainerd (2000, ApJ,
+    534, 34).
+    """
+    if out is None:
+        out = np.zeros_like(x)
+
+    # 3 cases: x > 1, x < 1, and |x-1| < 0.001
+    mask = (x < 0.999)
+    if mask.any():
+        a = ((1.-x[mask])/(x[mask]+1.))**0.5
+        out[mask] = 0.5*np.log((1.+a)/(1.-a))/(1-x[mask]**2)**0.5
+
+    mask = (x > 1.001)
+    if mask.any():
+        a = ((x[mask]-1.)/(x[mask]+1.))**0.5
+        out[mask] = np.arctan(a)/(x[mask]**2 - 1)**0.5
+
+    # the approximation below has a maximum fractional error of 2.3e-7
+    mask = (x >= 0.999) & (x <= 1.001)
+    if mask.any():
+        out[mask] = 5./6. - x[mask]/3.
+
+    return out
+
+def _kappa(x, ks, out=None):
+    """Calculate convergence of halo.
+
+    @param x   Radial coordinate in units of rs (scale radius of halo), i.e., x=r/rs.
+    @param ks  Lensing strength prefactor.
+    @param out Numpy array into which results should be placed.
+    """
+    # convenience: call with single number
+    if isinstance(x, np.ndarray) == False:
+        return _kappa(np.array([x], dtype='float'), np.array([ks], dtype='float'))[0]
+
+    if out is None:
+        out = np.zeros_like(x)
+
+    # 3 cases: x > 1, x < 1, and |x-1| < 0.001
+    mask = (x < 0.999)
+    if mask.any():
+        a = ((1 - x[mask])/(x[mask] + 1))**0.5
+        out[mask] = 2*ks[mask]/(x[mask]**2 - 1) * \
+            (1 - np.log((1 + a)/(1 - a))/(1 - x[mask]**2)**0.5)
+
+    mask = (x > 1.001)
+    if mask.any():
+        a = ((x[mask] - 1)/(x[mask] + 1))**0.5
+        out[mask] = 2*ks[mask]/(x[mask]**2 - 1) * \
+            (1 - 2*np.arctan(a)/(x[mask]**2 - 1)**0.5)
+
+    # the approximation below has a maximum fractional error of 7.4e-7
+    mask = (x >= 0.999) & (x <= 1.001)
+    if mask.any():
+        out[mask] = ks[mask]*(22./15. - 0.8*x[mask])
+
+    return out
+
+def _gamma(x, ks, out=None):
+    """Calculate tangential shear of halo.
+
+    @param x   Radial coordinate in units of rs (scale radius of halo), i.e., x=r/rs.
+    @param ks  Lensing strength prefactor.
+    @param out Numpy array into which results should be placed
+    """
+    # convenience: call with single number
+    if isinstance(x, np.ndarray) == False:
+        return _gamma(np.array([x], dtype='float'), np.array([ks], dtype='float'))[0]
+    if out is None:
+        out = np.zeros_like(x)
+
+    mask = (x > 0.01)
+    if mask.any():
+        out[mask] = 4*ks[mask]*(np.log(x[mask]/2) + 2*_farcth(x[mask])) * \
+            x[mask]**(-2) - _kappa(x[mask], ks[mask])
+
+    # the approximation below has a maximum fractional error of 1.1e-7
+    mask = (x <= 0.01)
+    if mask.any():
+        out[mask] = 4*ks[mask]*(0.25 + 0.125 * x[mask]**2 * (3.25 + 3.0*np.log(x[mask]/2)))
+
+    return out
+
 
 class NFWHalo(object):
     """Class for NFW halos.
@@ -166,115 +298,41 @@ class NFWHalo(object):
         arcsec2rad = 1./206265;
         self.rs_arcsec = scale/arcsec2rad;
 
-    def __omega(self, a):
-        """Matter density at scale factor a.
-        """
-        return self.cosmo.omega_m/(self.cosmo.E(a)**2 * a**3)
-
-    def __farcth (self, x, out=None):
-        """Numerical implementation of integral functions of a spherical NFW profile.
-
-        All expressions are a function of x, which is the radius r in units of the NFW scale radius,
-        r_s.  For the derivation of these functions, see for example Wright & Brainerd (2000, ApJ,
-        534, 34).
-        """
-        if out is None:
-            out = np.zeros_like(x)
-
-        # 3 cases: x > 1, x < 1, and |x-1| < 0.001
-        mask = (x < 0.999)
-        if mask.any():
-            a = ((1.-x[mask])/(x[mask]+1.))**0.5
-            out[mask] = 0.5*np.log((1.+a)/(1.-a))/(1-x[mask]**2)**0.5
-
-        mask = (x > 1.001)
-        if mask.any():
-            a = ((x[mask]-1.)/(x[mask]+1.))**0.5
-            out[mask] = np.arctan(a)/(x[mask]**2 - 1)**0.5
-
-        # the approximation below has a maximum fractional error of 2.3e-7
-        mask = (x >= 0.999) & (x <= 1.001)
-        if mask.any():
-            out[mask] = 5./6. - x[mask]/3.
-
-        return out
-
-    def __kappa(self, x, ks, out=None):
-        """Calculate convergence of halo.
-
-        @param x   Radial coordinate in units of rs (scale radius of halo), i.e., x=r/rs.
-        @param ks  Lensing strength prefactor.
-        @param out Numpy array into which results should be placed.
-        """
-        # convenience: call with single number
-        if isinstance(x, np.ndarray) == False:
-            return self.__kappa(np.array([x], dtype='float'), np.array([ks], dtype='float'))[0]
-
-        if out is None:
-            out = np.zeros_like(x)
-
-        # 3 cases: x > 1, x < 1, and |x-1| < 0.001
-        mask = (x < 0.999)
-        if mask.any():
-            a = ((1 - x[mask])/(x[mask] + 1))**0.5
-            out[mask] = 2*ks[mask]/(x[mask]**2 - 1) * \
-                (1 - np.log((1 + a)/(1 - a))/(1 - x[mask]**2)**0.5)
-
-        mask = (x > 1.001)
-        if mask.any():
-            a = ((x[mask] - 1)/(x[mask] + 1))**0.5
-            out[mask] = 2*ks[mask]/(x[mask]**2 - 1) * \
-                (1 - 2*np.arctan(a)/(x[mask]**2 - 1)**0.5)
-
-        # the approximation below has a maximum fractional error of 7.4e-7
-        mask = (x >= 0.999) & (x <= 1.001)
-        if mask.any():
-            out[mask] = ks[mask]*(22./15. - 0.8*x[mask])
-
-        return out
-
-    def __gamma(self, x, ks, out=None):
-        """Calculate tangential shear of halo.
-
-        @param x   Radial coordinate in units of rs (scale radius of halo), i.e., x=r/rs.
-        @param ks  Lensing strength prefactor.
-        @param out Numpy array into which results should be placed
-        """
-        # convenience: call with single number
-        if isinstance(x, np.ndarray) == False:
-            return self.__gamma(np.array([x], dtype='float'), np.array([ks], dtype='float'))[0]
-        if out is None:
-            out = np.zeros_like(x)
-
-        mask = (x > 0.01)
-        if mask.any():
-            out[mask] = 4*ks[mask]*(np.log(x[mask]/2) + 2*self.__farcth(x[mask])) * \
-                x[mask]**(-2) - self.__kappa(x[mask], ks[mask])
-
-        # the approximation below has a maximum fractional error of 1.1e-7
-        mask = (x <= 0.01)
-        if mask.any():
-            out[mask] = 4*ks[mask]*(0.25 + 0.125 * x[mask]**2 * (3.25 + 3.0*np.log(x[mask]/2)))
-
-        return out
-
-    def __ks(self, z_s):
-        """Lensing strength of halo as function of source redshift.
-        """
+        # the parts of the lensing strength that do not depend on the source redshift
         # critical density and surface density
         rho_c = 2.7722e11
         Sigma_c = 5.5444e14
         # density contrast of halo at redshift z
-        a = self.cosmo.a(self.z)
         ez = self.cosmo.E(a)
         d0 = 200./3 * self.c**3/(np.log(1+self.c) - (1.*self.c)/(1+self.c))
         rho_s = rho_c * ez**2 *d0
+        self._ks_norm = self.cosmo.Da(self.z) * self.rs * rho_s / Sigma_c
+        self.__ks_cache = {}
 
+    def __omega(self, a):
+        """Matter density at scale factor a.
+        """
+        return self.cosmo.omega_m/(self.cosmo.E(a)**2 * a**3)
+
+    def __ks(self, z_s):
+        """Lensing strength of halo as function of source redshift.
+
+        Results for scalar z_s are cached; for arrays, the distances are computed only once for
+        each distinct source redshift.
+        """
         # lensing weights: the only thing that depends on z_s
-        # this does takes some time...
-        dl = self.cosmo.Da(z_s, self.z) * self.cosmo.Da(self.z) / self.cosmo.Da(z_s)
-        k_s = dl * self.rs * rho_s / Sigma_c
-        return k_s
+        if isinstance(z_s, np.ndarray):
+            uz, inv = np.unique(z_s, return_inverse=True)
+            k_s = self.cosmo.Da(uz, self.z) / self.cosmo.Da(uz) * self._ks_norm
+            return k_s[inv].reshape(z_s.shape)
+        else:
+            z_s = float(z_s)
+            if z_s not in self.__ks_cache:
+                if len(self.__ks_cache) >= 1000:
+                    self.__ks_cache.clear()
+                self.__ks_cache[z_s] = (self.cosmo.Da(z_s, self.z) / self.cosmo.Da(z_s) *
+                                        self._ks_norm)
+            return self.__ks_cache[z_s]
 
     def getShear(self, pos, z_s, units=galsim.arcsec, reduced=True):
         """Calculate (reduced) shear of halo at specified positions.
@@ -303,11 +361,11 @@ class NFWHalo(object):
         ks = self.__ks(z_s)
         if isinstance(z_s, np.ndarray) == False:
             ks = ks*np.ones_like(r)
-        g = self.__gamma(r, ks)
+        g = _gamma(r, ks)
 
         # convert to observable = reduced shear
         if reduced:
-            kappa = self.__kappa(r, ks)
+            kappa = _kappa(r, ks)
             g /= 1 - kappa
 
         # pure tangential shear, no cross component
@@ -361,7 +419,7 @@ class NFWHalo(object):
         ks = self.__ks(z_s)
         if isinstance(z_s, np.ndarray) == False:
             ks = ks*np.ones_like(r)
-        kappa = self.__kappa(r, ks)
+        kappa = _kappa(r, ks)
 
         # Make outputs in proper format: be careful here, we want consistent inputs and outputs
         # (e.g., if given a Numpy array, return one as well).  But don't attempt to index "pos"
@@ -401,8 +459,8 @@ class NFWHalo(object):
         ks = self.__ks(z_s)
         if isinstance(z_s, np.ndarray) == False:
             ks = ks*np.ones_like(r)
-        g = self.__gamma(r, ks)
-        kappa = self.__kappa(r, ks)
+        g = _gamma(r, ks)
+        kappa = _kappa(r, ks)
 
         mu = 1. / ( (1.-kappa)**2 - g**2 )
 
@@ -444,8 +502,8 @@ class NFWHalo(object):
         ks = self.__ks(z_s)
         if isinstance(z_s, np.ndarray) == False:
             ks = ks*np.ones_like(r)
-        g = self.__gamma(r, ks)
-        kappa = self.__kappa(r, ks)
+        g = _gamma(r, ks)
+        kappa = _kappa(r, ks)
 
         g /= 1 - kappa
         mu = 1. / ( (1.-kappa)**2 - g**2 )
@@ -473,3 +531,283 @@ class NFWHalo(object):
             return g1.tolist(), g2.tolist(), m.tolist()
 
 
+class NFWHaloField(object):
+    """A field of many NFW halos, whose lensing shears and convergences are summed.
+
+    Each halo is modelled as an NFWHalo (see that class for the meaning of the halo parameters),
+    all in the same Cosmology.  The halos are kept in the NFWHalo instances in the list
+    `halos`.
+
+    To keep the cost of evaluating the field at many source positions from growing with the total
+    number of halos, each halo only contributes to sources within `trunc` times its virial radius
+    R200 (= conc times its scale radius) of its center.  The halos are binned onto a grid of
+    square cells, each of which lists the halos whose truncation disc overlaps it, so a source
+    only has to be checked against the halos listed in its own cell.  Halos at redshifts not
+    less than the source redshift do not contribute.
+
+    The halos may be given either as arrays (or lists) of mass, conc, redshift, halo_x and
+    halo_y, or as an ASCII file with those five quantities as its columns (in that order, with
+    positions in arcsec).  The latter is the way to define them in a config file, using
+    input.nfw_halo_field.
+
+    The cosmology to use can be set in the same ways as for NFWHalo.
+
+    @param mass       Array of halo masses (see NFWHalo), in units of M_solar/h.
+    @param conc       Array of halo concentrations.
+    @param redshift   Array of halo redshifts.
+    @param halo_x     Array of halo center x positions (in arcsec).
+    @param halo_y     Array of halo center y positions (in arcsec).
+    @param file_name  ASCII file from which to read the halos, instead of giving the arrays.
+    @param dir        Optionally a directory name can be provided if the file_name does not
+                      already include it.
+    @param comments   The character used to indicate the start of a comment in file_name.
+                      [default='#']
+    @param trunc      Truncation radius of each halo in units of its virial radius. [default=5]
+    @param cell_size  Size of the grid cells (in arcsec).  [default=None, which means use the
+                      median truncation radius of the halos]
+    @param omega_m    Omega_matter to pass to Cosmology constructor. [default=None]
+    @param omega_lam  Omega_lambda to pass to Cosmology constructor. [default=None]
+    @param cosmo      A Cosmology instance. [default=None]
+    """
+    _req_params = {}
+    _opt_params = { 'file_name' : str , 'dir' : str , 'comments' : str , 'trunc' : float ,
+                    'cell_size' : float , 'omega_m' : float , 'omega_lam' : float }
+    _single_params = []
+    _takes_rng = False
+
+    # Maximum number of candidate (source, halo) pairs to process at once.
+    _max_pairs = 1 << 20
+
+    def __init__(self, mass=None, conc=None, redshift=None, halo_x=None, halo_y=None,
+                 file_name=None, dir=None, comments='#', trunc=5., cell_size=None,
+                 omega_m=None, omega_lam=None, cosmo=None):
+        if file_name is not None:
+            if mass is not None or conc is not None or redshift is not None or \
+                    halo_x is not None or halo_y is not None:
+                raise TypeError("NFWHaloField constructor received both file_name and halo arrays")
+            if dir:
+                import os
+                file_name = os.path.join(dir,file_name)
+            data = np.loadtxt(file_name, comments=comments, ndmin=2)
+            if data.shape[1] != 5:
+                raise ValueError("NFWHaloField file %s must have 5 columns"%file_name)
+            mass, conc, redshift, halo_x, halo_y = data.T
+        elif mass is None or conc is None or redshift is None or halo_x is None or halo_y is None:
+            raise TypeError("NFWHaloField requires either file_name or all of mass, conc, "+
+                            "redshift, halo_x and halo_y")
+
+        if omega_m or omega_lam:
+            if cosmo:
+                raise TypeError("NFWHaloField constructor received both cosmo and omega parameters")
+            if not omega_m: omega_m = 1.-omega_lam
+            if not omega_lam: omega_lam = 1.-omega_m
+            cosmo = Cosmology(omega_m=omega_m, omega_lam=omega_lam)
+        elif not cosmo:
+            cosmo = Cosmology()
+        elif not isinstance(cosmo,Cosmology):
+            raise TypeError("Invalid cosmo parameter in NFWHaloField constructor")
+        self.cosmo = cosmo
+
+        mass = np.array(mass, dtype=float).ravel()
+        conc = np.array(conc, dtype=float).ravel()
+        redshift = np.array(redshift, dtype=float).ravel()
+        halo_x = np.array(halo_x, dtype=float).ravel()
+        halo_y = np.array(halo_y, dtype=float).ravel()
+        n = len(mass)
+        if len(conc) != n or len(redshift) != n or len(halo_x) != n or len(halo_y) != n:
+            raise ValueError("NFWHaloField arrays must all have the same length")
+        if not trunc > 0.:
+            raise ValueError("Invalid trunc=%f for NFWHaloField (must be > 0)"%trunc)
+
+        self.halos = [ NFWHalo(mass=mass[i], conc=conc[i], redshift=redshift[i],
+                               halo_pos=galsim.PositionD(halo_x[i], halo_y[i]), cosmo=cosmo)
+                       for i in range(n) ]
+        self.trunc = trunc
+        self._x = halo_x
+        self._y = halo_y
+        self._z = redshift
+        self._rs = np.array([ h.rs_arcsec for h in self.halos ])
+        self._ks_norm = np.array([ h._ks_norm for h in self.halos ])
+        self._rtrunc = trunc * conc * self._rs
+
+        # Build the grid of cells.  Each halo is listed in every cell overlapping the square
+        # bounding its truncation disc.
+        if n == 0:
+            self._cell_size = 1.
+            self._x0 = self._y0 = 0.
+            self._nx = self._ny = 0
+            self._cell_start = np.zeros(2, dtype=int)
+            self._cell_halos = np.zeros(0, dtype=int)
+            return
+        if cell_size is None:
+            cell_size = np.median(self._rtrunc)
+        elif not cell_size > 0.:
+            raise ValueError("Invalid cell_size=%f for NFWHaloField (must be > 0)"%cell_size)
+        self._cell_size = float(cell_size)
+        self._x0 = np.min(halo_x - self._rtrunc)
+        self._y0 = np.min(halo_y - self._rtrunc)
+        ix1 = np.floor((halo_x - self._rtrunc - self._x0) / cell_size).astype(int)
+        ix2 = np.floor((halo_x + self._rtrunc - self._x0) / cell_size).astype(int)
+        iy1 = np.floor((halo_y - self._rtrunc - self._y0) / cell_size).astype(int)
+        iy2 = np.floor((halo_y + self._rtrunc - self._y0) / cell_size).astype(int)
+        self._nx = np.max(ix2) + 1
+        self._ny = np.max(iy2) + 1
+        cells = []
+        for i in range(n):
+            ix = np.arange(ix1[i], ix2[i]+1)
+            iy = np.arange(iy1[i], iy2[i]+1)
+            cells.append((iy[:,np.newaxis] * self._nx + ix).ravel())
+        ncells = np.array([ len(c) for c in cells ])
+        cells = np.concatenate(cells)
+        halo_index = np.repeat(np.arange(n), ncells)
+        order = np.argsort(cells, kind='mergesort')
+        self._cell_halos = halo_index[order]
+        self._cell_start = np.searchsorted(cells[order], np.arange(self._nx*self._ny+1))
+
+    def __pairs(self, pos_x, pos_y, z_s, cell, start, count):
+        """Find the (source, halo) pairs for which the halo contributes to the lensing of the source.
+
+        @param pos_x, pos_y, z_s  Positions and redshifts of the sources.
+        @param cell               Grid cell of each source.
+        @param start, count       Start and length of each source's list in _cell_halos.
+        @return src, halo, dx, dy, ks  The source and halo indices of each pair, the source
+                                       position relative to the halo center, and the lensing
+                                       strength of the halo for that source.
+        """
+        # For each pair, the index into _cell_halos: start of the source's list plus the position
+        # of the pair within that list.
+        index = np.repeat(start - np.cumsum(count) + count, count) + np.arange(np.sum(count))
+        src = np.repeat(np.arange(len(pos_x)), count)
+        halo = self._cell_halos[index]
+
+        dx = pos_x[src] - self._x[halo]
+        dy = pos_y[src] - self._y[halo]
+        keep = (dx*dx + dy*dy < self._rtrunc[halo]**2) & (z_s[src] > self._z[halo])
+        src = src[keep]
+        halo = halo[keep]
+        dx = dx[keep]
+        dy = dy[keep]
+        zs = z_s[src]
+        ks = self.cosmo.Da(zs, self._z[halo]) / self.cosmo.Da(zs) * self._ks_norm[halo]
+        return src, halo, dx, dy, ks
+
+    def __fields(self, pos, z_s, units, func):
+        """Sum the shear (gamma1, gamma2) and convergence of all the halos at the given positions.
+        """
+        pos_x, pos_y = galsim.utilities._convertPositions(pos, units, func)
+        z_s = np.asarray(z_s, dtype=float) * np.ones_like(pos_x)
+        n = len(pos_x)
+        gamma1 = np.zeros(n)
+        gamma2 = np.zeros(n)
+        kappa = np.zeros(n)
+
+        # Find the list of candidate halos for each source from its grid cell.
+        ix = np.floor((pos_x - self._x0) / self._cell_size).astype(int)
+        iy = np.floor((pos_y - self._y0) / self._cell_size).astype(int)
+        inside = (ix >= 0) & (ix < self._nx) & (iy >= 0) & (iy < self._ny)
+        cell = np.where(inside, iy * self._nx + ix, 0)
+        start = self._cell_start[cell]
+        count = np.where(inside, self._cell_start[cell+1] - start, 0)
+
+        # Process the sources in chunks with a bounded number of candidate pairs, so the
+        # temporary arrays stay a manageable size.
+        cum_count = np.cumsum(count)
+        i = 0
+        while i < n:
+            j = np.searchsorted(cum_count, cum_count[i] - count[i] + self._max_pairs, side='right')
+            j = max(j, i+1)
+            src, halo, dx, dy, ks = self.__pairs(pos_x[i:j], pos_y[i:j], z_s[i:j], cell[i:j],
+                                                 start[i:j], count[i:j])
+            i0 = i
+            i = j
+            if len(src) == 0: continue
+
+            r = (dx*dx + dy*dy)**0.5 / self._rs[halo]
+            g = _gamma(r, ks)
+            k = _kappa(r, ks)
+
+            # pure tangential shear for each halo
+            drsq = dx*dx+dy*dy
+            drsq[drsq==0.] = 1. # Avoid division by 0
+            cos2phi = (dx*dx-dy*dy)/drsq
+            sin2phi = 2*dx*dy/drsq
+
+            gamma1[i0:j] = np.bincount(src, weights=-g*cos2phi, minlength=j-i0)
+            gamma2[i0:j] = np.bincount(src, weights=-g*sin2phi, minlength=j-i0)
+            kappa[i0:j] = np.bincount(src, weights=k, minlength=j-i0)
+        return gamma1, gamma2, kappa
+
+    def __format(self, pos, *vals):
+        """Return the output values in the same format as NFWHalo does for the given pos.
+        """
+        if isinstance(pos, galsim.PositionD) or isinstance(pos, galsim.PositionI):
+            vals = [ v[0] for v in vals ]
+        elif isinstance(pos[0], np.ndarray):
+            pass
+        elif len(vals[0]) == 1 and not isinstance(pos[0],list):
+            vals = [ v[0] for v in vals ]
+        else:
+            vals = [ v.tolist() for v in vals ]
+        if len(vals) == 1:
+            return vals[0]
+        else:
+            return tuple(vals)
+
+    def getShear(self, pos, z_s, units=galsim.arcsec, reduced=True):
+        """Calculate (reduced) shear of the halo field at specified positions.
+
+        @param pos       Position(s) of the source(s), assumed to be post-lensing!
+                         See NFWHalo.getShear for the valid ways to input this.
+        @param z_s       Source redshift(s).
+        @param units     Angular units of coordinates. [default = arcsec]
+        @param reduced   Whether returned shear(s) should be reduced shears. [default=True]
+
+        @return (g1,g2)   [g1 and g2 are each a list if input was a list]
+        """
+        g1, g2, kappa = self.__fields(pos, z_s, units, 'getShear')
+        if reduced:
+            g1 /= 1 - kappa
+            g2 /= 1 - kappa
+        return self.__format(pos, g1, g2)
+
+    def getConvergence(self, pos, z_s, units=galsim.arcsec):
+        """Calculate convergence of the halo field at specified positions.
+
+        @param pos     Position(s) of the source(s), assumed to be post-lensing!
+                       See NFWHalo.getConvergence for the valid ways to input this.
+        @param z_s     Source redshift(s).
+        @param units   Angular units of coordinates. [default = arcsec]
+
+        @return kappa or list of kappa values.
+        """
+        g1, g2, kappa = self.__fields(pos, z_s, units, 'getKappa')
+        return self.__format(pos, kappa)
+
+    def getMagnification(self, pos, z_s, units=galsim.arcsec):
+        """Calculate magnification of the halo field at specified positions.
+
+        @param pos     Position(s) of the source(s), assumed to be post-lensing!
+                       See NFWHalo.getMagnification for the valid ways to input this.
+        @param z_s     Source redshift(s).
+        @param units   Angular units of coordinates. [default = arcsec]
+
+        @return mu or list of mu values.
+        """
+        g1, g2, kappa = self.__fields(pos, z_s, units, 'getMagnification')
+        mu = 1. / ( (1.-kappa)**2 - g1**2 - g2**2 )
+        return self.__format(pos, mu)
+
+    def getLensing(self, pos, z_s, units=galsim.arcsec):
+        """Calculate lensing shear and magnification of the halo field at specified positions.
+
+        @param pos         Position(s) of the source(s), assumed to be post-lensing!
+                           See NFWHalo.getLensing for the valid ways to input this.
+        @param z_s         Source redshift(s).
+        @param units       Angular units of coordinates. [default = arcsec]
+        @return g1,g2,mu   Reduced shears and magnifications.
+        """
+        g1, g2, kappa = self.__fields(pos, z_s, units, 'getLensing')
+        mu = 1. / ( (1.-kappa)**2 - g1**2 - g2**2 )
+        g1 /= 1 - kappa
+        g2 /= 1 - kappa
+        return self.__format(pos, g1, g2, mu)
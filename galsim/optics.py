@@ -128,35 +128,6 @@ class OpticalPSF(GSObject):
                  circular_pupil=True, obscuration=0., interpolant=None, oversampling=1.5,
                  pad_factor=1.5, flux=1., gsparams=None):
 
-        # Currently we load optics, noise etc in galsim/__init__.py, but this might change (???)
-        import galsim.optics
-        
-        # Choose dx for lookup table using Nyquist for optical aperture and the specified
-        # oversampling factor
-        dx_lookup = .5 * lam_over_diam / oversampling
-        
-        # We need alias_threshold here, so don't wait to make this a default GSParams instance
-        # if the user didn't specify anything else.
-        if not gsparams:
-            gsparams = galsim.GSParams()
-
-        # Use a similar prescription as SBAiry to set Airy stepK and thus reference unpadded image
-        # size in physical units
-        stepk_airy = min(
-            gsparams.alias_threshold * .5 * np.pi**3 * (1. - obscuration) / lam_over_diam,
-            np.pi / 5. / lam_over_diam)
-        
-        # Boost Airy image size by a user-specifed pad_factor to allow for larger, aberrated PSFs,
-        # also make npix always *odd* so that opticalPSF lookup table array is correctly centred:
-        npix = 1 + 2 * (np.ceil(pad_factor * (np.pi / stepk_airy) / dx_lookup)).astype(int)
-        
-        # Make the psf image using this dx and array shape
-        optimage = galsim.optics.psf_image(
-            lam_over_diam=lam_over_diam, dx=dx_lookup, array_shape=(npix, npix), defocus=defocus,
-            astig1=astig1, astig2=astig2, coma1=coma1, coma2=coma2, trefoil1=trefoil1,
-            trefoil2=trefoil2, spher=spher, circular_pupil=circular_pupil, obscuration=obscuration,
-            flux=flux)
-        
         # If interpolant not specified on input, use a Quintic interpolant
         if interpolant is None:
             quintic = galsim.Quintic(tol=1e-4)
@@ -164,16 +135,98 @@ class OpticalPSF(GSObject):
         else:
             self.interpolant = galsim.utilities.convert_interpolant_to_2d(interpolant)
 
+        # Interpolant objects can't be compared by value, so we can only use the cache when the
+        # interpolant was specified by name (or not at all).
+        if interpolant is None or isinstance(interpolant, basestring):
+            sbp = _optical_sbprofile_cache(
+                float(lam_over_diam), float(defocus), float(astig1), float(astig2), float(coma1),
+                float(coma2), float(trefoil1), float(trefoil2), float(spher),
+                bool(circular_pupil), float(obscuration), interpolant, float(oversampling),
+                float(pad_factor), float(flux), _gsparams_key(gsparams))
+            # The cached profile is shared, and GSObject methods like applyShear replace the
+            # implementation that the SBProfile object points to with a transformed one.  So give
+            # this object its own SBProfile, which shares the same (unchanging) implementation.
+            sbp = galsim.SBInterpolatedImage(sbp)
+        else:
+            sbp = _optical_sbprofile(
+                lam_over_diam, defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2, spher,
+                circular_pupil, obscuration, self.interpolant, oversampling, pad_factor, flux,
+                gsparams)
+
         # Initialize the SBProfile
-        GSObject.__init__(
-            self, galsim.SBInterpolatedImage(optimage, xInterp=self.interpolant, dx=dx_lookup,
-                                             gsparams=gsparams))
+        GSObject.__init__(self, sbp)
+
+
+# The order of the GSParams constructor arguments, used to key the OpticalPSF cache on the values
+# of the gsparams rather than the (unhashable) GSParams instance.
+_gsparams_names = ('minimum_fft_size', 'maximum_fft_size', 'alias_threshold', 'maxk_threshold',
+                   'kvalue_accuracy', 'xvalue_accuracy', 'shoot_accuracy', 'realspace_relerr',
+                   'realspace_abserr', 'integration_relerr', 'integration_abserr')
+
+def _gsparams_key(gsparams):
+    """Return a hashable tuple of the values in gsparams (None if gsparams is None).
+    """
+    if not gsparams:
+        return None
+    return tuple([ getattr(gsparams, name) for name in _gsparams_names ])
+
+def _optical_sbprofile(lam_over_diam, defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2,
+                       spher, circular_pupil, obscuration, interpolant, oversampling, pad_factor,
+                       flux, gsparams):
+    """Build the SBInterpolatedImage for an OpticalPSF.
+
+    The interpolant may be an Interpolant2d, a string or None (meaning the default Quintic), and
+    gsparams may be a GSParams, a tuple of GSParams values as returned by _gsparams_key, or None.
+    The latter options allow this function to be wrapped in an LRU_Cache.
+    """
+    # Choose dx for lookup table using Nyquist for optical aperture and the specified
+    # oversampling factor
+    dx_lookup = .5 * lam_over_diam / oversampling
+    
+    # We need alias_threshold here, so don't wait to make this a default GSParams instance
+    # if the user didn't specify anything else.
+    if not gsparams:
+        gsparams = galsim.GSParams()
+    elif isinstance(gsparams, tuple):
+        gsparams = galsim.GSParams(*gsparams)
+
+    # Use a similar prescription as SBAiry to set Airy stepK and thus reference unpadded image
+    # size in physical units
+    stepk_airy = min(
+        gsparams.alias_threshold * .5 * np.pi**3 * (1. - obscuration) / lam_over_diam,
+        np.pi / 5. / lam_over_diam)
+    
+    # Boost Airy image size by a user-specifed pad_factor to allow for larger, aberrated PSFs,
+    # also make npix always *odd* so that opticalPSF lookup table array is correctly centred:
+    npix = 1 + 2 * (np.ceil(pad_factor * (np.pi / stepk_airy) / dx_lookup)).astype(int)
+    
+    # Make the psf image using this dx and array shape
+    optimage = psf_image(
+        lam_over_diam=lam_over_diam, dx=dx_lookup, array_shape=(npix, npix), defocus=defocus,
+        astig1=astig1, astig2=astig2, coma1=coma1, coma2=coma2, trefoil1=trefoil1,
+        trefoil2=trefoil2, spher=spher, circular_pupil=circular_pupil, obscuration=obscuration,
+        flux=flux)
+    
+    if interpolant is None:
+        quintic = galsim.Quintic(tol=1e-4)
+        interpolant = galsim.InterpolantXY(quintic)
+    else:
+        interpolant = galsim.utilities.convert_interpolant_to_2d(interpolant)
+
+    sbp = galsim.SBInterpolatedImage(optimage, xInterp=interpolant, dx=dx_lookup,
+                                     gsparams=gsparams)
 
-        # The above procedure ends up with a larger image than we really need, which
-        # means that the default stepK value will be smaller than we need.  
-        # Thus, we call the function calculateStepK() to refine the value.
-        self.SBProfile.calculateStepK()
-        self.SBProfile.calculateMaxK()
+    # The above procedure ends up with a larger image than we really need, which
+    # means that the default stepK value will be smaller than we need.  
+    # Thus, we call the function calculateStepK() to refine the value.
+    sbp.calculateStepK()
+    sbp.calculateMaxK()
+    return sbp
+
+# In position-dependent PSF models we may build many OpticalPSFs, often with repeated parameters.
+# Each one holds an image of (typically) a few hundred pixels on a side, so this cache is kept
+# fairly small.
+_optical_sbprofile_cache = utilities.LRU_Cache(_optical_sbprofile, maxsize=100)
 
 
 def generate_pupil_plane(array_shape=(256, 256), dx=1., lam_over_diam=2., circular_pupil=True,
@@ -192,6 +245,20 @@ def generate_pupil_plane(array_shape=(256, 256), dx=1., lam_over_diam=2., circul
     pupil in unit disc-scaled coordinates for use by Zernike polynomials for describing the
     wavefront across the pupil plane.  The array in_pupil is a vector of Bools used to specify
     where in the pupil plane described by rho, theta is illuminated.  See also optics.wavefront. 
+
+    The arrays are cached internally for repeated calls with the same inputs, but the returned
+    arrays are copies, so they may be modified freely.
+    """
+    if obscuration >= 1.:
+        raise ValueError("Pupil fully obscured! obscuration ="+str(obscuration)+" (>= 1)")
+    rho, theta, in_pupil = _pupil_plane_cache(
+        tuple(array_shape), float(dx), float(lam_over_diam), bool(circular_pupil),
+        float(obscuration))
+    return rho.copy(), theta.copy(), in_pupil.copy()
+
+def _generate_pupil_plane(array_shape, dx, lam_over_diam, circular_pupil, obscuration):
+    """Uncached implementation of generate_pupil_plane().  The returned arrays are read-only,
+    since they are shared by everything that uses _pupil_plane_cache.
     """
     kmax_internal = dx * 2. * np.pi / lam_over_diam # INTERNAL kmax in units of array grid spacing
     # Build kx, ky coords
@@ -201,8 +268,6 @@ def generate_pupil_plane(array_shape=(256, 256), dx=1., lam_over_diam=2., circul
     theta = np.arctan2(ky, kx)
     # Cut out circular pupil if desired (default, square pupil optionally supported) and include 
     # central obscuration
-    if obscuration >= 1.:
-        raise ValueError("Pupil fully obscured! obscuration ="+str(obscuration)+" (>= 1)")
     if circular_pupil:
         in_pupil = (rho < 1.)
         if obscuration > 0.:
@@ -213,8 +278,46 @@ def generate_pupil_plane(array_shape=(256, 256), dx=1., lam_over_diam=2., circul
             in_pupil = in_pupil * (
                 (np.abs(kx) >= .5 * obscuration * kmax_internal) *
                 (np.abs(ky) >= .5 * obscuration * kmax_internal))
+    # These get shared by everyone who hits the cache, so protect them from being modified.
+    for array in (rho, theta, in_pupil):
+        array.flags.writeable = False
     return rho, theta, in_pupil
 
+def _zernike_basis(array_shape, dx, lam_over_diam, circular_pupil, obscuration):
+    """Return (in_pupil, basis) where basis[j] is 2 pi times the j-th aberration's Noll-normalized
+    Zernike polynomial, evaluated at the illuminated pupil points rho[in_pupil], theta[in_pupil].
+
+    The aberrations are ordered as (defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2,
+    spher), so the wavefront phase for a set of coefficients in units of wavelength is simply
+    np.dot(coeffs, basis).  The returned arrays are read-only, since they are shared by everything
+    that uses _zernike_basis_cache.
+    """
+    rho, theta, in_pupil = _pupil_plane_cache(
+        array_shape, dx, lam_over_diam, circular_pupil, obscuration)
+    r = rho[in_pupil]
+    t = theta[in_pupil]
+    rsq = r**2
+    basis = np.array([
+        np.sqrt(3.) * (2. * rsq - 1.),                  # Defocus
+        np.sqrt(6.) * rsq * np.sin(2. * t),             # Astigmatism (like e2)
+        np.sqrt(6.) * rsq * np.cos(2. * t),             # Astigmatism (like e1)
+        np.sqrt(8.) * (3. * rsq - 2.) * r * np.sin(t),  # Coma along x2
+        np.sqrt(8.) * (3. * rsq - 2.) * r * np.cos(t),  # Coma along x1
+        np.sqrt(8.) * rsq * r * np.sin(3. * t),         # Trefoil (one of the arrows along x2)
+        np.sqrt(8.) * rsq * r * np.cos(3. * t),         # Trefoil (one of the arrows along x1)
+        np.sqrt(5.) * (6. * rsq**2 - 6. * rsq + 1.) ])  # Spherical aberration
+    basis *= 2. * np.pi
+    basis.flags.writeable = False
+    return in_pupil, basis
+
+# The pupil plane and the Zernike basis only depend on the geometry (array_shape, dx,
+# lam_over_diam, circular_pupil, obscuration), not on the aberration coefficients, so we keep the
+# most recent few of each around.  Then a new set of aberrations for the same geometry only costs
+# one phase multiply and one FFT.  The basis arrays are 8 times the size of the pupil, so keep this
+# cache small.
+_pupil_plane_cache = utilities.LRU_Cache(_generate_pupil_plane, maxsize=10)
+_zernike_basis_cache = utilities.LRU_Cache(_zernike_basis, maxsize=10)
+
 def wavefront(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig1=0., astig2=0.,
               coma1=0., coma2=0., trefoil1=0., trefoil2=0., spher=0.,
               circular_pupil=True, obscuration=0.):
@@ -254,38 +357,19 @@ def wavefront(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
     
     Outputs the wavefront for kx, ky locations corresponding to kxky(array_shape).
     """
-    # Define the pupil coordinates and non-zero regions based on input kwargs
-    rho, theta, in_pupil = generate_pupil_plane(
-        array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, circular_pupil=circular_pupil,
-        obscuration=obscuration)
-    pi = np.pi # minor but saves Python checking the entire np. namespace every time I need pi    
+    if obscuration >= 1.:
+        raise ValueError("Pupil fully obscured! obscuration ="+str(obscuration)+" (>= 1)")
+    # Get the (cached) illuminated pupil region and Zernike basis for this geometry
+    in_pupil, basis = _zernike_basis_cache(
+        tuple(array_shape), float(dx), float(lam_over_diam), bool(circular_pupil),
+        float(obscuration))
+    coeffs = np.array([defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2, spher])
     # Then make wavefront image
     wf = np.zeros(array_shape, dtype=complex)
-    wf[in_pupil] = 1.
-    # Defocus
-    wf[in_pupil] *= np.exp(2j * pi * defocus * np.sqrt(3.) * (2. * rho[in_pupil]**2 - 1.))
-    # Astigmatism (like e2)
-    wf[in_pupil] *= np.exp(2j * pi * astig1 * np.sqrt(6.) * rho[in_pupil]**2
-                           * np.sin(2. * theta[in_pupil]))
-    # Astigmatism (like e1)
-    wf[in_pupil] *= np.exp(2j * pi * astig2 * np.sqrt(6.) * rho[in_pupil]**2
-                           * np.cos(2. * theta[in_pupil]))
-    # Coma along x2
-    wf[in_pupil] *= np.exp(2j * pi * coma1 * np.sqrt(8.) * (3. * rho[in_pupil]**2 - 2.)
-                           * rho[in_pupil] * np.sin(theta[in_pupil]))
-    # Coma along x1
-    wf[in_pupil] *= np.exp(2j * pi * coma2 * np.sqrt(8.) * (3. * rho[in_pupil]**2 - 2.)
-                           * rho[in_pupil]* np.cos(theta[in_pupil]))
-    # Trefoil (one of the arrows along x2)
-    wf[in_pupil] *= np.exp(2j * pi * trefoil1 * np.sqrt(8.) * rho[in_pupil]**3
-                           * np.sin(3. * theta[in_pupil]))
-    # Trefoil (one of the arrows along x1)
-    wf[in_pupil] *= np.exp(2j * pi * trefoil2 * np.sqrt(8.) * rho[in_pupil]**3
-                           * np.cos(3. * theta[in_pupil]))
-    # Spherical aberration
-    wf[in_pupil] *= np.exp(2j * pi * spher * np.sqrt(5.)
-                           * (6. * rho[in_pupil]**4 - 6. * rho[in_pupil]**2 + 1.))
-
+    if np.any(coeffs != 0.):
+        wf[in_pupil] = np.exp(1j * np.dot(coeffs, basis))
+    else:
+        wf[in_pupil] = 1.
     return wf
 
 def wavefront_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0.,
@@ -426,6 +510,104 @@ def psf_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
     im.setScale(dx)
     return im
 
+def psf_batch(aberrations, array_shape=(256, 256), dx=1., lam_over_diam=2., circular_pupil=True,
+              obscuration=0., flux=1., max_batch=64):
+    """Return a 3D NumPy array containing a stack of circular (default) or square pupil PSFs, one
+    for each row of the input array of aberrations.
+
+    This is equivalent to calling psf() once for each set of aberrations, but the pupil plane and
+    Zernike basis are only set up once, and the FFTs are done together in batches of at most
+    `max_batch` PSFs.  This is much faster when you need many PSFs that differ only in their
+    aberrations, e.g. for a field-dependent optical model.
+
+    Each PSF in the stack is centred on the [array_shape[0] / 2, array_shape[1] / 2] pixel, and
+    uses surface brightness rather than flux units for pixel values, matching SBProfile.
+
+    To ensure properly Nyquist sampled output any user should set lam_over_diam >= 2. * dx.
+
+    Ouput NumPy array is C-contiguous, with shape (naberrations,) + array_shape.
+
+    @param aberrations     array of shape (naberrations, ncoeff), where each row gives the
+                           aberrations (defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2,
+                           spher) in units of incident light wavelength.  If ncoeff < 8, the
+                           remaining coefficients are taken to be zero.
+    @param array_shape     the NumPy array shape desired for each PSF in the output array.
+    @param dx              grid spacing of PSF in real space units
+    @param lam_over_diam   lambda / telescope diameter in the physical units adopted for dx 
+                           (user responsible for consistency).
+    @param circular_pupil  adopt a circular pupil?
+    @param obscuration     linear dimension of central obscuration as fraction of pupil linear
+                           dimension, [0., 1.)
+    @param flux            total flux of each profile, either a single value or an array of
+                           length naberrations [default flux=1.]
+    @param max_batch       maximum number of PSFs to transform in a single FFT call.  This limits
+                           the size of the temporary complex arrays.  [default max_batch=64]
+    """
+    if obscuration >= 1.:
+        raise ValueError("Pupil fully obscured! obscuration ="+str(obscuration)+" (>= 1)")
+    aberrations = np.atleast_2d(np.asarray(aberrations, dtype=float))
+    if aberrations.ndim != 2 or aberrations.shape[1] > 8:
+        raise ValueError(
+            "aberrations must have shape (naberrations, ncoeff) with ncoeff <= 8, got "+
+            str(aberrations.shape))
+    if max_batch < 1:
+        raise ValueError("max_batch must be at least 1")
+    array_shape = tuple(array_shape)
+    naberr, ncoeff = aberrations.shape
+    flux = np.ones(naberr) * flux   # Also checks that flux has the right length, if an array.
+
+    in_pupil, basis = _zernike_basis_cache(
+        array_shape, float(dx), float(lam_over_diam), bool(circular_pupil), float(obscuration))
+
+    out = np.empty((naberr,) + array_shape)
+    for start in range(0, naberr, max_batch):
+        end = min(start + max_batch, naberr)
+        # Build the stack of wavefronts and do all the FFTs in a single call
+        wf = np.zeros((end - start,) + array_shape, dtype=complex)
+        wf[:, in_pupil] = np.exp(1j * np.dot(aberrations[start:end], basis[:ncoeff]))
+        ftwf = np.fft.fft2(wf, axes=(-2, -1))
+        im = (ftwf * ftwf.conj()).real
+        # Same as utilities.roll2d, but for each PSF in the stack
+        im = np.roll(np.roll(im, array_shape[1] // 2, axis=2), array_shape[0] // 2, axis=1)
+        norm = flux[start:end] / (im.sum(axis=2).sum(axis=1) * dx**2)
+        out[start:end] = im * norm[:, np.newaxis, np.newaxis]
+    return out
+
+def psf_images_batch(aberrations, array_shape=(256, 256), dx=1., lam_over_diam=2.,
+                     circular_pupil=True, obscuration=0., flux=1., max_batch=64):
+    """Return a list of circular (default) or square pupil PSFs as ImageViewD objects, one for each
+    row of the input array of aberrations.
+
+    See psf_batch() for details.  Each ImageViewD has its scale set to dx, so it can be used
+    directly to instantiate an SBInterpolatedImage or galsim.InterpolatedImage.  The images are
+    views into a single 3D array returned by psf_batch().
+
+    @param aberrations     array of shape (naberrations, ncoeff), where each row gives the
+                           aberrations (defocus, astig1, astig2, coma1, coma2, trefoil1, trefoil2,
+                           spher) in units of incident light wavelength.  If ncoeff < 8, the
+                           remaining coefficients are taken to be zero.
+    @param array_shape     the NumPy array shape desired for the array views of the ImageViewDs.
+    @param dx              grid spacing of PSF in real space units
+    @param lam_over_diam   lambda / telescope diameter in the physical units adopted for dx 
+                           (user responsible for consistency).
+    @param circular_pupil  adopt a circular pupil?
+    @param obscuration     linear dimension of central obscuration as fraction of pupil linear
+                           dimension, [0., 1.)
+    @param flux            total flux of each profile, either a single value or an array of
+                           length naberrations [default flux=1.]
+    @param max_batch       maximum number of PSFs to transform in a single FFT call.
+                           [default max_batch=64]
+    """
+    stack = psf_batch(
+        aberrations, array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam,
+        circular_pupil=circular_pupil, obscuration=obscuration, flux=flux, max_batch=max_batch)
+    images = []
+    for array in stack:
+        im = galsim.ImageViewD(array)
+        im.setScale(dx)
+        images.append(im)
+    return images
+
 def otf(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig1=0., astig2=0., coma1=0.,
         coma2=0., trefoil1=0., trefoil2=0., spher=0., circular_pupil=True, obscuration=0.):
     """Return the complex OTF of a circular (default) or square pupil with low-order aberrations as
@@ -154,6 +154,83 @@ def convert_interpolant_to_2d(interpolant):
         return galsim.Interpolant2d(interpolant)
 
 
+class LRU_Cache(object):
+    """Simplified Least Recently Used Cache, the Python analogue of the C++ LRUCache class in
+    include/galsim/LRUCache.h.
+
+    Wraps a function `user_function` so that calls with the same (hashable) positional arguments
+    return the stored result rather than recomputing it.  At most `maxsize` results are kept; when
+    the cache is full, the least recently used entry is discarded.
+
+    Initialization
+    --------------
+
+        >>> f_cached = galsim.utilities.LRU_Cache(f, maxsize=100)
+
+    Then `f_cached(*args)` returns the same thing as `f(*args)`, but only calls `f` the first time
+    it sees a given set of arguments (at least until that entry falls out of the cache).
+
+    Note that the cached return values are shared between callers, so they should be treated as
+    read-only.
+
+    @param user_function   The function to be cached.
+    @param maxsize         The maximum number of results to store.  Must be at least 1.
+                           [default `maxsize = 1024`]
+    """
+    def __init__(self, user_function, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1 for an LRU_Cache")
+        # Link layout:     [PREV, NEXT, KEY, RESULT]
+        self.root = root = [None, None, None, None]
+        self.user_function = user_function
+        self.cache = cache = {}
+
+        last = root
+        for i in range(maxsize):
+            key = object()
+            cache[key] = last[1] = last = [last, root, key, None]
+        root[0] = last
+
+    def __call__(self, *key):
+        cache = self.cache
+        root = self.root
+        link = cache.get(key)
+        if link is not None:
+            # Cache hit: move link to last position
+            link_prev, link_next, _, result = link
+            link_prev[1] = link_next
+            link_next[0] = link_prev
+            last = root[0]
+            last[1] = root[0] = link
+            link[0] = last
+            link[1] = root
+            return result
+        # Cache miss: evaluate and insert new key/value at root, then increment root
+        #             so that just-evaluated value is in last position.
+        result = self.user_function(*key)
+        root[2] = key
+        root[3] = result
+        oldroot = root
+        root = self.root = root[1]
+        root[2], oldkey = None, root[2]
+        root[3], oldvalue = None, root[3]
+        del cache[oldkey]
+        cache[key] = oldroot
+        return result
+
+    def clear(self):
+        """Discard all of the stored results, keeping the same maximum size.
+        """
+        self.resize(len(self.cache))
+
+    def resize(self, maxsize):
+        """Resize the cache.  This also discards all of the stored results.
+
+        @param maxsize   The new maximum number of results to store.
+        """
+        self.__init__(self.user_function, maxsize)
+
+
 class ComparisonShapeData(object):
     """A class to contain the outputs of a comparison between photon shooting and DFT rendering of
     GSObjects, as measured by the HSM module's FindAdaptiveMom or (in future) EstimateShear.
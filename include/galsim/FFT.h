@@ -254,6 +254,27 @@ namespace galsim {
         /// interpolate to k=(kx, ky) - WILL wrap k values to fill interpolant kernel
         std::complex<double> interpolate(double kx, double ky, const Interpolant2d& interp) const;
 
+        /**
+         * @brief Interpolate to a regular, possibly sheared or rotated, grid of k values.
+         *
+         * Sets val[i+j*m] for 0 <= i < m and 0 <= j < n to the interpolated value at
+         *
+         *     kx = kx0 + i*dkx + j*dkxy
+         *     ky = ky0 + i*dkyx + j*dky
+         *
+         * or to zero if |kx| or |ky| is greater than kmax.  The result is the same as calling
+         * interpolate() at each point, but it is much faster when both kx and ky change along
+         * each row of the grid, since then the row cache used by interpolate() never gets a hit.
+         * Here the interpolant weights for each point are calculated once into local buffers and
+         * the table is summed directly.  If kx is constant along either direction of the grid
+         * (e.g. for a 90 degree rotation), the points are instead done in the order that lets
+         * interpolate() use its row cache.
+         */
+        void interpolateGrid(
+            std::complex<double>* val, int m, int n,
+            double kx0, double dkx, double dkxy, double ky0, double dky, double dkyx,
+            double kmax, const InterpolantXY& interp) const;
+
         /// Set the value of a grid point ix,iy (k = (ix*dk, iy*dk)) to a given value.
         void kSet(int ix, int iy, std::complex<double> value);
 
@@ -345,6 +366,7 @@ namespace galsim {
         // Objects used to accelerate interpolation with separable interpolants:
         mutable std::deque<std::complex<double> > _cache;
         mutable std::vector<double> _xwt;
+        mutable std::vector<double> _ywt;  // Just workspace, so not cleared with the cache.
         mutable int _cacheStartY;
         mutable double _cacheX;
         mutable const InterpolantXY* _cacheInterp;
@@ -476,6 +498,7 @@ namespace galsim {
         // Objects used to accelerate interpolation with separable interpolants:
         mutable std::deque<double> _cache;
         mutable std::vector<double> _xwt;
+        mutable std::vector<double> _ywt;  // Just workspace, so not cleared with the cache.
         mutable double _cacheX;
         mutable int _cacheStartY;
         mutable const InterpolantXY* _cacheInterp;
@@ -0,0 +1,103 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+
+#ifndef INFO_DISK_CACHE_H
+#define INFO_DISK_CACHE_H
+
+#include <string>
+#include <vector>
+#include "SBProfile.h"
+
+namespace galsim {
+
+    /**
+     * @brief An optional on-disk cache of the tabulated quantities of the profile info classes.
+     *
+     * SersicInfo, KolmogorovInfo and AiryInfo build lookup tables and photon-shooting samplers
+     * that are expensive to calculate, but which only depend on a few parameters and the
+     * GSParams.  The in-memory LRUCaches avoid recalculating them within a single process,
+     * but each new process (e.g. each worker of a multi-process config run) has to start over.
+     *
+     * If a cache directory is set, each info class saves its tables to a file in that
+     * directory, named by the type of profile and a hash of its parameters and GSParams
+     * values.  Later constructions of an equivalent info object, in this or any other process,
+     * read the file rather than repeating the calculation.  The full key is saved in the file
+     * and checked on reading, so a hash collision just means the tables are recalculated.
+     *
+     * The directory is initially taken from the environment variable GALSIM_INFO_CACHE_DIR.
+     * If that is not set (and setDirectory() is not called), nothing is read or written.
+     * The files are written to a temporary name and then renamed, so several processes may
+     * share the same directory.
+     */
+    class InfoDiskCache
+    {
+    public:
+        /**
+         * @brief Set the directory in which to save the tables.
+         *
+         * @param[in] dir  The directory to use.  An empty string turns off the disk cache.
+         *                 The directory is created if it does not exist.
+         */
+        static void setDirectory(const std::string& dir);
+
+        /// @brief Returns the current cache directory (or an empty string if there is none).
+        static const std::string& getDirectory();
+
+        /**
+         * @brief Make the start of a key from the values of a GSParams.
+         *
+         * The info class should append its own parameters to the returned key.
+         */
+        static std::vector<double> makeKey(const GSParams& gsparams);
+
+        /**
+         * @brief Read the data saved for the given profile type and key.
+         *
+         * @param[in]  type  A name for the type of info, e.g. "Sersic".
+         * @param[in]  key   The values that determine the data (see makeKey()).
+         * @param[out] data  The saved data.
+         * @returns whether the data was found.
+         */
+        static bool read(const std::string& type, const std::vector<double>& key,
+                         std::vector<double>& data);
+
+        /**
+         * @brief Save the data for the given profile type and key.
+         *
+         * Does nothing if there is no cache directory.  Failure to write the file is silently
+         * ignored, since the cache is only an optimization.
+         *
+         * @param[in] type  A name for the type of info, e.g. "Sersic".
+         * @param[in] key   The values that determine the data (see makeKey()).
+         * @param[in] data  The data to save.
+         */
+        static void write(const std::string& type, const std::vector<double>& key,
+                          const std::vector<double>& data);
+
+    private:
+        static std::string fileName(const std::string& type, const std::vector<double>& key);
+        static std::string& directory();
+    };
+
+}
+
+#endif
@@ -103,6 +103,19 @@ namespace galsim {
          */
         virtual double xvalWrapped(double x, int N) const;
 
+        /**
+         * @brief Values of interpolant at a row of taps spaced by one pixel
+         *
+         * This sets w[j] = xval(x0+j) for 0 <= j < n, which is the set of weights needed to
+         * interpolate a row of samples.  Subclasses can calculate the whole row at once faster
+         * than with n separate calls to xval.
+         * @param[in] x0 Distance from the first sample (pixels)
+         * @param[in] n Number of taps
+         * @param[out] w Array of length n to receive the weights
+         */
+        virtual void xvalTaps(double x0, int n, double* w) const
+        { for (int j=0; j<n; ++j) w[j] = xval(x0+j); }
+
         /**
          * @brief Value of interpolant in frequency space
          * @param[in] u Frequency for evaluation (cycles per pixel)
@@ -270,6 +283,14 @@ namespace galsim {
          */
         double xval1d(double x) const { return _i1d->xval(x); }
 
+        /**
+         * @brief Access the 1d interpolant functions for more efficient 2d interps:
+         * @param[in] x0 1d argument of the first tap
+         * @param[in] n number of taps
+         * @param[out] w array of length n to receive xval1d(x0+j)
+         */
+        void xvalTaps1d(double x0, int n, double* w) const { _i1d->xvalTaps(x0,n,w); }
+
         /**
          * @brief Access the 1d interpolant functions for more efficient 2d interps:
          * @param[in] x 1d argument
@@ -506,6 +527,8 @@ namespace galsim {
             if (x>1.) return 0.;
             else return 1.-x;
         }
+        void xvalTaps(double x0, int n, double* w) const
+        { for (int j=0; j<n; ++j) w[j] = Linear::xval(x0+j); }
         double uval(double u) const { return std::pow(sinc(u),2.); }
         // Override the default numerical photon-shooting method
         double getPositiveFlux() const { return 1.; }
@@ -526,10 +549,10 @@ namespace galsim {
      * at high x.  Order n Lanczos has a range of +/- n pixels.  It typically is a good compromise
      * between kernel size and accuracy.
      *
-     * The filter has accuracy parameters `xvalue_accuracy` and `kvalue_accuracy` that relate to the
-     * accuracy of building the initial lookup table.  For now, these are fixed in
-     * src/Interpolant.cpp to be 0.1 times the input `tol` value, where `tol` is typically very
-     * small already (default 1e-4).
+     * The real-space values are calculated directly.  The Fourier transform is tabulated, with
+     * an accuracy parameter `kvalue_accuracy` that relates to the accuracy of building the lookup
+     * table.  For now, this is fixed in src/Interpolant.cpp to be 0.1 times the input `tol` value,
+     * where `tol` is typically very small already (default 1e-4).
      *
      * Note that pure Lanczos, when interpolating a set of constant-valued samples, does not return
      * this constant.  Setting fluxConserve in the constructor tweaks the function so that it 
@@ -556,6 +579,15 @@ namespace galsim {
         double xval(double x) const;
         double uval(double u) const;
 
+        /**
+         * @brief Values at a row of taps.
+         *
+         * The sin(pi x) and flux correction factors are the same for all taps up to a sign, and
+         * sin(pi x/n) steps by a fixed rotation, so the whole row only needs three trig calls,
+         * rather than two for each tap in xval.  The results agree with xval to rounding error.
+         */
+        void xvalTaps(double x0, int n, double* w) const;
+
     private:
         double _n; ///< Actually storing 2n, since it's used mostly this way.
         double _range; ///< Reduce range slightly from n so we're not using zero-valued endpoints.
@@ -563,14 +595,12 @@ namespace galsim {
         double _tolerance;  ///< k-space accuracy parameter
         double _uMax;  ///< truncation point for Fourier transform
         double _u1; ///< coefficient for flux correction
-        boost::shared_ptr<Table<double,double> > _xtab; ///< Table for x values
         boost::shared_ptr<Table<double,double> > _utab; ///< Table for Fourier transform
         double xCalc(double x) const;
         double uCalc(double u) const;
 
         // Store the tables in a map, so repeat constructions are quick.
         typedef std::pair<int,std::pair<bool,double> > KeyType;
-        static std::map<KeyType,boost::shared_ptr<Table<double,double> > > _cache_xtab; 
         static std::map<KeyType,boost::shared_ptr<Table<double,double> > > _cache_utab; 
         static std::map<KeyType,double> _cache_umax; 
     };
@@ -605,6 +635,8 @@ namespace galsim {
             if (x<1.) return 1. + x*x*(1.5*x-2.5);
             return 2. + x*(-4. + x*(2.5 - 0.5*x));
         }
+        void xvalTaps(double x0, int n, double* w) const
+        { for (int j=0; j<n; ++j) w[j] = Cubic::xval(x0+j); }
         double uval(double u) const 
         {
             u = std::abs(u);
@@ -661,6 +693,8 @@ namespace galsim {
             else 
                 return 0.;
         }
+        void xvalTaps(double x0, int n, double* w) const
+        { for (int j=0; j<n; ++j) w[j] = Quintic::xval(x0+j); }
         double uval(double u) const 
         {
             u = std::abs(u);
@@ -22,12 +22,24 @@
 #ifndef LRUCACHE_H
 #define LRUCACHE_H
 
+#include <cassert>
 #include <list>
 #include <map>
 
 namespace galsim {
 
 
+    /**
+     * @brief The usage statistics of an LRUCache.
+     */
+    struct LRUCacheStats
+    {
+        long nhits;     ///< Number of calls to get() that found the value in the cache.
+        long nmisses;   ///< Number of calls to get() that had to build a new value.
+        size_t size;    ///< Number of values currently in the cache.
+        size_t nmax;    ///< Maximum number of values to save in the cache.
+    };
+
     // Helper to build a Value from a Key
     // Normal case is that the Value take Key as a single parameter
     template <typename Value, typename Key>
@@ -79,8 +91,9 @@ namespace galsim {
          *
          * @param[in] nmax  How many values to save in the cache.
          */
-        LRUCache(size_t nmax) : _nmax(nmax) 
+        LRUCache(size_t nmax) : _nmax(nmax), _nhits(0), _nmisses(0)
         {
+            assert(_nmax > 0);
             //std::cout<<"New LRUCache "<<this<<" with nmax = "<<_nmax<<std::endl;
         }
 
@@ -97,6 +110,40 @@ namespace galsim {
         void clear() 
         { _cache.clear(); _entries.clear(); }
 
+        /**
+         * @brief Change the maximum number of values to save in the cache.
+         *
+         * If the cache currently holds more than nmax values, the least recently used ones
+         * are removed.
+         *
+         * @param[in] nmax  How many values to save in the cache.  (Must be > 0.)
+         */
+        void resize(size_t nmax)
+        {
+            assert(nmax > 0);
+            _nmax = nmax;
+            while (_entries.size() > _nmax) {
+                _cache.erase(_entries.back().first);
+                _entries.pop_back();
+            }
+            assert(_cache.size() == _entries.size());
+        }
+
+        /// @brief Return the number of hits and misses along with the current and maximum size.
+        LRUCacheStats getStats() const
+        {
+            LRUCacheStats stats;
+            stats.nhits = _nhits;
+            stats.nmisses = _nmisses;
+            stats.size = _entries.size();
+            stats.nmax = _nmax;
+            return stats;
+        }
+
+        /// @brief Reset the hit and miss counters to zero.
+        void resetStats() 
+        { _nhits = _nmisses = 0; }
+
         boost::shared_ptr<Value> get(const Key& key)
         {
             //std::cout<<"LRUCache "<<this<<": get Key "<<&key<<std::endl;
@@ -108,6 +155,7 @@ namespace galsim {
                 //std::cout<<"Found key in cache"<<std::endl;
                 //std::cout<<"value = "<<iter->second->second.get()<<std::endl;
                 // Item is cached.
+                ++_nhits;
                 // Move it to the front of the list.
                 if (iter != _cache.begin()) 
                     _entries.splice(_entries.begin(), _entries, iter->second);
@@ -118,6 +166,7 @@ namespace galsim {
             } else {
                 //std::cout<<"key not in cache yet"<<std::endl;
                 // Item is not cached.
+                ++_nmisses;
                 // Make a new one.
                 boost::shared_ptr<Value> value(LRUCacheHelper<Value,Key>::NewValue(key));
                 //std::cout<<"Made new value "<<value.get()<<std::endl;
@@ -145,6 +194,8 @@ namespace galsim {
     private:
 
         size_t _nmax;
+        long _nhits;
+        long _nmisses;
 
         typedef std::pair<Key, boost::shared_ptr<Value> > Entry;
         std::list<Entry> _entries;
@@ -128,6 +128,35 @@ namespace galsim {
             _isRadial(isRadial),
             _fluxIsReady(false) {}
 
+        /**
+         * @brief Construct an Interval that has already been split, from the values saved
+         *        by getData().
+         *
+         * @param[in] fluxDensity The function giving flux (= unnormalized probability) density.
+         * @param[in] data Pointer to the DATA_SIZE values written by getData().
+         * @param[in] isRadial Set true if this is an annulus on a plane, false for linear interval.
+         */
+        Interval(const FluxDensity& fluxDensity, const double* data, bool isRadial=false) :
+            _fluxDensityPtr(&fluxDensity),
+            _xLower(data[0]),
+            _xUpper(data[1]),
+            _isRadial(isRadial),
+            _fluxIsReady(true),
+            _flux(data[2]),
+            _useRejectionMethod(data[3] != 0.),
+            _invMaxAbsDensity(data[4]),
+            _invMeanAbsDensity(data[5]) {}
+
+        /// @brief The number of values written by getData().
+        static const int DATA_SIZE = 6;
+
+        /**
+         * @brief Append the values needed to reconstruct this Interval to data.
+         *
+         * This should only be called for an Interval returned by split().
+         */
+        void getData(std::vector<double>& data) const;
+
         /**
          * @brief Draw one photon position and flux from within this interval
          * @param[in] unitRandom An initial uniform deviate to select photon
@@ -243,6 +272,24 @@ namespace galsim {
         OneDimensionalDeviate(const FluxDensity& fluxDensity, std::vector<double>& range,
                               bool isRadial=false);
 
+        /**
+         * @brief Construct from the values saved by getData() for the same FluxDensity.
+         *
+         * This skips the integrals and interval splitting of the regular constructor, and 
+         * builds the identical sampler.
+         *
+         * @param[in] fluxDensity The FluxDensity being sampled.  No copy is made, original must 
+         *            stay in existence.
+         * @param[in] data The values written by getData().
+         * @param[in] isRadial Set true for an axisymmetric function on the plane; false (default) 
+         *            for linear domain.
+         */
+        OneDimensionalDeviate(const FluxDensity& fluxDensity, const std::vector<double>& data,
+                              bool isRadial=false);
+
+        /// @brief Append the values needed to reconstruct this sampler to data.
+        void getData(std::vector<double>& data) const;
+
         /// @brief Return total flux in positive regions of FluxDensity
         double getPositiveFlux() const {return _positiveFlux;}
 
@@ -29,6 +29,7 @@
 #include <cmath>
 #include <vector>
 #include <algorithm>
+#include <boost/shared_ptr.hpp>
 
 #include "Std.h"
 #include "Random.h"
@@ -63,6 +64,29 @@ namespace galsim {
          */
         PhotonArray(std::vector<double>& vx, std::vector<double>& vy, std::vector<double>& vflux);
 
+        /**
+         * @brief Make a new array of size N, reusing the storage of a previously released array
+         * if possible.
+         *
+         * Photon shooting makes many large, short-lived PhotonArrays (one per chunk of photons 
+         * and per component of a convolution).  Arrays made with this function are returned to 
+         * a small pool when the last shared_ptr to them goes away, so the next call can reuse 
+         * their memory rather than allocating it again.  (Arrays larger than the chunks that 
+         * drawShoot uses are not kept.)  Unlike the constructor, the photon values are not 
+         * initialized.
+         *
+         * @param[in] N Size of desired array.
+         * @returns A shared_ptr to the new array.
+         */
+        static boost::shared_ptr<PhotonArray> create(int N);
+
+        /**
+         * @brief Free the memory held by the pool of released arrays.
+         *
+         * This is available from Python as galsim.PhotonArray.clearPool().
+         */
+        static void clearPool();
+
         /**
          * @brief Accessor for array size
          *
@@ -120,6 +144,21 @@ namespace galsim {
          */
         double getFlux(int i) const { return _flux[i]; }
 
+        /**
+         * @brief Direct access to the arrays of x, y and flux values.
+         *
+         * These pointers are only valid until the size of the array is changed (e.g. by
+         * append() or reserve()).  They are 0 if the array is empty.
+         */
+        //@{
+        double* getXArray() { return _x.empty() ? 0 : &_x[0]; }
+        double* getYArray() { return _y.empty() ? 0 : &_y[0]; }
+        double* getFluxArray() { return _flux.empty() ? 0 : &_flux[0]; }
+        const double* getXArray() const { return _x.empty() ? 0 : &_x[0]; }
+        const double* getYArray() const { return _y.empty() ? 0 : &_y[0]; }
+        const double* getFluxArray() const { return _flux.empty() ? 0 : &_flux[0]; }
+        //@}
+
         /**
          * @brief Return sum of all photons' fluxes
          *
@@ -219,6 +258,10 @@ namespace galsim {
         std::vector<double> _y;      // Vector holding y coords of photons
         std::vector<double> _flux;   // Vector holding flux of photons
         bool _is_correlated;          // Are the photons correlated?
+
+        static std::vector<PhotonArray*>& getPool();
+        static void release(PhotonArray* pa);
+        friend struct PhotonArrayReleaser;
     };
 
 } // end namespace galsim
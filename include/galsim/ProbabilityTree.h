@@ -63,6 +63,8 @@ namespace galsim {
         using std::vector<FluxData>::insert;
         using std::vector<FluxData>::empty;
         using std::vector<FluxData>::clear;
+        using std::vector<FluxData>::reserve;
+        typedef typename std::vector<FluxData>::const_iterator const_iterator;
 
         /// @brief Constructor - nothing to do.
         ProbabilityTree() : _root(0) {}
@@ -97,14 +99,18 @@ namespace galsim {
         /** 
          * @brief Construct the tree from current vector elements.
          * @param[in] threshold that have flux <= this value are not included in the tree.
+         * @param[in] sorted    Set true if the elements are already in the order that a
+         *                      previous call to buildTree() put them in, in which case they
+         *                      are not sorted again.  (This guarantees the same tree, since the
+         *                      sort does not preserve the order of elements with equal flux.)
          */
-        void buildTree(double threshold=0.)
+        void buildTree(double threshold=0., bool sorted=false)
         {
             dbg<<"buildTree\n";
             assert(!empty());
             assert(!_root);
             // Sort the list so the largest flux regions are first.
-            std::sort(begin(), end(), FluxCompare());
+            if (!sorted) std::sort(begin(), end(), FluxCompare());
             VecIter last = 
                 threshold == 0. ? end() :
                 std::upper_bound(begin(), end(), threshold, FluxCompare());
@@ -26,6 +26,7 @@
  */
 
 #include "SBProfile.h"
+#include "LRUCache.h"
 
 namespace galsim {
 
@@ -67,6 +68,26 @@ namespace galsim {
         /// @brief Returns obscuration param of the SBAiry.
         double getObscuration() const;
 
+
+        /**
+         * @brief Set the maximum number of AiryInfo objects to save in the cache.
+         *
+         * The AiryInfo objects hold the tabulated quantities that are shared by all SBAiry
+         * profiles with the same parameters and GSParams.  The default cache size is 100.
+         *
+         * @param[in] nmax  How many AiryInfo objects to save.  (Must be >= 1.)
+         */
+        static void setCacheSize(int nmax);
+
+        /// @brief Remove all AiryInfo objects from the cache.
+        static void clearCache();
+
+        /// @brief Returns the hit and miss counts and the current and maximum cache size.
+        static LRUCacheStats getCacheStats();
+
+        /// @brief Reset the hit and miss counts of the AiryInfo cache to zero.
+        static void resetCacheStats();
+
     protected:
 
         class SBAiryImpl;
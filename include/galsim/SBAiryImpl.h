@@ -25,6 +25,7 @@
 #include "SBProfileImpl.h"
 #include "SBAiry.h"
 #include "LRUCache.h"
+#include "InfoDiskCache.h"
 
 namespace galsim {
 
@@ -265,6 +266,7 @@ namespace galsim {
 
         /// One static map of all `AiryInfo` structures for whole program.
         static LRUCache<std::pair<double,const GSParams*>, AiryInfo> cache;
+        friend class SBAiry;
     };
 }
 
@@ -66,6 +66,9 @@ namespace galsim {
 
         class SBBoxImpl;
 
+        // SBConvolve checks for an SBBox to do real-space convolutions with it more efficiently.
+        friend class SBConvolve;
+
     private:
         // op= is undefined
         void operator=(const SBBox& rhs);
@@ -67,6 +67,12 @@ namespace galsim {
      * the maxK for each component is quite large since the ringing dies off fairly slowly.  So it
      * can be quicker to use real-space convolution instead.
      *
+     * When the same profiles (e.g. a PSF and a pixel) are convolved with many different galaxies,
+     * the product of their k-space values can be cached between draws by putting them at the
+     * start of the list and setting `ncache` to their number.  The cache keeps the tables for the
+     * most recently used combinations of profiles and k grids, so it only helps if the very same
+     * SBProfile objects (or copies of them) are used each time.
+     *
      */
     class SBConvolve : public SBProfile 
     {
@@ -77,9 +83,12 @@ namespace galsim {
          * @param[in] slist       Input: list of SBProfiles.
          * @param[in] real_space  Do convolution in real space? (default `real_space = false`).
          * @param[in] gsparams    GSParams to use, if different from the default.
+         * @param[in] ncache      Number of profiles at the start of slist whose combined
+         *                        k-space values should be cached. (default `ncache = 0`).
          */
         SBConvolve(const std::list<SBProfile>& slist, bool real_space=false,
-                   boost::shared_ptr<GSParams> gsparams = boost::shared_ptr<GSParams>());
+                   boost::shared_ptr<GSParams> gsparams = boost::shared_ptr<GSParams>(),
+                   int ncache=0);
 
         /// @brief Copy constructor.
         SBConvolve(const SBConvolve& rhs);
@@ -87,6 +96,16 @@ namespace galsim {
         /// @brief Destructor.
         ~SBConvolve();
 
+        /**
+         * @brief Set the maximum number of k value tables to keep in the cache used with ncache.
+         *
+         * @param[in] nmax  How many tables to save.  (Must be >= 1.)
+         */
+        static void setCacheSize(int nmax);
+
+        /// @brief Remove all k value tables from the cache used with ncache.
+        static void clearCache();
+
     protected:
 
         class SBConvolveImpl;
@@ -27,12 +27,20 @@
 
 namespace galsim {
 
+    // Defined in RealSpaceConvolve.cpp
+    // Fill val with the convolution of p with a box of size xw x yw and surface brightness norm
+    // on the grid x = x0 + i dx, y = y0 + j dy.
+    void RealSpaceConvolveBox(
+        const SBProfile& p, double xw, double yw, double norm,
+        tmv::MatrixView<double> val, double x0, double dx, double y0, double dy,
+        double flux, const GSParams* gsparams);
+
     class SBConvolve::SBConvolveImpl: public SBProfileImpl
     {
     public:
 
         SBConvolveImpl(const std::list<SBProfile>& slist, bool real_space,
-                       boost::shared_ptr<GSParams> gsparams);
+                       boost::shared_ptr<GSParams> gsparams, int ncache);
         ~SBConvolveImpl() {}
 
         void add(const SBProfile& rhs); 
@@ -113,6 +121,12 @@ namespace galsim {
         boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
 
         // Overrides for better efficiency
+        void fillXValue(tmv::MatrixView<double> val,
+                        double x0, double dx, int ix_zero,
+                        double y0, double dy, int iy_zero) const;
+        void fillXValue(tmv::MatrixView<double> val,
+                        double x0, double dx, double dxy,
+                        double y0, double dy, double dyx) const;
         void fillKValue(tmv::MatrixView<std::complex<double> > val,
                         double x0, double dx, int ix_zero,
                         double y0, double dy, int iy_zero) const;
@@ -136,9 +150,46 @@ namespace galsim {
         double _sumMaxY; ///< sum of maxY() of the convolved SBProfiles.
         double _fluxProduct; ///< Flux of the product.
         bool _real_space; ///< Whether to do convolution as an integral in real space.
+        int _ncache; ///< Number of leading profiles in _plist whose k values are cached.
 
         void initialize();
 
+        /**
+         * @brief Check for a real-space convolution of two profiles, one of which is an SBBox.
+         *
+         * If so, returns the other profile and sets the width and surface brightness of the box.
+         * Otherwise returns 0.
+         */
+        const SBProfile* getBoxConvolvee(double& xw, double& yw, double& norm) const;
+
+        /// @brief The grid of k values requested by one of the fillKValue functions.
+        struct KGrid
+        {
+            bool general; ///< Whether the grid uses dxy, dyx (rather than ix_zero, iy_zero).
+            double x0, dx, dxy, y0, dy, dyx;
+            int ix_zero, iy_zero;
+            int m, n; ///< Size of the grid.
+
+            bool operator==(const KGrid& rhs) const;
+        };
+        struct KCacheEntry;
+        static std::list<KCacheEntry> kcache; ///< Most recently used entries are at the front.
+        static int max_kcache; ///< Maximum number of entries to keep in kcache.
+        friend class SBConvolve;
+
+        void fillKValue(tmv::MatrixView<std::complex<double> > val, const KGrid& grid) const;
+        void fillKValue(tmv::MatrixView<std::complex<double> > val, const KGrid& grid,
+                        const SBProfile& prof) const;
+
+        /**
+         * @brief Get the product of the k values of the first _ncache profiles on the given grid.
+         *
+         * The tables are kept in a cache of the most recently used ones, keyed by the profiles'
+         * implementations and the grid.
+         */
+        boost::shared_ptr<const tmv::Matrix<std::complex<double> > > getCachedKValues(
+            const KGrid& grid) const;
+
         // Copy constructor and op= are undefined.
         SBConvolveImpl(const SBConvolveImpl& rhs);
         void operator=(const SBConvolveImpl& rhs);
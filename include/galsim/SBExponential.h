@@ -26,6 +26,7 @@
  */
 
 #include "SBProfile.h"
+#include "LRUCache.h"
 
 namespace galsim {
 
@@ -59,6 +60,26 @@ namespace galsim {
         /// @brief Returns the scale radius of the Exponential profile.
         double getScaleRadius() const;
 
+
+        /**
+         * @brief Set the maximum number of ExponentialInfo objects to save in the cache.
+         *
+         * The ExponentialInfo objects hold the tabulated quantities that are shared by all SBExponential
+         * profiles with the same parameters and GSParams.  The default cache size is 100.
+         *
+         * @param[in] nmax  How many ExponentialInfo objects to save.  (Must be >= 1.)
+         */
+        static void setCacheSize(int nmax);
+
+        /// @brief Remove all ExponentialInfo objects from the cache.
+        static void clearCache();
+
+        /// @brief Returns the hit and miss counts and the current and maximum cache size.
+        static LRUCacheStats getCacheStats();
+
+        /// @brief Reset the hit and miss counts of the ExponentialInfo cache to zero.
+        static void resetCacheStats();
+
     protected:
 
         class SBExponentialImpl;
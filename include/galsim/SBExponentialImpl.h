@@ -161,6 +161,8 @@ namespace galsim {
         void operator=(const SBExponentialImpl& rhs);
 
         static LRUCache<const GSParams*, ExponentialInfo> cache;
+
+        friend class SBExponential;
     };
 
 }
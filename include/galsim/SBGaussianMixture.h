@@ -0,0 +1,91 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+#ifndef SBGAUSSIANMIXTURE_H
+#define SBGAUSSIANMIXTURE_H
+/** 
+ * @file SBGaussianMixture.h @brief SBProfile that implements a sum of many elliptical Gaussians.
+ */
+
+#include <vector>
+#include "SBProfile.h"
+
+namespace galsim {
+
+    /**
+     * @brief Gaussian Mixture Surface Brightness Profile
+     *
+     * The sum of N elliptical Gaussians, each characterized by its flux, its center (x0, y0)
+     * and its covariance matrix [[cxx, cxy], [cxy, cyy]], so that component i has the surface
+     * brightness
+     *
+     *     flux_i / (2 pi sqrt(det C_i)) exp[-0.5 (r - r0_i)^T C_i^-1 (r - r0_i)].
+     *
+     * This is equivalent to an SBAdd of N sheared and shifted SBGaussians, but the components
+     * are held in flat arrays and evaluated together in a single pass over the image, without
+     * the per-component SBTransform and SBAdd overhead.  Component fluxes may be negative.
+     *
+     * The maxK() and stepK() are chosen so that every component individually satisfies the
+     * same criteria used by SBGaussian.
+     */
+    class SBGaussianMixture : public SBProfile 
+    {
+    public:
+        /** 
+         * @brief Constructor.
+         *
+         * All of the input vectors must have the same length, which is the number of components.
+         * Each covariance matrix must be positive definite.
+         *
+         * @param[in] flux   fluxes of the components.
+         * @param[in] x0     x coordinates of the component centers.
+         * @param[in] y0     y coordinates of the component centers.
+         * @param[in] cxx    xx elements of the component covariance matrices.
+         * @param[in] cxy    xy elements of the component covariance matrices.
+         * @param[in] cyy    yy elements of the component covariance matrices.
+         */
+        SBGaussianMixture(const std::vector<double>& flux,
+                          const std::vector<double>& x0, const std::vector<double>& y0,
+                          const std::vector<double>& cxx, const std::vector<double>& cxy,
+                          const std::vector<double>& cyy,
+                          boost::shared_ptr<GSParams> gsparams = boost::shared_ptr<GSParams>());
+
+        /// @brief Copy constructor.
+        SBGaussianMixture(const SBGaussianMixture& rhs);
+
+        /// @brief Destructor.
+        ~SBGaussianMixture();
+
+        /// @brief Returns the number of Gaussian components.
+        int getNComponents() const;
+
+    protected:
+
+        class SBGaussianMixtureImpl;
+
+    private:
+        // op= is undefined
+        void operator=(const SBGaussianMixture& rhs);
+    };
+
+}
+
+#endif // SBGAUSSIANMIXTURE_H
@@ -0,0 +1,121 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+#ifndef SBGAUSSIANMIXTURE_IMPL_H
+#define SBGAUSSIANMIXTURE_IMPL_H
+
+#include "SBProfileImpl.h"
+#include "SBGaussianMixture.h"
+
+namespace galsim {
+
+    class SBGaussianMixture::SBGaussianMixtureImpl : public SBProfileImpl
+    {
+    public:
+        SBGaussianMixtureImpl(const std::vector<double>& flux,
+                              const std::vector<double>& x0, const std::vector<double>& y0,
+                              const std::vector<double>& cxx, const std::vector<double>& cxy,
+                              const std::vector<double>& cyy,
+                              boost::shared_ptr<GSParams> gsparams);
+
+        ~SBGaussianMixtureImpl() {}
+
+        double xValue(const Position<double>& p) const;
+        std::complex<double> kValue(const Position<double>& k) const;
+
+        bool isAxisymmetric() const { return _axisymmetric; } 
+        bool hasHardEdges() const { return false; }
+        bool isAnalyticX() const { return true; }
+        bool isAnalyticK() const { return true; }
+
+        double maxK() const { return _maxk; }
+        double stepK() const { return _stepk; }
+
+        Position<double> centroid() const;
+
+        double getFlux() const { return _flux; }
+        double getPositiveFlux() const { return _pos_flux; }
+        double getNegativeFlux() const { return _neg_flux; }
+
+        /**
+         * @brief Shoot photons through this SBGaussianMixture.
+         *
+         * Each photon first picks a component with probability proportional to the absolute
+         * value of its flux, using a binary search of the cumulative flux array.  Its position
+         * is then drawn from that component's Gaussian using the Cholesky factor of the
+         * covariance matrix applied to a pair of unit normal deviates.  Photons from negative
+         * components carry negative flux.
+         *
+         * @param[in] N Total number of photons to produce.
+         * @param[in] ud UniformDeviate that will be used to draw photons from distribution.
+         * @returns PhotonArray containing all the photons' info.
+         */
+        boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const;
+
+        int getNComponents() const { return int(_flux_i.size()); }
+
+        // Overrides for better efficiency
+        void fillXValue(tmv::MatrixView<double> val,
+                        double x0, double dx, int ix_zero,
+                        double y0, double dy, int iy_zero) const;
+        void fillXValue(tmv::MatrixView<double> val,
+                        double x0, double dx, double dxy,
+                        double y0, double dy, double dyx) const;
+        void fillKValue(tmv::MatrixView<std::complex<double> > val,
+                        double x0, double dx, int ix_zero,
+                        double y0, double dy, int iy_zero) const;
+        void fillKValue(tmv::MatrixView<std::complex<double> > val,
+                        double x0, double dx, double dxy,
+                        double y0, double dy, double dyx) const;
+
+    private:
+        double _flux; ///< Total flux of the Surface Brightness Profile.
+        double _pos_flux; ///< Sum of the positive component fluxes.
+        double _neg_flux; ///< Minus the sum of the negative component fluxes.
+        double _maxk;
+        double _stepk;
+        bool _axisymmetric;
+        double _qmax_x; ///< If Q > _qmax_x, a component's xValue is set to 0
+        double _qmax_k; ///< If Q > _qmax_k, a component's kValue is set to 0
+
+        // Per-component values, one entry per Gaussian.
+        std::vector<double> _flux_i; ///< Flux of each component
+        std::vector<double> _x0; ///< Center of each component
+        std::vector<double> _y0;
+        std::vector<double> _cxx; ///< Covariance matrix of each component
+        std::vector<double> _cxy;
+        std::vector<double> _cyy;
+        std::vector<double> _ixx; ///< Inverse covariance matrix of each component
+        std::vector<double> _ixy;
+        std::vector<double> _iyy;
+        std::vector<double> _norm; ///< flux / (2pi sqrt(det C)), the peak surface brightness
+        std::vector<double> _l11; ///< Cholesky factor of each covariance matrix
+        std::vector<double> _l21;
+        std::vector<double> _l22;
+        std::vector<double> _cum_flux; ///< Cumulative sum of |flux_i| for photon shooting
+
+        // Copy constructor and op= are undefined.
+        SBGaussianMixtureImpl(const SBGaussianMixtureImpl& rhs);
+        void operator=(const SBGaussianMixtureImpl& rhs);
+    };
+}
+
+#endif // SBGAUSSIANMIXTURE_IMPL_H
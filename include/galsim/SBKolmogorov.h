@@ -26,6 +26,7 @@
  */
 
 #include "SBProfile.h"
+#include "LRUCache.h"
 
 namespace galsim {
 
@@ -61,6 +62,26 @@ namespace galsim {
         /// @brief Returns lam_over_r0 param of the SBKolmogorov.
         double getLamOverR0() const;
 
+
+        /**
+         * @brief Set the maximum number of KolmogorovInfo objects to save in the cache.
+         *
+         * The KolmogorovInfo objects hold the tabulated quantities that are shared by all SBKolmogorov
+         * profiles with the same parameters and GSParams.  The default cache size is 100.
+         *
+         * @param[in] nmax  How many KolmogorovInfo objects to save.  (Must be >= 1.)
+         */
+        static void setCacheSize(int nmax);
+
+        /// @brief Remove all KolmogorovInfo objects from the cache.
+        static void clearCache();
+
+        /// @brief Returns the hit and miss counts and the current and maximum cache size.
+        static LRUCacheStats getCacheStats();
+
+        /// @brief Reset the hit and miss counts of the KolmogorovInfo cache to zero.
+        static void resetCacheStats();
+
     protected:
         class SBKolmogorovImpl;
 
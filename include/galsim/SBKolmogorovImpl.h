@@ -25,6 +25,7 @@
 #include "SBProfileImpl.h"
 #include "SBKolmogorov.h"
 #include "LRUCache.h"
+#include "InfoDiskCache.h"
 
 namespace galsim {
 
@@ -89,6 +90,11 @@ namespace galsim {
 
         ///< Class that can sample radial distribution
         boost::shared_ptr<OneDimensionalDeviate> _sampler; 
+
+        /// Save the calculated values, table and sampler into data (for InfoDiskCache).
+        void getData(std::vector<double>& data) const;
+        /// Set the calculated values, table and sampler from data.  Returns false if invalid.
+        bool setData(const std::vector<double>& data);
     };
 
     class SBKolmogorov::SBKolmogorovImpl : public SBProfileImpl 
@@ -157,6 +163,8 @@ namespace galsim {
         void operator=(const SBKolmogorovImpl& rhs);
 
         static LRUCache<const GSParams*, KolmogorovInfo> cache;
+
+        friend class SBKolmogorov;
     };
 
 }
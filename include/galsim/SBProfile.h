@@ -135,6 +135,43 @@ namespace galsim {
             integration_abserr(1.e-7)
             {}
 
+        /**
+         * @brief GSParams are compared by value.
+         *
+         * operator< gives a strict weak ordering, so GSParams may be used as the key of a 
+         * std::map.
+         */
+        bool operator==(const GSParams& rhs) const
+        { return !(*this < rhs) && !(rhs < *this); }
+
+        bool operator!=(const GSParams& rhs) const
+        { return !(*this == rhs); }
+
+        bool operator<(const GSParams& rhs) const
+        {
+            if (minimum_fft_size != rhs.minimum_fft_size) 
+                return minimum_fft_size < rhs.minimum_fft_size;
+            if (maximum_fft_size != rhs.maximum_fft_size) 
+                return maximum_fft_size < rhs.maximum_fft_size;
+            if (alias_threshold != rhs.alias_threshold) 
+                return alias_threshold < rhs.alias_threshold;
+            if (maxk_threshold != rhs.maxk_threshold) 
+                return maxk_threshold < rhs.maxk_threshold;
+            if (kvalue_accuracy != rhs.kvalue_accuracy) 
+                return kvalue_accuracy < rhs.kvalue_accuracy;
+            if (xvalue_accuracy != rhs.xvalue_accuracy) 
+                return xvalue_accuracy < rhs.xvalue_accuracy;
+            if (shoot_accuracy != rhs.shoot_accuracy) 
+                return shoot_accuracy < rhs.shoot_accuracy;
+            if (realspace_relerr != rhs.realspace_relerr) 
+                return realspace_relerr < rhs.realspace_relerr;
+            if (realspace_abserr != rhs.realspace_abserr) 
+                return realspace_abserr < rhs.realspace_abserr;
+            if (integration_relerr != rhs.integration_relerr) 
+                return integration_relerr < rhs.integration_relerr;
+            return integration_abserr < rhs.integration_abserr;
+        }
+
         // These are all public.  So you access them just as member values.
         int minimum_fft_size;
         int maximum_fft_size;
@@ -511,6 +548,16 @@ namespace galsim {
          *                         (default `poisson_flux = true`).
          * @param[in] add_to_image Whether to add flux to the existing image rather than draw
          *                         an image from scratch.  (default `add_to_image = false`).
+         * @param[in] nthreads The number of threads to use for shooting the photons.  Each 
+         *                     thread gets its own UniformDeviate, seeded from `ud`, and its own
+         *                     image, and these images are added to `image` in order at the 
+         *                     end.  So the result is reproducible for a given seed of `ud` and
+         *                     value of `nthreads`, and does not depend on whether GalSim was 
+         *                     compiled with OpenMP (without it, the threads' photons are just
+         *                     shot one after another).  `nthreads <= 0` means to use the 
+         *                     OpenMP default number of threads.  When max_extra_noise > 0, 
+         *                     the first photons, which are used to decide how many photons 
+         *                     to shoot, are shot serially.  (default `nthreads = 1`)
          * @returns The total flux of photons the landed inside the image bounds.
          *
          * Note: N is input as a double so that very large values of N don't have to
@@ -520,7 +567,8 @@ namespace galsim {
         template <typename T>
         double drawShoot(
             ImageView<T> image, double N, UniformDeviate ud, double gain=1.,
-            double max_extra_noise=0., bool poisson_flux=true, bool add_to_image=false) const;
+            double max_extra_noise=0., bool poisson_flux=true, bool add_to_image=false,
+            int nthreads=1) const;
 
 
         /** 
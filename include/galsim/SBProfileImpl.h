@@ -134,6 +134,13 @@ namespace galsim {
 
         // Default GSParams to use when input is None
         static boost::shared_ptr<GSParams> default_gsparams;
+
+        // Return the unique GSParams object with the same values as the input (or the default
+        // GSParams if gsparams is null).  Equal GSParams are thus always the same object, 
+        // which lets the info caches of e.g. SBSersic, which are keyed on the GSParams pointer,
+        // be shared by all profiles built with equal GSParams.
+        static boost::shared_ptr<GSParams> internGSParams(
+            const boost::shared_ptr<GSParams>& gsparams);
     };
 
 }
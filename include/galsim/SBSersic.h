@@ -26,6 +26,7 @@
  */
 
 #include "SBProfile.h"
+#include "LRUCache.h"
 
 namespace galsim {
 
@@ -90,6 +91,45 @@ namespace galsim {
         /// @brief Returns the half light radius of the Sersic profile.
         double getHalfLightRadius() const;
 
+
+        /**
+         * @brief Set the maximum number of SersicInfo objects to save in the cache.
+         *
+         * The SersicInfo objects hold the tabulated quantities that are shared by all SBSersic
+         * profiles with the same parameters and GSParams.  The default cache size is 100.
+         *
+         * @param[in] nmax  How many SersicInfo objects to save.  (Must be >= 1.)
+         */
+        static void setCacheSize(int nmax);
+
+        /// @brief Remove all SersicInfo objects from the cache.
+        static void clearCache();
+
+        /// @brief Returns the hit and miss counts and the current and maximum cache size.
+        static LRUCacheStats getCacheStats();
+
+        /// @brief Reset the hit and miss counts of the SersicInfo cache to zero.
+        static void resetCacheStats();
+
+        /**
+         * @brief Turn on or off interpolation in the Sersic index n.
+         *
+         * Normally each distinct value of n needs its own SersicInfo, which is expensive to 
+         * calculate.  With interpolation on, SersicInfos are only calculated on a grid of 
+         * n values, and profiles with other values of n use a linear interpolation between 
+         * the two nearest grid values.  The grid starts with a spacing of 0.1, and each grid
+         * cell is subdivided (down to a spacing of 0.1/64) until interpolating to the middle
+         * of the cell has errors less than kvalue_accuracy in k space and 
+         * xvalue_accuracy (relative to the central value) in real space.  
+         * Profiles created after this call use the new setting.  (Default is false.)
+         *
+         * @param[in] interpolate  Whether to interpolate in n.
+         */
+        static void setNInterpolation(bool interpolate);
+
+        /// @brief Returns whether interpolation in n is on.
+        static bool getNInterpolation();
+
     protected:
 
         class SBSersicImpl;
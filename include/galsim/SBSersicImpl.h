@@ -25,6 +25,7 @@
 #include "SBProfileImpl.h"
 #include "SBSersic.h"
 #include "LRUCache.h"
+#include "InfoDiskCache.h"
 
 namespace galsim {
 
@@ -92,6 +93,21 @@ namespace galsim {
         /// @brief Constructor takes SersicKey, which is really (n,maxRre,flux_untruncated)
         SersicInfo(const SersicKey& key, const GSParams* gsparams);
 
+        /**
+         * @brief Constructor for an info that interpolates between two others in n.
+         *
+         * The profile is the linear combination of the two profiles, weighted by the distance
+         * of n from each of their indices.  This is used by the n interpolation mode of 
+         * SBSersic (see SBSersic::setNInterpolation).
+         *
+         * @param[in] info1  The info for an index n1 <= n.  (Must have the same maxRre and 
+         *                   flux_untruncated as info2.)
+         * @param[in] info2  The info for an index n2 > n.
+         * @param[in] n      The Sersic index to approximate.
+         */
+        SersicInfo(boost::shared_ptr<SersicInfo> info1, boost::shared_ptr<SersicInfo> info2,
+                   double n);
+
         /// @brief Destructor: deletes photon-shooting classes if necessary
         ~SersicInfo() {}
 
@@ -110,6 +126,9 @@ namespace galsim {
         double maxK() const { return _maxK; }
         double stepK() const { return _stepK; }
 
+        /// @brief Returns the Sersic index `n`.
+        double getN() const { return _n; }
+
         double getKsqMax() const { return _ksq_max; }
 
         /// @brief Returns the maximum relevant R, in units of half-light radius `re`.
@@ -169,7 +188,17 @@ namespace galsim {
         /// Class that does numerical photon shooting
         boost::shared_ptr<OneDimensionalDeviate> _sampler;   
 
+        /// For an interpolated info, the two infos to interpolate between (otherwise null).
+        boost::shared_ptr<SersicInfo> _info1;
+        boost::shared_ptr<SersicInfo> _info2;
+        double _w; ///< The weight of _info2 in the interpolation.
+
         double findMaxRre(double missing_flux_fraction, double gamma2n);
+
+        /// Save the calculated values, table and sampler into data (for InfoDiskCache).
+        void getData(std::vector<double>& data) const;
+        /// Set the calculated values, table and sampler from data.  Returns false if invalid.
+        bool setData(const std::vector<double>& data);
     };
 
     class SBSersic::SBSersicImpl : public SBProfileImpl
@@ -266,6 +295,19 @@ namespace galsim {
         void operator=(const SBSersicImpl& rhs);
 
         static LRUCache<std::pair<SersicKey, const GSParams*>, SersicInfo> cache;
+
+        /// Whether to interpolate in n between infos on a grid.  (See SBSersic::setNInterpolation.)
+        static bool interpolate_n;
+
+        /// Return the info to use for these parameters, interpolated if interpolate_n is true.
+        static boost::shared_ptr<SersicInfo> getInfo(
+            double n, double maxRre, bool flux_untruncated, const GSParams* gsparams);
+
+        /// Return whether interpolating across the given grid cell is accurate enough.
+        static bool checkCell(double n1, double n2, double maxRre, bool flux_untruncated,
+                              const GSParams* gsparams);
+
+        friend class SBSersic;
     };
 }
 
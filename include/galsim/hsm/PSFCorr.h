@@ -34,6 +34,7 @@
 
 /* object data type */
 
+#include <vector>
 #include "../CppShear.h"
 #include "../Image.h"
 #include "../Bounds.h"
@@ -376,15 +377,85 @@ namespace hsm {
      * @param[in] guess_y_centroid  Optional argument with an initial guess for the y centroid of
      *                              the galaxy; if not set, then the code will try the center of the
      *                              image.
+     * @param[in] guess_e1          Optional argument with an initial guess for the e1 distortion
+     *                              of the object, default 0.  Together with guess_sig and the
+     *                              centroid guesses, this allows the iteration to be started from
+     *                              the result of a previous measurement of a similar object.
+     * @param[in] guess_e2          Optional argument with an initial guess for the e2 distortion
+     *                              of the object, default 0.
      * @return A CppShapeData object containing the results of moment measurement.
      */
     template <typename T>
         CppShapeData FindAdaptiveMomView(
             const ImageView<T> &object_image, const ImageView<int> &object_mask_image,
             double guess_sig = 5.0, double precision = 1.0e-6, double guess_x_centroid = -1000.0,
-            double guess_y_centroid = -1000.0,
+            double guess_y_centroid = -1000.0, double guess_e1 = 0., double guess_e2 = 0.,
             boost::shared_ptr<HSMParams> hsmparams = boost::shared_ptr<HSMParams>());
 
+    /**
+     * @brief Measure the adaptive moments of many objects, each in a stamp of a larger image.
+     *
+     * This calls FindAdaptiveMomView for the sub-image of object_image (and object_mask_image)
+     * in each of the given stamps, using the center of each stamp as the initial guess for the
+     * centroid.  A failed measurement does not throw an exception.  Rather, the corresponding
+     * entry in results is a default CppShapeData with the error_message set.
+     *
+     * The stamps are measured in parallel using nthreads threads if GalSim was compiled with
+     * OpenMP.  nthreads <= 0 means to use the number of available cores.
+     *
+     * @param[in] object_image      The ImageView containing all the objects being measured.
+     * @param[in] object_mask_image The ImageView for the mask image to be applied to the objects
+     *                              (integer array, 1=use pixel and 0=do not use pixel).
+     * @param[in] stamps            The bounds of the stamp for each object.
+     * @param[out] results          The results for each stamp.
+     * @param[in] guess_sig         Optional argument with an initial guess for the Gaussian sigma
+     *                              of the objects, default 5.0 (pixels).
+     * @param[in] precision         The convergence criterion for the moments; default 1e-6.
+     * @param[in] nthreads          The number of threads to use; default 1.
+     */
+    template <typename T>
+        void FindAdaptiveMomBatch(
+            const ImageView<T> &object_image, const ImageView<int> &object_mask_image,
+            const std::vector<Bounds<int> >& stamps, std::vector<CppShapeData>& results,
+            double guess_sig = 5.0, double precision = 1.0e-6,
+            boost::shared_ptr<HSMParams> hsmparams = boost::shared_ptr<HSMParams>(),
+            int nthreads = 1);
+
+    /**
+     * @brief Carry out PSF correction for many galaxies, each in a stamp of a larger image.
+     *
+     * This calls EstimateShearView for the sub-image of gal_image (and gal_mask_image) in each
+     * of gal_stamps, along with the sub-image of PSF_image in the corresponding entry of
+     * PSF_stamps.  A failed measurement does not throw an exception.  Rather, the corresponding
+     * entry in results is a default CppShapeData with the error_message set.
+     *
+     * The stamps are measured in parallel using nthreads threads if GalSim was compiled with
+     * OpenMP.  nthreads <= 0 means to use the number of available cores.
+     *
+     * See EstimateShearView for the meaning of the other parameters.
+     *
+     * @param[in] gal_image        The ImageView containing all the galaxies being measured.
+     * @param[in] PSF_image        The ImageView containing the PSF images.
+     * @param[in] gal_mask_image   The ImageView for the mask image to be applied to the galaxies
+     *                             (integer array, 1=use pixel and 0=do not use pixel).
+     * @param[in] gal_stamps       The bounds of the stamp for each galaxy.
+     * @param[in] PSF_stamps       The bounds of the PSF stamp to use for each galaxy.  This must
+     *                             be the same length as gal_stamps.
+     * @param[out] results         The results for each stamp.
+     * @param[in] nthreads         The number of threads to use; default 1.
+     */
+    template <typename T, typename U>
+        void EstimateShearBatch(
+            const ImageView<T> &gal_image, const ImageView<U> &PSF_image,
+            const ImageView<int> &gal_mask_image,
+            const std::vector<Bounds<int> >& gal_stamps,
+            const std::vector<Bounds<int> >& PSF_stamps, std::vector<CppShapeData>& results,
+            float sky_var = 0.0, const char *shear_est = "REGAUSS",
+            const std::string& recompute_flux = "FIT",
+            double guess_sig_gal = 5.0, double guess_sig_PSF = 3.0, double precision = 1.0e-6,
+            boost::shared_ptr<HSMParams> hsmparams = boost::shared_ptr<HSMParams>(),
+            int nthreads = 1);
+
     /**
      * @brief Carry out PSF correction.
      *
@@ -19,6 +19,7 @@
  * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
  */
 #include "boost/python.hpp"
+#include "NumpyHelper.h"
 #include "hsm/PSFCorr.h"
 
 namespace bp = boost::python;
@@ -139,19 +140,127 @@ struct PyHSMParams {
     }
 };
 
+// Release the GIL for the lifetime of this object.  Used while the batch functions run, since
+// they don't touch any Python objects.
+class ReleaseGIL
+{
+public:
+    ReleaseGIL() : _state(PyEval_SaveThread()) {}
+    ~ReleaseGIL() { PyEval_RestoreThread(_state); }
+private:
+    PyThreadState* _state;
+};
+
+// The number of columns in the array returned by the batch functions.  The python layer
+// (galsim/hsm.py) turns these into a structured array, so the order must match _batch_dtype
+// there.
+static const int NBATCHCOLS = 17;
+
 struct PyCppShapeData {
 
+    // Convert an (n,4) int32 array of (xmin, xmax, ymin, ymax) to a vector of Bounds.
+    static std::vector<Bounds<int> > MakeStamps(const bp::object& array)
+    {
+        int32_t* data = 0;
+        boost::shared_ptr<int32_t> owner;
+        int stride = 0;
+        CheckNumpyArray(array, 2, true, data, owner, stride);
+        if (GetNumpyArrayDim(array.ptr(), 1) != 4) {
+            PyErr_SetString(PyExc_ValueError, "stamp bounds array must have shape (n,4)");
+            bp::throw_error_already_set();
+        }
+        int n = GetNumpyArrayDim(array.ptr(), 0);
+        std::vector<Bounds<int> > stamps(n);
+        for (int i=0; i<n; ++i) {
+            const int32_t* row = data + i*stride;
+            stamps[i] = Bounds<int>(row[0], row[1], row[2], row[3]);
+        }
+        return stamps;
+    }
+
+    struct ArrayDeleter
+    {
+        void operator()(double* p) const { delete [] p; }
+    };
+
+    // Pack the results of a batch measurement into an (n,NBATCHCOLS) numpy array.
+    static bp::object MakeResultArray(const std::vector<CppShapeData>& results)
+    {
+        int n = results.size();
+        boost::shared_ptr<double> owner(new double[n*NBATCHCOLS], ArrayDeleter());
+        double* row = owner.get();
+        for (int i=0; i<n; ++i, row+=NBATCHCOLS) {
+            const CppShapeData& res = results[i];
+            row[0] = res.moments_status;
+            row[1] = res.observed_shape.getE1();
+            row[2] = res.observed_shape.getE2();
+            row[3] = res.moments_sigma;
+            row[4] = res.moments_amp;
+            row[5] = res.moments_centroid.x;
+            row[6] = res.moments_centroid.y;
+            row[7] = res.moments_rho4;
+            row[8] = res.moments_n_iter;
+            row[9] = res.correction_status;
+            row[10] = res.corrected_e1;
+            row[11] = res.corrected_e2;
+            row[12] = res.corrected_g1;
+            row[13] = res.corrected_g2;
+            row[14] = res.corrected_shape_err;
+            row[15] = res.resolution_factor;
+            row[16] = res.error_message.empty() ? 0. : 1.;
+        }
+        return MakeNumpyArray(owner.get(), n, NBATCHCOLS, NBATCHCOLS, false, owner);
+    }
+
+    template <typename U>
+    static bp::object FindAdaptiveMomBatch(
+        const ImageView<U>& object_image, const ImageView<int>& object_mask_image,
+        const bp::object& stamp_array, double guess_sig, double precision,
+        boost::shared_ptr<HSMParams> hsmparams, int nthreads)
+    {
+        std::vector<Bounds<int> > stamps = MakeStamps(stamp_array);
+        std::vector<CppShapeData> results;
+        {
+            ReleaseGIL release;
+            hsm::FindAdaptiveMomBatch(object_image, object_mask_image, stamps, results,
+                                      guess_sig, precision, hsmparams, nthreads);
+        }
+        return MakeResultArray(results);
+    }
+
+    template <typename U, typename V>
+    static bp::object EstimateShearBatch(
+        const ImageView<U>& gal_image, const ImageView<V>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const bp::object& gal_stamp_array, const bp::object& PSF_stamp_array,
+        float sky_var, const std::string& shear_est, const std::string& recompute_flux,
+        double guess_sig_gal, double guess_sig_PSF, double precision,
+        boost::shared_ptr<HSMParams> hsmparams, int nthreads)
+    {
+        std::vector<Bounds<int> > gal_stamps = MakeStamps(gal_stamp_array);
+        std::vector<Bounds<int> > PSF_stamps = MakeStamps(PSF_stamp_array);
+        std::vector<CppShapeData> results;
+        {
+            ReleaseGIL release;
+            hsm::EstimateShearBatch(gal_image, PSF_image, gal_mask_image, gal_stamps, PSF_stamps,
+                                    results, sky_var, shear_est.c_str(), recompute_flux,
+                                    guess_sig_gal, guess_sig_PSF, precision, hsmparams,
+                                    nthreads);
+        }
+        return MakeResultArray(results);
+    }
+
     template <typename U, typename V>
     static void wrapTemplates() {
         typedef CppShapeData (*FAM_func)(const ImageView<U> &, const ImageView<int> &, 
-                                         double, double, double, double,
+                                         double, double, double, double, double, double,
                                          boost::shared_ptr<HSMParams>);
         bp::def("_FindAdaptiveMomView",
                 FAM_func(&FindAdaptiveMomView),
                 (bp::arg("object_image"), bp::arg("object_mask_image"), bp::arg("guess_sig")=5.0, 
                  bp::arg("precision")=1.0e-6, bp::arg("guess_x_centroid")=-1000.0, 
-                 bp::arg("guess_y_centroid")=-1000.0,
-                 bp::arg("hsmparams")=bp::object()),
+                 bp::arg("guess_y_centroid")=-1000.0, bp::arg("guess_e1")=0.,
+                 bp::arg("guess_e2")=0., bp::arg("hsmparams")=bp::object()),
                 "Find adaptive moments of an image (with some optional args).");
 
         typedef CppShapeData (*ESH_func)(const ImageView<U> &, const ImageView<V> &, 
@@ -167,8 +276,29 @@ struct PyCppShapeData {
                  bp::arg("precision")=1.0e-6, bp::arg("guess_x_centroid")=-1000.0,
                  bp::arg("guess_y_centroid")=-1000.0, bp::arg("hsmparams")=bp::object()),
                 "Estimate PSF-corrected shear for a galaxy, given a PSF (and some optional args).");
+
+        bp::def("_EstimateShearBatch",
+                &EstimateShearBatch<U,V>,
+                (bp::arg("gal_image"), bp::arg("PSF_image"), bp::arg("gal_mask_image"),
+                 bp::arg("gal_stamps"), bp::arg("PSF_stamps"),
+                 bp::arg("sky_var")=0.0, bp::arg("shear_est")="REGAUSS",
+                 bp::arg("recompute_flux")="FIT",
+                 bp::arg("guess_sig_gal")=5.0, bp::arg("guess_sig_PSF")=3.0,
+                 bp::arg("precision")=1.0e-6, bp::arg("hsmparams")=bp::object(),
+                 bp::arg("nthreads")=1),
+                "Estimate PSF-corrected shears for many galaxies in stamps of a larger image.");
     };
 
+    template <typename U>
+    static void wrapBatchTemplates() {
+        bp::def("_FindAdaptiveMomBatch",
+                &FindAdaptiveMomBatch<U>,
+                (bp::arg("object_image"), bp::arg("object_mask_image"), bp::arg("stamps"),
+                 bp::arg("guess_sig")=5.0, bp::arg("precision")=1.0e-6,
+                 bp::arg("hsmparams")=bp::object(), bp::arg("nthreads")=1),
+                "Find adaptive moments of many objects in stamps of a larger image.");
+    }
+
     static void wrap() {
         static char const * doc = 
             "CppShapeData object represents information from the HSM moments and PSF-correction\n"
@@ -201,6 +331,9 @@ struct PyCppShapeData {
         wrapTemplates<double, float>();
         wrapTemplates<float, double>();
         wrapTemplates<int, int>();
+        wrapBatchTemplates<float>();
+        wrapBatchTemplates<double>();
+        wrapBatchTemplates<int>();
     }
 };
 
@@ -21,6 +21,9 @@
 #include "boost/python.hpp"
 #include "boost/python/stl_iterator.hpp"
 
+#include <map>
+
+#include "NumpyHelper.h"
 #include "PhotonArray.h"
 
 namespace bp = boost::python;
@@ -30,28 +33,125 @@ namespace galsim {
     struct PyPhotonArray 
     {
 
-        static PhotonArray * construct(bp::object const & vx, bp::object const & vy,
-                                       bp::object const & vflux) {
-            Py_ssize_t size = bp::len(vx);
-            if (size != bp::len(vx)) {
+        // Convert any sequence to a contiguous 1-d array of doubles and return its data.
+        static const double* GetDoubleData(bp::object& array, const char* name)
+        {
+            array = bp::import("numpy").attr("ascontiguousarray")(array, "float64");
+            if (GetNumpyArrayNDim(array.ptr()) != 1) {
+                std::string msg = std::string(name) + " must be 1-d";
+                PyErr_SetString(PyExc_ValueError, msg.c_str());
+                bp::throw_error_already_set();
+            }
+            return GetNumpyArrayData<double>(array.ptr());
+        }
+
+        static PhotonArray * construct(bp::object vx, bp::object vy, bp::object vflux) 
+        {
+            const double* x = GetDoubleData(vx, "vx");
+            const double* y = GetDoubleData(vy, "vy");
+            const double* flux = GetDoubleData(vflux, "vflux");
+            int size = GetNumpyArrayDim(vx.ptr(), 0);
+            if (size != GetNumpyArrayDim(vy.ptr(), 0)) {
                 PyErr_SetString(PyExc_ValueError,
                                 "Length of vx array does not match  length of vy array");
                 bp::throw_error_already_set();
             }
-            if (size != bp::len(vflux)) {
+            if (size != GetNumpyArrayDim(vflux.ptr(), 0)) {
                 PyErr_SetString(PyExc_ValueError,
                                 "Length of vx array does not match length of vflux array");
                 bp::throw_error_already_set();
             }
-            std::vector<double> vx_(size);
-            std::vector<double> vy_(size);
-            std::vector<double> vflux_(size);
-            for (Py_ssize_t n = 0; n < size; ++n) {
-                vx_[n] = bp::extract<double>(vx[n]);
-                vy_[n] = bp::extract<double>(vy[n]);
-                vflux_[n] = bp::extract<double>(vflux[n]);
+            PhotonArray* pa = new PhotonArray(size);
+            std::copy(x, x+size, pa->getXArray());
+            std::copy(y, y+size, pa->getYArray());
+            std::copy(flux, flux+size, pa->getFluxArray());
+            return pa;
+        }
+
+        // The number of numpy arrays that currently view the data of each PhotonArray.
+        // (These are only changed with the GIL held, so they don't need a lock.)
+        static std::map<const PhotonArray*, int>& GetViewCounts()
+        {
+            static std::map<const PhotonArray*, int> counts;
+            return counts;
+        }
+
+        // The owner of a numpy array made by MakeArray.  It keeps the Python PhotonArray object
+        // alive for as long as the numpy array exists, and counts the views of its data.
+        struct ViewDeleter
+        {
+            ViewDeleter(PyObject* o, const PhotonArray* pa_) : owner(bp::borrowed(o)), pa(pa_)
+            { ++GetViewCounts()[pa]; }
+            void operator()(double* p)
+            {
+                std::map<const PhotonArray*, int>& counts = GetViewCounts();
+                if (--counts[pa] == 0) counts.erase(pa);
+                owner.reset();
+            }
+            bp::handle<> owner;
+            const PhotonArray* pa;
+        };
+
+        // Return a numpy array that views the given data.
+        static bp::object MakeArray(bp::object self, double* data)
+        {
+            const PhotonArray& pa = bp::extract<const PhotonArray&>(self);
+            if (pa.size() == 0) return bp::import("numpy").attr("zeros")(0);
+            boost::shared_ptr<double> owner(data, ViewDeleter(self.ptr(), &pa));
+            return MakeNumpyArray(data, pa.size(), 1, false, owner);
+        }
+
+        static bp::object GetX(bp::object self) 
+        { return MakeArray(self, bp::extract<PhotonArray&>(self)().getXArray()); }
+        static bp::object GetY(bp::object self) 
+        { return MakeArray(self, bp::extract<PhotonArray&>(self)().getYArray()); }
+        static bp::object GetFlux(bp::object self) 
+        { return MakeArray(self, bp::extract<PhotonArray&>(self)().getFluxArray()); }
+
+        // append and reserve can move the photon data, so they are not allowed while any numpy
+        // arrays view it.
+        static void CheckNoViews(const PhotonArray& pa, const char* name)
+        {
+            if (GetViewCounts().count(&pa)) {
+                std::string msg = std::string("Cannot call PhotonArray.") + name + 
+                    " while the x, y or flux arrays are in use";
+                PyErr_SetString(PyExc_RuntimeError, msg.c_str());
+                bp::throw_error_already_set();
             }
-            return new PhotonArray(vx_, vy_, vflux_);
+        }
+
+        static void Append(PhotonArray& pa, const PhotonArray& rhs)
+        {
+            CheckNoViews(pa, "append");
+            pa.append(rhs);
+        }
+
+        static void Reserve(PhotonArray& pa, int N)
+        {
+            CheckNoViews(pa, "reserve");
+            pa.reserve(N);
+        }
+
+        template <typename T>
+        static double AddToImage(const PhotonArray& pa, Image<T>& image)
+        {
+            ImageView<T> view = image.view();
+            return pa.addTo(view);
+        }
+
+        template <typename T>
+        static void wrapTemplates(bp::class_<PhotonArray>& pyPhotonArray)
+        {
+            pyPhotonArray
+                .def("addTo", 
+                     (double(PhotonArray::*)(ImageView<T> &) const)&PhotonArray::addTo,
+                     bp::arg("image"),
+                     "Add photons' fluxes into image. Returns total flux of photons falling inside "
+                     "image bounds.")
+                .def("addTo", &AddToImage<T>, bp::arg("image"),
+                     "Add photons' fluxes into image. Returns total flux of photons falling inside "
+                     "image bounds.")
+                ;
         }
 
         static void wrap() {
@@ -66,6 +166,11 @@ namespace galsim {
                 "number of positive and negative photons.  This class holds the\n"
                 "code that allows its flux to be added to a surface-brightness\n"
                 "Image.\n"
+                "\n"
+                "The x, y and flux attributes are numpy arrays that view the photon data\n"
+                "directly, so they can be modified in place without copying.  While any of\n"
+                "these arrays exist, append and reserve raise a RuntimeError, since they\n"
+                "can move the photon data.\n"
                 ;
             bp::class_<PhotonArray> pyPhotonArray("PhotonArray", doc, bp::no_init);
             pyPhotonArray
@@ -76,26 +181,25 @@ namespace galsim {
                 )
                 .def(bp::init<int>(bp::args("n")))
                 .def("__len__", &PhotonArray::size)
-                .def("reserve", &PhotonArray::reserve)
+                .def("reserve", &Reserve, bp::arg("n"))
                 .def("setPhoton", &PhotonArray::setPhoton, bp::args("i", "x", "y", "flux"))
                 .def("getX", &PhotonArray::getX)
                 .def("getY", &PhotonArray::getY)
                 .def("getFlux", &PhotonArray::getFlux)
                 .def("getTotalFlux", &PhotonArray::getTotalFlux)
                 .def("setTotalFlux", &PhotonArray::setTotalFlux)
-                .def("append", &PhotonArray::append)
+                .def("scaleFlux", &PhotonArray::scaleFlux, bp::arg("scale"))
+                .def("scaleXY", &PhotonArray::scaleXY, bp::arg("scale"))
+                .def("append", &Append, bp::arg("rhs"))
                 .def("convolve", &PhotonArray::convolve)
-                .def("addTo", 
-                     (double(PhotonArray::*)(ImageView<float> &) const)&PhotonArray::addTo,
-                     bp::arg("image"),
-                     "Add photons' fluxes into image. Returns total flux of photons falling inside "
-                     "image bounds.")
-                .def("addTo", 
-                     (double(PhotonArray::*)(ImageView<double> &) const)&PhotonArray::addTo,
-                     bp::arg("image"),
-                     "Add photons' fluxes into image. Returns total flux of photons falling inside "
-                     "image bounds.")
+                .add_property("x", &GetX)
+                .add_property("y", &GetY)
+                .add_property("flux", &GetFlux)
+                .def("clearPool", &PhotonArray::clearPool)
+                .staticmethod("clearPool")
                 ;
+            wrapTemplates<float>(pyPhotonArray);
+            wrapTemplates<double>(pyPhotonArray);
         }
 
     };
@@ -29,6 +29,12 @@ namespace galsim {
 
     struct PySBAiry 
     {
+        static bp::tuple getCacheStats()
+        {
+            LRUCacheStats stats = SBAiry::getCacheStats();
+            return bp::make_tuple(stats.nhits, stats.nmisses, stats.size, stats.nmax);
+        }
+
         static void wrap() 
         {
             bp::class_<SBAiry,bp::bases<SBProfile> >("SBAiry", bp::no_init)
@@ -39,6 +45,15 @@ namespace galsim {
                 .def(bp::init<const SBAiry &>())
                 .def("getLamOverD", &SBAiry::getLamOverD)
                 .def("getObscuration", &SBAiry::getObscuration)
+                .def("setCacheSize", &SBAiry::setCacheSize, bp::arg("nmax"))
+                .staticmethod("setCacheSize")
+                .def("clearCache", &SBAiry::clearCache)
+                .staticmethod("clearCache")
+                .def("getCacheStats", &getCacheStats,
+                     "Returns (nhits, nmisses, size, maxsize) for the AiryInfo cache")
+                .staticmethod("getCacheStats")
+                .def("resetCacheStats", &SBAiry::resetCacheStats)
+                .staticmethod("resetCacheStats")
                 ;
         }
     };
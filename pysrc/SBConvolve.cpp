@@ -32,11 +32,11 @@ namespace galsim {
 
         // This will be wrapped as a Python constructor; it accepts an arbitrary Python iterable.
         static SBConvolve * construct(bp::object const & iterable, bool real_space,
-                                      boost::shared_ptr<GSParams> gsparams) 
+                                      boost::shared_ptr<GSParams> gsparams, int ncache) 
         {
             bp::stl_input_iterator<SBProfile> begin(iterable), end;
             std::list<SBProfile> plist(begin, end);
-            return new SBConvolve(plist, real_space, gsparams);
+            return new SBConvolve(plist, real_space, gsparams, ncache);
         }
 
         static void wrap() 
@@ -47,9 +47,13 @@ namespace galsim {
                 .def("__init__", bp::make_constructor(
                         &construct, bp::default_call_policies(), 
                         (bp::arg("slist"), bp::arg("real_space")=false,
-                         bp::arg("gsparams")=bp::object()))
+                         bp::arg("gsparams")=bp::object(), bp::arg("ncache")=0))
                 )
                 .def(bp::init<const SBConvolve &>())
+                .def("setCacheSize", &SBConvolve::setCacheSize, bp::arg("nmax"))
+                .staticmethod("setCacheSize")
+                .def("clearCache", &SBConvolve::clearCache)
+                .staticmethod("clearCache")
                 ;
         }
 
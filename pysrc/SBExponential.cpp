@@ -59,6 +59,12 @@ namespace galsim {
             return new SBExponential(s, flux, gsparams);
         }
 
+        static bp::tuple getCacheStats()
+        {
+            LRUCacheStats stats = SBExponential::getCacheStats();
+            return bp::make_tuple(stats.nhits, stats.nmisses, stats.size, stats.nmax);
+        }
+
         static void wrap() 
         {
             bp::class_<SBExponential,bp::bases<SBProfile> >(
@@ -75,6 +81,15 @@ namespace galsim {
                 )
                 .def(bp::init<const SBExponential &>())
                 .def("getScaleRadius", &SBExponential::getScaleRadius)
+                .def("setCacheSize", &SBExponential::setCacheSize, bp::arg("nmax"))
+                .staticmethod("setCacheSize")
+                .def("clearCache", &SBExponential::clearCache)
+                .staticmethod("clearCache")
+                .def("getCacheStats", &getCacheStats,
+                     "Returns (nhits, nmisses, size, maxsize) for the ExponentialInfo cache")
+                .staticmethod("getCacheStats")
+                .def("resetCacheStats", &SBExponential::resetCacheStats)
+                .staticmethod("resetCacheStats")
                 ;
         }
     };
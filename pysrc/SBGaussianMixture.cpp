@@ -0,0 +1,82 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+#include "boost/python.hpp"
+#include "boost/python/stl_iterator.hpp"
+
+#include "SBGaussianMixture.h"
+
+namespace bp = boost::python;
+
+namespace galsim {
+
+    struct PySBGaussianMixture 
+    {
+
+        static std::vector<double> toVector(const bp::object& iterable, const char* name)
+        {
+            std::vector<double> v;
+            try {
+                bp::stl_input_iterator<double> begin(iterable), end;
+                v.insert(v.end(), begin, end);
+            } catch (std::exception& e) {
+                PyErr_Format(PyExc_ValueError, "Unable to convert %s to C++ vector", name);
+                bp::throw_error_already_set();
+            }
+            return v;
+        }
+
+        static SBGaussianMixture* construct(
+            const bp::object& flux, const bp::object& x0, const bp::object& y0,
+            const bp::object& cxx, const bp::object& cxy, const bp::object& cyy,
+            boost::shared_ptr<GSParams> gsparams) 
+        {
+            return new SBGaussianMixture(
+                toVector(flux, "flux"), toVector(x0, "x0"), toVector(y0, "y0"),
+                toVector(cxx, "cxx"), toVector(cxy, "cxy"), toVector(cyy, "cyy"), gsparams);
+        }
+
+        static void wrap() 
+        {
+            bp::class_<SBGaussianMixture,bp::bases<SBProfile> > pySBGaussianMixture(
+                "SBGaussianMixture",
+                "SBGaussianMixture(flux, x0, y0, cxx, cxy, cyy)\n\n"
+                "Construct a sum of elliptical Gaussians, given sequences of the component\n"
+                "fluxes, centers and covariance matrix elements.\n",
+                bp::no_init);
+            pySBGaussianMixture
+                .def("__init__", bp::make_constructor(
+                        &construct, bp::default_call_policies(),
+                        (bp::arg("flux"), bp::arg("x0"), bp::arg("y0"),
+                         bp::arg("cxx"), bp::arg("cxy"), bp::arg("cyy"),
+                         bp::arg("gsparams")=bp::object())
+                ))
+                .def(bp::init<const SBGaussianMixture &>())
+                .def("getNComponents", &SBGaussianMixture::getNComponents)
+                ;
+        }
+    };
+
+    void pyExportSBGaussianMixture() 
+    {
+        PySBGaussianMixture::wrap();
+    }
+
+} // namespace galsim
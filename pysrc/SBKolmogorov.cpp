@@ -29,6 +29,12 @@ namespace galsim {
 
     struct PySBKolmogorov 
     {
+        static bp::tuple getCacheStats()
+        {
+            LRUCacheStats stats = SBKolmogorov::getCacheStats();
+            return bp::make_tuple(stats.nhits, stats.nmisses, stats.size, stats.nmax);
+        }
+
         static void wrap() 
         {
             bp::class_<SBKolmogorov,bp::bases<SBProfile> >("SBKolmogorov", bp::no_init)
@@ -38,6 +44,15 @@ namespace galsim {
                 )
                 .def(bp::init<const SBKolmogorov &>())
                 .def("getLamOverR0", &SBKolmogorov::getLamOverR0)
+                .def("setCacheSize", &SBKolmogorov::setCacheSize, bp::arg("nmax"))
+                .staticmethod("setCacheSize")
+                .def("clearCache", &SBKolmogorov::clearCache)
+                .staticmethod("clearCache")
+                .def("getCacheStats", &getCacheStats,
+                     "Returns (nhits, nmisses, size, maxsize) for the KolmogorovInfo cache")
+                .staticmethod("getCacheStats")
+                .def("resetCacheStats", &SBKolmogorov::resetCacheStats)
+                .staticmethod("resetCacheStats")
                 ;
         }
     };
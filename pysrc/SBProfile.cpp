@@ -22,6 +22,7 @@
 #include "boost/python/stl_iterator.hpp"
 
 #include "SBProfile.h"
+#include "InfoDiskCache.h"
 
 namespace bp = boost::python;
 
@@ -121,11 +122,12 @@ namespace galsim {
             wrapper
                 .def("drawShoot", 
                      (double (SBProfile::*)(ImageView<U>, double, UniformDeviate,
-                                            double, double, bool, bool)
+                                            double, double, bool, bool, int)
                       const)&SBProfile::drawShoot,
                      (bp::arg("image"), bp::arg("N")=0., bp::arg("ud"),
                       bp::arg("gain")=1., bp::arg("max_extra_noise")=0.,
-                      bp::arg("poisson_flux")=true, bp::arg("add_to_image")=false),
+                      bp::arg("poisson_flux")=true, bp::arg("add_to_image")=false,
+                      bp::arg("nthreads")=1),
                      "Draw object into existing image using photon shooting.\n"
                      "\n"
                      "Setting optional integer arg possionFlux != 0 allows profile flux to vary\n"
@@ -220,10 +222,26 @@ namespace galsim {
     };
 
 
+    struct PyInfoDiskCache {
+
+        static std::string getDirectory() { return InfoDiskCache::getDirectory(); }
+
+        static void wrap() {
+            bp::def("setInfoCacheDirectory", &InfoDiskCache::setDirectory, bp::arg("dir"),
+                    "Set a directory in which to save the tables calculated for Sersic,\n"
+                    "Kolmogorov and Airy profiles, so they can be reused by later runs and other\n"
+                    "processes.  An empty string turns this off.  The default is the value of\n"
+                    "the GALSIM_INFO_CACHE_DIR environment variable, if set.");
+            bp::def("getInfoCacheDirectory", &getDirectory,
+                    "Returns the directory set by setInfoCacheDirectory (or '' if none).");
+        }
+    };
+
     void pyExportSBProfile() 
     {
         PySBProfile::wrap();
         PyGSParams::wrap();
+        PyInfoDiskCache::wrap();
     }
 
 } // namespace galsim
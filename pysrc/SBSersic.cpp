@@ -30,6 +30,12 @@ namespace galsim {
     struct PySBSersic 
     {
 
+        static bp::tuple getCacheStats()
+        {
+            LRUCacheStats stats = SBSersic::getCacheStats();
+            return bp::make_tuple(stats.nhits, stats.nmisses, stats.size, stats.nmax);
+        }
+
         static void wrap() 
         {
             bp::class_<SBSersic,bp::bases<SBProfile> >("SBSersic", bp::no_init)
@@ -41,6 +47,19 @@ namespace galsim {
                 .def(bp::init<const SBSersic &>())
                 .def("getN", &SBSersic::getN)
                 .def("getHalfLightRadius", &SBSersic::getHalfLightRadius)
+                .def("setCacheSize", &SBSersic::setCacheSize, bp::arg("nmax"))
+                .staticmethod("setCacheSize")
+                .def("clearCache", &SBSersic::clearCache)
+                .staticmethod("clearCache")
+                .def("getCacheStats", &getCacheStats,
+                     "Returns (nhits, nmisses, size, maxsize) for the SersicInfo cache")
+                .staticmethod("getCacheStats")
+                .def("resetCacheStats", &SBSersic::resetCacheStats)
+                .staticmethod("resetCacheStats")
+                .def("setNInterpolation", &SBSersic::setNInterpolation, bp::arg("interpolate"))
+                .staticmethod("setNInterpolation")
+                .def("getNInterpolation", &SBSersic::getNInterpolation)
+                .staticmethod("getNInterpolation")
                 ;
         }
     };
@@ -40,6 +40,7 @@ namespace galsim {
     void pyExportSBTransform();
     void pyExportSBBox();
     void pyExportSBGaussian();
+    void pyExportSBGaussianMixture();
     void pyExportSBExponential();
     void pyExportSBSersic();
     void pyExportSBMoffat();
@@ -78,6 +79,7 @@ BOOST_PYTHON_MODULE(_galsim) {
     galsim::pyExportSBTransform();
     galsim::pyExportSBBox();
     galsim::pyExportSBGaussian();
+    galsim::pyExportSBGaussianMixture();
     galsim::pyExportSBExponential();
     galsim::pyExportSBSersic();
     galsim::pyExportSBMoffat();
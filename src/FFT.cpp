@@ -270,6 +270,9 @@ namespace galsim {
             }
 
             const bool simple_xval = ixy->xrange() <= _N;
+            // If the kernel is less than half the table, the footprint doesn't wrap onto itself,
+            // so the args are consecutive, and we can get all the weights at once.
+            const bool use_taps = ixy->xrange() < No2;
 
             // Build the x component of interpolant
             int nx = ixMax - ixMin;
@@ -279,7 +282,11 @@ namespace galsim {
             if (_xwt.empty()) {
                 _xwt.resize(nx);
                 int ix = ixMin;
-                if (simple_xval) {
+                if (use_taps) {
+                    double arg = ix-kx;
+                    arg = arg-_N*std::floor(arg/_N+0.5);
+                    ixy->xvalTaps1d(arg, nx, &_xwt[0]);
+                } else if (simple_xval) {
                     // Then simple xval is fine (and faster)
                     // Just need to keep ix-kx to [-N/2,N/2)
                     double arg = ix-kx;
@@ -327,6 +334,10 @@ namespace galsim {
             if (simple_xval) {
                 arg = arg-_N*std::floor(arg/_N+0.5);
             }
+            if (use_taps) {
+                _ywt.resize(ny);
+                ixy->xvalTaps1d(arg, ny, &_ywt[0]);
+            }
             for (int j=0; j<ny; j++, iy++, arg+=1.) {
                 if (iy >= No2) iy-=_N;   // wrap iy if needed
                 dbg<<"j = "<<j<<", iy = "<<iy<<std::endl;
@@ -390,7 +401,9 @@ namespace galsim {
                     _cache.push_back(sumy);
                     nextSaved = _cache.end();
                 }
-                if (simple_xval) {
+                if (use_taps) {
+                    sum += sumy * _ywt[j];
+                } else if (simple_xval) {
                     if (arg > _N/2.) arg -= _N;
                     dbg<<"Call xval for arg = "<<arg<<std::endl;
                     sum += sumy * ixy->xval1d(arg);
@@ -421,6 +434,139 @@ namespace galsim {
         return sum;
     }
 
+    // Interpolate to a sheared grid of k values.  The calculation is the same as in
+    // interpolate for a separable interpolant, but the kernel footprint is kept in unwrapped
+    // indices, so the weights are just xval1d(ix-kx), and the table indices are wrapped
+    // as we go.
+    void KTable::interpolateGrid(
+        std::complex<double>* val, int m, int n,
+        double kx0, double dkx, double dkxy, double ky0, double dky, double dkyx,
+        double kmax, const InterpolantXY& interp) const
+    {
+        dbg<<"Start KTable interpolateGrid\n";
+        dbg<<"kx = "<<kx0<<" + i * "<<dkx<<" + j * "<<dkxy<<std::endl;
+        dbg<<"ky = "<<ky0<<" + i * "<<dkyx<<" + j * "<<dky<<std::endl;
+        const int No2 = _N>>1;
+        const double xr = interp.xrange();
+
+        if (dkxy == 0.) {
+            // Then kx is constant down each column, so interpolate can use its row cache
+            // if we make j the inner loop.
+            for (int i=0;i<m;++i,kx0+=dkx,ky0+=dkyx) {
+                double ky = ky0;
+                std::complex<double>* valit = val+i;
+                for (int j=0;j<n;++j,ky+=dky,valit+=m) {
+                    if (std::abs(kx0) > kmax || std::abs(ky) > kmax) *valit = 0.;
+                    else *valit = interpolate(kx0, ky, interp);
+                }
+            }
+            return;
+        }
+        if (dkx == 0. || xr >= No2) {
+            // If kx is constant along each row, the row cache works with the regular order.
+            // And if the kernel covers the whole table, the footprint logic below doesn't
+            // help.  In both cases, just use the regular interpolate.
+            for (int j=0;j<n;++j,kx0+=dkxy,ky0+=dky) {
+                double kx = kx0;
+                double ky = ky0;
+                for (int i=0;i<m;++i,kx+=dkx,ky+=dkyx) {
+                    if (std::abs(kx) > kmax || std::abs(ky) > kmax) *val++ = 0.;
+                    else *val++ = interpolate(kx, ky, interp);
+                }
+            }
+            return;
+        }
+
+        const Interpolant& i1d = *interp.get1d();
+        const bool exact = i1d.isExactAtNodes();
+        const double eps = 10.*std::numeric_limits<double>::epsilon();
+        const int nmax = 2*int(std::ceil(xr)) + 2;
+        const int rowlen = No2+1;
+        const std::complex<double>* array = _array.get();
+        std::vector<double> wx(nmax);
+        std::vector<double> wy(nmax);
+
+        for (int j=0;j<n;++j,kx0+=dkxy,ky0+=dky) {
+            double kx = kx0;
+            double ky = ky0;
+            for (int i=0;i<m;++i,kx+=dkx,ky+=dkyx) {
+                if (std::abs(kx) > kmax || std::abs(ky) > kmax) {
+                    *val++ = 0.;
+                    continue;
+                }
+                double u = kx / _dk;
+                double v = ky / _dk;
+
+                // Kernel footprint in x and y, and the weights for each.
+                int ix0, nx, iy0, ny;
+                if (exact && std::abs(u - std::floor(u+0.01)) < eps) {
+                    ix0 = int(std::floor(u+0.01));
+                    nx = 1;
+                } else {
+                    ix0 = int(std::floor(u-xr+0.99));
+                    nx = int(std::ceil(u+xr+0.01)) - ix0;
+                }
+                if (exact && std::abs(v - std::floor(v+0.01)) < eps) {
+                    iy0 = int(std::floor(v+0.01));
+                    ny = 1;
+                } else {
+                    iy0 = int(std::floor(v-xr+0.99));
+                    ny = int(std::ceil(v+xr+0.01)) - iy0;
+                }
+                xassert(nx <= nmax);
+                xassert(ny <= nmax);
+                i1d.xvalTaps(ix0-u, nx, &wx[0]);
+                i1d.xvalTaps(iy0-v, ny, &wy[0]);
+
+                // Put the starting indices into [-N/2,N/2)
+                const int jx0 = Wrap(ix0, _N);
+                int jy = Wrap(iy0, _N);
+
+                double sumr = 0.;
+                double sumi = 0.;
+                for (int k=0; k<ny; ++k, ++jy) {
+                    if (jy >= No2) jy -= _N;
+                    // Values with jx < 0 come from the conjugate of (-jx,-jy).
+                    const double* rowp =
+                        reinterpret_cast<const double*>(array + (jy < 0 ? jy+_N : jy)*rowlen);
+                    const double* rowm =
+                        reinterpret_cast<const double*>(array + (jy > 0 ? _N-jy : -jy)*rowlen);
+                    double sumyr = 0.;
+                    double sumyi = 0.;
+                    const double* w = &wx[0];
+                    int jx = jx0;
+                    int count = nx;
+                    while (count) {
+                        if (jx < 0) {
+                            // Negative jx: ptr goes down as jx goes up.
+                            int count1 = std::min(count, -jx);
+                            const double* ptr = rowm - 2*jx;
+                            for (int l=count1; l; --l, ptr-=2, ++w) {
+                                sumyr += *w * ptr[0];
+                                sumyi -= *w * ptr[1];
+                            }
+                            count -= count1;
+                            jx += count1;
+                        } else {
+                            int count1 = std::min(count, No2+1-jx);
+                            const double* ptr = rowp + 2*jx;
+                            for (int l=count1; l; --l, ptr+=2, ++w) {
+                                sumyr += *w * ptr[0];
+                                sumyi += *w * ptr[1];
+                            }
+                            count -= count1;
+                            // Wrap around to -N/2+1, since N/2 was included here.
+                            jx = -No2 + 1;
+                        }
+                    }
+                    sumr += wy[k] * sumyr;
+                    sumi += wy[k] * sumyi;
+                }
+                *val++ = std::complex<double>(sumr,sumi);
+            }
+        }
+    }
+
     // Fill table from a function:
     void KTable::fill(KTable::function1 func)
     {
@@ -769,8 +915,7 @@ namespace galsim {
             // This is also cached if possible.  It gets cleared when kx != cacheX above.
             if (_xwt.empty()) {
                 _xwt.resize(nx);
-                for (int i=0; i<nx; i++) 
-                    _xwt[i] = ixy->xval1d(i+ixMin-x);
+                ixy->xvalTaps1d(ixMin-x, nx, &_xwt[0]);
             } else {
                 assert(int(_xwt.size()) == nx);
             }
@@ -784,6 +929,11 @@ namespace galsim {
                 nextSaved = _cache.begin();
             }
 
+            // The y factors for each row
+            _ywt.resize(iyMax - iyMin + 1);
+            ixy->xvalTaps1d(iyMin-y, iyMax - iyMin + 1, &_ywt[0]);
+            std::vector<double>::const_iterator ywt_it = _ywt.begin();
+
             for (int iy=iyMin; iy<=iyMax; iy++) {
                 double sumy = 0.;
                 if (nextSaved != _cache.end()) {
@@ -802,7 +952,7 @@ namespace galsim {
                     _cache.push_back(sumy);
                     nextSaved = _cache.end();
                 }
-                sum += sumy * ixy->xval1d(iy-y);
+                sum += sumy * (*ywt_it++);
             }
         } else {
             // Interpolant is not seperable, calculate weight at each point
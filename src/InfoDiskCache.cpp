@@ -0,0 +1,164 @@
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+
+//#define DEBUGLOGGING
+
+#include "InfoDiskCache.h"
+
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+#include <sys/stat.h>
+#include <sys/types.h>
+#include <unistd.h>
+
+namespace galsim {
+
+    // The file starts with this magic string and a 1.0, which lets us reject files that were
+    // written in some other format or on a machine with a different byte order.
+    static const char INFO_MAGIC[8] = { 'G','S','I','N','F','O','0','1' };
+
+    std::string& InfoDiskCache::directory()
+    {
+        static bool first = true;
+        static std::string dir;
+        if (first) {
+            first = false;
+            const char* env = std::getenv("GALSIM_INFO_CACHE_DIR");
+            if (env) setDirectory(env);
+        }
+        return dir;
+    }
+
+    void InfoDiskCache::setDirectory(const std::string& dir)
+    {
+        std::string& cache_dir = directory();
+        cache_dir = dir;
+        if (dir.empty()) return;
+        // Make the directory if necessary.  If this fails (e.g. another process made it first)
+        // we will find out when we try to write to it.
+        struct stat st;
+        if (stat(dir.c_str(), &st) != 0) mkdir(dir.c_str(), 0777);
+        dbg<<"InfoDiskCache directory = "<<dir<<std::endl;
+    }
+
+    const std::string& InfoDiskCache::getDirectory() 
+    { return directory(); }
+
+    std::vector<double> InfoDiskCache::makeKey(const GSParams& gsparams)
+    {
+        std::vector<double> key;
+        key.push_back(gsparams.minimum_fft_size);
+        key.push_back(gsparams.maximum_fft_size);
+        key.push_back(gsparams.alias_threshold);
+        key.push_back(gsparams.maxk_threshold);
+        key.push_back(gsparams.kvalue_accuracy);
+        key.push_back(gsparams.xvalue_accuracy);
+        key.push_back(gsparams.shoot_accuracy);
+        key.push_back(gsparams.realspace_relerr);
+        key.push_back(gsparams.realspace_abserr);
+        key.push_back(gsparams.integration_relerr);
+        key.push_back(gsparams.integration_abserr);
+        return key;
+    }
+
+    std::string InfoDiskCache::fileName(const std::string& type, const std::vector<double>& key)
+    {
+        // Use the 64 bit FNV-1a hash of the bytes of the key.
+        unsigned long long hash = 14695981039346656037ULL;
+        const unsigned char* bytes = reinterpret_cast<const unsigned char*>(&key[0]);
+        for (size_t i=0; i<key.size()*sizeof(double); ++i) {
+            hash ^= bytes[i];
+            hash *= 1099511628211ULL;
+        }
+        std::ostringstream oss;
+        oss << directory() << "/" << type << "_" 
+            << std::hex << std::setfill('0') << std::setw(16) << hash << ".dat";
+        return oss.str();
+    }
+
+    bool InfoDiskCache::read(const std::string& type, const std::vector<double>& key,
+                             std::vector<double>& data)
+    {
+        if (directory().empty()) return false;
+        std::string file_name = fileName(type,key);
+        std::ifstream fin(file_name.c_str(), std::ios::binary);
+        if (!fin) return false;
+        dbg<<"Reading cached "<<type<<" info from "<<file_name<<std::endl;
+
+        char magic[8];
+        double one;
+        int nkey, ndata;
+        fin.read(magic, 8);
+        fin.read(reinterpret_cast<char*>(&one), sizeof(double));
+        fin.read(reinterpret_cast<char*>(&nkey), sizeof(int));
+        if (!fin || std::memcmp(magic, INFO_MAGIC, 8) != 0 || one != 1. || 
+            nkey != int(key.size())) return false;
+        std::vector<double> file_key(nkey);
+        fin.read(reinterpret_cast<char*>(&file_key[0]), nkey*sizeof(double));
+        fin.read(reinterpret_cast<char*>(&ndata), sizeof(int));
+        if (!fin || file_key != key || ndata < 0) return false;
+        data.resize(ndata);
+        if (ndata > 0) fin.read(reinterpret_cast<char*>(&data[0]), ndata*sizeof(double));
+        if (!fin) { data.clear(); return false; }
+        return true;
+    }
+
+    void InfoDiskCache::write(const std::string& type, const std::vector<double>& key,
+                              const std::vector<double>& data)
+    {
+        if (directory().empty()) return;
+        std::string file_name = fileName(type,key);
+        dbg<<"Writing "<<type<<" info to "<<file_name<<std::endl;
+
+        // Write to a temporary file and then rename it, so other processes never see a 
+        // partially written file.  The temporary name includes a count of the files written 
+        // by this process, so different threads never write to the same one.
+        static int ntmp = 0;
+        int this_tmp;
+#ifdef _OPENMP
+#pragma omp critical (galsim_info_cache_tmp)
+#endif
+        this_tmp = ntmp++;
+        std::ostringstream oss;
+        oss << file_name << ".tmp" << getpid() << "_" << this_tmp;
+        std::string tmp_name = oss.str();
+        std::ofstream fout(tmp_name.c_str(), std::ios::binary);
+        if (!fout) return;
+
+        double one = 1.;
+        int nkey = key.size();
+        int ndata = data.size();
+        fout.write(INFO_MAGIC, 8);
+        fout.write(reinterpret_cast<const char*>(&one), sizeof(double));
+        fout.write(reinterpret_cast<const char*>(&nkey), sizeof(int));
+        fout.write(reinterpret_cast<const char*>(&key[0]), nkey*sizeof(double));
+        fout.write(reinterpret_cast<const char*>(&ndata), sizeof(int));
+        if (ndata > 0) fout.write(reinterpret_cast<const char*>(&data[0]), ndata*sizeof(double));
+        fout.close();
+        if (!fout || std::rename(tmp_name.c_str(), file_name.c_str()) != 0) 
+            std::remove(tmp_name.c_str());
+    }
+
+}
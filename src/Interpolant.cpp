@@ -59,7 +59,7 @@ namespace galsim {
     {
         dbg<<"InterpolantXY shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = 1.\n";
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         double fluxPerPhoton = 1./N;
         for (int i=0; i<N; i++)  {
             result->setPhoton(i, 0., 0., fluxPerPhoton);
@@ -72,7 +72,7 @@ namespace galsim {
     {
         dbg<<"InterpolantXY shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = 1.\n";
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         double fluxPerPhoton = 1./N;
         for (int i=0; i<N; i++)  {
             result->setPhoton(i, ud()-0.5, 0., fluxPerPhoton);
@@ -85,7 +85,7 @@ namespace galsim {
     {
         dbg<<"InterpolantXY shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = 1.\n";
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         double fluxPerPhoton = 1./N;
         for (int i=0; i<N; i++) {
             // *** Guessing here that 2 random draws is faster than a sqrt:
@@ -140,11 +140,10 @@ namespace galsim {
     Lanczos::Lanczos(int n, bool fluxConserve, double tol) :  
         _n(n), _fluxConserve(fluxConserve), _tolerance(tol)
     {
-        // TODO: These can't be retrieved from any GSParams object.
-        //       Should they be tol?  0.1*tol?  For now, using 0.1*tol since tol is already a
+        // TODO: This can't be retrieved from any GSParams object.
+        //       Should it be tol?  0.1*tol?  For now, using 0.1*tol since tol is already a
         //       small number and 10% inaccuracies in building the lookup table should be completely
         //       negligible.
-        const double xvalue_accuracy = 0.1*tol;
         const double kvalue_accuracy = 0.1*tol;
 
         // Reduce range slightly from n so we're not including points with zero weight in
@@ -158,7 +157,6 @@ namespace galsim {
         // Doing an explicit clear fixes the problem.
         if (_cache_umax.size() == 0) {
             _cache_umax.clear();
-            _cache_xtab.clear();
             _cache_utab.clear();  
         }
 
@@ -166,20 +164,11 @@ namespace galsim {
 
         if (_cache_umax.count(key)) {
             // Then uMax and tab are already cached.
-            _xtab = _cache_xtab[key];
             _utab = _cache_utab[key];
             _uMax = _cache_umax[key];
         } else {
-            _xtab.reset(new Table<double,double>(Table<double,double>::spline));
             _utab.reset(new Table<double,double>(Table<double,double>::spline));
 
-            // Build xtab = table of x values
-            // Spline is accurate to O(dx^3), so errors should be ~dx^4.
-            const double xStep1 = std::pow(xvalue_accuracy,0.25);
-            // Make sure steps hit the integer values exactly.
-            const double xStep = 1. / std::ceil(1./xStep1);
-            for(double x=0.; x<_n; x+=xStep) _xtab->addEntry(x, xCalc(x));
-
             // Build utab = table of u values
             const double uStep = std::pow(kvalue_accuracy,0.25) / _n;
             _uMax = 0.;
@@ -200,20 +189,18 @@ namespace galsim {
                 }
             }
             // Save these values in the cache.
-            _cache_xtab[key] = _xtab;
             _cache_utab[key] = _utab;
             _cache_umax[key] = _uMax;
         }
     }
 
-    std::map<Lanczos::KeyType,boost::shared_ptr<Table<double,double> > > Lanczos::_cache_xtab;
     std::map<Lanczos::KeyType,boost::shared_ptr<Table<double,double> > > Lanczos::_cache_utab;
     std::map<Lanczos::KeyType,double> Lanczos::_cache_umax;
 
     double Lanczos::xval(double x) const
     {
         x = std::abs(x);
-        return x>=_n ? 0. : (*_xtab)(x);
+        return x>=_n ? 0. : xCalc(x);
     }
 
     double Lanczos::uval(double u) const
@@ -222,6 +209,30 @@ namespace galsim {
         return u>_uMax ? 0. : (*_utab)(u);
     }
 
+    void Lanczos::xvalTaps(double x0, int n, double* w) const
+    {
+        // sin(pi x) just changes sign from one tap to the next.
+        const double s0 = std::sin(M_PI*x0);
+        // 1-cos(2pi x) = 2 sin^2(pi x) is the same for all taps.
+        const double fc = _fluxConserve ? 1. + 4.*_u1*s0*s0 : 1.;
+        const double norm = s0 * fc * _n / (M_PI*M_PI);
+        // sin(pi x/n) is stepped by rotating through pi/n.
+        const double sd = std::sin(M_PI/_n);
+        const double cd = std::cos(M_PI/_n);
+        double sn = std::sin(M_PI*x0/_n);
+        double cn = std::cos(M_PI*x0/_n);
+        double sign = 1.;
+        for (int j=0; j<n; ++j, sign=-sign) {
+            double x = x0+j;
+            if (std::abs(x) >= _n) w[j] = 0.;
+            else if (std::abs(x) < 1.e-3) w[j] = sinc(x) * sinc(x/_n) * fc;
+            else w[j] = sign * norm * sn / (x*x);
+            double temp = sn*cd + cn*sd;
+            cn = cn*cd - sn*sd;
+            sn = temp;
+        }
+    }
+
     class CubicIntegrand : public std::unary_function<double,double>
     {
     public:
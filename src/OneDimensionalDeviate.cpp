@@ -250,6 +250,46 @@ namespace galsim {
         return result;
     }
 
+    void Interval::getData(std::vector<double>& data) const
+    {
+        assert(_fluxIsReady);
+        data.push_back(_xLower);
+        data.push_back(_xUpper);
+        data.push_back(_flux);
+        data.push_back(_useRejectionMethod ? 1. : 0.);
+        data.push_back(_invMaxAbsDensity);
+        data.push_back(_invMeanAbsDensity);
+    }
+
+    OneDimensionalDeviate::OneDimensionalDeviate(const FluxDensity& fluxDensity, 
+                                                 const std::vector<double>& data,
+                                                 bool isRadial):
+        _fluxDensity(fluxDensity),
+        _isRadial(isRadial)
+    {
+        // The layout is (positiveFlux, negativeFlux, nIntervals, interval data...).
+        if (data.size() < 3) throw std::runtime_error("Invalid OneDimensionalDeviate data");
+        _positiveFlux = data[0];
+        _negativeFlux = data[1];
+        int nIntervals = int(data[2]);
+        if (nIntervals < 1 || int(data.size()) != 3 + nIntervals * Interval::DATA_SIZE) 
+            throw std::runtime_error("Invalid OneDimensionalDeviate data");
+        _pt.reserve(nIntervals);
+        for (int i=0; i<nIntervals; ++i) 
+            _pt.push_back(Interval(fluxDensity, &data[3 + i*Interval::DATA_SIZE], isRadial));
+        // The intervals were saved in the order of the original tree.
+        _pt.buildTree(0., true);
+    }
+
+    void OneDimensionalDeviate::getData(std::vector<double>& data) const
+    {
+        data.push_back(_positiveFlux);
+        data.push_back(_negativeFlux);
+        data.push_back(_pt.size());
+        for (ProbabilityTree<Interval>::const_iterator it=_pt.begin(); it!=_pt.end(); ++it) 
+            it->getData(data);
+    }
+
     OneDimensionalDeviate::OneDimensionalDeviate(const FluxDensity& fluxDensity, 
                                                  std::vector<double>& range,
                                                  bool isRadial):
@@ -329,7 +369,7 @@ namespace galsim {
         dbg<<"isradial? "<<_isRadial<<std::endl;
         dbg<<"N = "<<N<<std::endl;
         assert(N>=0);
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         if (N==0) return result;
         double totalAbsoluteFlux = getPositiveFlux() + getNegativeFlux();
         dbg<<"totalAbsFlux = "<<totalAbsoluteFlux<<std::endl;
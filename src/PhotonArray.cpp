@@ -47,6 +47,84 @@ namespace galsim {
         _flux = vflux;
     }
 
+    // The maximum number of released arrays to keep for reuse.
+    const size_t PHOTON_POOL_SIZE = 16;
+    // The largest array to keep for reuse.  This is the number of photons that drawShoot shoots 
+    // at a time, so the pool holds at most about 40 MB.  Larger arrays (e.g. from a single call
+    // to shoot with many photons) are deleted when they are released.
+    const size_t PHOTON_POOL_MAX_CAPACITY = 100000;
+
+    std::vector<PhotonArray*>& PhotonArray::getPool()
+    {
+        static std::vector<PhotonArray*> pool;
+        return pool;
+    }
+
+    // The deleter for arrays made by PhotonArray::create.
+    struct PhotonArrayReleaser
+    {
+        void operator()(PhotonArray* pa) const { PhotonArray::release(pa); }
+    };
+
+    void PhotonArray::release(PhotonArray* pa)
+    {
+        bool keep = false;
+        // The pool is shared by all threads when drawShoot uses multiple threads.
+#ifdef _OPENMP
+#pragma omp critical (galsim_photon_pool)
+#endif
+        {
+            std::vector<PhotonArray*>& pool = getPool();
+            if (pool.size() < PHOTON_POOL_SIZE && 
+                pa->_x.capacity() <= PHOTON_POOL_MAX_CAPACITY) {
+                pool.push_back(pa);
+                keep = true;
+            }
+        }
+        if (!keep) delete pa;
+    }
+
+    boost::shared_ptr<PhotonArray> PhotonArray::create(int N)
+    {
+        PhotonArray* pa = 0;
+#ifdef _OPENMP
+#pragma omp critical (galsim_photon_pool)
+#endif
+        {
+            std::vector<PhotonArray*>& pool = getPool();
+            if (!pool.empty()) {
+                // Use the released array with the most storage, since the arrays in a given
+                // calculation are usually all about the same size.
+                std::vector<PhotonArray*>::iterator best = pool.begin();
+                for (std::vector<PhotonArray*>::iterator it=pool.begin(); it!=pool.end(); ++it) 
+                    if ((*it)->_x.capacity() > (*best)->_x.capacity()) best = it;
+                pa = *best;
+                pool.erase(best);
+            }
+        }
+        if (!pa) {
+            pa = new PhotonArray(N);
+        } else {
+            pa->_x.resize(N);
+            pa->_y.resize(N);
+            pa->_flux.resize(N);
+            pa->_is_correlated = false;
+        }
+        return boost::shared_ptr<PhotonArray>(pa, PhotonArrayReleaser());
+    }
+
+    void PhotonArray::clearPool()
+    {
+#ifdef _OPENMP
+#pragma omp critical (galsim_photon_pool)
+#endif
+        {
+            std::vector<PhotonArray*>& pool = getPool();
+            for (size_t k=0; k<pool.size(); ++k) delete pool[k];
+            pool.clear();
+        }
+    }
+
     double PhotonArray::getTotalFlux() const 
     {
         double total = 0.;
@@ -180,51 +258,40 @@ namespace galsim {
         dbg<<"fluxScale = "<<fluxScale<<std::endl;
         dbg<<"bounds = "<<b<<std::endl;
 
+        // Work directly with the image data, with indices relative to the lower-left corner.
+        // The photons that miss the image are not tested with a branch.  Rather, they are
+        // sent to pixel 0 with zero flux, which keeps the loop simple enough for the compiler
+        // to pipeline well.
+        const double invdx = 1./dx;
+        const double x0 = b.getXMin() - 0.5;
+        const double y0 = b.getYMin() - 0.5;
+        const unsigned int nx = b.getXMax() - b.getXMin() + 1;
+        const unsigned int ny = b.getYMax() - b.getYMin() + 1;
+        const int stride = target.getStride();
+        T* data = target.getData();
+        const int n = size();
+        const double* xptr = getXArray();
+        const double* yptr = getYArray();
+        const double* fptr = getFluxArray();
+
         double addedFlux = 0.;
-#ifdef DEBUGLOGGING
-        double totalFlux = 0.;
-        double lostFlux = 0.;
-        int nx = target.getXMax()-target.getXMin()+1;
-        int ny = target.getYMax()-target.getYMin()+1;
-        std::vector<std::vector<double> > posFlux(nx,std::vector<double>(ny,0.));
-        std::vector<std::vector<double> > negFlux(nx,std::vector<double>(ny,0.));
-#endif
-        for (int i=0; i<int(size()); i++) {
-            int ix = int(floor(_x[i]/dx + 0.5));
-            int iy = int(floor(_y[i]/dx + 0.5));
-#ifdef DEBUGLOGGING
-            totalFlux += _flux[i];
-            xdbg<<"  photon: ("<<_x[i]<<','<<_y[i]<<")  f = "<<_flux[i]<<std::endl;
-#endif
-            if (b.includes(ix,iy)) {
-#ifdef DEBUGLOGGING
-                if (_flux[i] > 0.) posFlux[ix-target.getXMin()][iy-target.getXMin()] += _flux[i];
-                else negFlux[ix-target.getXMin()][iy-target.getXMin()] -= _flux[i];
-#endif
-                target(ix,iy) += _flux[i]*fluxScale;
-                addedFlux += _flux[i];
-            } else {
-#ifdef DEBUGLOGGING
-                xdbg<<"lost flux at ix = "<<ix<<", iy = "<<iy<<" with flux = "<<_flux[i]<<std::endl;
-                lostFlux += _flux[i];
-#endif
-            }
+        for (int i=0; i<n; ++i) {
+            double x = xptr[i]*invdx - x0;
+            double y = yptr[i]*invdx - y0;
+            // Check the range as doubles, so very distant photons don't overflow the ints.
+            // (The comparisons are written so that NaN positions also count as outside.)
+            bool inside = (x >= 0.) & (x < nx) & (y >= 0.) & (y < ny);
+            int ix = inside ? int(x) : 0;
+            int iy = inside ? int(y) : 0;
+            double f = inside ? fptr[i] : 0.;
+            data[iy*stride + ix] += T(f*fluxScale);
+            addedFlux += f;
         }
 #ifdef DEBUGLOGGING
+        double totalFlux = getTotalFlux();
         dbg<<"totalFlux = "<<totalFlux<<std::endl;
         dbg<<"addedlFlux = "<<addedFlux<<std::endl;
-        dbg<<"lostFlux = "<<lostFlux<<std::endl;
-        for(int ix=0;ix<nx;++ix) {
-            for(int iy=0;iy<ny;++iy) {
-                double pos = posFlux[ix][iy];
-                double neg = negFlux[ix][iy];
-                double tot = pos + neg;
-                if (tot > 0.) {
-                    xdbg<<"eta("<<ix+target.getXMin()<<','<<iy+target.getXMin()<<") = "<<
-                        neg<<" / "<<tot<<" = "<<neg/tot<<std::endl;
-                }
-            }
-        }
+        dbg<<"lostFlux = "<<totalFlux-addedFlux<<std::endl;
 #endif
 
         return addedFlux;
@@ -22,6 +22,7 @@
 //#define DEBUGLOGGING
 
 #include "SBProfile.h"
+#include "SBConvolveImpl.h"
 #include "integ/Int.h"
 #include "Solve.h"
 
@@ -386,4 +387,292 @@ namespace galsim {
         return result;
     }
 
+    // The rest of this file handles the common case of convolving a profile with an SBBox,
+    // such as a PSF with a Pixel.  Then the convolution at (X,Y) is just the integral of the
+    // profile over the box centered at (X,Y), times the box's surface brightness.  When 
+    // drawing a whole image, the boxes of neighboring pixels share their edges (or at least
+    // overlap in a regular way).  So rather than integrate over each box separately, we
+    // integrate over the cells between all the box edges and then add up the cells covered
+    // by each box using a summed-area table.
+    //
+    // Most cells are small compared to the scale of the profile, so Boole's rule on a 4x4 grid
+    // of sub-cells is very accurate.  The grid points on the edges of each cell are shared with 
+    // its neighbors, so this takes about 16 evaluations of the profile per cell.  Simpson's
+    // rule on the same points gives an estimate of the error.  The cells where the two don't
+    // agree, or where the profile has an edge or a split point, are done with the adaptive 
+    // integrator instead.
+
+    class ProfileFunc : 
+        public std::binary_function<double,double,double>
+    {
+    public:
+        ProfileFunc(const SBProfile& p) : _p(p) {}
+
+        double operator()(double x, double y) const 
+        { return _p.xValue(Position<double>(x,y)); }
+    private:
+        const SBProfile& _p;
+    };
+
+    class CellYRegion :
+        public std::unary_function<double, integ::IntRegion<double> >
+    {
+    public:
+        CellYRegion(const SBProfile& p, double ymin, double ymax) :
+            _p(p), _ymin(ymin), _ymax(ymax) {}
+
+        integ::IntRegion<double> operator()(double x) const
+        {
+            double ymin, ymax;
+            splits.clear();
+            _p.getYRangeX(x,ymin,ymax,splits);
+            ymin = std::max(ymin, _ymin);
+            ymax = std::min(ymax, _ymax);
+            if (ymax < ymin) ymax = ymin;
+            integ::IntRegion<double> reg(ymin,ymax);
+            for(size_t k=0;k<splits.size();++k) {
+                double s = splits[k];
+                if (s > ymin && s < ymax) reg.addSplit(s);
+            }
+            return reg;
+        }
+    private:
+        const SBProfile& _p;
+        double _ymin, _ymax;
+        mutable std::vector<double> splits;
+    };
+
+    static bool HasSplit(const std::vector<double>& splits, double a, double b)
+    {
+        for(size_t k=0;k<splits.size();++k) 
+            if (splits[k] > a && splits[k] < b) return true;
+        return false;
+    }
+
+    // Check whether the corners of the cell are all inside the profile's x range and y range, 
+    // so the profile probably doesn't have an edge running through the cell.
+    // (getYRangeX is only valid for x inside the x range, so check that first.  The comparisons
+    // are written so that a NaN range counts as outside.)
+    static bool CornersInside(const SBProfile& p, double xa, double xb, double ya, double yb,
+                              std::vector<double>& splits)
+    {
+        double xmin, xmax, ymin, ymax;
+        splits.clear();
+        p.getXRange(xmin,xmax,splits);
+        if (!(xa >= xmin && xb <= xmax)) return false;
+        splits.clear();
+        p.getYRangeX(xa,ymin,ymax,splits);
+        if (!(ya >= ymin && yb <= ymax) || HasSplit(splits,ya,yb)) return false;
+        splits.clear();
+        p.getYRangeX(xb,ymin,ymax,splits);
+        if (!(ya >= ymin && yb <= ymax) || HasSplit(splits,ya,yb)) return false;
+        return true;
+    }
+
+    // The values of the profile on the grid points of one row of cells, each of which is
+    // divided into 4x4 sub-cells.  The values are only calculated when they are first needed.
+    // Moving to the next row keeps the values along the shared edge.
+    class CellRowGrid
+    {
+    public:
+        CellRowGrid(const SBProfile& p, const std::vector<double>& ex) : 
+            _p(p), _nu(4*(ex.size()-1)+1), _x(_nu), _y(5), _f(_nu*5), _done(_nu*5,false)
+        {
+            for (size_t a=0; a<ex.size()-1; ++a) {
+                double h = 0.25 * (ex[a+1]-ex[a]);
+                for (int k=0; k<4; ++k) _x[4*a+k] = ex[a] + k*h;
+            }
+            _x[_nu-1] = ex.back();
+        }
+
+        void setRow(double ya, double yb, bool keep_edge)
+        {
+            if (keep_edge) {
+                std::copy(_f.begin()+4*_nu,_f.end(),_f.begin());
+                std::copy(_done.begin()+4*_nu,_done.end(),_done.begin());
+                std::fill(_done.begin()+_nu,_done.end(),false);
+            } else {
+                std::fill(_done.begin(),_done.end(),false);
+            }
+            double h = 0.25 * (yb-ya);
+            for (int l=0; l<4; ++l) _y[l] = ya + l*h;
+            _y[4] = yb;
+        }
+
+        double operator()(int u, int l) 
+        {
+            int k = u + l*_nu;
+            if (!_done[k]) {
+                _f[k] = _p.xValue(Position<double>(_x[u],_y[l]));
+                _done[k] = true;
+            }
+            return _f[k];
+        }
+
+    private:
+        const SBProfile& _p;
+        const int _nu;
+        std::vector<double> _x, _y, _f;
+        std::vector<bool> _done;
+    };
+
+    static const double boole_w[5] = { 7./90., 32./90., 12./90., 32./90., 7./90. };
+    static const double simpson_w[3] = { 1./6., 4./6., 1./6. };
+
+    // The integral of p over the rectangle [xa,xb] x [ya,yb], which is cell a in the row 
+    // currently held by grid.
+    static double IntegrateCell(
+        const SBProfile& p, double xa, double xb, double ya, double yb,
+        CellRowGrid& grid, int a, const std::vector<double>& xsplits,
+        const std::vector<double>& ysplits, bool try_fixed, double relerr, double abserr)
+    {
+        std::vector<double> splits;
+        if (try_fixed && !HasSplit(xsplits,xa,xb) && !HasSplit(ysplits,ya,yb) &&
+            CornersInside(p,xa,xb,ya,yb,splits)) {
+            double boole = 0.;
+            for (int l=0; l<5; ++l) {
+                double sumx = 0.;
+                for (int k=0; k<5; ++k) sumx += boole_w[k] * grid(4*a+k,l);
+                boole += boole_w[l] * sumx;
+            }
+            double simpson = 0.;
+            for (int l=0; l<3; ++l) {
+                double sumx = 0.;
+                for (int k=0; k<3; ++k) sumx += simpson_w[k] * grid(4*a+2*k,2*l);
+                simpson += simpson_w[l] * sumx;
+            }
+            double area = (xb-xa) * (yb-ya);
+            boole *= area;
+            simpson *= area;
+            xdbg<<"Cell "<<xa<<".."<<xb<<" x "<<ya<<".."<<yb<<": Boole = "<<boole<<
+                ", Simpson = "<<simpson<<std::endl;
+            if (std::abs(boole-simpson) <= std::max(relerr * std::abs(boole), abserr)) 
+                return boole;
+        }
+
+        // Otherwise use the adaptive integrator on the part of the cell inside the profile.
+        double xmin, xmax, ymin, ymax;
+        splits.clear();
+        p.getXRange(xmin,xmax,splits);
+        p.getYRange(ymin,ymax,splits);
+        xa = std::max(xa,xmin);
+        xb = std::min(xb,xmax);
+        ya = std::max(ya,ymin);
+        yb = std::min(yb,ymax);
+        if (xa >= xb || ya >= yb) return 0.;
+        xdbg<<"Use adaptive integration for cell "<<xa<<".."<<xb<<" x "<<ya<<".."<<yb<<std::endl;
+        ProfileFunc func(p);
+        integ::IntRegion<double> xreg(xa,xb);
+        for(size_t k=0;k<xsplits.size();++k) {
+            double s = xsplits[k];
+            if (s > xa && s < xb) xreg.addSplit(s);
+        }
+        CellYRegion yreg(p,ya,yb);
+        return integ::int2d(func, xreg, yreg, relerr, abserr);
+    }
+
+    // Find the edges of the boxes of width w centered at x0 + i dx for i = 0..m-1.
+    // Edges that coincide (e.g. when w = dx) are only included once.  
+    // The edges of box i are edges[lo[i]] and edges[hi[i]].
+    static void GetCellEdges(double x0, double dx, int m, double w, std::vector<double>& edges, 
+                             std::vector<int>& lo, std::vector<int>& hi)
+    {
+        std::vector<double> all(2*m);
+        for (int i=0; i<m; ++i) {
+            all[2*i] = x0 + i*dx - 0.5*w;
+            all[2*i+1] = x0 + i*dx + 0.5*w;
+        }
+        std::sort(all.begin(),all.end());
+        const double tol = 1.e-10 * (std::abs(dx) + w);
+        edges.clear();
+        edges.push_back(all[0]);
+        for (int k=1; k<2*m; ++k) 
+            if (all[k] - edges.back() > tol) edges.push_back(all[k]);
+        lo.resize(m);
+        hi.resize(m);
+        for (int i=0; i<m; ++i) {
+            double x = x0 + i*dx;
+            lo[i] = std::lower_bound(edges.begin(),edges.end(),x-0.5*w-tol) - edges.begin();
+            hi[i] = std::lower_bound(edges.begin(),edges.end(),x+0.5*w-tol) - edges.begin();
+            assert(lo[i] < hi[i] && hi[i] < int(edges.size()));
+        }
+    }
+
+    void RealSpaceConvolveBox(
+        const SBProfile& p, double xw, double yw, double norm,
+        tmv::MatrixView<double> val, double x0, double dx, double y0, double dy,
+        double flux, const GSParams* gsparams)
+    {
+        dbg<<"Start RealSpaceConvolveBox for box "<<xw<<" x "<<yw<<std::endl;
+        dbg<<"x = "<<x0<<" + ix * "<<dx<<std::endl;
+        dbg<<"y = "<<y0<<" + iy * "<<dy<<std::endl;
+        const int m = val.colsize();
+        const int n = val.rowsize();
+
+        std::vector<double> ex, ey;
+        std::vector<int> xlo, xhi, ylo, yhi;
+        GetCellEdges(x0,dx,m,xw,ex,xlo,xhi);
+        GetCellEdges(y0,dy,n,yw,ey,ylo,yhi);
+        const int nx = ex.size()-1;
+        const int ny = ey.size()-1;
+        dbg<<"Number of cells = "<<nx<<" x "<<ny<<std::endl;
+
+        // Only integrate the cells that are inside at least one box.
+        // Also find the largest number of cells in any box, which determines how accurate
+        // each cell needs to be.
+        std::vector<bool> xuse(nx,false), yuse(ny,false);
+        int kx = 1, ky = 1;
+        for (int i=0; i<m; ++i) {
+            for (int a=xlo[i]; a<xhi[i]; ++a) xuse[a] = true;
+            kx = std::max(kx, xhi[i]-xlo[i]);
+        }
+        for (int j=0; j<n; ++j) {
+            for (int b=ylo[j]; b<yhi[j]; ++b) yuse[b] = true;
+            ky = std::max(ky, yhi[j]-ylo[j]);
+        }
+        const double relerr = gsparams->realspace_relerr;
+        const double abserr = gsparams->realspace_abserr * std::abs(flux / norm) / (kx*ky);
+
+        double xmin, xmax, ymin, ymax;
+        std::vector<double> xsplits, ysplits;
+        p.getXRange(xmin,xmax,xsplits);
+        p.getYRange(ymin,ymax,ysplits);
+        xdbg<<"Profile x range = "<<xmin<<" ... "<<xmax<<std::endl;
+        xdbg<<"Profile y range = "<<ymin<<" ... "<<ymax<<std::endl;
+
+        // The fixed rule could miss features much smaller than a sub-cell, so only try it
+        // when the cells are not much larger than the smallest scale in the profile.
+        const double max_cell = 4. / p.maxK();
+
+        // sum(a,b) = sum of the integrals of all cells below a and b.
+        tmv::Matrix<double> sum(nx+1,ny+1);
+        sum.setZero();
+        CellRowGrid grid(p,ex);
+        int grid_row = -1;
+        for (int b=0; b<ny; ++b) {
+            if (!yuse[b] || ey[b+1] <= ymin || ey[b] >= ymax) {
+                for (int a=0; a<nx; ++a) sum(a+1,b+1) = sum(a+1,b);
+                continue;
+            }
+            grid.setRow(ey[b],ey[b+1],grid_row == b-1);
+            grid_row = b;
+            for (int a=0; a<nx; ++a) {
+                double cell = 0.;
+                if (xuse[a] && ex[a+1] > xmin && ex[a] < xmax) {
+                    bool try_fixed = ex[a+1]-ex[a] <= max_cell && ey[b+1]-ey[b] <= max_cell;
+                    cell = IntegrateCell(p,ex[a],ex[a+1],ey[b],ey[b+1],grid,a,xsplits,ysplits,
+                                         try_fixed,relerr,abserr);
+                }
+                sum(a+1,b+1) = cell + sum(a,b+1) + sum(a+1,b) - sum(a,b);
+            }
+        }
+
+        for (int j=0; j<n; ++j) {
+            for (int i=0; i<m; ++i) {
+                val(i,j) = norm * (sum(xhi[i],yhi[j]) - sum(xlo[i],yhi[j]) -
+                                   sum(xhi[i],ylo[j]) + sum(xlo[i],ylo[j]));
+            }
+        }
+    }
+
 }
@@ -212,7 +212,8 @@ namespace galsim {
         double fluxPerPhoton = totalAbsoluteFlux / N;
 
         // Initialize the output array
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(0));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(0);
+        result->reserve(N);
 
         double remainingAbsoluteFlux = totalAbsoluteFlux;
         int remainingN = N;
@@ -90,6 +90,21 @@ namespace galsim {
     LRUCache<std::pair<double, const GSParams*>, AiryInfo>
         SBAiry::SBAiryImpl::cache(MAX_AIRY_INFO);
 
+    void SBAiry::setCacheSize(int nmax)
+    {
+        if (nmax < 1) throw SBError("SBAiry cache size must be at least 1");
+        SBAiryImpl::cache.resize(nmax);
+    }
+
+    void SBAiry::clearCache() 
+    { SBAiryImpl::cache.clear(); }
+
+    LRUCacheStats SBAiry::getCacheStats() 
+    { return SBAiryImpl::cache.getStats(); }
+
+    void SBAiry::resetCacheStats() 
+    { SBAiryImpl::cache.resetStats(); }
+
     // This is a scale-free version of the Airy radial function.
     // Input radius is in units of lambda/D.  Output normalized
     // to integrate to unity over input units.
@@ -367,6 +382,11 @@ namespace galsim {
         int N, UniformDeviate u) const
     {
         // Use the OneDimensionalDeviate to sample from scale-free distribution
+        // (The sampler is built on first use, so make sure only one thread does so when 
+        // drawShoot is run with multiple threads.)
+#ifdef _OPENMP
+#pragma omp critical (galsim_airy_sampler)
+#endif
         checkSampler();
         assert(_sampler.get());
         return _sampler->shoot(N, u);
@@ -375,6 +395,22 @@ namespace galsim {
     void AiryInfoObs::checkSampler() const 
     {
         if (this->_sampler.get()) return;
+        // If this sampler has been built before (in any process), read it from the
+        // disk cache rather than rebuilding it.
+        std::vector<double> cache_key = InfoDiskCache::makeKey(*_gsparams);
+        cache_key.push_back(_obscuration);
+        std::vector<double> cache_data;
+        if (InfoDiskCache::read("AiryObs",cache_key,cache_data)) {
+            // If the cached data are invalid (e.g. a truncated file), rebuild the sampler
+            // below, which also rewrites the cache file.
+            try {
+                this->_sampler.reset(new OneDimensionalDeviate(_radial, cache_data, true));
+                return;
+            } catch (std::exception& e) {
+                dbg<<"Invalid cached AiryObs data: "<<e.what()<<std::endl;
+                cache_data.clear();
+            }
+        }
         std::vector<double> ranges(1,0.);
         // Break Airy function into ranges that will not have >1 extremum:
         double rmin = 1.1 - 0.5*_obscuration;
@@ -389,6 +425,10 @@ namespace galsim {
         ranges.reserve(int((rmax-rmin+2)/0.5+0.5));
         for(double r=rmin; r<=rmax; r+=0.5) ranges.push_back(r);
         this->_sampler.reset(new OneDimensionalDeviate(_radial, ranges, true));
+        if (!InfoDiskCache::getDirectory().empty()) {
+            this->_sampler->getData(cache_data);
+            InfoDiskCache::write("AiryObs",cache_key,cache_data);
+        }
     }
 
     // Now the specializations for when obs = 0
@@ -447,6 +487,19 @@ namespace galsim {
     void AiryInfoNoObs::checkSampler() const 
     {
         if (this->_sampler.get()) return;
+        std::vector<double> cache_key = InfoDiskCache::makeKey(*_gsparams);
+        std::vector<double> cache_data;
+        if (InfoDiskCache::read("AiryNoObs",cache_key,cache_data)) {
+            // If the cached data are invalid (e.g. a truncated file), rebuild the sampler
+            // below, which also rewrites the cache file.
+            try {
+                this->_sampler.reset(new OneDimensionalDeviate(_radial, cache_data, true));
+                return;
+            } catch (std::exception& e) {
+                dbg<<"Invalid cached AiryNoObs data: "<<e.what()<<std::endl;
+                cache_data.clear();
+            }
+        }
         std::vector<double> ranges(1,0.);
         double rmin = 1.1;
         double rmax = 2./(_gsparams->shoot_accuracy * M_PI*M_PI);
@@ -457,5 +510,9 @@ namespace galsim {
         ranges.reserve(int((rmax-rmin+2)/0.5+0.5));
         for(double r=rmin; r<=rmax; r+=0.5) ranges.push_back(r);
         this->_sampler.reset(new OneDimensionalDeviate(_radial, ranges, true));
+        if (!InfoDiskCache::getDirectory().empty()) {
+            this->_sampler->getData(cache_data);
+            InfoDiskCache::write("AiryNoObs",cache_key,cache_data);
+        }
     }
 }
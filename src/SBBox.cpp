@@ -284,7 +284,7 @@ namespace galsim {
     {
         dbg<<"Box shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = "<<getFlux()<<std::endl;
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         for (int i=0; i<result->size(); i++)
             result->setPhoton(i, _xw*(u()-0.5), _yw*(u()-0.5), _flux/N);
         dbg<<"Box Realized flux = "<<result->getTotalFlux()<<std::endl;
@@ -23,6 +23,7 @@
 
 #include "SBConvolve.h"
 #include "SBConvolveImpl.h"
+#include "SBBoxImpl.h"
 
 #ifdef DEBUGLOGGING
 #include <fstream>
@@ -33,21 +34,26 @@
 namespace galsim {
 
     SBConvolve::SBConvolve(const std::list<SBProfile>& slist, bool real_space,
-                           boost::shared_ptr<GSParams> gsparams) :
-        SBProfile(new SBConvolveImpl(slist,real_space,gsparams)) {}
+                           boost::shared_ptr<GSParams> gsparams, int ncache) :
+        SBProfile(new SBConvolveImpl(slist,real_space,gsparams,ncache)) {}
 
     SBConvolve::SBConvolve(const SBConvolve& rhs) : SBProfile(rhs) {}
 
     SBConvolve::~SBConvolve() {}
 
     SBConvolve::SBConvolveImpl::SBConvolveImpl(const std::list<SBProfile>& slist, bool real_space,
-                                               boost::shared_ptr<GSParams> gsparams) :
+                                               boost::shared_ptr<GSParams> gsparams, int ncache) :
         SBProfileImpl(gsparams.get() ? gsparams :
                       GetImpl(slist.front())->gsparams),
-        _real_space(real_space)
+        _real_space(real_space), _ncache(0)
     {
-        for (ConstIter sptr = slist.begin(); sptr!=slist.end(); ++sptr)
+        int i = 0;
+        for (ConstIter sptr = slist.begin(); sptr!=slist.end(); ++sptr, ++i) {
             add(*sptr);
+            // Any SBConvolve in the list is expanded into its components, so count the number
+            // of cached profiles after the expansion.
+            if (i < ncache) _ncache = _plist.size();
+        }
         initialize(); 
     }
 
@@ -124,6 +130,58 @@ namespace galsim {
             throw SBError("Real-space integration of more than 2 profiles is not implemented.");
     }
 
+    const SBProfile* SBConvolve::SBConvolveImpl::getBoxConvolvee(
+        double& xw, double& yw, double& norm) const
+    {
+        if (!_real_space || _plist.size() != 2) return 0;
+        const SBProfile& p1 = _plist.front();
+        const SBProfile& p2 = _plist.back();
+        const SBBox::SBBoxImpl* box = dynamic_cast<const SBBox::SBBoxImpl*>(GetImpl(p2));
+        const SBProfile* other = &p1;
+        if (!box) {
+            box = dynamic_cast<const SBBox::SBBoxImpl*>(GetImpl(p1));
+            other = &p2;
+        }
+        if (!box) return 0;
+        xw = box->getXWidth();
+        yw = box->getYWidth();
+        norm = box->getFlux() / (xw * yw);
+        return other;
+    }
+
+    void SBConvolve::SBConvolveImpl::fillXValue(tmv::MatrixView<double> val,
+                                                double x0, double dx, int ix_zero,
+                                                double y0, double dy, int iy_zero) const
+    {
+        dbg<<"SBConvolve fillXValue\n";
+        dbg<<"x = "<<x0<<" + ix * "<<dx<<", ix_zero = "<<ix_zero<<std::endl;
+        dbg<<"y = "<<y0<<" + iy * "<<dy<<", iy_zero = "<<iy_zero<<std::endl;
+        double xw, yw, norm;
+        const SBProfile* p = getBoxConvolvee(xw,yw,norm);
+        if (p) 
+            RealSpaceConvolveBox(*p,xw,yw,norm,val,x0,dx,y0,dy,_fluxProduct,
+                                 this->gsparams.get());
+        else 
+            SBProfileImpl::fillXValue(val,x0,dx,ix_zero,y0,dy,iy_zero);
+    }
+
+    void SBConvolve::SBConvolveImpl::fillXValue(tmv::MatrixView<double> val,
+                                                double x0, double dx, double dxy,
+                                                double y0, double dy, double dyx) const
+    {
+        dbg<<"SBConvolve fillXValue\n";
+        dbg<<"x = "<<x0<<" + ix * "<<dx<<" + iy * "<<dxy<<std::endl;
+        dbg<<"y = "<<y0<<" + ix * "<<dyx<<" + iy * "<<dy<<std::endl;
+        double xw, yw, norm;
+        const SBProfile* p = getBoxConvolvee(xw,yw,norm);
+        // The boxes need to be aligned with the grid.
+        if (p && dxy == 0. && dyx == 0.)
+            RealSpaceConvolveBox(*p,xw,yw,norm,val,x0,dx,y0,dy,_fluxProduct,
+                                 this->gsparams.get());
+        else 
+            SBProfileImpl::fillXValue(val,x0,dx,dxy,y0,dy,dyx);
+    }
+
     std::complex<double> SBConvolve::SBConvolveImpl::kValue(const Position<double>& k) const 
     {
         ConstIter pptr = _plist.begin();
@@ -140,16 +198,9 @@ namespace galsim {
         dbg<<"SBConvolve fillKValue\n";
         dbg<<"x = "<<x0<<" + ix * "<<dx<<", ix_zero = "<<ix_zero<<std::endl;
         dbg<<"y = "<<y0<<" + iy * "<<dy<<", iy_zero = "<<iy_zero<<std::endl;
-        ConstIter pptr = _plist.begin();
-        assert(pptr != _plist.end());
-        GetImpl(*pptr)->fillKValue(val,x0,dx,ix_zero,y0,dy,iy_zero);
-        if (++pptr != _plist.end()) {
-            tmv::Matrix<std::complex<double> > val2(val.colsize(),val.rowsize());
-            for (; pptr != _plist.end(); ++pptr) {
-                GetImpl(*pptr)->fillKValue(val2.view(),x0,dx,ix_zero,y0,dy,iy_zero);
-                val = ElemProd(val,val2);
-            }
-        }
+        KGrid grid = { false, x0, dx, 0., y0, dy, 0., ix_zero, iy_zero,
+                       int(val.colsize()), int(val.rowsize()) };
+        fillKValue(val,grid);
     }
 
     void SBConvolve::SBConvolveImpl::fillKValue(tmv::MatrixView<std::complex<double> > val,
@@ -159,18 +210,143 @@ namespace galsim {
         dbg<<"SBConvolve fillKValue\n";
         dbg<<"x = "<<x0<<" + ix * "<<dx<<" + iy * "<<dxy<<std::endl;
         dbg<<"y = "<<y0<<" + ix * "<<dyx<<" + iy * "<<dy<<std::endl;
+        KGrid grid = { true, x0, dx, dxy, y0, dy, dyx, 0, 0,
+                       int(val.colsize()), int(val.rowsize()) };
+        fillKValue(val,grid);
+    }
+
+    void SBConvolve::SBConvolveImpl::fillKValue(tmv::MatrixView<std::complex<double> > val,
+                                                const KGrid& grid) const
+    {
         ConstIter pptr = _plist.begin();
         assert(pptr != _plist.end());
-        GetImpl(*pptr)->fillKValue(val,x0,dx,dxy,y0,dy,dyx);
-        if (++pptr != _plist.end()) {
+        if (_ncache > 0) {
+            val = *getCachedKValues(grid);
+            for (int i=0; i<_ncache; ++i) ++pptr;
+        } else {
+            fillKValue(val,grid,*pptr++);
+        }
+        if (pptr != _plist.end()) {
             tmv::Matrix<std::complex<double> > val2(val.colsize(),val.rowsize());
             for (; pptr != _plist.end(); ++pptr) {
-                GetImpl(*pptr)->fillKValue(val2.view(),x0,dx,dxy,y0,dy,dyx);
+                fillKValue(val2.view(),grid,*pptr);
                 val = ElemProd(val,val2);
             }
         }
     }
 
+    void SBConvolve::SBConvolveImpl::fillKValue(tmv::MatrixView<std::complex<double> > val,
+                                                const KGrid& grid, const SBProfile& prof) const
+    {
+        if (grid.general)
+            GetImpl(prof)->fillKValue(val,grid.x0,grid.dx,grid.dxy,grid.y0,grid.dy,grid.dyx);
+        else
+            GetImpl(prof)->fillKValue(val,grid.x0,grid.dx,grid.ix_zero,
+                                      grid.y0,grid.dy,grid.iy_zero);
+    }
+
+    bool SBConvolve::SBConvolveImpl::KGrid::operator==(const KGrid& rhs) const
+    {
+        return (general == rhs.general && m == rhs.m && n == rhs.n &&
+                x0 == rhs.x0 && dx == rhs.dx && dxy == rhs.dxy &&
+                y0 == rhs.y0 && dy == rhs.dy && dyx == rhs.dyx &&
+                ix_zero == rhs.ix_zero && iy_zero == rhs.iy_zero);
+    }
+
+    // An entry in the cache of k values used by getCachedKValues.  The entry holds copies of
+    // the profiles it was computed from, which keeps their implementations alive, so the
+    // implementation pointers used as the key cannot be reused by some other profile.
+    struct SBConvolve::SBConvolveImpl::KCacheEntry
+    {
+        std::list<SBProfile> profiles;
+        std::vector<const SBProfileImpl*> impls;
+        KGrid grid;
+        boost::shared_ptr<const tmv::Matrix<std::complex<double> > > kval;
+    };
+
+    // The default maximum number of tables to keep in the cache.
+    const int MAX_KCACHE = 4;
+
+    std::list<SBConvolve::SBConvolveImpl::KCacheEntry> SBConvolve::SBConvolveImpl::kcache;
+    int SBConvolve::SBConvolveImpl::max_kcache = MAX_KCACHE;
+
+    // The cache is shared by all SBConvolve objects, which may be drawn from several OpenMP
+    // threads at once, so it is only accessed inside the critical section galsim_convolve_kcache.
+    void SBConvolve::setCacheSize(int nmax)
+    {
+        if (nmax < 1) throw SBError("SBConvolve cache size must be at least 1");
+#ifdef _OPENMP
+#pragma omp critical (galsim_convolve_kcache)
+#endif
+        {
+            SBConvolveImpl::max_kcache = nmax;
+            while (int(SBConvolveImpl::kcache.size()) > nmax) SBConvolveImpl::kcache.pop_back();
+        }
+    }
+
+    void SBConvolve::clearCache()
+    {
+#ifdef _OPENMP
+#pragma omp critical (galsim_convolve_kcache)
+#endif
+        SBConvolveImpl::kcache.clear();
+    }
+
+    boost::shared_ptr<const tmv::Matrix<std::complex<double> > >
+    SBConvolve::SBConvolveImpl::getCachedKValues(const KGrid& grid) const
+    {
+        ConstIter pend = _plist.begin();
+        std::vector<const SBProfileImpl*> impls;
+        for (int i=0; i<_ncache; ++i, ++pend) impls.push_back(GetImpl(*pend));
+
+        boost::shared_ptr<const tmv::Matrix<std::complex<double> > > cached;
+#ifdef _OPENMP
+#pragma omp critical (galsim_convolve_kcache)
+#endif
+        {
+            for (std::list<KCacheEntry>::iterator it=kcache.begin(); it!=kcache.end(); ++it) {
+                if (it->impls == impls && it->grid == grid) {
+                    kcache.splice(kcache.begin(), kcache, it);
+                    cached = kcache.front().kval;
+                    break;
+                }
+            }
+        }
+        if (cached) {
+            dbg<<"Using cached k values for "<<_ncache<<" profiles\n";
+            return cached;
+        }
+
+        dbg<<"Computing k values to cache for "<<_ncache<<" profiles\n";
+        boost::shared_ptr<tmv::Matrix<std::complex<double> > > kval(
+            new tmv::Matrix<std::complex<double> >(grid.m,grid.n));
+        ConstIter pptr = _plist.begin();
+        fillKValue(kval->view(),grid,*pptr);
+        if (++pptr != pend) {
+            tmv::Matrix<std::complex<double> > val2(grid.m,grid.n);
+            for (; pptr != pend; ++pptr) {
+                fillKValue(val2.view(),grid,*pptr);
+                *kval = ElemProd(*kval,val2);
+            }
+        }
+
+        // The k values are computed outside the critical section, so two threads might both
+        // compute the same table.  Then there are two equal entries, which is harmless.
+#ifdef _OPENMP
+#pragma omp critical (galsim_convolve_kcache)
+#endif
+        {
+            kcache.push_front(KCacheEntry());
+            KCacheEntry& entry = kcache.front();
+            entry.profiles.assign(_plist.begin(), pend);
+            entry.impls = impls;
+            entry.grid = grid;
+            entry.kval = kval;
+            while (int(kcache.size()) > max_kcache) kcache.pop_back();
+        }
+        return kval;
+    }
+
     double SBConvolve::SBConvolveImpl::getPositiveFlux() const 
     {
         if (_plist.empty()) return 0.;
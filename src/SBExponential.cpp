@@ -70,6 +70,21 @@ namespace galsim {
     LRUCache<const GSParams*, ExponentialInfo>
         SBExponential::SBExponentialImpl::cache(MAX_EXPONENTIAL_INFO);
 
+    void SBExponential::setCacheSize(int nmax)
+    {
+        if (nmax < 1) throw SBError("SBExponential cache size must be at least 1");
+        SBExponentialImpl::cache.resize(nmax);
+    }
+
+    void SBExponential::clearCache() 
+    { SBExponentialImpl::cache.clear(); }
+
+    LRUCacheStats SBExponential::getCacheStats() 
+    { return SBExponentialImpl::cache.getStats(); }
+
+    void SBExponential::resetCacheStats() 
+    { SBExponentialImpl::cache.resetStats(); }
+
     SBExponential::SBExponentialImpl::SBExponentialImpl(
         double r0, double flux, boost::shared_ptr<GSParams> gsparams) :
         SBProfileImpl(gsparams),
@@ -331,7 +346,7 @@ namespace galsim {
         const double Y_TOLERANCE=this->gsparams->shoot_accuracy;
 
         double fluxPerPhoton = _flux / N;
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
 
         for (int i=0; i<N; i++) {
             double y = u();
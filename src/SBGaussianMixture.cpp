@@ -0,0 +1,358 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+//#define DEBUGLOGGING
+
+#include <algorithm>
+#include "SBGaussianMixture.h"
+#include "SBGaussianMixtureImpl.h"
+
+#ifdef DEBUGLOGGING
+#include <fstream>
+//std::ostream* dbgout = new std::ofstream("debug.out");
+//int verbose_level = 1;
+#endif
+
+namespace galsim {
+
+
+    SBGaussianMixture::SBGaussianMixture(
+        const std::vector<double>& flux,
+        const std::vector<double>& x0, const std::vector<double>& y0,
+        const std::vector<double>& cxx, const std::vector<double>& cxy,
+        const std::vector<double>& cyy, boost::shared_ptr<GSParams> gsparams) : 
+        SBProfile(new SBGaussianMixtureImpl(flux, x0, y0, cxx, cxy, cyy, gsparams)) {}
+
+    SBGaussianMixture::SBGaussianMixture(const SBGaussianMixture& rhs) : SBProfile(rhs) {}
+
+    SBGaussianMixture::~SBGaussianMixture() {}
+
+    int SBGaussianMixture::getNComponents() const 
+    { 
+        assert(dynamic_cast<const SBGaussianMixtureImpl*>(_pimpl.get()));
+        return static_cast<const SBGaussianMixtureImpl&>(*_pimpl).getNComponents(); 
+    }
+
+    SBGaussianMixture::SBGaussianMixtureImpl::SBGaussianMixtureImpl(
+        const std::vector<double>& flux,
+        const std::vector<double>& x0, const std::vector<double>& y0,
+        const std::vector<double>& cxx, const std::vector<double>& cxy,
+        const std::vector<double>& cyy, boost::shared_ptr<GSParams> gsparams) :
+        SBProfileImpl(gsparams),
+        _flux(0.), _pos_flux(0.), _neg_flux(0.), _axisymmetric(true),
+        _flux_i(flux), _x0(x0), _y0(y0), _cxx(cxx), _cxy(cxy), _cyy(cyy)
+    {
+        const int n = _flux_i.size();
+        if (n == 0) throw SBError("SBGaussianMixture requires at least one component");
+        if (int(_x0.size()) != n || int(_y0.size()) != n ||
+            int(_cxx.size()) != n || int(_cxy.size()) != n || int(_cyy.size()) != n)
+            throw SBError("SBGaussianMixture component arrays must all have the same length");
+
+        _ixx.resize(n); _ixy.resize(n); _iyy.resize(n);
+        _norm.resize(n);
+        _l11.resize(n); _l21.resize(n); _l22.resize(n);
+        _cum_flux.resize(n);
+
+        // The criteria for maxK and stepK are the same ones SBGaussian uses, applied
+        // to each component along its narrowest and widest axis respectively.
+        const double kfactor = -2.*std::log(this->gsparams->maxk_threshold);
+        double R = sqrt(-2.*std::log(this->gsparams->alias_threshold));
+        R = std::max(4., R);
+        double maxksq = 0.;
+        double maxr = 0.;
+        for (int i=0; i<n; ++i) {
+            double det = _cxx[i]*_cyy[i] - _cxy[i]*_cxy[i];
+            if (!(_cxx[i] > 0. && det > 0.))
+                throw SBError("SBGaussianMixture covariance matrices must be positive definite");
+            _ixx[i] = _cyy[i] / det;
+            _ixy[i] = -_cxy[i] / det;
+            _iyy[i] = _cxx[i] / det;
+            _norm[i] = _flux_i[i] / (2. * M_PI * std::sqrt(det));
+
+            _l11[i] = std::sqrt(_cxx[i]);
+            _l21[i] = _cxy[i] / _l11[i];
+            _l22[i] = std::sqrt(det) / _l11[i];
+
+            _flux += _flux_i[i];
+            if (_flux_i[i] > 0.) _pos_flux += _flux_i[i];
+            else _neg_flux -= _flux_i[i];
+            _cum_flux[i] = _pos_flux + _neg_flux;
+
+            // Eigenvalues of the covariance matrix
+            double mean = 0.5 * (_cxx[i] + _cyy[i]);
+            double diff = 0.5 * (_cxx[i] - _cyy[i]);
+            double disc = std::sqrt(diff*diff + _cxy[i]*_cxy[i]);
+            double lmin = mean - disc;
+            double lmax = mean + disc;
+            if (_flux_i[i] != 0.) {
+                maxksq = std::max(maxksq, kfactor / lmin);
+                double r = std::sqrt(_x0[i]*_x0[i] + _y0[i]*_y0[i]) + R * std::sqrt(lmax);
+                maxr = std::max(maxr, r);
+            }
+            if (_x0[i] != 0. || _y0[i] != 0. || _cxy[i] != 0. || _cxx[i] != _cyy[i])
+                _axisymmetric = false;
+        }
+        if (maxr == 0.) throw SBError("SBGaussianMixture requires a non-zero flux component");
+        _maxk = std::sqrt(maxksq);
+        _stepk = M_PI / maxr;
+
+        // For large Q = (r-r0)^T C^-1 (r-r0), or k^T C k in k space, we clip each component
+        // to 0.  As for SBGaussian, we do this when it is less than xvalue_accuracy or 
+        // kvalue_accuracy times its peak value.
+        _qmax_x = -2. * std::log(this->gsparams->xvalue_accuracy);
+        _qmax_k = -2. * std::log(this->gsparams->kvalue_accuracy);
+
+        dbg<<"GaussianMixture:\n";
+        dbg<<"n = "<<n<<std::endl;
+        dbg<<"_flux = "<<_flux<<std::endl;
+        dbg<<"_pos_flux = "<<_pos_flux<<std::endl;
+        dbg<<"_neg_flux = "<<_neg_flux<<std::endl;
+        dbg<<"maxK() = "<<maxK()<<std::endl;
+        dbg<<"stepK() = "<<stepK()<<std::endl;
+    }
+
+    Position<double> SBGaussianMixture::SBGaussianMixtureImpl::centroid() const 
+    {
+        double sumx = 0.;
+        double sumy = 0.;
+        const int n = _flux_i.size();
+        if (_flux != 0.) {
+            for (int i=0; i<n; ++i) {
+                sumx += _flux_i[i] * _x0[i];
+                sumy += _flux_i[i] * _y0[i];
+            }
+            return Position<double>(sumx / _flux, sumy / _flux);
+        } else {
+            // If the component fluxes cancel, the flux-weighted centroid is undefined, so 
+            // weight by the absolute fluxes instead.  If all the fluxes are zero, use (0,0).
+            double sumf = 0.;
+            for (int i=0; i<n; ++i) {
+                double f = std::abs(_flux_i[i]);
+                sumx += f * _x0[i];
+                sumy += f * _y0[i];
+                sumf += f;
+            }
+            if (sumf == 0.) return Position<double>(0.,0.);
+            return Position<double>(sumx / sumf, sumy / sumf);
+        }
+    }
+
+    double SBGaussianMixture::SBGaussianMixtureImpl::xValue(const Position<double>& p) const
+    {
+        double sum = 0.;
+        const int n = _flux_i.size();
+        for (int i=0; i<n; ++i) {
+            double x = p.x - _x0[i];
+            double y = p.y - _y0[i];
+            double q = _ixx[i]*x*x + 2.*_ixy[i]*x*y + _iyy[i]*y*y;
+            if (q <= _qmax_x) sum += _norm[i] * std::exp(-0.5 * q);
+        }
+        return sum;
+    }
+
+    std::complex<double> SBGaussianMixture::SBGaussianMixtureImpl::kValue(
+        const Position<double>& k) const
+    {
+        std::complex<double> sum = 0.;
+        const int n = _flux_i.size();
+        for (int i=0; i<n; ++i) {
+            double q = _cxx[i]*k.x*k.x + 2.*_cxy[i]*k.x*k.y + _cyy[i]*k.y*k.y;
+            if (q <= _qmax_k)
+                sum += std::polar(_flux_i[i] * std::exp(-0.5 * q),
+                                  -(k.x*_x0[i] + k.y*_y0[i]));
+        }
+        return sum;
+    }
+
+    // Along a column of the image, the points are p + i s for i = 0..m-1, so the quadratic 
+    // form of a component is a quadratic in i:
+    //     Q(i) = c0 + 2 c1 i + c2 i^2
+    // Find the range [i1,i2] where Q(i) <= qmax.  Returns false if there are no such i.
+    static bool GetWindow(double c0, double c1, double c2, double qmax, int m, int& i1, int& i2)
+    {
+        if (c2 <= 0.) {
+            // Then s = 0, so Q is the same all along the column.
+            if (c0 > qmax) return false;
+            i1 = 0;
+            i2 = m-1;
+            return true;
+        }
+        double disc = c1*c1 - c2*(c0-qmax);
+        if (disc < 0.) return false;
+        disc = std::sqrt(disc);
+        double lo = std::ceil((-c1 - disc) / c2);
+        double hi = std::floor((-c1 + disc) / c2);
+        if (hi < 0. || lo > m-1) return false;
+        i1 = lo < 0. ? 0 : int(lo);
+        i2 = hi > m-1 ? m-1 : int(hi);
+        return i1 <= i2;
+    }
+
+    // Add amp exp(-Q(i)/2) to col[i] for each i in the window.  Rather than calling exp
+    // for every pixel, use the ratio of consecutive terms, which is itself geometric:
+    //     exp(-Q(i+1)/2) / exp(-Q(i)/2) = exp(-c1 - c2 (i+1/2))
+    static void AddXColumn(double* col, int m, double px, double py, double sx, double sy,
+                           double qxx, double qxy, double qyy, double qmax, double amp)
+    {
+        double c0 = qxx*px*px + 2.*qxy*px*py + qyy*py*py;
+        double c1 = qxx*px*sx + qxy*(px*sy+py*sx) + qyy*py*sy;
+        double c2 = qxx*sx*sx + 2.*qxy*sx*sy + qyy*sy*sy;
+        int i1, i2;
+        if (!GetWindow(c0,c1,c2,qmax,m,i1,i2)) return;
+        double v = amp * std::exp(-0.5 * (c0 + (2.*c1 + c2*i1)*i1));
+        double r = std::exp(-c1 - c2*(i1+0.5));
+        const double d = std::exp(-c2);
+        for (int i=i1; i<=i2; ++i) {
+            col[i] += v;
+            v *= r;
+            r *= d;
+        }
+    }
+
+    // The same for k space, where there is also a linear phase exp(-i (p + i s).r0).
+    static void AddKColumn(std::complex<double>* col, int m,
+                           double px, double py, double sx, double sy,
+                           double qxx, double qxy, double qyy, double qmax, double amp,
+                           double ph0, double dph)
+    {
+        double c0 = qxx*px*px + 2.*qxy*px*py + qyy*py*py;
+        double c1 = qxx*px*sx + qxy*(px*sy+py*sx) + qyy*py*sy;
+        double c2 = qxx*sx*sx + 2.*qxy*sx*sy + qyy*sy*sy;
+        int i1, i2;
+        if (!GetWindow(c0,c1,c2,qmax,m,i1,i2)) return;
+        std::complex<double> v = std::polar(amp * std::exp(-0.5 * (c0 + (2.*c1 + c2*i1)*i1)),
+                                            ph0 + dph*i1);
+        if (dph == 0.) {
+            double r = std::exp(-c1 - c2*(i1+0.5));
+            const double d = std::exp(-c2);
+            for (int i=i1; i<=i2; ++i) {
+                col[i] += v;
+                v *= r;
+                r *= d;
+            }
+        } else {
+            std::complex<double> r = std::polar(std::exp(-c1 - c2*(i1+0.5)), dph);
+            const double d = std::exp(-c2);
+            for (int i=i1; i<=i2; ++i) {
+                col[i] += v;
+                v *= r;
+                r *= d;
+            }
+        }
+    }
+
+    // Since the profile is not in general symmetric, the quadrant versions cannot be used.
+    // Just use the general versions with no cross terms.
+    void SBGaussianMixture::SBGaussianMixtureImpl::fillXValue(
+        tmv::MatrixView<double> val,
+        double x0, double dx, int /*ix_zero*/, double y0, double dy, int /*iy_zero*/) const
+    {
+        fillXValue(val,x0,dx,0.,y0,dy,0.);
+    }
+
+    void SBGaussianMixture::SBGaussianMixtureImpl::fillKValue(
+        tmv::MatrixView<std::complex<double> > val,
+        double x0, double dx, int /*ix_zero*/, double y0, double dy, int /*iy_zero*/) const
+    {
+        fillKValue(val,x0,dx,0.,y0,dy,0.);
+    }
+
+    void SBGaussianMixture::SBGaussianMixtureImpl::fillXValue(
+        tmv::MatrixView<double> val,
+        double x0, double dx, double dxy, double y0, double dy, double dyx) const
+    {
+        dbg<<"SBGaussianMixture fillXValue\n";
+        dbg<<"x = "<<x0<<" + ix * "<<dx<<" + iy * "<<dxy<<std::endl;
+        dbg<<"y = "<<y0<<" + ix * "<<dyx<<" + iy * "<<dy<<std::endl;
+        assert(val.stepi() == 1);
+        const int m = val.colsize();
+        const int n = val.rowsize();
+        const int nc = _flux_i.size();
+
+        val.setZero();
+        for (int j=0;j<n;++j,x0+=dxy,y0+=dy) {
+            double* col = val.col(j).begin().getP();
+            for (int c=0;c<nc;++c) {
+                AddXColumn(col, m, x0-_x0[c], y0-_y0[c], dx, dyx,
+                           _ixx[c], _ixy[c], _iyy[c], _qmax_x, _norm[c]);
+            }
+        }
+    }
+
+    void SBGaussianMixture::SBGaussianMixtureImpl::fillKValue(
+        tmv::MatrixView<std::complex<double> > val,
+        double x0, double dx, double dxy, double y0, double dy, double dyx) const
+    {
+        dbg<<"SBGaussianMixture fillKValue\n";
+        dbg<<"x = "<<x0<<" + ix * "<<dx<<" + iy * "<<dxy<<std::endl;
+        dbg<<"y = "<<y0<<" + ix * "<<dyx<<" + iy * "<<dy<<std::endl;
+        assert(val.stepi() == 1);
+        const int m = val.colsize();
+        const int n = val.rowsize();
+        const int nc = _flux_i.size();
+
+        val.setZero();
+        for (int j=0;j<n;++j,x0+=dxy,y0+=dy) {
+            std::complex<double>* col = val.col(j).begin().getP();
+            for (int c=0;c<nc;++c) {
+                double ph0 = -(x0*_x0[c] + y0*_y0[c]);
+                double dph = -(dx*_x0[c] + dyx*_y0[c]);
+                AddKColumn(col, m, x0, y0, dx, dyx,
+                           _cxx[c], _cxy[c], _cyy[c], _qmax_k, _flux_i[c], ph0, dph);
+            }
+        }
+    }
+
+    boost::shared_ptr<PhotonArray> SBGaussianMixture::SBGaussianMixtureImpl::shoot(
+        int N, UniformDeviate u) const 
+    {
+        dbg<<"GaussianMixture shoot: N = "<<N<<std::endl;
+        dbg<<"Target flux = "<<getFlux()<<std::endl;
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
+        const int nc = _flux_i.size();
+        const double absflux = _cum_flux.back();
+        const double fluxPerPhoton = absflux/N;
+        for (int i=0; i<N; i++) {
+            // Pick a component with probability |flux_c| / sum |flux|
+            double f = u() * absflux;
+            int c = std::upper_bound(_cum_flux.begin(), _cum_flux.end(), f) - _cum_flux.begin();
+            if (c >= nc) c = nc-1;
+
+            // Two unit normal deviates from a point uniformly distributed in the unit circle
+            double xu, yu, rsq;
+            do {
+                xu = 2.*u()-1.;
+                yu = 2.*u()-1.;
+                rsq = xu*xu+yu*yu;
+            } while (rsq>=1. || rsq==0.);
+            double rFactor = std::sqrt( -2. * std::log(rsq) / rsq);
+            xu *= rFactor;
+            yu *= rFactor;
+
+            // Then map to the component's Gaussian with its Cholesky factor
+            double x = _x0[c] + _l11[c]*xu;
+            double y = _y0[c] + _l21[c]*xu + _l22[c]*yu;
+            result->setPhoton(i, x, y, _flux_i[c] >= 0. ? fluxPerPhoton : -fluxPerPhoton);
+        }
+        dbg<<"GaussianMixture Realized flux = "<<result->getTotalFlux()<<std::endl;
+        return result;
+    }
+}
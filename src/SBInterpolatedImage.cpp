@@ -561,6 +561,31 @@ namespace galsim {
         double duxy = dxy * _uscale;
         double duyx = dyx * _uscale;
 
+        const InterpolantXY* kInterpXY = dynamic_cast<const InterpolantXY*>(_kInterp.get());
+        if (kInterpXY) {
+            // This is the usual case for a sheared or rotated image.  Neither kx nor ky is
+            // constant along a row (or column), so the KTable row cache would never be used.
+            // Let the KTable do the whole grid at once, and then apply the x kernel transform.
+            std::complex<double>* valp = val.linearView().begin().getP();
+            _ktab->interpolateGrid(valp,m,n,x0,dx,dxy,y0,dy,dyx,_maxk1,*kInterpXY);
+
+            const InterpolantXY* xInterpXY = dynamic_cast<const InterpolantXY*>(_xInterp.get());
+            It valit(valp,1);
+            for (int j=0;j<n;++j,x0+=dxy,y0+=dy,ux0+=duxy,uy0+=duy) {
+                double x = x0;
+                double y = y0;
+                double ux = ux0;
+                double uy = uy0;
+                for (int i=0;i<m;++i,x+=dx,y+=dyx,ux+=dux,uy+=duyx,++valit) {
+                    // interpolateGrid already set these to 0.
+                    if (std::abs(x) > _maxk1 || std::abs(y) > _maxk1) continue;
+                    if (xInterpXY) *valit *= xInterpXY->uval1d(ux) * xInterpXY->uval1d(uy);
+                    else *valit *= _xInterp->uval(ux, uy);
+                }
+            }
+            return;
+        }
+
         It valit(val.linearView().begin().getP(),1);
         for (int j=0;j<n;++j,x0+=dxy,y0+=dy,ux0+=duxy,uy0+=duy) {
             double x = x0;
@@ -780,8 +805,8 @@ namespace galsim {
          */
         assert(N>=0);
 
-        boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
-        if (N<=0 || _pt.empty()) return result;
+        if (N<=0 || _pt.empty()) return boost::shared_ptr<PhotonArray>(new PhotonArray(N));
+        boost::shared_ptr<PhotonArray> result = PhotonArray::create(N);
         double totalAbsFlux = _positiveFlux + _negativeFlux;
         double fluxPerPhoton = totalAbsFlux / N;
         dbg<<"posFlux = "<<_positiveFlux<<", negFlux = "<<_negativeFlux<<std::endl;
@@ -60,6 +60,21 @@ namespace galsim {
     LRUCache<const GSParams*, KolmogorovInfo>
         SBKolmogorov::SBKolmogorovImpl::cache(MAX_KOLMOGOROV_INFO);
 
+    void SBKolmogorov::setCacheSize(int nmax)
+    {
+        if (nmax < 1) throw SBError("SBKolmogorov cache size must be at least 1");
+        SBKolmogorovImpl::cache.resize(nmax);
+    }
+
+    void SBKolmogorov::clearCache() 
+    { SBKolmogorovImpl::cache.clear(); }
+
+    LRUCacheStats SBKolmogorov::getCacheStats() 
+    { return SBKolmogorovImpl::cache.getStats(); }
+
+    void SBKolmogorov::resetCacheStats() 
+    { SBKolmogorovImpl::cache.resetStats(); }
+
     // The "magic" number 2.992934 below comes from the standard form of the Kolmogorov spectrum
     // from Racine, 1996 PASP, 108, 699 (who in turn is quoting Fried, 1966, JOSA, 56, 1372):
     // T(k) = exp(-1/2 D(k)) 
@@ -329,6 +344,13 @@ namespace galsim {
     {
         dbg<<"Initializing KolmogorovInfo\n";
 
+        // If this table has been calculated before (in any process), read it from the
+        // disk cache rather than recalculating it.
+        std::vector<double> cache_key = InfoDiskCache::makeKey(*gsparams);
+        std::vector<double> cache_data;
+        if (InfoDiskCache::read("Kolmogorov",cache_key,cache_data) && setData(cache_data)) 
+            return;
+
         // Calculate maxK:
         // exp(-k^5/3) = kvalue_accuracy
         _maxk = std::pow(-std::log(gsparams->kvalue_accuracy),3./5.);
@@ -373,6 +395,11 @@ namespace galsim {
         range[1] = _radial.argMax();
         _sampler.reset(new OneDimensionalDeviate(_radial, range, true));
 
+        if (!InfoDiskCache::getDirectory().empty()) {
+            getData(cache_data);
+            InfoDiskCache::write("Kolmogorov",cache_key,cache_data);
+        }
+
 #ifdef SOLVE_FWHM_HLR
         // Improve upon the conversion between lam_over_r0 and fwhm:
         KolmTargetValue fwhm_func(0.55090124543985636638457099311149824 / 2., gsparams);
@@ -406,6 +433,41 @@ namespace galsim {
 #endif
     }
 
+    void KolmogorovInfo::getData(std::vector<double>& data) const
+    {
+        data.clear();
+        data.push_back(_maxk);
+        data.push_back(_stepk);
+        const std::vector<TableEntry<double,double> >& radial = _radial.getV();
+        data.push_back(radial.size());
+        for (size_t i=0; i<radial.size(); ++i) {
+            data.push_back(radial[i].arg);
+            data.push_back(radial[i].val);
+        }
+        _sampler->getData(data);
+    }
+
+    bool KolmogorovInfo::setData(const std::vector<double>& data)
+    {
+        const int nscalar = 3;
+        if (int(data.size()) < nscalar) return false;
+        const int nradial = int(data[nscalar-1]);
+        if (int(data.size()) <= nscalar + 2*nradial) return false;
+        for (int i=0; i<nradial; ++i) _radial.addEntry(data[nscalar+2*i], data[nscalar+2*i+1]);
+        std::vector<double> sampler_data(data.begin() + nscalar + 2*nradial, data.end());
+        try {
+            _sampler.reset(new OneDimensionalDeviate(_radial, sampler_data, true));
+        } catch (std::exception& e) {
+            // Leave the table empty, so the constructor can recalculate it.
+            dbg<<"Invalid cached Kolmogorov data: "<<e.what()<<std::endl;
+            _radial.clear();
+            return false;
+        }
+        _maxk = data[0];
+        _stepk = data[1];
+        return true;
+    }
+
     boost::shared_ptr<PhotonArray> KolmogorovInfo::shoot(int N, UniformDeviate ud) const
     {
         dbg<<"KolmogorovInfo shoot: N = "<<N<<std::endl;
@@ -27,6 +27,11 @@
 #include "SBTransform.h"
 #include "SBProfileImpl.h"
 #include "FFT.h"
+#include <map>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 #ifdef DEBUGLOGGING
 #include <fstream>
@@ -167,8 +172,34 @@ namespace galsim {
 
     boost::shared_ptr<GSParams> SBProfile::SBProfileImpl::default_gsparams(new GSParams());
 
+    boost::shared_ptr<GSParams> SBProfile::SBProfileImpl::internGSParams(
+        const boost::shared_ptr<GSParams>& gsparams)
+    {
+        // The interned objects are private copies, so they cannot be changed by the user
+        // after the fact (e.g. by setting an attribute of the GSParams object in Python).
+        // They are never deleted, but there are normally only a handful of distinct GSParams.
+        // Profiles may be constructed from several OpenMP threads at once (e.g. when shooting
+        // photons), so the map is only accessed inside a named critical section.
+        typedef std::map<GSParams, boost::shared_ptr<GSParams> > InternMap;
+        static InternMap interned;
+        const GSParams& key = gsparams.get() ? *gsparams : *default_gsparams;
+        boost::shared_ptr<GSParams> result;
+#ifdef _OPENMP
+#pragma omp critical (galsim_gsparams_intern)
+#endif
+        {
+            InternMap::iterator it = interned.find(key);
+            if (it == interned.end()) {
+                boost::shared_ptr<GSParams> copy(new GSParams(key));
+                it = interned.insert(std::make_pair(key, copy)).first;
+            }
+            result = it->second;
+        }
+        return result;
+    }
+
     SBProfile::SBProfileImpl::SBProfileImpl(boost::shared_ptr<GSParams> gsparams) :
-        gsparams(gsparams.get() ? gsparams : default_gsparams) {}
+        gsparams(internGSParams(gsparams)) {}
 
     SBProfile::SBProfileImpl* SBProfile::GetImpl(const SBProfile& rhs) 
     { return rhs._pimpl.get(); }
@@ -807,10 +838,67 @@ namespace galsim {
         FillQuadrant(*this,val,x0,dx,nx1,y0,dy,ny1);
     }
 
+    // Shoot N photons from prof using nthreads threads.  Each thread uses its own 
+    // UniformDeviate, seeded from u, and bins its photons into its own image, which is 
+    // returned in images.  The images can then be added to the target image in a fixed order.
+    // Returns the total flux of the photons that landed in the images.
+    template <class T>
+    static double ShootThreads(
+        const SBProfile& prof, const Bounds<int>& bounds, double scale, double N,
+        double flux_per_photon, UniformDeviate u, int nthreads, int maxN,
+        std::vector<boost::shared_ptr<Image<T> > >& images)
+    {
+        // Split the photons as evenly as possible among the threads.
+        N = std::floor(N+0.5);
+        double Nper = std::floor(N / nthreads);
+        int nextra = int(N - Nper * nthreads);
+
+        // Draw all the seeds from u before starting, so each thread's random numbers only 
+        // depend on the seed of u and the number of threads.
+        std::vector<long> seeds(nthreads);
+        for (int k=0; k<nthreads; ++k) seeds[k] = long(u() * 2147483647.) + 1;
+
+        images.resize(nthreads);
+        std::vector<double> added_flux(nthreads, 0.);
+        std::string error;
+#ifdef _OPENMP
+#pragma omp parallel for num_threads(nthreads) schedule(static,1)
+#endif
+        for (int k=0; k<nthreads; ++k) {
+            try {
+                UniformDeviate ud(seeds[k]);
+                boost::shared_ptr<Image<T> > im(new Image<T>(bounds, T(0)));
+                im->setScale(scale);
+                ImageView<T> view = im->view();
+                double Nk = Nper + (k < nextra ? 1. : 0.);
+                while (Nk > 0.5) {
+                    int thisN = Nk > maxN ? maxN : int(Nk+0.5);
+                    boost::shared_ptr<PhotonArray> pa = prof.shoot(thisN, ud);
+                    pa->scaleFlux(flux_per_photon * thisN);
+                    added_flux[k] += pa->addTo(view);
+                    Nk -= thisN;
+                }
+                images[k] = im;
+            } catch (std::exception& e) {
+                // Exceptions can't propagate out of an OpenMP loop, so save the message 
+                // and throw it below.
+#ifdef _OPENMP
+#pragma omp critical (galsim_shoot_error)
+#endif
+                error = e.what();
+            }
+        }
+        if (!error.empty()) throw SBError(error);
+
+        double total = 0.;
+        for (int k=0; k<nthreads; ++k) total += added_flux[k];
+        return total;
+    }
+
     template <class T>
     double SBProfile::drawShoot(
         ImageView<T> img, double N, UniformDeviate u, double gain, double max_extra_noise,
-        bool poisson_flux, bool add_to_image) const 
+        bool poisson_flux, bool add_to_image, int nthreads) const 
     {
         // If N = 0, this routine will try to end up with an image with the number of real 
         // photons = flux that has the corresponding Poisson noise. For profiles that are 
@@ -933,6 +1021,22 @@ namespace galsim {
         img.setCenter(0,0);
         dbg<<"On input, image has central value = "<<img(0,0)<<std::endl;
 
+        if (nthreads <= 0) {
+#ifdef _OPENMP
+            nthreads = omp_get_max_threads();
+#else
+            nthreads = 1;
+#endif
+        }
+        dbg<<"nthreads = "<<nthreads<<std::endl;
+        // When using multiple threads, each one shoots into its own image.  These are added
+        // to img at the end.
+        std::vector<boost::shared_ptr<Image<T> > > thread_images;
+        double thread_added_flux = 0.;
+        // When max_extra_noise > 0, this is set to the estimated number of photons left to 
+        // shoot once we have an estimate.  Only then can we split the rest among the threads.
+        double Nrest = -1.;
+
         // Store the PhotonArrays to be added here rather than add them as we go,
         // since we might need to rescale them all before adding.
         // We only use this if max_extra_noise > 0 and add_to_image = true.
@@ -963,6 +1067,17 @@ namespace galsim {
             // NB: don't need floor, since rhs is positive, so floor is superfluous.
             if (thisN > N) thisN = int(N+0.5);
 
+            if (nthreads > 1 && (max_extra_noise == 0. || Nrest >= 0.)) {
+                // Shoot all the remaining photons with multiple threads.
+                double nshoot = (max_extra_noise > 0. && Nrest < N) ? Nrest : N;
+                xdbg<<"shoot "<<nshoot<<" using "<<nthreads<<" threads"<<std::endl;
+                thread_added_flux = ShootThreads(
+                    *this, img.getBounds(), img.getScale(), nshoot, flux_scaling / origN, u,
+                    nthreads, maxN, thread_images);
+                N -= nshoot;
+                break;
+            }
+
             xdbg<<"shoot "<<thisN<<std::endl;
             assert(_pimpl.get());
             boost::shared_ptr<PhotonArray> pa = _pimpl->shoot(thisN, u);
@@ -1021,6 +1136,7 @@ namespace galsim {
                 // So far we've done (origN-N)
                 // Set thisN to do the rest on the next pass.
                 Ntot -= (origN-N);
+                Nrest = Ntot;
                 if (Ntot > maxN) thisN = maxN; // Make sure we don't overflow thisN.
                 else thisN = int(Ntot);
                 xdbg<<"Next value of thisN = "<<thisN<<std::endl;
@@ -1052,6 +1168,10 @@ namespace galsim {
                 negative_flux *= factor;
 #endif
             }
+            // The images from the threads haven't been added to img yet, so they always
+            // need to be rescaled separately.
+            for (size_t k=0; k<thread_images.size(); ++k) thread_images[k]->view() *= T(factor);
+            thread_added_flux *= factor;
         }
 
         if (arrays.size() > 0) {
@@ -1071,6 +1191,10 @@ namespace galsim {
             }
         }
 
+        // Add the images from each thread in order, so the result is deterministic.
+        for (size_t k=0; k<thread_images.size(); ++k) img += *thread_images[k];
+        added_flux += thread_added_flux;
+
 #ifdef DEBUGLOGGING
         dbg<<"Done drawShoot.  Realized flux = "<<realized_flux*gain<<std::endl;
         dbg<<"c.f. target flux = "<<flux<<std::endl;
@@ -1095,10 +1219,10 @@ namespace galsim {
 
     template double SBProfile::drawShoot(
         ImageView<float> image, double N, UniformDeviate ud, double gain,
-        double max_extra_noise, bool poisson_flux, bool add_to_image) const;
+        double max_extra_noise, bool poisson_flux, bool add_to_image, int nthreads) const;
     template double SBProfile::drawShoot(
         ImageView<double> image, double N, UniformDeviate ud, double gain,
-        double max_extra_noise, bool poisson_flux, bool add_to_image) const;
+        double max_extra_noise, bool poisson_flux, bool add_to_image, int nthreads) const;
 
     template double SBProfile::draw(ImageView<float> img, double gain, double wmult) const;
     template double SBProfile::draw(ImageView<double> img, double gain, double wmult) const;
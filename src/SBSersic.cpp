@@ -27,6 +27,7 @@
 #include "SBSersicImpl.h"
 #include "integ/Int.h"
 #include "Solve.h"
+#include <map>
 
 #ifdef DEBUGLOGGING
 #include <fstream>
@@ -62,6 +63,104 @@ namespace galsim {
     LRUCache<std::pair<SersicKey, const GSParams*>, SersicInfo> 
         SBSersic::SBSersicImpl::cache(MAX_SERSIC_INFO);
 
+    void SBSersic::setCacheSize(int nmax)
+    {
+        if (nmax < 1) throw SBError("SBSersic cache size must be at least 1");
+        SBSersicImpl::cache.resize(nmax);
+    }
+
+    void SBSersic::clearCache() 
+    { SBSersicImpl::cache.clear(); }
+
+    LRUCacheStats SBSersic::getCacheStats() 
+    { return SBSersicImpl::cache.getStats(); }
+
+    void SBSersic::resetCacheStats() 
+    { SBSersicImpl::cache.resetStats(); }
+
+    bool SBSersic::SBSersicImpl::interpolate_n = false;
+
+    void SBSersic::setNInterpolation(bool interpolate)
+    { SBSersicImpl::interpolate_n = interpolate; }
+
+    bool SBSersic::getNInterpolation()
+    { return SBSersicImpl::interpolate_n; }
+
+    // When interpolating in n, the grid points are at n = j / (10 * 2^level) for
+    // j = 3 * 2^level .. 42 * 2^level, i.e. 0.3 <= n <= 4.2.  Writing them as a ratio of
+    // integers makes values like n = 4 exactly representable, so e.g. DeVaucouleurs is exact.
+    const int SERSIC_N_JMIN = 3;
+    const int SERSIC_N_JMAX = 42;
+    const int SERSIC_N_DENOM = 10;
+    const int SERSIC_N_MAX_LEVEL = 6;  // The finest grid spacing is 0.1 / 2^6
+
+    boost::shared_ptr<SersicInfo> SBSersic::SBSersicImpl::getInfo(
+        double n, double maxRre, bool flux_untruncated, const GSParams* gsparams)
+    {
+        const double nmin = double(SERSIC_N_JMIN) / SERSIC_N_DENOM;
+        const double nmax = double(SERSIC_N_JMAX) / SERSIC_N_DENOM;
+        if (interpolate_n && n > nmin && n < nmax) {
+            // Find the coarsest grid on which interpolating to n is accurate enough.
+            for (int level=0; level<=SERSIC_N_MAX_LEVEL; ++level) {
+                int jmin = SERSIC_N_JMIN << level;
+                int jmax = SERSIC_N_JMAX << level;
+                double denom = SERSIC_N_DENOM << level;
+                int j = std::min(std::max(int(n * denom), jmin), jmax-1);
+                double n1 = j / denom;
+                double n2 = (j+1) / denom;
+                if (n == n1 || n == n2) break;  // Just use the exact info.
+                if (checkCell(n1,n2,maxRre,flux_untruncated,gsparams)) {
+                    dbg<<"Interpolate Sersic n = "<<n<<" between "<<n1<<" and "<<n2<<std::endl;
+                    boost::shared_ptr<SersicInfo> info1 = cache.get(
+                        std::make_pair(SersicKey(n1,maxRre,flux_untruncated), gsparams));
+                    boost::shared_ptr<SersicInfo> info2 = cache.get(
+                        std::make_pair(SersicKey(n2,maxRre,flux_untruncated), gsparams));
+                    return boost::shared_ptr<SersicInfo>(new SersicInfo(info1,info2,n));
+                }
+            }
+        }
+        return cache.get(std::make_pair(SersicKey(n,maxRre,flux_untruncated), gsparams));
+    }
+
+    bool SBSersic::SBSersicImpl::checkCell(
+        double n1, double n2, double maxRre, bool flux_untruncated, const GSParams* gsparams)
+    {
+        // Remember the result for each cell, since checking requires three SersicInfos.
+        typedef std::pair<SersicKey, std::pair<double, const GSParams*> > CellKey;
+        static std::map<CellKey, bool> checked;
+        CellKey key(SersicKey(n1,maxRre,flux_untruncated), std::make_pair(n2,gsparams));
+        std::map<CellKey, bool>::iterator it = checked.find(key);
+        if (it != checked.end()) return it->second;
+
+        // Compare the interpolation to the exact profile in the middle of the cell, where
+        // the error of linear interpolation is largest.
+        double nm = 0.5 * (n1 + n2);
+        SersicInfo interp(
+            cache.get(std::make_pair(SersicKey(n1,maxRre,flux_untruncated), gsparams)),
+            cache.get(std::make_pair(SersicKey(n2,maxRre,flux_untruncated), gsparams)), nm);
+        boost::shared_ptr<SersicInfo> exact = 
+            cache.get(std::make_pair(SersicKey(nm,maxRre,flux_untruncated), gsparams));
+
+        bool ok = true;
+        // k values are normalized to 1 at k=0, so kvalue_accuracy is an absolute tolerance.
+        double maxlogk = 0.5 * std::log(std::max(interp.getKsqMax(), exact->getKsqMax()));
+        for (double logk = -3.; ok && logk < maxlogk; logk += 0.05) {
+            double ksq = std::exp(2.*logk);
+            double diff = std::abs(interp.kValue(ksq) - exact->kValue(ksq));
+            if (diff > gsparams->kvalue_accuracy) ok = false;
+        }
+        // x values use xvalue_accuracy relative to the central value.
+        double xtol = gsparams->xvalue_accuracy * exact->xValue(0.);
+        double maxr = interp.getMaxRRe() > 0. ? interp.getMaxRRe() : 20.;
+        for (double r = 0.; ok && r < maxr; r += 0.01) {
+            double diff = std::abs(interp.xValue(r*r) - exact->xValue(r*r));
+            if (diff > xtol) ok = false;
+        }
+        dbg<<"Sersic cell "<<n1<<" .. "<<n2<<" accurate enough? "<<ok<<std::endl;
+        checked[key] = ok;
+        return ok;
+    }
+
     SBSersic::SBSersicImpl::SBSersicImpl(double n,  double re, double flux,
                                          double trunc, bool flux_untruncated,
                                          boost::shared_ptr<GSParams> gsparams) :
@@ -71,8 +170,7 @@ namespace galsim {
         _norm(_flux*_inv_re_sq), 
         _trunc(trunc), _flux_untruncated(flux_untruncated),
         _maxRre((int)(_trunc/_re * 100 + 0.5) / 100.0),  // round to two decimal places
-        _info(cache.get(std::make_pair(SersicKey(_n,_maxRre,_flux_untruncated),
-                                       this->gsparams.get())))
+        _info(getInfo(_n,_maxRre,_flux_untruncated,this->gsparams.get()))
     {
         _truncated = (_trunc > 0.);
         if (!_truncated) _flux_untruncated = true;  // set unused parameter to a single value
@@ -240,6 +338,7 @@ namespace galsim {
 
     double SersicInfo::xValue(double xsq) const 
     {
+        if (_info1) return (1.-_w) * _info1->xValue(xsq) + _w * _info2->xValue(xsq);
         if (_truncated && xsq > _maxRre_sq) return 0.;
         else return _norm * std::exp(-_b*std::pow(xsq,_inv2n));
     }
@@ -250,6 +349,8 @@ namespace galsim {
 
         assert(ksq >= 0.);
 
+        if (_info1) return (1.-_w) * _info1->kValue(ksq) + _w * _info2->kValue(ksq);
+
         if (ksq>=_ksq_max)
             return 0.; // truncate the Fourier transform
         else if (ksq<_ksq_min)
@@ -463,6 +564,15 @@ namespace galsim {
 
         _truncated = (_maxRre > 0.);
 
+        // If these tables have been calculated before (in any process), read them from the
+        // disk cache rather than recalculating them.
+        std::vector<double> cache_key = InfoDiskCache::makeKey(*gsparams);
+        cache_key.push_back(_n);
+        cache_key.push_back(_maxRre);
+        cache_key.push_back(_flux_untruncated);
+        std::vector<double> cache_data;
+        if (InfoDiskCache::read("Sersic",cache_key,cache_data) && setData(cache_data)) return;
+
         if ( _truncated && _flux_untruncated ) {
             dbg << "Calculating b with maxR/re => 0 (inf)" << std::endl;
             _b = SersicCalculateScaleBFromHLR(_n, 0.);
@@ -596,12 +706,102 @@ namespace galsim {
         else
             range[1] = _maxRre;
         _sampler.reset(new OneDimensionalDeviate( *_radial, range, true));
+
+        if (!InfoDiskCache::getDirectory().empty()) {
+            getData(cache_data);
+            InfoDiskCache::write("Sersic",cache_key,cache_data);
+        }
+    }
+
+    void SersicInfo::getData(std::vector<double>& data) const
+    {
+        data.clear();
+        data.push_back(_b);
+        data.push_back(_norm);
+        data.push_back(_flux_fraction);
+        data.push_back(_re_fraction);
+        data.push_back(_kderiv2);
+        data.push_back(_kderiv4);
+        data.push_back(_ksq_min);
+        data.push_back(_ksq_max);
+        data.push_back(_stepK);
+        data.push_back(_maxK);
+        const std::vector<TableEntry<double,double> >& ft = _ft.getV();
+        data.push_back(ft.size());
+        for (size_t i=0; i<ft.size(); ++i) {
+            data.push_back(ft[i].arg);
+            data.push_back(ft[i].val);
+        }
+        _sampler->getData(data);
+    }
+
+    bool SersicInfo::setData(const std::vector<double>& data)
+    {
+        const int nscalar = 11;
+        if (int(data.size()) < nscalar) return false;
+        const int nft = int(data[nscalar-1]);
+        if (int(data.size()) <= nscalar + 2*nft) return false;
+        // Build the sampler first, so nothing is changed if the data are invalid.
+        boost::shared_ptr<SersicRadialFunction> radial(new SersicRadialFunction(_n, data[0]));
+        std::vector<double> sampler_data(data.begin() + nscalar + 2*nft, data.end());
+        boost::shared_ptr<OneDimensionalDeviate> sampler;
+        try {
+            sampler.reset(new OneDimensionalDeviate(*radial, sampler_data, true));
+        } catch (std::exception& e) {
+            dbg<<"Invalid cached Sersic data: "<<e.what()<<std::endl;
+            return false;
+        }
+        _b = data[0];
+        _norm = data[1];
+        _flux_fraction = data[2];
+        _re_fraction = data[3];
+        _kderiv2 = data[4];
+        _kderiv4 = data[5];
+        _ksq_min = data[6];
+        _ksq_max = data[7];
+        _stepK = data[8];
+        _maxK = data[9];
+        for (int i=0; i<nft; ++i) _ft.addEntry(data[nscalar+2*i], data[nscalar+2*i+1]);
+        _radial = radial;
+        _sampler = sampler;
+        return true;
+    }
+
+    SersicInfo::SersicInfo(boost::shared_ptr<SersicInfo> info1, 
+                           boost::shared_ptr<SersicInfo> info2, double n) :
+        _n(n), _maxRre(info1->_maxRre), _maxRre_sq(info1->_maxRre_sq), _inv2n(1./(2.*_n)),
+        _flux_untruncated(info1->_flux_untruncated), _truncated(info1->_truncated),
+        _info1(info1), _info2(info2), _w((n - info1->_n) / (info2->_n - info1->_n))
+    {
+        assert(info1->_maxRre == info2->_maxRre);
+        assert(info1->_flux_untruncated == info2->_flux_untruncated);
+        assert(_w >= 0. && _w <= 1.);
+        // Use the more conservative of the two for the FFT sizes.
+        _maxK = std::max(info1->_maxK, info2->_maxK);
+        _stepK = std::min(info1->_stepK, info2->_stepK);
+        _ksq_max = std::max(info1->_ksq_max, info2->_ksq_max);
+        _flux_fraction = (1.-_w) * info1->_flux_fraction + _w * info2->_flux_fraction;
+        _re_fraction = (1.-_w) * info1->_re_fraction + _w * info2->_re_fraction;
     }
 
     boost::shared_ptr<PhotonArray> SersicInfo::shoot(int N, UniformDeviate ud) const
     {
         dbg<<"SersicInfo shoot: N = "<<N<<std::endl;
         dbg<<"Target flux = 1.0\n";
+        if (_info1) {
+            // Draw each photon from one of the two profiles with probability 1-w and w.
+            int N2 = 0;
+            for (int i=0; i<N; ++i) if (ud() < _w) ++N2;
+            int N1 = N - N2;
+            boost::shared_ptr<PhotonArray> result = _info1->shoot(N1,ud);
+            boost::shared_ptr<PhotonArray> result2 = _info2->shoot(N2,ud);
+            // Each of these has the total flux of its profile, so rescale them to give
+            // every photon a flux of 1/N of the total.
+            result->scaleFlux(double(N1)/N);
+            result2->scaleFlux(double(N2)/N);
+            result->append(*result2);
+            return result;
+        }
         assert(_sampler.get());
         boost::shared_ptr<PhotonArray> result = _sampler->shoot(N,ud);
         result->scaleFlux(_norm);
@@ -23,9 +23,17 @@
 
 #include <cstring>
 #include <string>
+#include <map>
+#include <deque>
+#include <vector>
 #define TMV_DEBUG
 #include "TMV.h"
 #include "hsm/PSFCorr.h"
+#include "FFT.h"
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 //#define DEBUGLOGGING
 #ifdef DEBUGLOGGING
@@ -180,7 +188,8 @@ namespace hsm {
     CppShapeData FindAdaptiveMomView(
         const ImageView<T>& object_image, const ImageView<int> &object_mask_image, 
         double guess_sig, double precision, double guess_x_centroid,
-        double guess_y_centroid, boost::shared_ptr<HSMParams> hsmparams) 
+        double guess_y_centroid, double guess_e1, double guess_e2,
+        boost::shared_ptr<HSMParams> hsmparams) 
     {
         dbg<<"Start FindAdaptiveMomView"<<std::endl;
         dbg<<"Setting defaults and so on before calling find_ellipmom_2"<<std::endl;
@@ -201,9 +210,15 @@ namespace hsm {
         } else {
             results.moments_centroid.y = 0.5*(object_image.getYMin() + object_image.getYMax());
         }
-        m_xx = guess_sig*guess_sig;
-        m_yy = m_xx;
-        m_xy = 0.0;
+        // The initial moments have det(M) = guess_sig^4 and distortion (guess_e1, guess_e2).
+        double guess_esq = guess_e1*guess_e1 + guess_e2*guess_e2;
+        if (guess_esq >= 1.) {
+            throw HSMError("Initial guess for the distortion must have |e| < 1");
+        }
+        double trace = 2.*guess_sig*guess_sig / std::sqrt(1.-guess_esq);
+        m_xx = 0.5*trace*(1.+guess_e1);
+        m_yy = 0.5*trace*(1.-guess_e1);
+        m_xy = 0.5*trace*guess_e2;
 
         // call find_ellipmom_2
         results.image_bounds = object_image.getBounds();
@@ -237,112 +252,88 @@ namespace hsm {
         return results;
     }
 
-    /* fourier_trans_1
-     * *** FOURIER TRANSFORMS A DATA SET WITH LENGTH A POWER OF 2 ***
-     *
-     * This is a Fourier transform routine.  It has the same calling
-     * interface as Numerical Recipes four1 and uses the same algorithm
-     * as that routine.  This function is slightly faster than NR four1
-     * because we have minimized the use of expensive array look-ups.
-     *
-     * Replaces data[1..2*nn] by its discrete Fourier transform, if
-     * isign is input as 1; or replaces data[1..2*nn] by nn times its
-     * inverse discrete Fourier transform, if isign is input as -1.
-     * data is a complex array of length nn.
-     *
-     */
-
-    void fourier_trans_1(double *data, long nn, int isign) 
+    // Convert the nthreads argument of the batch functions into the actual number to use.
+    static int get_num_threads(int nthreads)
     {
+        if (nthreads <= 0) {
+#ifdef _OPENMP
+            nthreads = omp_get_max_threads();
+#else
+            nthreads = 1;
+#endif
+        }
+        return nthreads;
+    }
 
-        double *data_i, *data_i1;
-        double *data_j, *data_j1;
-        double temp, theta, sintheta, oneminuscostheta;
-        double wr, wi, wtemp;
-        double tempr1, tempr2, tempr, tempi;
-
-        unsigned long ndata; /* = 2*nn */
-        unsigned long lcurrent; /* length of current FFT; will range from 2..n */
-        unsigned long i,j,k,m,istep;
-
-        ndata = (unsigned long)nn << 1;
-
-        /* Bit reversal */
-        data_i = data;
-        for(i=0;i<(unsigned long)nn;i++) {
-
-            /* Here we set data_j equal to data_null plus twice the bit-reverse of i */
-            j=0;
-            k=i;
-            for(m=ndata>>2;m>=1;m>>=1) {
-                if (k & 1) j+=m;
-                k >>= 1;
-            }
+    // Measure the adaptive moments of the objects in each stamp, catching any errors.
+    template <typename T>
+    void FindAdaptiveMomBatch(
+        const ImageView<T>& object_image, const ImageView<int>& object_mask_image,
+        const std::vector<Bounds<int> >& stamps, std::vector<CppShapeData>& results,
+        double guess_sig, double precision, boost::shared_ptr<HSMParams> hsmparams,
+        int nthreads)
+    {
+        const int nstamps = stamps.size();
+        dbg<<"Start FindAdaptiveMomBatch for "<<nstamps<<" stamps"<<std::endl;
+        if (!hsmparams.get()) hsmparams = hsm::default_hsmparams;
+        nthreads = get_num_threads(nthreads);
+        results.clear();
+        results.resize(nstamps);
 
-            /* If i<j, swap the i and j complex elements of data
-             * Notice that these are the (2i,2i+1) and (2j,2j+1)
-             * real elements.
-             */
-            if (i<j) {
-                data_j = data + (j<<1);
-                temp = *data_i; *data_i = *data_j; *data_j = temp;
-                data_i++; data_j++;
-                temp = *data_i; *data_i = *data_j; *data_j = temp;
-            } else {
-                data_i++;
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic,16) num_threads(nthreads)
+#endif
+        for (int i=0; i<nstamps; ++i) {
+            try {
+                results[i] = FindAdaptiveMomView(
+                    object_image.subImage(stamps[i]), object_mask_image.subImage(stamps[i]),
+                    guess_sig, precision, -1000., -1000., 0., 0., hsmparams);
+            } catch (std::exception& err) {
+                results[i] = CppShapeData();
+                results[i].image_bounds = stamps[i];
+                results[i].error_message = err.what();
             }
-
-            /* Now increment data_i so it points to data[2i+1]; this is
-             * important when we start the next iteration.
-             */
-            data_i++;
         }
+        dbg<<"Exiting FindAdaptiveMomBatch"<<std::endl;
+    }
 
-        /* Now do successive FFTs */
-        for(lcurrent=2;lcurrent<ndata;lcurrent<<=1) {
-
-            /* Find the angle between successive points and its trig
-             * functions, the sine and 1-cos. (Use 1-cos for stability.)
-             */
-            theta = 2.*M_PI/lcurrent * isign;
-            sintheta = std::sin(theta);
-            oneminuscostheta = std::sin(0.5*theta);
-            oneminuscostheta = 2.0*oneminuscostheta*oneminuscostheta;
-
-            /* FFT the individual length-lcurrent segments */
-            wr = 1.0;
-            wi = 0.0;
-            istep = lcurrent<<1;
-            for(m=0;m<lcurrent;m+=2) {
-                for(i=m;i<ndata;i+=istep) {
-                    /* Set the data pointers so we don't need to do
-                     * time-consuming array lookups.
-                     */
-                    data_j1=data_j = (data_i1=data_i = data + i) + lcurrent;
-                    data_i1++;
-                    data_j1++;
-
-                    /* Now apply Danielson-Lanczos formula */
-                    tempr1 = wr*(*data_j);
-                    tempr2 = wi*(*data_j1);
-                    tempr = tempr1 - tempr2;
-                    tempi = (wr+wi)*((*data_j)+(*data_j1)) - tempr1 - tempr2;
-                    /*
-                     * at this point, tempr + i*tempi is equal to the product of
-                     * the jth complex array element and w.
-                     */
-                    *data_j = (*data_i) - tempr;
-                    *data_j1 = (*data_i1) - tempi;
-                    *data_i += tempr;
-                    *data_i1 += tempi;
-
-                }
+    // Carry out PSF correction for the galaxy in each stamp, catching any errors.
+    template <typename T, typename U>
+    void EstimateShearBatch(
+        const ImageView<T>& gal_image, const ImageView<U>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps,
+        const std::vector<Bounds<int> >& PSF_stamps, std::vector<CppShapeData>& results,
+        float sky_var, const char* shear_est, const std::string& recompute_flux,
+        double guess_sig_gal, double guess_sig_PSF, double precision,
+        boost::shared_ptr<HSMParams> hsmparams, int nthreads)
+    {
+        const int nstamps = gal_stamps.size();
+        dbg<<"Start EstimateShearBatch for "<<nstamps<<" stamps"<<std::endl;
+        if (PSF_stamps.size() != gal_stamps.size()) {
+            throw HSMError("Number of PSF stamps does not match the number of galaxy stamps!");
+        }
+        if (!hsmparams.get()) hsmparams = hsm::default_hsmparams;
+        nthreads = get_num_threads(nthreads);
+        results.clear();
+        results.resize(nstamps);
 
-                /* Now increment trig recurrence */
-                wr -= (wtemp=wr)*oneminuscostheta + wi*sintheta;
-                wi += wtemp*sintheta - wi*oneminuscostheta;
+#ifdef _OPENMP
+#pragma omp parallel for schedule(dynamic,16) num_threads(nthreads)
+#endif
+        for (int i=0; i<nstamps; ++i) {
+            try {
+                results[i] = EstimateShearView(
+                    gal_image.subImage(gal_stamps[i]), PSF_image.subImage(PSF_stamps[i]),
+                    gal_mask_image.subImage(gal_stamps[i]), sky_var, shear_est, recompute_flux,
+                    guess_sig_gal, guess_sig_PSF, precision, -1000., -1000., hsmparams);
+            } catch (std::exception& err) {
+                results[i] = CppShapeData();
+                results[i].image_bounds = gal_stamps[i];
+                results[i].error_message = err.what();
             }
         }
+        dbg<<"Exiting EstimateShearBatch"<<std::endl;
     }
 
     /* qho1d_wf_1
@@ -603,38 +594,85 @@ namespace hsm {
         double TwoMinv_xy = -Mxy/detM * 2.0;
         double Minv_yy    =  Mxx/detM;
 
-        /* Generate Minv_xx__x_x0__x_x0 array */
-        tmv::Vector<double> Minv_xx__x_x0__x_x0(xmax-xmin+1);
-        for(long x=xmin;x<=xmax;x++) Minv_xx__x_x0__x_x0[x-xmin] = Minv_xx*(x-x0)*(x-x0);
+        /* The weight is set to zero outside the ellipse rho^2 < max_moment_nsig2, so we only
+         * need to loop over the pixels inside it.  Its extent in y is
+         * |y-y0| < sqrt(max_moment_nsig2 * Mxx * Myy / detM) = sqrt(max_moment_nsig2 * Myy),
+         * and in each row rho^2 is a quadratic in x, so the pixels to use lie between its roots.
+         * We include an extra pixel at each end to guard against rounding errors; the test
+         * of rho2 below makes sure that no pixels outside the ellipse are used.
+         */
+        const double max_rho2 = hsmparams->max_moment_nsig2;
+        const double y_extent = std::sqrt(max_rho2 * Myy);
+        const long ylo = long(std::max(double(ymin), std::floor(y0 - y_extent) - 1.));
+        const long yhi = long(std::min(double(ymax), std::ceil(y0 + y_extent) + 1.));
+        const double exp_mMinv_xx = std::exp(-Minv_xx);
+
+        /* The weights for each row are tabulated in wrow.  Rather than calling exp for every
+         * pixel, the table is filled outwards from the pixel nearest the peak of the row, using
+         * the ratio of the weights of adjacent pixels, which changes by exp(-Minv_xx) each step.
+         * Going outwards, both the weights and the ratios decrease, so this is stable.
+         */
+        std::vector<double> wrow(xmax-xmin+1);
 
         /* Now let's initialize the outputs and then sum
          * over all the unmasked pixels
          */
         A = Bx = By = Cxx = Cxy = Cyy = rho4w = 0.;
-        /* Use these pointers to speed up referencing arrays */
-        const int* maskptr = mask.getData();
-        const T* imageptr = data.getData();
-        const int maskstride = mask.getStride() - (xmax - xmin + 1);
-        const int datastride = data.getStride() - (xmax - xmin + 1);
-        for(long y=ymin;y<=ymax;y++, maskptr+=maskstride, imageptr+=datastride) {
+        for(long y=ylo;y<=yhi;y++) {
             double y_y0 = y-y0;
-            double x_x0 = xmin - 1 - x0;
             double TwoMinv_xy__y_y0 = TwoMinv_xy * y_y0;
             double Minv_yy__y_y0__y_y0 = Minv_yy * y_y0 * y_y0;
-            const double* mxxptr = Minv_xx__x_x0__x_x0.cptr();
-            for(long x=xmin;x<=xmax;x++) {
-                x_x0 += 1.; // do this increment to x_x0 out here, before the following if
-                            // statement, because it has to happen whether we actually use the pixel
-                            // or not if we want to properly track where we are in the image
-                if (*(maskptr++)) {
+
+            /* Find the range of x with Minv_xx x_x0^2 + TwoMinv_xy__y_y0 x_x0 
+             * + Minv_yy__y_y0__y_y0 < max_rho2 */
+            double disc = TwoMinv_xy__y_y0 * TwoMinv_xy__y_y0
+                - 4. * Minv_xx * (Minv_yy__y_y0__y_y0 - max_rho2);
+            if (disc <= 0.) continue;
+            double xpeak = x0 - 0.5 * TwoMinv_xy__y_y0 / Minv_xx;
+            double x_extent = 0.5 * std::sqrt(disc) / Minv_xx;
+            long xlo = long(std::max(double(xmin), std::floor(xpeak - x_extent) - 1.));
+            long xhi = long(std::min(double(xmax), std::ceil(xpeak + x_extent) + 1.));
+            if (xlo > xhi) continue;
+
+            /* Fill the weights for this row */
+            long xmid = long(std::min(double(xhi), std::max(double(xlo), std::floor(xpeak + 0.5))));
+            double u = xmid - xpeak;
+            double x_x0 = xmid - x0;
+            double w = std::exp(-0.5 * (Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0
+                                        + Minv_xx*x_x0*x_x0));
+            double* wptr = &wrow[xmid-xmin];
+            *wptr = w;
+            double ratio = std::exp(-0.5 * Minv_xx * (2.*u + 1.));
+            for(long x=xmid+1;x<=xhi;x++) {
+                w *= ratio;
+                ratio *= exp_mMinv_xx;
+                *(++wptr) = w;
+            }
+            w = wrow[xmid-xmin];
+            wptr = &wrow[xmid-xmin];
+            ratio = std::exp(-0.5 * Minv_xx * (1. - 2.*u));
+            for(long x=xmid-1;x>=xlo;x--) {
+                w *= ratio;
+                ratio *= exp_mMinv_xx;
+                *(--wptr) = w;
+            }
+
+            /* Use these pointers to speed up referencing arrays */
+            const int* maskptr = mask.getData() + (y-ymin)*mask.getStride() + (xlo-xmin);
+            const T* imageptr = data.getData() + (y-ymin)*data.getStride() + (xlo-xmin);
+            wptr = &wrow[xlo-xmin];
+            x_x0 = xlo - x0;
+            for(long x=xlo;x<=xhi;x++, x_x0+=1., ++maskptr, ++imageptr, ++wptr) {
+                if (*maskptr) {
                     //npix++;
                     /* Compute displacement from weight centroid, then
                      * get elliptical radius and weight.
                      */
-                    double rho2 = Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0 + *(mxxptr++);
+                    double rho2 = Minv_yy__y_y0__y_y0 + TwoMinv_xy__y_y0*x_x0
+                        + Minv_xx*x_x0*x_x0;
                     dbg<<"Using pixel: "<<x<<" "<<y<<" with value "<<*(imageptr)<<" rho2 "<<rho2<<" x_x0 "<<x_x0<<" y_y0 "<<y_y0<<std::endl;
-                    if (rho2 < hsmparams->max_moment_nsig2) {
-                        double intensity = std::exp(-0.5 * rho2) * *(imageptr++);
+                    if (rho2 < max_rho2) {
+                        double intensity = *wptr * *imageptr;
 
                         /* Now do the addition */
                         double intensity__x_x0 = intensity * x_x0;
@@ -646,17 +684,7 @@ namespace hsm {
                         Cxy  += intensity__x_x0 * y_y0;
                         Cyy  += intensity__y_y0 * y_y0;
                         rho4w+= intensity * rho2 * rho2;
-                    } else {
-                        // if we are skipping this pixel because it's too far from center of
-                        // Gaussian, then just increment the pointer to the next pixel in the image,
-                        // don't waste time doing any math for this pixel
-                        ++imageptr;
                     }
-                } else {
-                    // we still have to increment pointers when jumping over masked pixels,
-                    // otherwise serious badness will happen.
-                    ++imageptr;
-                    ++mxxptr;
                 }
             }
         }
@@ -793,6 +821,128 @@ namespace hsm {
         rho4 /= Amp;
     }
 
+    /* The FFTW plans used by fast_convolve_image_1 for an NxN transform.
+     *
+     * Making a plan takes much longer than executing it, so we only make the plans once
+     * for each size and store them here.  The plans are made using arrays from fftw_malloc,
+     * so they may be executed on any other FFTW_Array of the same size using the new-array
+     * execute functions, fftw_execute_dft_r2c and fftw_execute_dft_c2r.
+     */
+    struct ConvolvePlans
+    {
+        fftw_plan forward;
+        fftw_plan backward;
+    };
+
+    static const ConvolvePlans& get_convolve_plans(int N)
+    {
+        static std::map<int,ConvolvePlans> cache;
+        ConvolvePlans* result = 0;
+        // Making FFTW plans is not thread safe, so only one thread may do this at a time.
+        // (Executing them is fine.)
+#ifdef _OPENMP
+#pragma omp critical (hsm_convolve_plans)
+#endif
+        {
+            std::map<int,ConvolvePlans>::iterator it = cache.find(N);
+            if (it == cache.end()) {
+                FFTW_Array<double> xarray(N);
+                FFTW_Array<std::complex<double> > karray(N);
+                ConvolvePlans plans;
+                plans.forward = fftw_plan_dft_r2c_2d(
+                    N, N, xarray.get_fftw(), karray.get_fftw(), FFTW_ESTIMATE);
+                plans.backward = fftw_plan_dft_c2r_2d(
+                    N, N, karray.get_fftw(), xarray.get_fftw(), FFTW_ESTIMATE);
+                if (plans.forward!=NULL && plans.backward!=NULL)
+                    it = cache.insert(std::make_pair(N,plans)).first;
+            }
+            if (it != cache.end()) result = &it->second;
+        }
+        if (!result) throw FFTInvalid();
+        return *result;
+    }
+
+    /* A transformed convolution kernel, along with the (masked) pixel values it was
+     * made from, so we can tell when the same kernel is used again.
+     */
+    struct ConvolveKernel
+    {
+        int N;
+        Bounds<int> bounds;
+        std::vector<double> values;
+        boost::shared_ptr<FFTW_Array<std::complex<double> > > kimage;
+    };
+
+    /* The number of recently used kernels to keep in get_convolve_kernel. */
+    static const size_t MAX_CONVOLVE_KERNELS = 8;
+
+    /* get_convolve_kernel
+     *
+     * *** RETURNS THE FFT OF A MASKED IMAGE, PADDED TO SIZE NxN ***
+     *
+     * In the re-Gaussianization method, the second image is the PSF residual, which is
+     * the same for every galaxy measured with the same PSF (at least when the galaxies
+     * are similar enough in size that the same part of the PSF image is used).  So we
+     * keep the transforms of the most recently used images and reuse them when the pixel
+     * values are the same.
+     *
+     * Arguments:
+     *   image: the image to transform, ImageView format
+     *   mask: the mask for image; masked pixels are set to 0
+     *   N: the size of the (square) transform
+     *   plans: the FFTW plans for size N
+     */
+    template <typename U>
+    static boost::shared_ptr<FFTW_Array<std::complex<double> > > get_convolve_kernel(
+        ConstImageView<U> image, ConstImageView<int> mask, int N, const ConvolvePlans& plans)
+    {
+        static std::deque<ConvolveKernel> cache;
+
+        ConvolveKernel kernel;
+        kernel.N = N;
+        kernel.bounds = image.getBounds();
+        kernel.values.reserve(kernel.bounds.area());
+        for(int x=image.getXMin();x<=image.getXMax();x++)
+            for(int y=image.getYMin();y<=image.getYMax();y++)
+                kernel.values.push_back(mask(x,y) ? double(image(x,y)) : 0.);
+
+        // The cache may be used by several threads in the batch functions, so access to it
+        // is in critical blocks.  We return a shared_ptr, so the kernel stays valid even if
+        // another thread pushes it out of the cache.
+#ifdef _OPENMP
+#pragma omp critical (hsm_convolve_kernels)
+#endif
+        {
+            for(size_t k=0;k<cache.size();k++) {
+                if (cache[k].N == N && cache[k].bounds == kernel.bounds &&
+                    cache[k].values == kernel.values) {
+                    dbg<<"Using cached kernel "<<k<<std::endl;
+                    kernel.kimage = cache[k].kimage;
+                    break;
+                }
+            }
+        }
+        if (kernel.kimage) return kernel.kimage;
+
+        kernel.kimage.reset(new FFTW_Array<std::complex<double> >(N));
+        FFTW_Array<double> xarray(N,0.);
+        int nx = image.getXMax() - image.getXMin() + 1;
+        int ny = image.getYMax() - image.getYMin() + 1;
+        for(int i=0;i<nx;i++)
+            for(int j=0;j<ny;j++)
+                xarray[i*N+j] = kernel.values[i*ny+j];
+        fftw_execute_dft_r2c(plans.forward, xarray.get(), kernel.kimage->get_fftw());
+
+#ifdef _OPENMP
+#pragma omp critical (hsm_convolve_kernels)
+#endif
+        {
+            cache.push_front(kernel);
+            if (cache.size() > MAX_CONVOLVE_KERNELS) cache.pop_back();
+        }
+        return kernel.kimage;
+    }
+
     /* fast_convolve_image_1
      *
      * *** CONVOLVES TWO IMAGES *** 
@@ -801,6 +951,10 @@ namespace hsm {
      * into account; only unmasked pixels are set in the output.  Note
      * that this routine ADDS the convolution to the pre-existing image.
      *
+     * The convolution is done with FFTW real-to-complex transforms.  The transform of
+     * image2 is cached (see get_convolve_kernel), so it is only computed once when
+     * many images are convolved with the same kernel.
+     *
      * Arguments:
      *   image1: 1st image to be convolved, ImageView format
      *   image2: 2nd image to be convolved, ImageView format
@@ -813,73 +967,39 @@ namespace hsm {
         ConstImageView<U> image2, ConstImageView<int> mask2, 
         ImageView<T> image_out, ConstImageView<int> mask_out)
     {
-        long dim1x, dim1y, dim1o, dim1, dim2, dim3, dim4;
-        double xr,xi,yr,yi;
-        long i,i_conj,j,k,ii,ii_conj;
+        long dim1x, dim1y, dim1o, N;
+        long i,j;
         long out_xmin, out_xmax, out_ymin, out_ymax, out_xref, out_yref;
 
-        /* Determine array sizes:
-         * dim1 = (linear) size of pixel grid used for FFT
-         * dim2 = 2*dim1
-         * dim3 = dim2*dim2
-         * dim4 = 2*dim3
+        /* Determine array size:
+         * N = (linear) size of pixel grid used for FFT, which must be large enough
+         * that the convolution does not wrap around.
          */
         dim1x = image1.getXMax() - image1.getXMin() + image2.getXMax() - image2.getXMin() + 2;
         dim1y = image1.getYMax() - image1.getYMin() + image2.getYMax() - image2.getYMin() + 2;
         dim1o = (dim1x>dim1y)? dim1x: dim1y;
-        dim1 = 1; while(dim1<dim1o) dim1 <<= 1; /* dim1 must be a power of two */
-        dim2 = dim1 << 1;
-        dim3 = dim2 * dim2;
-        dim4 = dim3 << 1;
-
-        /* Allocate & initialize memory */
-        tmv::Matrix<double> m1(dim1,dim1,0.);
-        tmv::Matrix<double> m2(dim1,dim1,0.);
-        tmv::Matrix<double> mout(dim1,dim1,0.);
-        tmv::Vector<double> Ax(dim4,0.);
-        tmv::Vector<double> Bx(dim4,0.);
-
-        /* Build input maps */
+        N = goodFFTSize(dim1o);
+        const ConvolvePlans& plans = get_convolve_plans(N);
+
+        /* Build the input map for image1 and transform it */
+        FFTW_Array<double> xarray(N,0.);
+        FFTW_Array<std::complex<double> > karray(N);
         for(int x=image1.getXMin();x<=image1.getXMax();x++)
             for(int y=image1.getYMin();y<=image1.getYMax();y++) 
                 if (mask1(x,y)) 
-                    m1(x-image1.getXMin(),y-image1.getYMin()) = image1(x,y);
-        for(i=image2.getXMin();i<=image2.getXMax();i++)
-            for(j=image2.getYMin();j<=image2.getYMax();j++)
-                if (mask2(i,j)) 
-                    m2(i-image2.getXMin(),j-image2.getYMin()) = image2(i,j);
-
-        /* Build the arrays for FFT -
-         * - put m1 and m2 into the real and imaginary parts of Bx, respectively. */
-        for(i=0;i<dim1;i++) for(j=0;j<dim1;j++) {
-            k=2*(dim2*i+j);
-            Bx[k  ] = m1[i][j];
-            Bx[k+1] = m2[i][j];
-        }
+                    xarray[(x-image1.getXMin())*N + (y-image1.getYMin())] = image1(x,y);
+        fftw_execute_dft_r2c(plans.forward, xarray.get(), karray.get_fftw());
 
-        /* We've filled only part of Bx, the other locations are for
-         * zero padding.  First we separate the real (m1) and imaginary (m2) parts of the FFT,
-         * then multiply to get the convolution.
-         */
-        fourier_trans_1(Bx.ptr(),dim3,1);
-        for(i=0;i<dim3;i++) {
-            i_conj = i==0? 0: dim3-i;      /* part of FFT of B holding complex conjugate mode */
-            ii      = 2*i;
-            ii_conj = 2*i_conj;
-            xr = 0.5 * (  Bx[ii  ] + Bx[ii_conj  ] );
-            xi = 0.5 * (  Bx[ii+1] - Bx[ii_conj+1] );
-            yr = 0.5 * (  Bx[ii+1] + Bx[ii_conj+1] );
-            yi = 0.5 * ( -Bx[ii  ] + Bx[ii_conj  ] );
-            Ax[ii  ] = xr*yr-xi*yi;      /* complex multiplication */
-            Ax[ii+1] = xr*yi+xi*yr;
-        }
-        fourier_trans_1(Ax.ptr(),dim3,-1);   /* Reverse FFT Ax to get convolved image */
-        for(i=0;i<dim1;i++)
-            for(j=0;j<dim1;j++)
-                mout[i][j] = Ax[2*(dim2*i+j)] / (double)dim3;
+        /* Multiply by the transform of image2, and reverse FFT to get the convolved image */
+        boost::shared_ptr<FFTW_Array<std::complex<double> > > kernel =
+            get_convolve_kernel(image2, mask2, N, plans);
+        long nk = N*(N/2+1);
+        for(i=0;i<nk;i++) karray[i] *= (*kernel)[i];
+        fftw_execute_dft_c2r(plans.backward, karray.get_fftw(), xarray.get());
+        double norm = 1./((double)N*N);
 
         /* Calculate the effective bounding box for the output image,
-         * [out_xmin..out_xmax][out_ymin..out_ymax], and the offset between mout and
+         * [out_xmin..out_xmax][out_ymin..out_ymax], and the offset between xarray and
          * image_out, namely (out_xref,out_yref)
          */
         out_xmin = out_xref = image1.getXMin() + image2.getXMin();
@@ -895,7 +1015,7 @@ namespace hsm {
         for(i=out_xmin;i<=out_xmax;i++)
             for(j=out_ymin;j<=out_ymax;j++)
                 if(mask_out(i,j))
-                    image_out(i,j) += mout(i-out_xref,j-out_yref);
+                    image_out(i,j) += norm * xarray[(i-out_xref)*N + (j-out_yref)];
 
     }
 
@@ -1661,15 +1781,64 @@ namespace hsm {
     template CppShapeData FindAdaptiveMomView(
         const ImageView<float>& object_image, const ImageView<int> &object_mask_image,
         double guess_sig, double precision, double guess_x_centroid, double guess_y_centroid,
-        boost::shared_ptr<HSMParams> hsmparams);
+        double guess_e1, double guess_e2, boost::shared_ptr<HSMParams> hsmparams);
     template CppShapeData FindAdaptiveMomView(
         const ImageView<double>& object_image, const ImageView<int> &object_mask_image,
         double guess_sig, double precision, double guess_x_centroid, double guess_y_centroid,
-        boost::shared_ptr<HSMParams> hsmparams);
+        double guess_e1, double guess_e2, boost::shared_ptr<HSMParams> hsmparams);
     template CppShapeData FindAdaptiveMomView(
         const ImageView<int>& object_image, const ImageView<int> &object_mask_image,
         double guess_sig, double precision, double guess_x_centroid, double guess_y_centroid,
-        boost::shared_ptr<HSMParams> hsmparams);
+        double guess_e1, double guess_e2, boost::shared_ptr<HSMParams> hsmparams);
+
+    template void EstimateShearBatch(
+        const ImageView<float>& gal_image, const ImageView<float>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps, const std::vector<Bounds<int> >& PSF_stamps,
+        std::vector<CppShapeData>& results, float sky_var, const char* shear_est,
+        const std::string& recompute_flux, double guess_sig_gal, double guess_sig_PSF,
+        double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void EstimateShearBatch(
+        const ImageView<double>& gal_image, const ImageView<double>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps, const std::vector<Bounds<int> >& PSF_stamps,
+        std::vector<CppShapeData>& results, float sky_var, const char* shear_est,
+        const std::string& recompute_flux, double guess_sig_gal, double guess_sig_PSF,
+        double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void EstimateShearBatch(
+        const ImageView<float>& gal_image, const ImageView<double>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps, const std::vector<Bounds<int> >& PSF_stamps,
+        std::vector<CppShapeData>& results, float sky_var, const char* shear_est,
+        const std::string& recompute_flux, double guess_sig_gal, double guess_sig_PSF,
+        double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void EstimateShearBatch(
+        const ImageView<double>& gal_image, const ImageView<float>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps, const std::vector<Bounds<int> >& PSF_stamps,
+        std::vector<CppShapeData>& results, float sky_var, const char* shear_est,
+        const std::string& recompute_flux, double guess_sig_gal, double guess_sig_PSF,
+        double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void EstimateShearBatch(
+        const ImageView<int>& gal_image, const ImageView<int>& PSF_image,
+        const ImageView<int>& gal_mask_image,
+        const std::vector<Bounds<int> >& gal_stamps, const std::vector<Bounds<int> >& PSF_stamps,
+        std::vector<CppShapeData>& results, float sky_var, const char* shear_est,
+        const std::string& recompute_flux, double guess_sig_gal, double guess_sig_PSF,
+        double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+
+    template void FindAdaptiveMomBatch(
+        const ImageView<float>& object_image, const ImageView<int>& object_mask_image,
+        const std::vector<Bounds<int> >& stamps, std::vector<CppShapeData>& results,
+        double guess_sig, double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void FindAdaptiveMomBatch(
+        const ImageView<double>& object_image, const ImageView<int>& object_mask_image,
+        const std::vector<Bounds<int> >& stamps, std::vector<CppShapeData>& results,
+        double guess_sig, double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
+    template void FindAdaptiveMomBatch(
+        const ImageView<int>& object_image, const ImageView<int>& object_mask_image,
+        const std::vector<Bounds<int> >& stamps, std::vector<CppShapeData>& results,
+        double guess_sig, double precision, boost::shared_ptr<HSMParams> hsmparams, int nthreads);
 
     template unsigned int general_shear_estimator(
         ConstImageView<float> gal_image, ConstImageView<int> gal_mask, 
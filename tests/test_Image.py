@@ -727,6 +727,178 @@ def test_Image_CubeFITS_IO():
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
 
+def test_Image_FITS_memmap():
+    """Test that memory mapped reads of FITS files match the normal reads.
+    """
+    import time
+    t1 = time.time()
+    for i in xrange(ntypes):
+        array_type = types[i]
+
+        # Single image
+        test_file = os.path.join(datadir, "test"+tchar[i]+".fits")
+        test_image = galsim.fits.read(test_file, memmap=True)
+        np.testing.assert_array_equal(ref_array.astype(types[i]), test_image.array, 
+                err_msg="Image"+tchar[i]+" read failed with memmap=True.")
+        # Modifying the image must not change the file
+        test_image.array[0,0] += 100
+        test_image = galsim.fits.read(test_file)
+        np.testing.assert_array_equal(ref_array.astype(types[i]), test_image.array, 
+                err_msg="Modifying memmap Image"+tchar[i]+" changed the file.")
+
+        # Multi-extension file
+        test_multi_file = os.path.join(datadir, "test_multi"+tchar[i]+".fits")
+        test_image_list = galsim.fits.readMulti(test_multi_file, memmap=True)
+        for k in range(nimages):
+            np.testing.assert_array_equal((ref_array+k).astype(types[i]),
+                    test_image_list[k].array, 
+                    err_msg="Image"+tchar[i]+" readMulti failed with memmap=True.")
+
+        # Data cube, written internally so it has the GS_* keywords
+        ref_image = galsim.ImageView[array_type](ref_array.astype(array_type))
+        image_list = [ ref_image + k for k in range(nimages) ]
+        for image in image_list:
+            image.setOrigin(3,4)
+            image.scale = 0.3
+        test_cube_file = os.path.join(datadir, "test_cube"+tchar[i]+"_internal.fits")
+        galsim.fits.writeCube(image_list,test_cube_file)
+        test_image_list = galsim.fits.readCube(test_cube_file, memmap=True)
+        if galsim.fits.native_byteorder == '<':
+            # FITS is big-endian, so each image should only be byte swapped when it is used.
+            np.testing.assert_array_equal((ref_array+2).astype(types[i]),
+                    test_image_list[2].array, 
+                    err_msg="Image"+tchar[i]+" readCube failed with memmap=True.")
+            np.testing.assert_equal(
+                    [ k for k in range(nimages) if test_image_list._makers[k] is not None ],
+                    [ k for k in range(nimages) if k != 2 ],
+                    err_msg="Image"+tchar[i]+" readCube with memmap=True swapped unused images.")
+            # Other ways of reading the list make the images too.
+            np.testing.assert_equal(test_image_list.index(test_image_list[1]), 1)
+            last = test_image_list.pop()
+            np.testing.assert_array_equal((ref_array+nimages-1).astype(types[i]), last.array,
+                    err_msg="Image"+tchar[i]+" readCube with memmap=True failed for pop.")
+            test_image_list.append(last)
+            assert None not in list(test_image_list)
+            assert test_image_list == list(test_image_list)
+        for k in range(nimages):
+            np.testing.assert_array_equal((ref_array+k).astype(types[i]),
+                    test_image_list[k].array, 
+                    err_msg="Image"+tchar[i]+" readCube failed with memmap=True.")
+            np.testing.assert_equal((test_image_list[k].xmin, test_image_list[k].ymin), (3,4),
+                    err_msg="Image"+tchar[i]+" readCube with memmap=True got the wrong origin.")
+            np.testing.assert_almost_equal(test_image_list[k].scale, 0.3, 12,
+                    err_msg="Image"+tchar[i]+" readCube with memmap=True got the wrong scale.")
+
+    # memmap is not possible for compressed files
+    test_file = os.path.join(datadir, "test_internal.fits.gz")
+    galsim.fits.write(ref_image, test_file)
+    try:
+        np.testing.assert_raises(ValueError, galsim.fits.read, test_file, memmap=True)
+    except ImportError:
+        print 'The assert_raises tests require nose'
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_Image_FITS_writers():
+    """Test that MultiWriter and CubeWriter match writeMulti and writeCube when the images are
+    given out of order.
+    """
+    import time
+    t1 = time.time()
+    order = [ 3, 0, 1, 7, 2, 11, 4, 10, 5, 9, 6, 8 ]
+    assert sorted(order) == range(nimages)
+    for i in xrange(ntypes):
+        array_type = types[i]
+        ref_image = galsim.ImageView[array_type](ref_array.astype(array_type))
+        image_list = [ ref_image + k for k in range(nimages) ]
+        for image in image_list:
+            image.scale = 0.3
+
+        for ext in [ '', '.gz' ]:
+            test_multi_file = os.path.join(datadir, "test_multi"+tchar[i]+"_writer.fits"+ext)
+            with galsim.fits.MultiWriter(test_multi_file, nimages) as writer:
+                for k in order:
+                    writer.write(k, image_list[k])
+            test_image_list = galsim.fits.readMulti(test_multi_file)
+            for k in range(nimages):
+                np.testing.assert_array_equal((ref_array+k).astype(types[i]),
+                        test_image_list[k].array, 
+                        err_msg="Image"+tchar[i]+" MultiWriter"+ext+" failed.")
+                np.testing.assert_almost_equal(test_image_list[k].scale, 0.3, 12,
+                        err_msg="Image"+tchar[i]+" MultiWriter"+ext+" got the wrong scale.")
+
+            test_cube_file = os.path.join(datadir, "test_cube"+tchar[i]+"_writer.fits"+ext)
+            with galsim.fits.CubeWriter(test_cube_file, nimages) as writer:
+                for k in order:
+                    writer.write(k, image_list[k])
+            test_image_list = galsim.fits.readCube(test_cube_file)
+            for k in range(nimages):
+                np.testing.assert_array_equal((ref_array+k).astype(types[i]),
+                        test_image_list[k].array, 
+                        err_msg="Image"+tchar[i]+" CubeWriter"+ext+" failed.")
+                np.testing.assert_almost_equal(test_image_list[k].scale, 0.3, 12,
+                        err_msg="Image"+tchar[i]+" CubeWriter"+ext+" got the wrong scale.")
+
+    try:
+        # Writing the same image twice is an error
+        writer = galsim.fits.CubeWriter(test_cube_file, nimages)
+        writer.write(0, image_list[0])
+        np.testing.assert_raises(IndexError, writer.write, 0, image_list[0])
+        # As is closing before all the images have been written, but the file is still closed.
+        np.testing.assert_raises(RuntimeError, writer.close)
+        assert writer.fout is None
+        np.testing.assert_raises(RuntimeError, writer.write, 1, image_list[1])
+        # Likewise at the end of a with block.
+        writers = []
+        def write_too_few():
+            with galsim.fits.CubeWriter(test_cube_file, nimages) as writer:
+                writers.append(writer)
+                writer.write(0, image_list[0])
+        np.testing.assert_raises(RuntimeError, write_too_few)
+        assert writers[0].fout is None
+    except ImportError:
+        print 'The assert_raises tests require nose'
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_Image_FITS_compression_threads():
+    """Test that gzip files written in parallel blocks and with other compression levels
+    read back correctly.
+    """
+    import time
+    t1 = time.time()
+    write_file = galsim.fits.write_file
+    save = (write_file.compression_level, write_file.compression_threads,
+            write_file.gzip_block_size)
+    try:
+        # Use a small block size so that even these small files are split into several blocks.
+        write_file.gzip_block_size = 2880
+        for i in xrange(ntypes):
+            array_type = types[i]
+            ref_image = galsim.ImageView[array_type](ref_array.astype(array_type))
+            image_list = [ ref_image + k for k in range(nimages) ]
+            for level, nthreads in [ (1, 4), (6, 0), (9, 1) ]:
+                write_file.compression_level = level
+                write_file.compression_threads = nthreads
+                for ext in [ '.gz', '.bz2' ]:
+                    test_multi_file = os.path.join(datadir,
+                                                   "test_multi"+tchar[i]+"_threads.fits"+ext)
+                    galsim.fits.writeMulti(image_list, test_multi_file)
+                    test_image_list = galsim.fits.readMulti(test_multi_file)
+                    for k in range(nimages):
+                        np.testing.assert_array_equal((ref_array+k).astype(types[i]),
+                                test_image_list[k].array, 
+                                err_msg="Image"+tchar[i]+" writeMulti"+ext+
+                                " with level=%d, threads=%d failed."%(level,nthreads))
+    finally:
+        (write_file.compression_level, write_file.compression_threads,
+         write_file.gzip_block_size) = save
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
 def test_Image_array_view():
     """Test that all four types of supported Images correctly provide a view on an input array.
     """
@@ -1340,6 +1512,9 @@ if __name__ == "__main__":
     test_Image_FITS_IO()
     test_Image_MultiFITS_IO()
     test_Image_CubeFITS_IO()
+    test_Image_FITS_memmap()
+    test_Image_FITS_writers()
+    test_Image_FITS_compression_threads()
     test_Image_array_view()
     test_Image_binary_add()
     test_Image_binary_subtract()
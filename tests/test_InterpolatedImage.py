@@ -487,6 +487,97 @@ def test_operations():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_interpolant_kernels():
+    """Test that interpolating a single non-zero pixel reproduces the interpolation kernel.
+    """
+    import time
+    t1 = time.time()
+
+    def quintic(x):
+        x = abs(x)
+        if x <= 1.:
+            return 1. + (1./12.)*x*x*x*(-95.+x*(138.-55.*x))
+        elif x <= 2.:
+            return (1./24.)*(x-1.)*(x-2.)*(-138.+x*(348.+x*(-249.+55.*x)))
+        elif x <= 3.:
+            return (1./24.)*(x-2.)*(x-3.)*(x-3.)*(-54.+x*(50.-11.*x))
+        else:
+            return 0.
+    def cubic(x):
+        x = abs(x)
+        if x >= 2.: return 0.
+        elif x < 1.: return 1. + x*x*(1.5*x-2.5)
+        else: return 2. + x*(-4. + x*(2.5 - 0.5*x))
+    def linear(x):
+        return max(0., 1.-abs(x))
+    def lanczos5(x):
+        # Without the flux conservation correction.
+        if abs(x) >= 5.: return 0.
+        else: return np.sinc(x) * np.sinc(x/5.)
+
+    # The interpolation weights for each row of pixels are calculated all at once (by
+    # Interpolant::xvalTaps), so check them against the kernel at a range of offsets.
+    ref_array = np.zeros((15,15))
+    ref_array[7,7] = 1.
+    im = galsim.ImageViewD(ref_array)
+    for interp, kernel in [ (galsim.Quintic(1.e-4), quintic),
+                            (galsim.Cubic(1.e-4), cubic),
+                            (galsim.Linear(1.e-4), linear),
+                            (galsim.Lanczos(5, False, 1.e-4), lanczos5) ]:
+        int_im = galsim.InterpolatedImage(im, x_interpolant=galsim.InterpolantXY(interp), dx=1.)
+        center = int_im.xValue(galsim.PositionD(0,0))
+        for x,y in [ (0.3,0.), (-1.7,0.2), (2.45,-0.55), (0.001,-3.9), (4.2,1.1), (0.5,-0.5) ]:
+            np.testing.assert_almost_equal(
+                int_im.xValue(galsim.PositionD(x,y)) / center, kernel(x) * kernel(y), 9,
+                err_msg="Interpolated single pixel does not match kernel for %s"%interp)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_transformed_drawK():
+    """Test that drawK of a sheared or rotated InterpolatedImage matches kValue at each point.
+    """
+    import time
+    t1 = time.time()
+
+    # drawK of a transformed InterpolatedImage fills the whole grid of transformed k values at
+    # once, which is done differently than kValue at a single point.  They should agree to
+    # near machine precision.
+    gal = galsim.Gaussian(sigma=1.1, flux=1.7)
+    gal.applyShear(g1=0.1, g2=0.3)
+    gal.applyShift(0.2, -0.1)
+    im = galsim.ImageD(32,32)
+    gal.draw(im, dx=0.3)
+
+    k_interps = [ None,
+                  galsim.InterpolantXY(galsim.Lanczos(4, True, 1.e-4)),
+                  galsim.InterpolantXY(galsim.Cubic(1.e-4)) ]
+    for k_interp in k_interps:
+        int_im = galsim.InterpolatedImage(im, k_interpolant=k_interp)
+        trans = [ int_im.createSheared(g1=0.2, g2=-0.1),
+                  int_im.createSheared(g1=-0.15, g2=0.25).createRotated(25.*galsim.degrees),
+                  int_im.createRotated(90.*galsim.degrees),
+                  int_im.createLensed(g1=0.05, g2=0.1, mu=1.3) ]
+        for obj in trans:
+            re = galsim.ImageD(40,40)
+            imag = galsim.ImageD(40,40)
+            obj.drawK(re, imag, dk=0.21)
+            peak = abs(obj.kValue(galsim.PositionD(0,0)))
+            b = re.bounds
+            for x,y in [ (0,0), (3,-2), (-7,5), (11,13), (-19,-20), (19,-4), (-1,17) ]:
+                kval = obj.kValue(galsim.PositionD(x*0.21, y*0.21))
+                i = x - b.xmin
+                j = y - b.ymin
+                np.testing.assert_almost_equal(
+                    re.array[j,i]/peak, kval.real/peak, 9,
+                    err_msg="drawK of transformed InterpolatedImage disagrees with kValue (real)")
+                np.testing.assert_almost_equal(
+                    imag.array[j,i]/peak, kval.imag/peak, 9,
+                    err_msg="drawK of transformed InterpolatedImage disagrees with kValue (imag)")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 def test_uncorr_padding():
     """Test for uncorrelated noise padding of InterpolatedImage."""
     import time
@@ -646,5 +737,7 @@ if __name__ == "__main__":
     test_exceptions()
     test_operations_simple()
     test_operations()
+    test_interpolant_kernels()
+    test_transformed_drawK()
     test_uncorr_padding()
     test_corr_padding()
@@ -3070,6 +3070,565 @@ def test_autocorrelate():
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
 
+def test_gsparams_cache():
+    """Test that profiles built with separate but equal GSParams share the cached profile info.
+    """
+    import time
+    t1 = time.time()
+    for sbclass in [ galsim.SBSersic, galsim.SBKolmogorov, galsim.SBAiry, galsim.SBExponential ]:
+        sbclass.clearCache()
+        sbclass.resetCacheStats()
+        stats = sbclass.getCacheStats()
+        np.testing.assert_equal(stats, (0, 0, 0, 100),
+                                err_msg="Wrong cache stats after clearing %s cache"%sbclass)
+
+    # Each new GSParams object has the same values, so only the first one should be a miss.
+    ntest = 5
+    for i in range(ntest):
+        gsp = galsim.GSParams(kvalue_accuracy=2.e-5)
+        galsim.Sersic(n=2.5, half_light_radius=1.3, flux=1.+i, gsparams=gsp)
+        galsim.Kolmogorov(fwhm=1.+i, gsparams=gsp)
+        galsim.Airy(lam_over_diam=1.+i, obscuration=0.1, gsparams=gsp)
+        galsim.Exponential(scale_radius=1.+i, gsparams=gsp)
+    for sbclass in [ galsim.SBSersic, galsim.SBKolmogorov, galsim.SBAiry, galsim.SBExponential ]:
+        nhits, nmisses, size, maxsize = sbclass.getCacheStats()
+        np.testing.assert_equal((nhits, nmisses, size), (ntest-1, 1, 1),
+                                err_msg="GSParams not interned by value for %s"%sbclass)
+
+    # The default GSParams is the same as gsparams=None.
+    galsim.Exponential(scale_radius=1.)
+    galsim.Exponential(scale_radius=1., gsparams=galsim.GSParams())
+    np.testing.assert_equal(galsim.SBExponential.getCacheStats()[0:3], (ntest, 2, 2),
+                            err_msg="GSParams() not interned together with default gsparams")
+
+    # Changing a GSParams after it has been used should not change the existing profiles.
+    gsp = galsim.GSParams(maxk_threshold=2.e-3)
+    exp1 = galsim.Exponential(scale_radius=1.3, gsparams=gsp)
+    maxk1 = exp1.maxK()
+    gsp.maxk_threshold = 1.e-4
+    exp2 = galsim.Exponential(scale_radius=1.3, gsparams=gsp)
+    np.testing.assert_equal(exp1.maxK(), maxk1,
+                            err_msg="Changing GSParams changed an existing profile")
+    assert exp2.maxK() > maxk1
+
+    # The cache size may be changed.
+    galsim.SBExponential.setCacheSize(1)
+    np.testing.assert_equal(galsim.SBExponential.getCacheStats()[2:4], (1, 1),
+                            err_msg="SBExponential.setCacheSize did not shrink the cache")
+    galsim.SBExponential.setCacheSize(100)
+    try:
+        np.testing.assert_raises(RuntimeError, galsim.SBExponential.setCacheSize, 0)
+    except ImportError:
+        print 'The assert_raises tests require nose'
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_info_disk_cache():
+    """Test that Sersic, Kolmogorov and Airy tables read from the disk cache give the same 
+    results as freshly calculated ones.
+    """
+    import time
+    import shutil
+    import tempfile
+    t1 = time.time()
+    cache_dir = tempfile.mkdtemp()
+    save_dir = galsim.getInfoCacheDirectory()
+    try:
+        galsim.setInfoCacheDirectory(cache_dir)
+        np.testing.assert_equal(galsim.getInfoCacheDirectory(), cache_dir)
+
+        def build():
+            return [ galsim.Sersic(n=1.7, half_light_radius=1.2),
+                     galsim.Sersic(n=2.3, half_light_radius=1.2, trunc=4.),
+                     galsim.Kolmogorov(fwhm=1.1),
+                     galsim.Airy(lam_over_diam=0.8, obscuration=0.2) ]
+        def draw(obj_list):
+            images = []
+            for obj in obj_list:
+                images.append(obj.draw(dx=0.3))
+                images.append(obj.drawShoot(galsim.ImageD(32,32), dx=0.3, n_photons=1000,
+                                            rng=galsim.BaseDeviate(1234)))
+            return images
+
+        # The first time, the tables are calculated and written to cache_dir.
+        for sbclass in [ galsim.SBSersic, galsim.SBKolmogorov, galsim.SBAiry ]:
+            sbclass.clearCache()
+        images1 = draw(build())
+        assert len(os.listdir(cache_dir)) == 4
+
+        # The second time, they are read back from the files.
+        for sbclass in [ galsim.SBSersic, galsim.SBKolmogorov, galsim.SBAiry ]:
+            sbclass.clearCache()
+        images2 = draw(build())
+        for im1, im2 in zip(images1, images2):
+            np.testing.assert_array_equal(
+                im1.array, im2.array,
+                err_msg="Image using tables from the disk cache differs from the original")
+
+        # If the cached data are invalid, the tables are recalculated and the files rewritten.
+        # Drop the last 5 values from each file, fixing the count so the file still reads.
+        import struct
+        sizes = {}
+        for name in os.listdir(cache_dir):
+            file_name = os.path.join(cache_dir, name)
+            sizes[name] = os.path.getsize(file_name)
+            with open(file_name, 'rb') as fin:
+                contents = fin.read()
+            nkey = struct.unpack('i', contents[16:20])[0]
+            k = 20 + 8*nkey
+            ndata = struct.unpack('i', contents[k:k+4])[0]
+            with open(file_name, 'wb') as fout:
+                fout.write(contents[:k] + struct.pack('i', ndata-5) + 
+                           contents[k+4:k+4+8*(ndata-5)])
+        for sbclass in [ galsim.SBSersic, galsim.SBKolmogorov, galsim.SBAiry ]:
+            sbclass.clearCache()
+        images3 = draw(build())
+        for im1, im3 in zip(images1, images3):
+            np.testing.assert_array_equal(
+                im1.array, im3.array,
+                err_msg="Image after reading invalid cached tables differs from the original")
+        for name in os.listdir(cache_dir):
+            np.testing.assert_equal(os.path.getsize(os.path.join(cache_dir, name)), sizes[name],
+                                    err_msg="Invalid cache file %s was not rewritten"%name)
+    finally:
+        galsim.setInfoCacheDirectory(save_dir)
+        shutil.rmtree(cache_dir)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_sersic_n_interpolation():
+    """Test that Sersic profiles interpolated between tabulated values of n are accurate.
+    """
+    import time
+    t1 = time.time()
+    save_interp = galsim.SBSersic.getNInterpolation()
+    try:
+        # n = 2.437 is not on any of the interpolation grids.
+        n = 2.437
+        galsim.SBSersic.setNInterpolation(False)
+        exact = galsim.Sersic(n=n, half_light_radius=1.1, flux=1.7)
+        galsim.SBSersic.setNInterpolation(True)
+        assert galsim.SBSersic.getNInterpolation()
+        interp = galsim.Sersic(n=n, half_light_radius=1.1, flux=1.7)
+
+        # The interpolation should be accurate to within the kvalue_accuracy and 
+        # xvalue_accuracy of the default GSParams.
+        gsp = galsim.GSParams()
+        np.testing.assert_almost_equal(interp.getFlux(), exact.getFlux())
+        for r in [ 0., 0.3, 1.1, 2.7, 5.0 ]:
+            pos = galsim.PositionD(r, 0.)
+            np.testing.assert_array_less(
+                abs(interp.xValue(pos) - exact.xValue(pos)),
+                10. * gsp.xvalue_accuracy * exact.xValue(galsim.PositionD(0.,0.)),
+                err_msg="Interpolated Sersic xValue differs from the exact value at r = %f"%r)
+        im_exact = exact.draw(dx=0.2)
+        im_interp = interp.draw(galsim.ImageD(im_exact.bounds), dx=0.2)
+        np.testing.assert_array_almost_equal(
+            im_interp.array / im_exact.array.max(), im_exact.array / im_exact.array.max(), 3,
+            err_msg="Interpolated Sersic image differs from the exact image")
+
+        # Photon shooting should also give the right flux.
+        im_shoot = interp.drawShoot(galsim.ImageD(64,64), dx=0.2, n_photons=10000,
+                                    rng=galsim.BaseDeviate(1234))
+        assert im_shoot.added_flux > 0.95 * 1.7
+        assert im_shoot.added_flux < 1.7 * (1. + 1.e-6)
+
+        # Many different values of n should only need a bounded number of tabulated profiles.
+        galsim.SBSersic.clearCache()
+        galsim.SBSersic.resetCacheStats()
+        for n in np.linspace(1.0, 1.5, 200):
+            galsim.Sersic(n=n, half_light_radius=1.)
+        nhits, nmisses, size, maxsize = galsim.SBSersic.getCacheStats()
+        assert nmisses < 50
+
+        # Values of n on the grid, like de Vaucouleurs, use the exact profile.
+        galsim.SBSersic.resetCacheStats()
+        galsim.DeVaucouleurs(half_light_radius=1.)
+        galsim.Sersic(n=4, half_light_radius=1.)
+        np.testing.assert_equal(galsim.SBSersic.getCacheStats()[0:2], (1, 1),
+                                err_msg="Grid value of n was interpolated")
+    finally:
+        galsim.SBSersic.setNInterpolation(save_interp)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_binning():
+    """Test that photons are binned correctly, including the ones that miss the image.
+    """
+    import time
+    t1 = time.time()
+    obj = galsim.Convolve([galsim.Gaussian(sigma=1.7, flux=3.), galsim.Exponential(scale_radius=0.6)])
+    dx = 0.3
+    for im_type in [ galsim.ImageF, galsim.ImageD ]:
+        # A small image, so a large fraction of the photons fall off the edges.
+        im1 = obj.drawShoot(im_type(11,13), dx=dx, n_photons=300000, rng=galsim.BaseDeviate(1234))
+        assert im1.added_flux < 0.5 * obj.getFlux()
+        np.testing.assert_almost_equal(
+            im1.array.sum() * dx**2 / im1.added_flux, 1., 5,
+            err_msg="Flux in image does not match added_flux for photon shooting")
+        # Shooting again reuses the photon arrays, which should not change the result.
+        im2 = obj.drawShoot(im_type(11,13), dx=dx, n_photons=300000, rng=galsim.BaseDeviate(1234))
+        np.testing.assert_array_equal(
+            im2.array, im1.array, err_msg="Repeated photon shooting gave a different image")
+        np.testing.assert_equal(im2.added_flux, im1.added_flux)
+        # A large image catches all the flux.
+        im3 = obj.drawShoot(im_type(200,200), dx=dx, n_photons=300000, 
+                            rng=galsim.BaseDeviate(1234))
+        np.testing.assert_almost_equal(im3.added_flux / obj.getFlux(), 1., 6)
+        # The central pixels should match those of the small image.
+        np.testing.assert_array_almost_equal(
+            im3.array[94:107,95:106] / im3.array.max(), im1.array / im3.array.max(), 5,
+            err_msg="Photons binned into the wrong pixels")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_threads():
+    """Test that photon shooting with multiple threads is reproducible and accurate.
+    """
+    import time
+    t1 = time.time()
+    obj = galsim.Convolve([galsim.Sersic(n=2.2, half_light_radius=1.3, flux=1.e5),
+                           galsim.Airy(lam_over_diam=0.7, obscuration=0.3)])
+    dx = 0.25
+    nx = 64
+    im1 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(1234))
+    for nthreads in [ 2, 3, 8 ]:
+        im2 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(1234),
+                            nthreads=nthreads)
+        im3 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(1234),
+                            nthreads=nthreads)
+        np.testing.assert_array_equal(
+            im3.array, im2.array, 
+            err_msg="Photon shooting with %d threads is not reproducible"%nthreads)
+        # The different random numbers mean this is a different realization, but it should 
+        # have the same flux and size.
+        np.testing.assert_almost_equal(im2.added_flux / im1.added_flux, 1., 2,
+                                       err_msg="Photon shooting with threads has wrong flux")
+        mom1 = im1.FindAdaptiveMom()
+        mom2 = im2.FindAdaptiveMom()
+        np.testing.assert_almost_equal(mom2.moments_sigma / mom1.moments_sigma, 1., 2,
+                                       err_msg="Photon shooting with threads has wrong size")
+
+    # With max_extra_noise, the photon count is estimated serially first.
+    im4 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(1234),
+                        max_extra_noise=10., nthreads=4)
+    im5 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(1234),
+                        max_extra_noise=10., nthreads=4)
+    np.testing.assert_array_equal(im5.array, im4.array)
+    np.testing.assert_almost_equal(im4.added_flux / im1.added_flux, 1., 2)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_threads_consistency():
+    """Test that photon shooting with different numbers of threads gives consistent images.
+    """
+    import time
+    t1 = time.time()
+    # Each photon has a flux of 1, so the pixel values are photon counts.
+    nphot = 200000
+    obj = galsim.Convolve([galsim.Sersic(n=2.2, half_light_radius=1.3, flux=nphot),
+                           galsim.Airy(lam_over_diam=0.7, obscuration=0.3)])
+    dx = 0.25
+    nx = 64
+    im1 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(5678),
+                        n_photons=nphot)
+    for nthreads in [ 2, 3, 8 ]:
+        im2 = obj.drawShoot(galsim.ImageD(nx,nx), dx=dx, rng=galsim.BaseDeviate(5678),
+                            n_photons=nphot, nthreads=nthreads)
+        # The two images are different realizations of the same Poisson process, so the
+        # difference in each pixel has variance im1 + im2.
+        var = im1.array + im2.array
+        use = var > 20.
+        chisq = np.sum((im1.array[use] - im2.array[use])**2 / var[use]) / np.sum(use)
+        print 'nthreads = %d: chisq/dof = %f'%(nthreads, chisq)
+        np.testing.assert_almost_equal(
+            chisq, 1., 1,
+            err_msg="Photon shooting with %d threads is inconsistent with 1 thread"%nthreads)
+        np.testing.assert_almost_equal(
+            (im2.added_flux - im1.added_flux) / np.sqrt(nphot), 0., 0,
+            err_msg="Photon shooting with %d threads has the wrong flux"%nthreads)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_photon_array():
+    """Test that photons from GSObject.shoot can be modified and binned into images.
+    """
+    import time
+    t1 = time.time()
+    obj = galsim.Gaussian(sigma=1.1, flux=1000.)
+    photons = obj.shoot(10000, galsim.BaseDeviate(1234))
+    assert len(photons) == 10000
+    np.testing.assert_almost_equal(photons.getTotalFlux(), obj.getFlux())
+    np.testing.assert_almost_equal(photons.flux.sum(), obj.getFlux())
+    np.testing.assert_equal(photons.x[17], photons.getX(17))
+    np.testing.assert_equal(photons.y[17], photons.getY(17))
+
+    # The arrays are views of the photon data, so modifying them changes the photons.
+    x0 = photons.x.copy()
+    photons.x[:] += 0.5
+    np.testing.assert_array_equal(photons.x, x0 + 0.5)
+    np.testing.assert_equal(photons.getX(17), x0[17] + 0.5)
+    photons.x[:] -= 0.5
+    # The arrays keep the photons alive.
+    xarray = obj.shoot(100, galsim.BaseDeviate(1234)).x
+    np.testing.assert_array_almost_equal(xarray, x0[:100])
+
+    # append and reserve could move the data under the arrays, so they aren't allowed while
+    # any arrays exist.
+    photons3 = obj.shoot(100, galsim.BaseDeviate(1234))
+    photons4 = obj.shoot(100, galsim.BaseDeviate(1234))
+    flux3 = photons3.flux
+    try:
+        np.testing.assert_raises(RuntimeError, photons3.append, photons4)
+        np.testing.assert_raises(RuntimeError, photons3.reserve, 1000)
+    except ImportError:
+        # assert_raises requires nose, which we don't want to force people to install.
+        # So if they are running this without nose, we just skip these tests.
+        pass
+    del flux3
+    photons3.append(photons4)
+    assert len(photons3) == 200
+    np.testing.assert_array_equal(photons3.x[100:], photons3.x[:100])
+
+    # Binning into an image should match drawShoot with the same photons.
+    dx = 0.3
+    im1 = galsim.ImageD(32,32)
+    im1.setCenter(0,0)
+    photons.scaleFlux(dx**2)
+    im1.scale = dx
+    added_flux = photons.addTo(im1)
+    im2 = galsim.ImageD(32,32)
+    im2.setCenter(0,0)
+    obj.drawShoot(im2, dx=dx, n_photons=10000, rng=galsim.BaseDeviate(1234), poisson_flux=False,
+                  use_true_center=False)
+    np.testing.assert_array_almost_equal(im1.array, im2.array, 10,
+                                         err_msg="PhotonArray.addTo differs from drawShoot")
+    np.testing.assert_almost_equal(added_flux, im1.array.sum() * dx**2)
+
+    # A PhotonArray can also be made from numpy arrays.
+    photons2 = galsim.PhotonArray(photons.x + 0.6, photons.y, photons.flux)
+    im3 = galsim.ImageF(32,32)
+    im3.setCenter(0,0)
+    im3.scale = dx
+    photons2.addTo(im3.view())
+    np.testing.assert_almost_equal(im3.array.sum() / im1.array.sum(), 1., 2)
+    assert abs(im3.FindAdaptiveMom().moments_centroid.x -
+               im1.FindAdaptiveMom().moments_centroid.x - 0.6/dx) < 0.1
+
+    # Freeing the reused photon arrays doesn't change the results.
+    galsim.PhotonArray.clearPool()
+    im4 = galsim.ImageD(32,32)
+    im4.setCenter(0,0)
+    obj.drawShoot(im4, dx=dx, n_photons=10000, rng=galsim.BaseDeviate(1234), poisson_flux=False,
+                  use_true_center=False)
+    np.testing.assert_array_equal(im4.array, im2.array)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_convolve_ncache():
+    """Test that caching the k values of the leading profiles in Convolve gives the same images.
+    """
+    import time
+    t1 = time.time()
+    psf = galsim.Moffat(beta=3, fwhm=0.8)
+    pix = galsim.Pixel(0.2)
+    psf2 = galsim.Kolmogorov(fwhm=0.7)
+    for i, (psf_i, hlr, e1) in enumerate([ (psf, 0.5, 0.1), (psf, 0.8, -0.3), (psf2, 0.6, 0.2),
+                                           (psf, 0.6, 0.2) ]):
+        gal = galsim.Exponential(half_light_radius=hlr)
+        gal.applyShear(e1=e1, e2=0.05)
+        for shift, shear in [ (None, None), ((0.05,-0.07), None), (None, (0.1,0.2)) ]:
+            im = []
+            for ncache in [ 0, 2, 2 ]:
+                final = galsim.Convolve([psf_i, pix, gal], ncache=ncache)
+                if shift: final.applyShift(*shift)
+                if shear: final.applyShear(g1=shear[0], g2=shear[1])
+                im.append(final.draw(galsim.ImageD(48,48), dx=0.2))
+            for ncache, im_c in [ (2, im[1]), (2, im[2]) ]:
+                np.testing.assert_array_almost_equal(
+                    im_c.array, im[0].array, 12,
+                    err_msg="Convolve with ncache=%d differs for case %d"%(ncache,i))
+
+    # Drawing in k space should use the cache too.
+    gal = galsim.Sersic(n=2.5, half_light_radius=0.7)
+    re0, im0 = galsim.Convolve([psf, pix, gal]).drawK(dk=0.3)
+    re1, im1 = galsim.Convolve([psf, pix, gal], ncache=2).drawK(dk=0.3)
+    np.testing.assert_array_almost_equal(re1.array, re0.array, 12)
+    np.testing.assert_array_almost_equal(im1.array, im0.array, 12)
+
+    # A nested Convolve counts as one item.
+    eff_psf = galsim.Convolve([psf, pix])
+    im2 = galsim.Convolve([eff_psf, gal], ncache=1).draw(dx=0.2)
+    im3 = galsim.Convolve([psf, pix, gal]).draw(dx=0.2)
+    np.testing.assert_array_almost_equal(im2.array, im3.array, 12)
+
+    # Changing the cache size or clearing it shouldn't change the results.
+    galsim.SBConvolve.setCacheSize(1)
+    im4 = galsim.Convolve([psf, pix, gal], ncache=2).draw(dx=0.2)
+    galsim.SBConvolve.clearCache()
+    im5 = galsim.Convolve([psf, pix, gal], ncache=2).draw(dx=0.2)
+    galsim.SBConvolve.setCacheSize(4)
+    np.testing.assert_array_almost_equal(im4.array, im3.array, 12)
+    np.testing.assert_array_almost_equal(im5.array, im3.array, 12)
+    try:
+        np.testing.assert_raises(RuntimeError, galsim.SBConvolve.setCacheSize, 0)
+    except ImportError:
+        print 'The assert_raises tests require nose'
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_gaussian_mixture():
+    """Test that a GaussianMixture matches the Add of the corresponding Gaussians.
+    """
+    import time
+    t1 = time.time()
+    ud = galsim.UniformDeviate(1234)
+    n = 60
+    flux = np.array([ 0.2 + ud() for i in range(n) ])
+    flux[7] = -0.1
+    sigma = np.array([ 0.2 + 0.8 * ud() for i in range(n) ])
+    g1 = np.array([ 0.6 * ud() - 0.3 for i in range(n) ])
+    g2 = np.array([ 0.6 * ud() - 0.3 for i in range(n) ])
+    x0 = np.array([ 2. * ud() - 1. for i in range(n) ])
+    y0 = np.array([ 2. * ud() - 1. for i in range(n) ])
+
+    # The covariance of a Gaussian with the given sigma after applyShear(g1,g2).
+    gsq = g1**2 + g2**2
+    cxx = sigma**2 * ((1.+g1)**2 + g2**2) / (1.-gsq)
+    cxy = sigma**2 * 2.*g2 / (1.-gsq)
+    cyy = sigma**2 * ((1.-g1)**2 + g2**2) / (1.-gsq)
+    mix = galsim.GaussianMixture(flux, cov=np.array([cxx,cxy,cyy]).T, x0=x0, y0=y0)
+    assert mix.getNComponents() == n
+    np.testing.assert_almost_equal(mix.getFlux(), flux.sum())
+
+    gauss = []
+    for i in range(n):
+        g = galsim.Gaussian(sigma=sigma[i], flux=flux[i])
+        g.applyShear(g1=g1[i], g2=g2[i])
+        g.applyShift(x0[i], y0[i])
+        gauss.append(g)
+    add = galsim.Add(gauss)
+    centroid = add.centroid()
+    np.testing.assert_almost_equal(mix.centroid().x, centroid.x)
+    np.testing.assert_almost_equal(mix.centroid().y, centroid.y)
+    np.testing.assert_almost_equal(mix.xValue(galsim.PositionD(0.3,-0.2)),
+                                   add.xValue(galsim.PositionD(0.3,-0.2)))
+
+    # The same image in both real and k space, also after a further transformation.
+    im1 = mix.draw(galsim.ImageD(64,64), dx=0.2)
+    im2 = add.draw(galsim.ImageD(64,64), dx=0.2)
+    np.testing.assert_array_almost_equal(im1.array, im2.array, 5,
+                                         err_msg="GaussianMixture draw differs from Add")
+    re1, im1 = mix.drawK(dk=0.3)
+    re2, im2 = add.drawK(dk=0.3)
+    np.testing.assert_array_almost_equal(re1.array, re2.array, 4,
+                                         err_msg="GaussianMixture drawK differs from Add")
+    np.testing.assert_array_almost_equal(im1.array, im2.array, 4,
+                                         err_msg="GaussianMixture drawK differs from Add")
+    pix = galsim.Pixel(0.2)
+    mix.applyShear(g1=0.2, g2=-0.1)
+    add.applyShear(g1=0.2, g2=-0.1)
+    im1 = galsim.Convolve([mix, pix]).draw(galsim.ImageD(64,64), dx=0.2)
+    im2 = galsim.Convolve([add, pix]).draw(galsim.ImageD(64,64), dx=0.2)
+    np.testing.assert_array_almost_equal(im1.array, im2.array, 5,
+                                         err_msg="Convolved GaussianMixture differs from Add")
+
+    # Photon shooting should give the right flux and centroid.
+    mix = galsim.GaussianMixture(flux[:7], sigma=sigma[:7], x0=x0[:7], y0=y0[:7])
+    im1 = mix.draw(galsim.ImageD(64,64), dx=0.2)
+    im2 = mix.drawShoot(galsim.ImageD(64,64), dx=0.2, n_photons=100000,
+                        rng=galsim.BaseDeviate(1234))
+    np.testing.assert_almost_equal(im2.array.sum() / im1.array.sum(), 1., 2)
+    mom1 = im1.FindAdaptiveMom()
+    mom2 = im2.FindAdaptiveMom()
+    assert abs(mom1.moments_centroid.x - mom2.moments_centroid.x) < 0.1
+    assert abs(mom1.moments_centroid.y - mom2.moments_centroid.y) < 0.1
+    np.testing.assert_almost_equal(mom2.moments_sigma / mom1.moments_sigma, 1., 2)
+
+    # If the fluxes cancel, the centroid is weighted by the absolute fluxes.
+    mix0 = galsim.GaussianMixture([ 1., -1. ], sigma=1., x0=[ 1., 3. ], y0=[ -2., 0. ])
+    cen = mix0.centroid()
+    np.testing.assert_almost_equal((cen.x, cen.y), (2., -1.))
+    cen = galsim.GaussianMixture([ 0., 0. ], sigma=1., x0=[ 1., 3. ]).centroid()
+    np.testing.assert_almost_equal((cen.x, cen.y), (0., 0.))
+
+    # Exactly one of sigma and cov is required.
+    try:
+        np.testing.assert_raises(TypeError, galsim.GaussianMixture, flux, sigma=sigma,
+                                 cov=[[1.,0.],[0.,1.]])
+        np.testing.assert_raises(TypeError, galsim.GaussianMixture, flux)
+        np.testing.assert_raises(ValueError, galsim.GaussianMixture, flux, sigma=sigma[:3])
+    except ImportError:
+        print 'The assert_raises tests require nose'
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_realspace_box_convolve():
+    """Test that drawing a real-space convolution with a Pixel matches the direct integrals.
+    """
+    import time
+    t1 = time.time()
+    # When drawing an image, a real-space convolution with a Pixel or Box integrates over the
+    # cells between the box edges and shares them between neighboring pixels.  The xValue
+    # function still does the full real-space integral for each position, so use that to 
+    # check the drawn images.
+    psf = galsim.Moffat(beta=1.5, half_light_radius=1, trunc=4.5, flux=1.7)
+    psf.applyShear(g1=0.1, g2=-0.05)
+    box = galsim.Pixel(xw=0.3, yw=0.3)
+    # Also use profiles whose edges cross the cells well inside the image: a Moffat truncated
+    # at a small radius and a larger box whose edges don't line up with the pixels.
+    trunc_psf = galsim.Moffat(beta=2.5, half_light_radius=1, trunc=1.3, flux=1.7)
+    big_box = galsim.Pixel(xw=1.13, yw=0.77)
+    for prof, xw, dx in [ (psf, 0.2, 0.2), (psf, 0.2, 0.05), (psf, 0.25, 0.1), 
+                          (psf, 0.2, 0.3), (box, 0.2, 0.2), (trunc_psf, 0.2, 0.2),
+                          (trunc_psf, 0.25, 0.1), (big_box, 0.2, 0.2), (big_box, 0.25, 0.1) ]:
+        pix = galsim.Pixel(xw=xw)
+        conv = galsim.Convolve([prof,pix],real_space=True)
+        n = 25
+        im = galsim.ImageD(n,n)
+        conv.draw(im, dx=dx, normalization="surface brightness", use_true_center=False)
+        ref = np.zeros((n,n))
+        for j in range(n):
+            for i in range(n):
+                ref[j,i] = conv.xValue(galsim.PositionD((i-n/2)*dx,(j-n/2)*dx))
+        peak = ref.max()
+        np.testing.assert_array_almost_equal(
+                im.array/peak, ref/peak, 5,
+                err_msg="Real-space convolution with xw = %f, dx = %f disagrees with xValue"%(
+                    xw,dx))
+
+    # A shifted convolution still draws its adaptee on an aligned grid.
+    pix = galsim.Pixel(xw=0.2)
+    conv = galsim.Convolve([psf,pix],real_space=True)
+    conv.applyShift(0.03,-0.05)
+    conv.draw(im, dx=0.2, normalization="surface brightness", use_true_center=False)
+    peak = im.array.max()
+    for j,i in [ (12,12), (10,15), (3,20) ]:
+        ref = conv.xValue(galsim.PositionD((i-n/2)*0.2,(j-n/2)*0.2))
+        np.testing.assert_almost_equal(im.array[j,i]/peak, ref/peak, 5)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
 if __name__ == "__main__":
     test_gaussian()
     test_gaussian_properties()
@@ -3107,3 +3666,13 @@ if __name__ == "__main__":
     test_drawK_Exponential_Moffat()
     test_autoconvolve()
     test_autocorrelate()
+    test_gsparams_cache()
+    test_info_disk_cache()
+    test_sersic_n_interpolation()
+    test_shoot_binning()
+    test_shoot_threads()
+    test_shoot_threads_consistency()
+    test_shoot_photon_array()
+    test_convolve_ncache()
+    test_gaussian_mixture()
+    test_realspace_box_convolve()
@@ -142,10 +142,170 @@ def test_scattered():
     np.testing.assert_almost_equal(image.array, image2.array)
 
 
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_tiled_psf_image():
+    """Test that reusing the psf stamps of a Tiled image gives the same psf image
+    """
+    import time
+    import copy
+    t1 = time.time()
+
+    config = {
+        'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+        'pix' : { 'type' : 'Pixel', 'xw' : 0.3 },
+        'gal' : { 'type' : 'Exponential', 'flux' : 100,
+                  'half_light_radius' : { 'type' : 'Random', 'min' : 0.3, 'max' : 0.8 } },
+        'image' : { 'type' : 'Tiled', 'nx_tiles' : 3, 'ny_tiles' : 2, 'stamp_size' : 24,
+                    'pixel_scale' : 0.3, 'random_seed' : 1234 }
+    }
+    # The same psf, but given in a way that makes it be rebuilt (and redrawn) for each stamp.
+    config2 = copy.deepcopy(config)
+    config2['psf']['fwhm'] = { 'type' : 'List', 'items' : [ 0.9 ] * 6 }
+
+    image, psf_image, _, _ = galsim.config.BuildImage(config, make_psf_image=True)
+    image2, psf_image2, _, _ = galsim.config.BuildImage(config2, make_psf_image=True)
+    assert 'psf_stamp_cache' in config
+    assert 'psf_stamp_cache' not in config2
+    np.testing.assert_array_almost_equal(image.array, image2.array)
+    np.testing.assert_array_equal(psf_image.array, psf_image2.array)
+
+    # Every tile of the psf image should be the same.
+    tile = psf_image.array[0:24,0:24]
+    for iy in range(2):
+        for ix in range(3):
+            np.testing.assert_array_equal(psf_image.array[24*iy:24*(iy+1),24*ix:24*(ix+1)], tile)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_nproc():
+    """Test that building Tiled and Scattered images with multiple processes matches nproc=1
+    """
+    import time
+    import copy
+    t1 = time.time()
+
+    config = {
+        'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+        'pix' : { 'type' : 'Pixel', 'xw' : 0.3 },
+        'gal' : { 'type' : 'Exponential', 'flux' : 100,
+                  'half_light_radius' : { 'type' : 'Random', 'min' : 0.3, 'max' : 0.8 } },
+        'image' : { 'type' : 'Tiled', 'nx_tiles' : 4, 'ny_tiles' : 3, 'stamp_size' : 24,
+                    'pixel_scale' : 0.3, 'random_seed' : 1234 }
+    }
+    config2 = copy.deepcopy(config)
+    config2['image']['nproc'] = 3
+
+    # Each tile is only written by one process, so these should be identical.
+    image, psf_image, _, _ = galsim.config.BuildImage(config, make_psf_image=True)
+    image2, psf_image2, _, _ = galsim.config.BuildImage(config2, make_psf_image=True)
+    np.testing.assert_array_equal(image.array, image2.array)
+    np.testing.assert_array_equal(psf_image.array, psf_image2.array)
+    np.testing.assert_equal(image2.bounds, image.bounds)
+    np.testing.assert_equal(image2.scale, image.scale)
+
+    # Scattered stamps overlap, but they are still added in order, so these should be
+    # identical too.
+    config['image'] = { 'type' : 'Scattered', 'size' : 64, 'stamp_size' : 24,
+                        'pixel_scale' : 0.3, 'random_seed' : 1234, 'nobjects' : 20 }
+    config2 = copy.deepcopy(config)
+    config2['image']['nproc'] = 3
+    image, _, weight_image, _ = galsim.config.BuildImage(config, make_weight_image=True)
+    image2, _, weight_image2, _ = galsim.config.BuildImage(config2, make_weight_image=True)
+    np.testing.assert_array_equal(image.array, image2.array)
+    np.testing.assert_array_equal(weight_image.array, weight_image2.array)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_stamp_callback():
+    """Test that stamps sent to a BuildStamps callback can't pile up behind a slow one
+    """
+    import time
+    t1 = time.time()
+
+    nobjects = 30
+    nproc = 2
+    # The first stamp is much bigger than the rest, so it takes much longer to draw.
+    sizes = [ 1024 ] + [ 16 ] * (nobjects-1)
+    config = {
+        'gal' : { 'type' : 'Gaussian', 'sigma' : 0.7, 'flux' : 17 },
+        'image' : { 'type' : 'Scattered', 'size' : 64, 'pixel_scale' : 0.45,
+                    'stamp_xsize' : { 'type' : 'List', 'items' : sizes },
+                    'stamp_ysize' : { 'type' : 'List', 'items' : sizes },
+                    'random_seed' : 1234, 'nobjects' : nobjects }
+    }
+    # Building the image once also sets up the config for building its stamps directly.
+    galsim.config.BuildImage(config)
+
+    # Use the stamps in order of k, the way BuildScatteredImage does.
+    pending = {}
+    stamps = []
+    max_pending = [ 0 ]
+    def callback(k, image, psf_image, weight_image, badpix_image):
+        pending[k] = image
+        max_pending[0] = max(max_pending[0], len(pending))
+        while len(stamps) in pending:
+            stamps.append(pending.pop(len(stamps)))
+
+    images = galsim.config.BuildStamps(nobjects, config, nproc=nproc, do_noise=False,
+                                       callback=callback, ordered_callback=True)[0]
+    np.testing.assert_equal(images, [])
+    np.testing.assert_equal(len(stamps), nobjects)
+    np.testing.assert_equal(pending, {})
+    # While the first stamp is being drawn, the other process can't get more than 2*nproc
+    # stamps ahead of it, so pending never holds more than that.
+    assert max_pending[0] <= 2*nproc
+
+    images = galsim.config.BuildStamps(nobjects, config, nproc=1, do_noise=False)[0]
+    for k in range(nobjects):
+        np.testing.assert_array_equal(stamps[k].array, images[k].array)
+
+    # Without ordered_callback, the tasks are larger, but each stamp still arrives once.
+    stamps2 = {}
+    def callback2(k, image, psf_image, weight_image, badpix_image):
+        assert k not in stamps2
+        stamps2[k] = image
+    galsim.config.BuildStamps(nobjects, config, nproc=nproc, do_noise=False, callback=callback2)
+    np.testing.assert_equal(sorted(stamps2.keys()), range(nobjects))
+    for k in range(nobjects):
+        np.testing.assert_array_equal(stamps2[k].array, images[k].array)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_compression_settings():
+    """Test that output.compression_level doesn't carry over to later writes
+    """
+    import time
+    t1 = time.time()
+
+    write_file = galsim.fits.write_file
+    level = write_file.compression_level
+    threads = write_file.compression_threads
+    file_name = os.path.join('Image_comparison_images', 'test_config_compression.fits.gz')
+    config = {
+        'gal' : { 'type' : 'Gaussian', 'sigma' : 0.7, 'flux' : 17 },
+        'image' : { 'pixel_scale' : 0.3, 'size' : 32 },
+        'output' : { 'file_name' : file_name,
+                     'compression_level' : 1, 'compression_threads' : 2 }
+    }
+    galsim.config.Process(config)
+    image = galsim.fits.read(file_name)
+    np.testing.assert_almost_equal(image.array.sum(), 17, decimal=2)
+    np.testing.assert_equal(write_file.compression_level, level)
+    np.testing.assert_equal(write_file.compression_threads, threads)
+
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
 if __name__ == "__main__":
     test_scattered()
+    test_tiled_psf_image()
+    test_nproc()
+    test_stamp_callback()
+    test_compression_settings()
 
 
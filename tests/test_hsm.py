@@ -143,6 +143,87 @@ def test_moments_basic():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_moments_warm_start():
+    """Test that starting adaptive moments from a previous result gives the same answer faster."""
+    import time
+    t1 = time.time()
+    gal = galsim.Sersic(n=2.5, half_light_radius=0.8, flux=1000.)
+    gal.applyShear(g1=0.25, g2=-0.15)
+    gal.applyShift(0.07, -0.11)
+    image = gal.draw(dx = pixel_scale)
+    first = image.FindAdaptiveMom()
+
+    # Repeating the measurement should take a single iteration.
+    res = image.FindAdaptiveMom(warm_start = first)
+    assert res.moments_n_iter == 1, 'Warm start on identical image took %d iterations'%(
+        res.moments_n_iter)
+    np.testing.assert_almost_equal(res.moments_sigma, first.moments_sigma, decimal=5)
+    np.testing.assert_almost_equal(res.observed_shape.e1, first.observed_shape.e1, decimal=5)
+    np.testing.assert_almost_equal(res.observed_shape.e2, first.observed_shape.e2, decimal=5)
+
+    # For noise realizations, the warm start should agree with a cold start, but take fewer 
+    # iterations.
+    rng = galsim.BaseDeviate(1234)
+    n_cold = n_warm = 0
+    for i in range(5):
+        noisy = galsim.ImageD(image)
+        noisy.addNoise(galsim.GaussianNoise(rng, sigma=0.05))
+        cold = noisy.FindAdaptiveMom()
+        warm = noisy.FindAdaptiveMom(warm_start = first)
+        np.testing.assert_almost_equal(warm.moments_sigma, cold.moments_sigma, decimal=4)
+        np.testing.assert_almost_equal(warm.observed_shape.e1, cold.observed_shape.e1, decimal=4)
+        np.testing.assert_almost_equal(warm.observed_shape.e2, cold.observed_shape.e2, decimal=4)
+        np.testing.assert_almost_equal(warm.moments_centroid.x, cold.moments_centroid.x, 
+                                       decimal=4)
+        np.testing.assert_almost_equal(warm.moments_centroid.y, cold.moments_centroid.y,
+                                       decimal=4)
+        n_cold += cold.moments_n_iter
+        n_warm += warm.moments_n_iter
+    assert n_warm < 0.5 * n_cold, 'Warm start took %d iterations, cf. %d'%(n_warm, n_cold)
+
+    # A failed previous measurement is ignored.
+    res = image.FindAdaptiveMom(warm_start = galsim.hsm.ShapeData())
+    assert equal_hsmshapedata(res, first)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_moments_big_stamp():
+    """Test that a small object in a big stamp has the same moments as in a small stamp."""
+    import time
+    t1 = time.time()
+    gal = galsim.Exponential(half_light_radius=0.5, flux=100.)
+    gal.applyShear(g1=0.3, g2=0.2)
+    small = gal.draw(galsim.ImageD(32,32), dx = pixel_scale)
+    small.setOrigin(241,241)
+    big = galsim.ImageD(512,512)
+    big[small.bounds] = small
+    # Start both from the same guess.  Even so, FindAdaptiveMom only converges to about 1.e-6,
+    # so don't expect better agreement than that.
+    guess = small.bounds.trueCenter()
+    res_small = small.FindAdaptiveMom(guess_x_centroid = guess.x, guess_y_centroid = guess.y)
+    res_big = big.FindAdaptiveMom(guess_x_centroid = guess.x, guess_y_centroid = guess.y)
+    np.testing.assert_almost_equal(res_big.moments_sigma / res_small.moments_sigma, 1., decimal=5)
+    np.testing.assert_almost_equal(res_big.observed_shape.e1, res_small.observed_shape.e1,
+                                   decimal=5)
+    np.testing.assert_almost_equal(res_big.observed_shape.e2, res_small.observed_shape.e2,
+                                   decimal=5)
+    np.testing.assert_almost_equal(res_big.moments_amp / res_small.moments_amp, 1., decimal=5)
+
+    # Effectively turning off the cutoff of the weight should make very little difference.
+    hsmparams = galsim.hsm.HSMParams(max_moment_nsig2=1.e10)
+    res_all = big.FindAdaptiveMom(guess_x_centroid = res_small.moments_centroid.x,
+                                  guess_y_centroid = res_small.moments_centroid.y,
+                                  hsmparams = hsmparams)
+    np.testing.assert_almost_equal(res_all.moments_sigma / res_big.moments_sigma, 1., decimal=5)
+    np.testing.assert_almost_equal(res_all.observed_shape.e1, res_big.observed_shape.e1,
+                                   decimal=5)
+    np.testing.assert_almost_equal(res_all.observed_shape.e2, res_big.observed_shape.e2,
+                                   decimal=5)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 def test_shearest_basic():
     """Test that we can recover shears for Gaussian galaxies and PSFs."""
     import time
@@ -225,6 +306,126 @@ def test_shearest_precomputed():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_shearest_kernel_cache():
+    """Test that re-Gaussianization gives the same answer whether or not the PSF kernel is cached.
+    """
+    import time
+    t1 = time.time()
+    psf = galsim.Moffat(beta=3, fwhm=0.8)
+    psf_image = psf.draw(dx = pixel_scale)
+    gal_images = []
+    for hlr, g1, g2 in [ (0.6, 0.1, -0.2), (0.9, -0.3, 0.05), (0.7, 0.0, 0.3) ]:
+        gal = galsim.Exponential(half_light_radius = hlr)
+        gal.applyShear(g1=g1, g2=g2)
+        final = galsim.Convolve([gal, psf])
+        gal_images.append(final.draw(dx = pixel_scale))
+
+    # The first measurement of each galaxy may or may not use a cached kernel from an
+    # earlier galaxy.  Repeating them must give identical results.
+    results = [ galsim.hsm.EstimateShear(im, psf_image) for im in gal_images ]
+    for im, res in zip(reversed(gal_images), reversed(results)):
+        res2 = galsim.hsm.EstimateShear(im, psf_image)
+        assert equal_hsmshapedata(res, res2), 'Shear outputs differ when reusing the PSF kernel'
+
+    # Measuring with many other PSFs pushes the original kernel out of the cache.
+    for fwhm in np.linspace(0.7, 0.9, 10):
+        other_psf_image = galsim.Moffat(beta=3, fwhm=fwhm).draw(dx = pixel_scale)
+        galsim.hsm.EstimateShear(gal_images[0], other_psf_image)
+    res2 = galsim.hsm.EstimateShear(gal_images[0], psf_image)
+    assert equal_hsmshapedata(results[0], res2), 'Shear outputs differ after recomputing kernel'
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_batch():
+    """Test that the batch functions give the same results as measuring each stamp separately."""
+    import time
+    t1 = time.time()
+    psf = galsim.Moffat(beta=3, fwhm=0.8)
+    psf_image = psf.draw(dx = pixel_scale)
+    nx = ny = 40
+    params = [ (0.6, 0.1, -0.2), (0.9, -0.3, 0.05), (0.7, 0.0, 0.3), (0.8, 0.2, 0.2) ]
+    cube = np.zeros((len(params), ny, nx))
+    tiled = galsim.ImageD(nx * len(params), ny)
+    bounds = []
+    for i, (hlr, g1, g2) in enumerate(params):
+        gal = galsim.Exponential(half_light_radius = hlr)
+        gal.applyShear(g1=g1, g2=g2)
+        final = galsim.Convolve([gal, psf])
+        b = galsim.BoundsI(i*nx+1, (i+1)*nx, 1, ny)
+        final.draw(tiled[b], dx = pixel_scale)
+        cube[i,:,:] = tiled[b].array
+        bounds.append(b)
+    # Make the last one fail by masking all its pixels.
+    weight = np.ones_like(cube)
+    weight[-1,:,:] = 0.
+
+    mom_cube = galsim.hsm.FindAdaptiveMomBatch(cube, weight=weight)
+    mom_tiled = galsim.hsm.FindAdaptiveMomBatch(tiled, bounds=bounds, nthreads=2)
+    shear_cube = galsim.hsm.EstimateShearBatch(cube, psf_image, weight=weight, nthreads=0)
+    shear_tiled = galsim.hsm.EstimateShearBatch(tiled, psf_image, gal_bounds=bounds)
+    assert len(mom_cube) == len(params)
+    assert len(shear_tiled) == len(params)
+
+    for i, b in enumerate(bounds):
+        mom = tiled[b].FindAdaptiveMom()
+        shear = galsim.hsm.EstimateShear(tiled[b], psf_image)
+        for res in [ mom_tiled[i], shear_tiled[i] ]:
+            assert not res['error']
+            np.testing.assert_almost_equal(res['moments_centroid_x'], mom.moments_centroid.x)
+            np.testing.assert_almost_equal(res['moments_centroid_y'], mom.moments_centroid.y)
+        np.testing.assert_equal(mom_tiled[i]['moments_sigma'], mom.moments_sigma)
+        np.testing.assert_equal(mom_tiled[i]['observed_e1'], mom.observed_shape.e1)
+        np.testing.assert_equal(mom_tiled[i]['observed_e2'], mom.observed_shape.e2)
+        np.testing.assert_equal(mom_tiled[i]['moments_n_iter'], mom.moments_n_iter)
+        np.testing.assert_equal(shear_tiled[i]['corrected_e1'], shear.corrected_e1)
+        np.testing.assert_equal(shear_tiled[i]['corrected_e2'], shear.corrected_e2)
+        np.testing.assert_equal(shear_tiled[i]['resolution_factor'], shear.resolution_factor)
+
+        if i < len(params)-1:
+            # The cube stamps have their own coordinates, starting at (1,1).
+            for res in [ mom_cube[i], shear_cube[i] ]:
+                assert not res['error']
+                np.testing.assert_almost_equal(res['moments_centroid_x'], 
+                                               mom.moments_centroid.x - i*nx)
+                np.testing.assert_almost_equal(res['moments_centroid_y'], mom.moments_centroid.y)
+            np.testing.assert_almost_equal(mom_cube[i]['moments_sigma'], mom.moments_sigma)
+            np.testing.assert_almost_equal(shear_cube[i]['corrected_e1'], shear.corrected_e1)
+            np.testing.assert_almost_equal(shear_cube[i]['corrected_e2'], shear.corrected_e2)
+        else:
+            assert mom_cube[i]['error']
+            assert shear_cube[i]['error']
+            assert mom_cube[i]['moments_status'] == -1
+            assert shear_cube[i]['corrected_e1'] == -10.
+
+    # Other pixel types are converted to double, and int galaxies can be used with a float PSF.
+    short_array = (tiled.array * 1.e4).astype(np.int16)
+    image_s = galsim.ImageViewS(short_array)
+    image_d = galsim.ImageViewD(short_array.astype(np.float64))
+    image_i = galsim.ImageViewI(short_array.astype(np.int32))
+    mom_s = galsim.hsm.FindAdaptiveMomBatch(image_s, bounds=bounds)
+    mom_d = galsim.hsm.FindAdaptiveMomBatch(image_d, bounds=bounds)
+    np.testing.assert_array_equal(mom_s['moments_sigma'], mom_d['moments_sigma'])
+    np.testing.assert_array_equal(mom_s['observed_e1'], mom_d['observed_e1'])
+    shear_s = galsim.hsm.EstimateShearBatch(image_s, psf_image, gal_bounds=bounds)
+    shear_i = galsim.hsm.EstimateShearBatch(image_i, psf_image, gal_bounds=bounds)
+    shear_d = galsim.hsm.EstimateShearBatch(image_d, psf_image, gal_bounds=bounds)
+    np.testing.assert_array_equal(shear_s['corrected_e1'], shear_d['corrected_e1'])
+    np.testing.assert_array_equal(shear_i['corrected_e1'], shear_d['corrected_e1'])
+
+    # A PSF for each galaxy should work too.
+    psf_cube = np.array([ psf_image.array ] * len(params))
+    shear_cube2 = galsim.hsm.EstimateShearBatch(cube, psf_cube, weight=weight)
+    np.testing.assert_array_equal(shear_cube2['corrected_e1'], shear_cube['corrected_e1'])
+    try:
+        np.testing.assert_raises(ValueError, galsim.hsm.EstimateShearBatch, cube, psf_cube[:2])
+        np.testing.assert_raises(ValueError, galsim.hsm.FindAdaptiveMomBatch, cube, bounds=bounds)
+    except ImportError:
+        print 'The assert_raises tests require nose'
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 def test_masks():
     """Test that moments and shear estimation routines respond appropriately to masks."""
     import time
@@ -595,8 +796,12 @@ def test_hsmparams_nodefault():
 
 if __name__ == "__main__":
     test_moments_basic()
+    test_moments_warm_start()
+    test_moments_big_stamp()
     test_shearest_basic()
     test_shearest_precomputed()
+    test_shearest_kernel_cache()
+    test_batch()
     test_masks()
     test_shearest_shape()
     test_hsmparams()
@@ -139,6 +139,145 @@ def test_nfwhalo():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_nfwhalo_redshifts():
+    """Test the tabulated Cosmology distances and NFWHalo with arrays of source redshifts"""
+    import time
+    t1 = time.time()
+
+    # Compare the tabulated distances to direct integration, for flat, open and closed models.
+    z = np.array([0., 0.01, 0.3, 1., 1.2345, 3., 7.5])
+    for omega_m, omega_lam in [ (0.3, 0.7), (0.3, 0.5), (0.25, 0.9) ]:
+        cosmo = galsim.Cosmology(omega_m=omega_m, omega_lam=omega_lam)
+        kernel = lambda x: cosmo.E(1./x)**-1
+        rk = abs(cosmo.omega_c)**0.5
+        for z_ref in [ 0., 0.3 ]:
+            da = cosmo.Da(z[z >= z_ref], z_ref)
+            for zz, d in zip(z[z >= z_ref], da):
+                ref = galsim.integ.int1d(kernel, z_ref+1, zz+1)
+                if rk*ref > 0.01:
+                    if cosmo.omega_c > 0:
+                        ref = np.sinh(rk*ref)/rk
+                    else:
+                        ref = np.sin(rk*ref)/rk
+                ref /= 1+zz
+                np.testing.assert_almost_equal(
+                    d, ref, decimal=8,
+                    err_msg="Tabulated Da disagrees with direct integration for z = %f"%zz)
+                # Scalar input should give the same value, returned as a float.
+                np.testing.assert_equal(cosmo.Da(zz, z_ref), d)
+        try:
+            cosmo.Da(-0.1)
+            raise AssertionError("Da did not raise for negative redshift")
+        except ValueError:
+            pass
+        try:
+            cosmo.Da(np.array([1., 0.2]), 0.3)
+            raise AssertionError("Da did not raise for z < z_ref")
+        except ValueError:
+            pass
+
+    # Array of source redshifts with many repeated values should match per-source scalar calls.
+    halo = galsim.NFWHalo(mass=1e15, conc=4, redshift=0.3)
+    ud = galsim.UniformDeviate(1234)
+    n = 200
+    pos_x = np.array([ 100.*(2.*ud()-1.) for i in range(n) ])
+    pos_y = np.array([ 100.*(2.*ud()-1.) for i in range(n) ])
+    z_s = np.array([ 0.5 + 0.1*int(20*ud()) for i in range(n) ])
+    kappa = halo.getConvergence((pos_x, pos_y), z_s)
+    g1, g2 = halo.getShear((pos_x, pos_y), z_s)
+    for i in range(0, n, 17):
+        k_i = halo.getConvergence(galsim.PositionD(pos_x[i], pos_y[i]), z_s[i])
+        g1_i, g2_i = halo.getShear(galsim.PositionD(pos_x[i], pos_y[i]), z_s[i])
+        np.testing.assert_almost_equal(kappa[i], k_i, decimal=12,
+                                       err_msg="Array and scalar z_s give different kappa")
+        np.testing.assert_almost_equal(g1[i], g1_i, decimal=12,
+                                       err_msg="Array and scalar z_s give different g1")
+        np.testing.assert_almost_equal(g2[i], g2_i, decimal=12,
+                                       err_msg="Array and scalar z_s give different g2")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_nfwhalo_field():
+    """Test that NFWHaloField matches the sum of its individual halos"""
+    import time
+    t1 = time.time()
+
+    data = np.loadtxt(os.path.join(refdir, 'nfw_halo_field.dat'))
+    mass, conc, redshift, halo_x, halo_y = data.T
+
+    # Sources with a range of redshifts, some of them in front of some of the halos.
+    ud = galsim.UniformDeviate(8675309)
+    n = 500
+    pos_x = np.array([ 2000.*(2.*ud()-1.) for i in range(n) ])
+    pos_y = np.array([ 2000.*(2.*ud()-1.) for i in range(n) ])
+    z_s = np.array([ 0.1 + 1.4*ud() for i in range(n) ])
+
+    # With a very large truncation radius, every halo contributes to every source behind it.
+    field = galsim.NFWHaloField(mass, conc, redshift, halo_x, halo_y, trunc=1.e4)
+    gamma1, gamma2 = field.getShear((pos_x, pos_y), z_s, reduced=False)
+    kappa = field.getConvergence((pos_x, pos_y), z_s)
+    g1, g2, mu = field.getLensing((pos_x, pos_y), z_s)
+
+    ref_gamma1 = np.zeros(n)
+    ref_gamma2 = np.zeros(n)
+    ref_kappa = np.zeros(n)
+    for halo in field.halos:
+        use = z_s > halo.z
+        pos = (pos_x[use], pos_y[use])
+        gh1, gh2 = halo.getShear(pos, z_s[use], reduced=False)
+        ref_gamma1[use] += gh1
+        ref_gamma2[use] += gh2
+        ref_kappa[use] += halo.getConvergence(pos, z_s[use])
+    np.testing.assert_array_almost_equal(gamma1, ref_gamma1, decimal=10,
+                                         err_msg="NFWHaloField gamma1 disagrees with sum of halos")
+    np.testing.assert_array_almost_equal(gamma2, ref_gamma2, decimal=10,
+                                         err_msg="NFWHaloField gamma2 disagrees with sum of halos")
+    np.testing.assert_array_almost_equal(kappa, ref_kappa, decimal=10,
+                                         err_msg="NFWHaloField kappa disagrees with sum of halos")
+    np.testing.assert_array_almost_equal(g1, ref_gamma1/(1-ref_kappa), decimal=10,
+                                         err_msg="NFWHaloField reduced shear g1 incorrect")
+    np.testing.assert_array_almost_equal(
+        mu, 1./((1-ref_kappa)**2 - ref_gamma1**2 - ref_gamma2**2), decimal=8,
+        err_msg="NFWHaloField magnification incorrect")
+
+    # With a single halo, the field should match NFWHalo inside the truncation radius and be
+    # zero outside it.
+    field = galsim.NFWHaloField(mass[:1], conc[:1], redshift[:1], halo_x[:1], halo_y[:1], trunc=2.)
+    halo = field.halos[0]
+    r_trunc = 2. * halo.c * halo.rs_arcsec
+    for r in [ 0.5*r_trunc, 0.99*r_trunc, 1.01*r_trunc, 3.*r_trunc ]:
+        pos = galsim.PositionD(r/np.sqrt(2.), -r/np.sqrt(2.))
+        kappa = field.getConvergence(pos, 1.)
+        g1, g2 = field.getShear(pos, 1.)
+        if r < r_trunc:
+            np.testing.assert_almost_equal(kappa, halo.getConvergence(pos, 1.), decimal=12)
+            np.testing.assert_almost_equal(g1, halo.getShear(pos, 1.)[0], decimal=12)
+            np.testing.assert_almost_equal(g2, halo.getShear(pos, 1.)[1], decimal=12)
+        else:
+            np.testing.assert_equal(kappa, 0.)
+            np.testing.assert_equal((g1, g2), (0., 0.))
+
+    # Check the config interface, reading the halos from the file.
+    config = {
+        'input' : { 'nfw_halo_field' : { 'dir' : refdir, 'file_name' : 'nfw_halo_field.dat' } },
+        'gal' : { 'redshift' : 0.9,
+                  'shear' : { 'type' : 'NFWHaloFieldShear' },
+                  'magnification' : { 'type' : 'NFWHaloFieldMagnification' } },
+        'sky_pos' : galsim.PositionD(pos_x[0], pos_y[0])
+    }
+    galsim.config.ProcessInput(config)
+    field = galsim.NFWHaloField(mass, conc, redshift, halo_x, halo_y)
+    shear = galsim.config.ParseValue(config['gal'], 'shear', config, galsim.Shear)[0]
+    mu = galsim.config.ParseValue(config['gal'], 'magnification', config, float)[0]
+    g1, g2 = field.getShear(config['sky_pos'], 0.9)
+    np.testing.assert_almost_equal(shear.g1, g1, decimal=10)
+    np.testing.assert_almost_equal(shear.g2, g2, decimal=10)
+    np.testing.assert_almost_equal(mu, field.getMagnification(config['sky_pos'], 0.9), decimal=10)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 def test_shear_variance():
     """Test that shears from several toy power spectra have the expected variances."""
     import time
@@ -728,6 +867,8 @@ def test_power_spectrum_with_kappa():
 
 if __name__ == "__main__":
     test_nfwhalo()
+    test_nfwhalo_redshifts()
+    test_nfwhalo_field()
     test_shear_variance()
     test_shear_seeds()
     test_shear_reference()
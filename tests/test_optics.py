@@ -338,6 +338,98 @@ def test_OpticalPSF_aberration():
     t2 = time.time()
     print 'time for %s = %.2f' % (funcname(), t2 - t1)
 
+def test_OpticalPSF_cache():
+    """Test that cached OpticalPSFs and wavefronts match freshly computed ones.
+    """
+    import time
+    t1 = time.time()
+    lod = 0.04
+    kwargs = { 'defocus' : .5, 'astig1' : 0.5, 'coma2' : -0.3, 'spher' : -0.8,
+               'obscuration' : 0.3 }
+    # Build one OpticalPSF through the cache, then shear it in place.  The second one should come
+    # from the cache, but must not be affected by the shear applied to the first.
+    galsim.optics._optical_sbprofile_cache.clear()
+    optics1 = galsim.OpticalPSF(lod, **kwargs)
+    image1 = optics1.draw(dx=0.2*lod)
+    optics1.applyShear(g1=0.2)
+    optics2 = galsim.OpticalPSF(lod, **kwargs)
+    image2 = optics2.draw(dx=0.2*lod)
+    np.testing.assert_array_equal(
+        image1.array, image2.array,
+        err_msg="Cached OpticalPSF does not match original")
+    # Compare to one built with an interpolant instance, which bypasses the cache.
+    interpolant = galsim.InterpolantXY(galsim.Quintic(tol=1e-4))
+    optics3 = galsim.OpticalPSF(lod, interpolant=interpolant, **kwargs)
+    image3 = optics3.draw(dx=0.2*lod)
+    np.testing.assert_array_almost_equal(
+        image1.array, image3.array, decimal,
+        err_msg="Cached OpticalPSF does not match uncached one")
+
+    # Check that the wavefront for new aberrations on an already cached geometry is right:
+    # the wavefront of a pure defocus should be exp(2 pi i defocus sqrt(3) (2 rho^2 - 1))
+    rho, theta, in_pupil = galsim.optics.generate_pupil_plane(array_shape=testshape)
+    for defocus in (0.1, -0.7):
+        wf = galsim.optics.wavefront(array_shape=testshape, defocus=defocus)
+        wf_test = np.zeros(testshape, dtype=complex)
+        wf_test[in_pupil] = np.exp(
+            2j * np.pi * defocus * np.sqrt(3.) * (2. * rho[in_pupil]**2 - 1.))
+        np.testing.assert_array_almost_equal(
+            wf, wf_test, decimal,
+            err_msg="Wavefront from cached Zernike basis disagrees with expected result")
+
+    # The arrays returned by generate_pupil_plane are copies, so modifying them must not change
+    # the cached ones.
+    rho[:,:] = 0.
+    rho2, theta2, in_pupil2 = galsim.optics.generate_pupil_plane(array_shape=testshape)
+    assert np.any(rho2 != 0.)
+    wf2 = galsim.optics.wavefront(array_shape=testshape, defocus=defocus)
+    np.testing.assert_array_equal(wf2, wf)
+
+    try:
+        np.testing.assert_raises(ValueError, galsim.utilities.LRU_Cache, lambda x: x, 0)
+        np.testing.assert_raises(ValueError, galsim.optics._pupil_plane_cache.resize, 0)
+    except ImportError:
+        print 'The assert_raises tests require nose'
+    t2 = time.time()
+    print 'time for %s = %.2f' % (funcname(), t2 - t1)
+
+def test_psf_batch():
+    """Test that the batched PSF calculation matches individual calls to galsim.optics.psf.
+    """
+    import time
+    t1 = time.time()
+    names = ('defocus', 'astig1', 'astig2', 'coma1', 'coma2', 'trefoil1', 'trefoil2', 'spher')
+    ud = galsim.UniformDeviate(1234)
+    aberrations = np.array([ [ ud() - 0.5 for name in names ] for i in range(5) ])
+    dx_test = 3.
+    lod_test = 8.
+    shape = (64, 64)
+    # Use a small max_batch so we test the loop over batches.
+    stack = galsim.optics.psf_batch(
+        aberrations, array_shape=shape, dx=dx_test, lam_over_diam=lod_test, obscuration=0.2,
+        flux=2., max_batch=2)
+    images = galsim.optics.psf_images_batch(
+        aberrations, array_shape=shape, dx=dx_test, lam_over_diam=lod_test, obscuration=0.2,
+        flux=2.)
+    assert stack.flags.c_contiguous
+    assert len(images) == len(aberrations)
+    for i in range(len(aberrations)):
+        kwargs = dict(zip(names, aberrations[i]))
+        psf = galsim.optics.psf(
+            array_shape=shape, dx=dx_test, lam_over_diam=lod_test, obscuration=0.2, flux=2.,
+            **kwargs)
+        np.testing.assert_array_almost_equal(
+            stack[i], psf, decimal,
+            err_msg="psf_batch disagrees with psf")
+        np.testing.assert_array_almost_equal(
+            images[i].array, psf, decimal,
+            err_msg="psf_images_batch disagrees with psf")
+        np.testing.assert_almost_equal(
+            images[i].getScale(), dx_test, decimal,
+            err_msg="psf_images_batch image scale not set correctly")
+    t2 = time.time()
+    print 'time for %s = %.2f' % (funcname(), t2 - t1)
+
 if __name__ == "__main__":
     test_check_all_contiguous()
     test_simple_wavefront()
@@ -353,3 +445,5 @@ if __name__ == "__main__":
     test_OpticalPSF_vs_Airy()
     test_OpticalPSF_vs_Airy_with_obs()
     test_OpticalPSF_aberration()
+    test_OpticalPSF_cache()
+    test_psf_batch()